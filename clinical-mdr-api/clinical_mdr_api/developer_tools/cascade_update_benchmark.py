@@ -0,0 +1,126 @@
+"""
+Benchmark of the cascade update of syntax instances when approving a template.
+
+Compares the bulk `cascade_update_from_template` of the instance repositories
+with the previous implementation (find_by_uid, cascade_update and save for each instance)
+on the database configured with NEO4J_DSN.
+The template must be an objective template with at least one instance.
+That instance is cloned until the template has the requested number of instances.
+All changes, including the clones, are rolled back.
+
+Usage:
+    python -m clinical_mdr_api.developer_tools.cascade_update_benchmark ObjectiveTemplate_000001 [--instances 5000]
+"""
+
+import argparse
+import datetime
+import time
+
+from neomodel import db
+
+from clinical_mdr_api.domain_repositories.syntax_instances.objective_repository import (
+    ObjectiveRepository,
+)
+
+AUTHOR_ID = "cascade-update-benchmark"
+
+CLONE_INSTANCE_QUERY = """
+MATCH (template:ObjectiveTemplateRoot {uid: $template_uid})-[:HAS_OBJECTIVE]->(root:ObjectiveRoot)-[:LATEST]->(value)
+WITH template, root, value LIMIT 1
+MATCH (root)-[version:HAS_VERSION]->(value)
+WITH template, root, value, version ORDER BY version.start_date DESC LIMIT 1
+MATCH (library:Library)-[:CONTAINS_SYNTAX_INSTANCE]->(root)
+UNWIND range(1, $count) AS index
+CALL apoc.create.node(labels(root), apoc.map.setKey(properties(root), "uid", root.uid + "_" + index))
+YIELD node AS root_clone
+CALL apoc.create.node(labels(value), properties(value)) YIELD node AS value_clone
+CREATE (template)-[:HAS_OBJECTIVE]->(root_clone)
+CREATE (library)-[:CONTAINS_SYNTAX_INSTANCE]->(root_clone)
+CREATE (root_clone)-[:LATEST]->(value_clone)
+CREATE (root_clone)-[version_clone:HAS_VERSION]->(value_clone)
+SET version_clone = properties(version)
+WITH root_clone, value_clone, value, version
+CALL apoc.create.relationship(root_clone, "LATEST_" + toUpper(version.status), {}, value_clone)
+YIELD rel
+WITH value_clone, value
+MATCH (value)-[parameter:USES_VALUE|HAS_CONJUNCTION]->(target)
+CALL apoc.create.relationship(value_clone, type(parameter), properties(parameter), target)
+YIELD rel
+RETURN count(DISTINCT value_clone)
+"""
+
+
+def legacy_cascade_update(repository, template_uid, template_name, date):
+    for uid in repository.find_instance_uids_by_template_uid(template_uid):
+        instance = repository.find_by_uid(uid, for_update=True)
+        if instance:
+            instance.cascade_update(
+                author_id=AUTHOR_ID, date=date, new_template_name=template_name
+            )
+            repository.save(instance)
+
+
+def bulk_cascade_update(repository, template_uid, template_name, date):
+    repository.cascade_update_from_template(
+        template_uid=template_uid,
+        template_name=template_name,
+        template_library_name="Sponsor",
+        author_id=AUTHOR_ID,
+        date=date,
+    )
+
+
+def timed_and_rolled_back(function, template_uid, instances) -> float:
+    db.begin()
+    try:
+        result, _ = db.cypher_query(
+            """
+            MATCH (:ObjectiveTemplateRoot {uid: $template_uid})-[:HAS_OBJECTIVE]->(root:ObjectiveRoot)
+            RETURN count(root)
+            """,
+            {"template_uid": template_uid},
+        )
+        missing = instances - result[0][0]
+        if missing > 0:
+            db.cypher_query(
+                CLONE_INSTANCE_QUERY, {"template_uid": template_uid, "count": missing}
+            )
+        template_name, _ = db.cypher_query(
+            """
+            MATCH (:ObjectiveTemplateRoot {uid: $template_uid})-[:LATEST]->(value)
+            RETURN value.name
+            """,
+            {"template_uid": template_uid},
+        )
+        start = time.perf_counter()
+        function(
+            ObjectiveRepository(),
+            template_uid,
+            template_name[0][0],
+            datetime.datetime.now(datetime.timezone.utc),
+        )
+        return time.perf_counter() - start
+    finally:
+        db.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("template_uid")
+    parser.add_argument("--instances", type=int, default=5000)
+    args = parser.parse_args()
+
+    legacy_time = timed_and_rolled_back(
+        legacy_cascade_update, args.template_uid, args.instances
+    )
+    bulk_time = timed_and_rolled_back(
+        bulk_cascade_update, args.template_uid, args.instances
+    )
+    print(
+        f"{'instances':>9} | {'legacy (s)':>10} | {'bulk (s)':>8} | speedup\n"
+        f"{args.instances:>9} | {legacy_time:>10.2f} | {bulk_time:>8.2f} | x{legacy_time / bulk_time:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark of the in-memory filtering used by the study selection services.
+
+Compares `generic_item_filtering` (compiled filters, single pass, one composite sort)
+with the previous implementation (one pass per filter element using `filter_aggregated_items`,
+one full sort per sort key) on synthetic items.
+
+Usage:
+    python -m clinical_mdr_api.developer_tools.filtering_benchmark [--sizes 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+
+from pydantic import BaseModel
+
+from clinical_mdr_api.repositories._utils import FilterDict, FilterOperator
+from clinical_mdr_api.services._utils import (
+    extract_nested_key_value,
+    filter_aggregated_items,
+    generic_item_filtering,
+)
+
+
+class BenchmarkTerm(BaseModel):
+    term_uid: str
+    sponsor_preferred_name: str
+
+
+class BenchmarkItem(BaseModel):
+    uid: str
+    name: str
+    order: int
+    status: str
+    visit_type: BenchmarkTerm
+    categories: list[BenchmarkTerm]
+
+
+SCENARIOS = {
+    "and, contains + eq, 2 sort keys": (
+        {
+            "name": {"v": ["visit 1"], "op": "co"},
+            "status": {"v": ["DRAFT"], "op": "eq"},
+        },
+        FilterOperator.AND,
+        {"visit_type.sponsor_preferred_name": True, "order": False},
+    ),
+    "and, nested + list fields": (
+        {
+            "visit_type.sponsor_preferred_name": {"v": ["Treatment"], "op": "eq"},
+            "categories.sponsor_preferred_name": {"v": ["Safety"], "op": "co"},
+        },
+        FilterOperator.AND,
+        {"name": True},
+    ),
+    "or, 3 filter elements": (
+        {
+            "name": {"v": ["visit 12"], "op": "co"},
+            "status": {"v": ["RETIRED"], "op": "eq"},
+            "visit_type.term_uid": {"v": ["CTTerm_000003"], "op": "eq"},
+        },
+        FilterOperator.OR,
+        {"order": True},
+    ),
+}
+
+
+def legacy_item_filtering(items, filter_by, filter_operator, sort_by):
+    filters = FilterDict(elements=filter_by)
+    if filter_operator == FilterOperator.AND:
+        filtered_items = items
+        for key, element in filters.elements.items():
+            filtered_items = [
+                x
+                for x in filtered_items
+                if filter_aggregated_items(x, key, element.v, element.op)
+            ]
+    else:
+        _filtered_items = []
+        for key, element in filters.elements.items():
+            _filtered_items += [
+                x
+                for x in items
+                if filter_aggregated_items(x, key, element.v, element.op)
+            ]
+        uids = set()
+        filtered_items = []
+        for item in _filtered_items:
+            if item.uid not in uids:
+                filtered_items.append(item)
+                uids.add(item.uid)
+    for sort_key, sort_order in sort_by.items():
+        filtered_items.sort(
+            key=lambda x, s=sort_key: (
+                elm if (elm := extract_nested_key_value(x, s)) is not None else "-1"
+            ),
+            reverse=not sort_order,
+        )
+    return filtered_items
+
+
+def generate_items(size: int) -> list[BenchmarkItem]:
+    rnd = random.Random(size)
+    terms = [
+        BenchmarkTerm(term_uid=f"CTTerm_{index:06}", sponsor_preferred_name=name)
+        for index, name in enumerate(
+            ["Screening", "Treatment", "Follow-up", "Safety", "Efficacy", "Other"]
+        )
+    ]
+    return [
+        BenchmarkItem(
+            uid=f"Item_{index:06}",
+            name=f"Visit {index}",
+            order=rnd.randint(0, size),
+            status=rnd.choice(["DRAFT", "FINAL", "RETIRED"]),
+            visit_type=rnd.choice(terms),
+            categories=rnd.sample(terms, 2),
+        )
+        for index in range(size)
+    ]
+
+
+def timed(function, repeat: int) -> tuple[float, list]:
+    best = None
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'items':>8} | {'scenario':<32} | {'legacy (s)':>10} | {'compiled (s)':>12} | speedup"
+    )
+    for size in args.sizes:
+        items = generate_items(size)
+        for name, (filter_by, filter_operator, sort_by) in SCENARIOS.items():
+            legacy_time, legacy_result = timed(
+                lambda: legacy_item_filtering(
+                    list(items), filter_by, filter_operator, sort_by
+                ),
+                args.repeat,
+            )
+            compiled_time, compiled_result = timed(
+                lambda: generic_item_filtering(
+                    items=list(items),
+                    filter_by=filter_by,
+                    filter_operator=filter_operator,
+                    sort_by=sort_by,
+                ),
+                args.repeat,
+            )
+            assert [item.uid for item in legacy_result] == [
+                item.uid for item in compiled_result
+            ], f"Results differ for scenario '{name}'"
+            print(
+                f"{size:>8} | {name:<32} | {legacy_time:>10.3f} | {compiled_time:>12.3f} | "
+                f"x{legacy_time / compiled_time:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
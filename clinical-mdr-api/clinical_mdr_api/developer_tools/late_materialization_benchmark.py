@@ -0,0 +1,92 @@
+"""
+Benchmark of the late materialization of the study and CT term listings.
+
+Compares the projection of all rows before the pagination with the projection of the rows
+of the returned page only, enabled by the LATE_MATERIALIZATION setting, on the database
+configured with NEO4J_DSN. Use a database loaded with the complete CDISC CT
+and with a few hundreds of studies to get production-like numbers.
+Exits with status 1 if both modes do not return the same rows.
+
+Usage:
+    python -m clinical_mdr_api.developer_tools.late_materialization_benchmark [--pages 1 50] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from unittest.mock import patch
+
+from clinical_mdr_api.domain_repositories.controlled_terminologies.ct_term_aggregated_repository import (
+    CTTermAggregatedRepository,
+)
+from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository_impl import (
+    StudyDefinitionRepositoryImpl,
+)
+from common import config
+
+
+def timed(function, repeat: int) -> tuple[float, list]:
+    best = None
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def list_terms(page_number: int, page_size: int, late: bool) -> list:
+    with patch.object(config, "LATE_MATERIALIZATION", late):
+        result = CTTermAggregatedRepository().find_all_aggregated_result(
+            page_number=page_number,
+            page_size=page_size,
+            total_count=True,
+        )
+    return [name.uid for name, _ in result.items] + [result.total]
+
+
+def list_studies(page_number: int, page_size: int, late: bool) -> list:
+    with patch.object(config, "LATE_MATERIALIZATION", late):
+        # pylint: disable=protected-access
+        result = StudyDefinitionRepositoryImpl("benchmark")._retrieve_all_snapshots(
+            page_number=page_number,
+            page_size=page_size,
+            total_count=True,
+        )
+    return [study.uid for study in result.items] + [result.total]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    same_results = True
+    print(
+        f"{'listing':<10} | {'page':>5} | {'total':>6} | {'eager (s)':>9} | {'late (s)':>8} | speedup"
+    )
+    for name, listing in [("ct terms", list_terms), ("studies", list_studies)]:
+        for page_number in args.pages:
+            eager_time, eager_result = timed(
+                lambda: listing(page_number, args.page_size, late=False),
+                args.repeat,
+            )
+            late_time, late_result = timed(
+                lambda: listing(page_number, args.page_size, late=True),
+                args.repeat,
+            )
+            same_results = same_results and eager_result == late_result
+            note = "" if eager_result == late_result else " (results differ)"
+            print(
+                f"{name:<10} | {page_number:>5} | {eager_result[-1]:>6} | {eager_time:>9.3f} | {late_time:>8.3f} | "
+                f"x{eager_time / late_time:.1f}{note}"
+            )
+    if not same_results:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of the wildcard search of the CT term listing.
+
+Compares the wildcard predicates evaluated on all terms with the full-text index
+lookup enabled by the WILDCARD_FULLTEXT_SEARCH setting, on the database configured
+with NEO4J_DSN. The full-text indexes must have been created with neo4j-mdr-db/init_neo4j.py.
+Use a database loaded with the complete CDISC CT to get production-like numbers.
+
+Usage:
+    python -m clinical_mdr_api.developer_tools.wildcard_search_benchmark [--search screening "blood pressure"] [--repeat 3]
+"""
+
+import argparse
+import time
+from unittest.mock import patch
+
+from clinical_mdr_api.domain_repositories.controlled_terminologies.ct_term_aggregated_repository import (
+    CTTermAggregatedRepository,
+)
+from clinical_mdr_api.repositories import _utils
+from common import config
+
+
+def timed(function, repeat: int) -> tuple[float, list]:
+    best = None
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def search_terms(search: str, page_size: int, fulltext: bool) -> list[str]:
+    with patch.object(config, "WILDCARD_FULLTEXT_SEARCH", fulltext):
+        result = CTTermAggregatedRepository().find_all_aggregated_result(
+            filter_by={"*": {"v": [search]}},
+            sort_by={"term_uid": True},
+            page_size=page_size,
+            total_count=True,
+        )
+    return [name.uid for name, _ in result.items] + [result.total]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--search",
+        nargs="+",
+        default=["screening", "blood pressure", "mg", "c25473", "xyzzy"],
+    )
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    index_names = {
+        CTTermAggregatedRepository.wildcard_fulltext_index.name,
+        _utils.FULLTEXT_METADATA_INDEX,
+        _utils.FULLTEXT_VERSION_INDEX,
+    }
+    offline = index_names - _utils.get_online_fulltext_indexes()
+    if offline:
+        raise SystemExit(f"The full-text indexes {sorted(offline)} are not online")
+
+    print(
+        f"{'search':<20} | {'total':>6} | {'scan (s)':>9} | {'full-text (s)':>13} | speedup"
+    )
+    for search in args.search:
+        scan_time, scan_result = timed(
+            lambda: search_terms(search, args.page_size, fulltext=False),
+            args.repeat,
+        )
+        fulltext_time, fulltext_result = timed(
+            lambda: search_terms(search, args.page_size, fulltext=True),
+            args.repeat,
+        )
+        note = ""
+        if scan_result != fulltext_result:
+            # Both modes must return the same terms
+            note = f" (MISMATCH, full-text total: {fulltext_result[-1]})"
+        print(
+            f"{search:<20} | {scan_result[-1]:>6} | {scan_time:>9.3f} | {fulltext_time:>13.3f} | "
+            f"x{scan_time / fulltext_time:.1f}{note}"
+        )
+
+
+if __name__ == "__main__":
+    main()
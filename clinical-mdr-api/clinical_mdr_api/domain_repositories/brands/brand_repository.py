@@ -1,6 +1,6 @@
 from threading import Lock
 
-from cachetools import TTLCache, cached
+from cachetools import cached
 from cachetools.keys import hashkey
 
 from clinical_mdr_api.domain_repositories.generic_repository import (
@@ -10,11 +10,14 @@ from clinical_mdr_api.domain_repositories.models.brand import Brand
 from clinical_mdr_api.domains.brands.brand import BrandAR
 from clinical_mdr_api.repositories._utils import sb_clear_cache
 from common import config
+from common.cache import SharedTTLCache
 
 
 class BrandRepository:
-    cache_store_item_by_uid = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_uid = SharedTTLCache(
+        name="BrandRepository.cache_store_item_by_uid",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
     lock_store_item_by_uid = Lock()
 
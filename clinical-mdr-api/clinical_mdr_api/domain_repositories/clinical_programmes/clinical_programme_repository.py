@@ -1,7 +1,7 @@
 from threading import Lock
 from typing import Collection
 
-from cachetools import TTLCache, cached
+from cachetools import cached
 from cachetools.keys import hashkey
 from neomodel import db
 
@@ -16,12 +16,15 @@ from clinical_mdr_api.domains.clinical_programmes.clinical_programme import (
 )
 from clinical_mdr_api.repositories._utils import sb_clear_cache
 from common import config
+from common.cache import SharedTTLCache
 from common.exceptions import BusinessLogicException, NotFoundException
 
 
 class ClinicalProgrammeRepository:
-    cache_store_item_by_uid = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_uid = SharedTTLCache(
+        name="ClinicalProgrammeRepository.cache_store_item_by_uid",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
     lock_store_item_by_uid = Lock()
 
@@ -2,7 +2,7 @@ from datetime import datetime
 from threading import Lock
 from typing import Collection
 
-from cachetools import TTLCache, cached
+from cachetools import cached
 from cachetools.keys import hashkey
 from neo4j.exceptions import CypherSyntaxError
 from neomodel import db
@@ -25,12 +25,15 @@ from clinical_mdr_api.domains.comments.comments import (
 )
 from clinical_mdr_api.repositories._utils import sb_clear_cache
 from common import config, exceptions
+from common.cache import SharedTTLCache
 from common.utils import convert_to_datetime, validate_max_skip_clause
 
 
 class CommentsRepository:
-    cache_store_item_by_uid = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_uid = SharedTTLCache(
+        name="CommentsRepository.cache_store_item_by_uid",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
     lock_store_item_by_uid = Lock()
 
@@ -32,6 +32,7 @@ from clinical_mdr_api.repositories._utils import (
     CypherQueryBuilder,
     FilterDict,
     FilterOperator,
+    WildcardFulltextIndex,
     sb_clear_cache,
     validate_filters_and_add_search_string,
 )
@@ -43,6 +44,8 @@ class ConceptGenericRepository(LibraryItemRepositoryImplBase[_AggregateRootType]
     value_class = type
     return_model = type
     filter_query_parameters = {}
+    # Full-text index on the concept values, used for wildcard filtering if defined
+    wildcard_fulltext_index: WildcardFulltextIndex | None = None
 
     @abstractmethod
     def _create_aggregate_root_instance_from_cypher_result(
@@ -300,6 +303,9 @@ class ConceptGenericRepository(LibraryItemRepositoryImplBase[_AggregateRootType]
             total_count=total_count,
             return_model=self.return_model,
             format_filter_sort_keys=self.format_filter_sort_keys,
+            wildcard_fulltext_index=(
+                self.wildcard_fulltext_index if not return_all_versions else None
+            ),
         )
 
         query.parameters.update(filter_query_parameters)
@@ -397,6 +403,7 @@ class ConceptGenericRepository(LibraryItemRepositoryImplBase[_AggregateRootType]
             wildcard_properties_list=list_concept_wildcard_properties(
                 self.return_model
             ),
+            wildcard_fulltext_index=self.wildcard_fulltext_index,
         )
 
         query.parameters.update(filter_query_parameters)
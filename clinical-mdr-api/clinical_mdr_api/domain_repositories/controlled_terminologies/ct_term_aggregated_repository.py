@@ -22,13 +22,36 @@ from clinical_mdr_api.repositories._utils import (
     CypherQueryBuilder,
     FilterDict,
     FilterOperator,
+    WildcardFulltextIndex,
     validate_filters_and_add_search_string,
 )
 from common.exceptions import ValidationException
 
 
 class CTTermAggregatedRepository:
-    generic_final_alias_clause = """
+    wildcard_fulltext_index = WildcardFulltextIndex(
+        name="fulltext_ct_term_value",
+        node_variables=("term_name_value", "term_attributes_value"),
+        value_labels=("CTTermNameValue", "CTTermAttributesValue"),
+        metadata_labels=("CTTermRoot", "Library", "CTCatalogue", "User"),
+    )
+    # Aliases on which the terms can be filtered and sorted without looking up their versions.
+    # A term is returned once per codelist it belongs to, and a package codelist can both have and have had a term,
+    # so the rows are only unique by term, codelist and codelist membership.
+    generic_key_alias_clause = """
+        WITH *,
+            term_root.uid AS term_uid,
+            codelist_root.uid AS codelist_uid,
+            elementId(rel_term) AS codelist_membership_id,
+            codelist_library.name AS codelist_library_name,
+            catalogue.name AS catalogue_name,
+            term_attributes_value AS value_node_attributes,
+            term_name_value AS value_node_name,
+            rel_term.order AS order,
+            library.name AS library_name,
+            library.is_editable AS is_library_editable
+    """
+    generic_final_projection_clause = """
         CALL {
             WITH rel_data_attributes
             OPTIONAL MATCH (attributes_author: User)
@@ -42,15 +65,16 @@ class CTTermAggregatedRepository:
             RETURN name_author
         }
         WITH
-            term_root.uid AS term_uid,
-            codelist_root.uid AS codelist_uid,
-            codelist_library.name AS codelist_library_name,
-            catalogue.name AS catalogue_name,
-            term_attributes_value AS value_node_attributes,
-            term_name_value AS value_node_name,
-            rel_term.order AS order,
-            library.name AS library_name,
-            library.is_editable AS is_library_editable,
+            term_uid,
+            codelist_uid,
+            codelist_membership_id,
+            codelist_library_name,
+            catalogue_name,
+            value_node_attributes,
+            value_node_name,
+            `order`,
+            library_name,
+            is_library_editable,
             {
                 start_date: rel_data_attributes.start_date,
                 end_date: NULL,
@@ -78,6 +102,9 @@ class CTTermAggregatedRepository:
         head([(catalogue:CTCatalogue)-[:HAS_CODELIST]->(codelist_root) | catalogue]) AS catalogue,
         head([(lib)-[:CONTAINS_TERM]->(term_root) | lib]) AS library
         MATCH (codelist_root)<-[:CONTAINS_CODELIST]-(codelist_library:Library)
+        {generic_key_alias_clause}
+    """
+    generic_projection_clause = f"""
         CALL {{
                 WITH term_attributes_root, term_attributes_value
                 MATCH (term_attributes_root)-[hv:HAS_VERSION]->(term_attributes_value)
@@ -102,7 +129,7 @@ class CTTermAggregatedRepository:
                 WITH collect(hv) as hvs
                 RETURN last(hvs) AS rel_data_name
         }}
-        {generic_final_alias_clause}
+        {generic_final_projection_clause}
     """
     sponsor_alias_clause = f"""
         DISTINCT term_root, term_attributes_root, term_attributes_value, term_name_root, term_name_value, attr_v_rel, name_v_rel, codelist_root, rel_term
@@ -113,8 +140,9 @@ class CTTermAggregatedRepository:
         head([(catalogue:CTCatalogue)-[:HAS_CODELIST]->(codelist_root) | catalogue]) AS catalogue,
         head([(lib)-[:CONTAINS_TERM]->(term_root) | lib]) AS library
         MATCH (codelist_root)<-[:CONTAINS_CODELIST]-(codelist_library:Library)
-        {generic_final_alias_clause}
+        {generic_key_alias_clause}
     """
+    sponsor_projection_clause = generic_final_projection_clause
 
     def _create_term_aggregate_instances_from_cypher_result(
         self, term_dict: dict
@@ -147,6 +175,7 @@ class CTTermAggregatedRepository:
         sort_by: dict | None = None,
         page_number: int = 1,
         page_size: int = 0,
+        page_token: str | None = None,
         filter_by: dict | None = None,
         filter_operator: FilterOperator | None = FilterOperator.AND,
         total_count: bool = False,
@@ -166,6 +195,7 @@ class CTTermAggregatedRepository:
         :param sort_by:
         :param page_number:
         :param page_size:
+        :param page_token: enables the keyset pagination, see CypherQueryBuilder
         :param filter_by:
         :param filter_operator:
         :param total_count:
@@ -184,12 +214,17 @@ class CTTermAggregatedRepository:
         alias_clause = (
             self.sponsor_alias_clause if is_sponsor else self.generic_alias_clause
         )
+        projection_clause = (
+            self.sponsor_projection_clause
+            if is_sponsor
+            else self.generic_projection_clause
+        )
 
         query = CypherQueryBuilder(
             match_clause=match_clause,
             alias_clause=alias_clause,
             sort_by=sort_by,
-            implicit_sort_by="term_uid",
+            implicit_sort_by=["term_uid", "codelist_uid", "codelist_membership_id"],
             page_number=page_number,
             page_size=page_size,
             filter_by=FilterDict(elements=filter_by),
@@ -197,6 +232,9 @@ class CTTermAggregatedRepository:
             total_count=total_count,
             wildcard_properties_list=list_term_wildcard_properties(),
             format_filter_sort_keys=format_term_filter_sort_keys,
+            wildcard_fulltext_index=self.wildcard_fulltext_index,
+            page_token=page_token,
+            projection_clause=projection_clause,
         )
 
         query.parameters.update(filter_query_parameters)
@@ -221,7 +259,11 @@ class CTTermAggregatedRepository:
             if len(count_result) > 0:
                 total = count_result[0][0]
 
-        return GenericFilteringReturn.create(items=terms_ars, total=total)
+        return GenericFilteringReturn.create(
+            items=terms_ars,
+            total=total,
+            next_page_token=query.next_page_token(result_array, attributes_names),
+        )
 
     def get_distinct_headers(
         self,
@@ -264,6 +306,11 @@ class CTTermAggregatedRepository:
         alias_clause = (
             self.sponsor_alias_clause if is_sponsor else self.generic_alias_clause
         )
+        projection_clause = (
+            self.sponsor_projection_clause
+            if is_sponsor
+            else self.generic_projection_clause
+        )
 
         # Add header field name to filter_by, to filter with a CONTAINS pattern
         filter_by = validate_filters_and_add_search_string(
@@ -278,6 +325,8 @@ class CTTermAggregatedRepository:
             alias_clause=alias_clause,
             wildcard_properties_list=list_term_wildcard_properties(),
             format_filter_sort_keys=format_term_filter_sort_keys,
+            wildcard_fulltext_index=self.wildcard_fulltext_index,
+            projection_clause=projection_clause,
         )
 
         query.full_query = query.build_header_query(
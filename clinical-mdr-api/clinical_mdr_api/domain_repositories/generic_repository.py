@@ -1,7 +1,6 @@
 from dataclasses import dataclass
 from typing import Any, Mapping, Type
 
-from cachetools import TTLCache
 from neomodel import RelationshipDefinition, RelationshipManager
 
 from clinical_mdr_api.domain_repositories.models.generic import (
@@ -14,6 +13,7 @@ from clinical_mdr_api.domain_repositories.models.study_field import StudyField
 from clinical_mdr_api.domain_repositories.models.study_selections import StudySelection
 from clinical_mdr_api.repositories._utils import sb_clear_cache
 from common import config
+from common.cache import SharedTTLCache
 from common.exceptions import ValidationException
 
 
@@ -38,8 +38,10 @@ class RepositoryImpl:
     Results from a repository should be used to build aggregate root (AR) objects.
     """
 
-    cache_store_item_by_uid = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_uid = SharedTTLCache(
+        name="RepositoryImpl.cache_store_item_by_uid",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
 
     value_class: type
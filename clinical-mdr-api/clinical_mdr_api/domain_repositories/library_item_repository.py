@@ -5,7 +5,7 @@ from threading import Lock
 from typing import Any, Iterable, Mapping, TypeVar
 
 import neo4j
-from cachetools import TTLCache, cached
+from cachetools import cached
 from cachetools.keys import hashkey
 from neomodel import (
     OUTGOING,
@@ -45,6 +45,7 @@ from clinical_mdr_api.repositories._utils import (
 from clinical_mdr_api.services.user_info import UserInfoService
 from clinical_mdr_api.utils import convert_to_plain, validate_dict
 from common import config
+from common.cache import SharedTTLCache
 from common.exceptions import (
     BusinessLogicException,
     NotFoundException,
@@ -60,8 +61,10 @@ MATCH_NODE_BY_ID = "MATCH (node) WHERE elementId(node)=$id RETURN node"
 class LibraryItemRepositoryImplBase(
     RepositoryImpl, GenericRepository[_AggregateRootType], abc.ABC
 ):
-    cache_store_item_by_uid = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_uid = SharedTTLCache(
+        name="LibraryItemRepositoryImplBase.cache_store_item_by_uid",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
     lock_store_item_by_uid = Lock()
     has_library = True
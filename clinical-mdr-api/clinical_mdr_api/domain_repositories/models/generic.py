@@ -128,6 +128,32 @@ class ClinicalMdrNodeWithUID(ClinicalMdrNode):
             )
         )
 
+    @classmethod
+    def reserve_uids(cls, count: int) -> list[str]:
+        """
+        Reserves `count` consecutive UIDs for nodes of this class created by a Cypher statement instead of `save`.
+        Uses the same counter as `save`.
+        """
+        if count <= 0:
+            return []
+        object_name = cls.__name__.removesuffix("Root")
+
+        last_uid_number = db.cypher_query(
+            """
+        MERGE (m:Counter{{counterId:'{LABEL}Counter'}})
+        ON CREATE SET m:{LABEL}Counter, m.count=0
+        SET m.count = m.count + $count
+        RETURN m.count as number
+        """.format(
+                LABEL=object_name
+            ),
+            {"count": count},
+        )[0][0][0]
+        return [
+            object_name + "_" + str(uid_number).zfill(NUMBER_OF_UID_DIGITS)
+            for uid_number in range(last_uid_number - count + 1, last_uid_number + 1)
+        ]
+
     def save(self):
         """
         Saves the node after create/update of a node.
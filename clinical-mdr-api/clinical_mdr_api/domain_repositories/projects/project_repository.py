@@ -1,7 +1,7 @@
 from threading import Lock
 from typing import Collection
 
-from cachetools import TTLCache, cached
+from cachetools import cached
 from cachetools.keys import hashkey
 from neomodel import db, exceptions
 
@@ -16,6 +16,7 @@ from clinical_mdr_api.domain_repositories.models.study import StudyRoot
 from clinical_mdr_api.domains.projects.project import ProjectAR
 from clinical_mdr_api.repositories._utils import sb_clear_cache
 from common import config
+from common.cache import SharedTTLCache
 from common.exceptions import (
     AlreadyExistsException,
     BusinessLogicException,
@@ -24,16 +25,22 @@ from common.exceptions import (
 
 
 class ProjectRepository:
-    cache_store_item_by_uid = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_uid = SharedTTLCache(
+        name="ProjectRepository.cache_store_item_by_uid",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
     lock_store_item_by_uid = Lock()
-    cache_store_item_by_study_uid = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_study_uid = SharedTTLCache(
+        name="ProjectRepository.cache_store_item_by_study_uid",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
     lock_store_item_by_study_uid = Lock()
-    cache_store_item_by_project_number = TTLCache(
-        maxsize=config.CACHE_MAX_SIZE, ttl=config.CACHE_TTL
+    cache_store_item_by_project_number = SharedTTLCache(
+        name="ProjectRepository.cache_store_item_by_project_number",
+        maxsize=config.CACHE_MAX_SIZE,
+        ttl=config.CACHE_TTL,
     )
     lock_store_item_by_project_number = Lock()
 
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Any, Sequence
 
 from neomodel.sync_.core import NodeMeta, db
@@ -779,6 +780,15 @@ RETURN
         :return: bool
         """
 
+    @abstractmethod
+    def get_last_change_date(self, study_uid: str) -> datetime | None:
+        """
+        A method that returns the date of the most recent action in the audit trail of a Study,
+        which also records the changes of the study selections.
+        Raises NotFoundException if the Study doesn't exist.
+        :return: datetime | None
+        """
+
     @staticmethod
     @abstractmethod
     def check_if_study_uid_and_version_exists(
@@ -794,3 +804,19 @@ RETURN
         Returns:
             bool: True if the study exists, False otherwise.
         """
+
+    @staticmethod
+    @abstractmethod
+    def check_if_study_version_is_locked_or_released(
+        study_uid: str, study_value_version: str
+    ) -> bool:
+        """
+        Check if the study with the given study_uid has a locked or released version study_value_version.
+
+        Args:
+            study_uid (str): The unique identifier of the study.
+            study_value_version (str): The version of the study to check.
+
+        Returns:
+            bool: True if the version exists and is locked or released, False otherwise.
+        """
@@ -2183,6 +2183,19 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
     def _build_snapshot_alias_clause(self) -> str:
         alias_clause = """
                     sr, sv,
+                    sr.uid AS uid,
+                    exists((sv)-[:HAS_STUDY_FOOTNOTE]->()) AS has_study_footnote,
+                    exists((sv)-[:HAS_STUDY_OBJECTIVE]->()) AS has_study_objective,
+                    exists((sv)-[:HAS_STUDY_ENDPOINT]->()) AS has_study_endpoint,
+                    exists((sv)-[:HAS_STUDY_CRITERIA]->()) AS has_study_criteria,
+                    exists((sv)-[:HAS_STUDY_ACTIVITY]->()) AS has_study_activity,
+                    exists((sv)-[:HAS_STUDY_ACTIVITY_INSTRUCTION]->()) AS has_study_activity_instruction
+                    """
+        return alias_clause
+
+    def _build_snapshot_projection_clause(self) -> str:
+        projection_clause = """
+                    WITH *,
                     head([(sr)-[ll:LATEST_LOCKED]->() | ll]) AS llr,
                     head([(sr)-[lr:LATEST_RELEASED]->(lrn) | {lrr:lr, svr: lrn}]) AS released,
                     head([(sr)-[ld:LATEST_DRAFT]->(sdr) | {ldr:ld, sdr: sdr}]) AS draft,
@@ -2192,15 +2205,10 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
                      | sub.uid] AS study_subpart_uids,
                     exists((sr)-[:LATEST_LOCKED]->()) AS has_latest_locked,
                     exists((sr)-[:LATEST_DRAFT]->()) AS has_latest_draft,
-                    exists((sr)-[:LATEST_RELEASED]->()) AS has_latest_released,
-                    exists((sv)-[:HAS_STUDY_FOOTNOTE]->()) AS has_study_footnote,
-                    exists((sv)-[:HAS_STUDY_OBJECTIVE]->()) AS has_study_objective,
-                    exists((sv)-[:HAS_STUDY_ENDPOINT]->()) AS has_study_endpoint,
-                    exists((sv)-[:HAS_STUDY_CRITERIA]->()) AS has_study_criteria,
-                    exists((sv)-[:HAS_STUDY_ACTIVITY]->()) AS has_study_activity,
-                    exists((sv)-[:HAS_STUDY_ACTIVITY_INSTRUCTION]->()) AS has_study_activity_instruction
+                    exists((sr)-[:LATEST_RELEASED]->()) AS has_latest_released
                     WITH sr,
                     sv,
+                    uid,
                     study_parent_part_uid,
                     study_subpart_uids,
                     llr,
@@ -2224,7 +2232,6 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
                     draft.sdr AS sdr
                     ORDER BY has_version.end_date ASC
                     WITH *,
-                        sr.uid as uid,
                         CASE WHEN ldr.end_date IS NULL THEN 'DRAFT' ELSE 'LOCKED' END as study_status,
                         {
                             study_id: sv.study_id,
@@ -2300,7 +2307,7 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
                         has_study_activity,
                         has_study_activity_instruction
                     """
-        return alias_clause
+        return projection_clause
 
     def _update_snapshot_filter_by(
         self,
@@ -2372,6 +2379,7 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
             deleted,
         )
         alias_clause = self._build_snapshot_alias_clause()
+        projection_clause = self._build_snapshot_projection_clause()
         filter_by = self._update_snapshot_filter_by(
             filter_by,
             has_study_footnote,
@@ -2392,6 +2400,7 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
             filter_operator=filter_operator,
             total_count=total_count,
             return_model=StudyDefinitionSnapshot,
+            projection_clause=projection_clause,
         )
 
         query.parameters.update(filter_query_parameters)
@@ -2756,6 +2765,19 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
         )
         return is_study_locked
 
+    def get_last_change_date(self, study_uid: str) -> datetime | None:
+        query = """
+            MATCH (study_root:StudyRoot {uid: $uid})
+            OPTIONAL MATCH (study_root)-[:AUDIT_TRAIL]->(action:StudyAction)
+            // Grouped by study, so that no row is returned for a missing study
+            RETURN study_root.uid, max(action.date)
+            """
+        result, _ = db.cypher_query(query, {"uid": study_uid})
+
+        exceptions.NotFoundException.raise_if(not result, "Study", study_uid)
+
+        return convert_to_datetime(result[0][1])
+
     @classmethod
     def check_if_study_is_deleted(cls, study_uid: str) -> bool:
         root = StudyRoot.nodes.get_or_none(uid=study_uid)
@@ -2792,6 +2814,21 @@ MATCH (sr:StudyRoot)-[:LATEST]->(sv)
 
         return len(result) > 0 and len(result[0]) > 0
 
+    @staticmethod
+    def check_if_study_version_is_locked_or_released(
+        study_uid: str, study_value_version: str
+    ) -> bool:
+        query = """
+            MATCH (:StudyRoot {uid: $uid})-[hv:HAS_VERSION]->(:StudyValue)
+            WHERE hv.version = $version AND hv.status IN ['LOCKED', 'RELEASED']
+            RETURN hv.version
+            LIMIT 1
+            """
+        result, _ = db.cypher_query(
+            query, {"uid": study_uid, "version": study_value_version}
+        )
+        return len(result) > 0
+
     def get_latest_released_version_from_specific_datetime(
         self, study_uid: str, specified_datetime: str
     ) -> str | None:
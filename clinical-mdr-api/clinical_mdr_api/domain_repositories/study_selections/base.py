@@ -1,12 +1,11 @@
+import dataclasses
 import datetime
 from dataclasses import dataclass
 
-from clinical_mdr_api.domain_repositories.models.study import StudyRoot, StudyValue
-from clinical_mdr_api.domain_repositories.models.study_audit_trail import (
-    Create,
-    Delete,
-    Edit,
-)
+from neomodel import db
+
+from clinical_mdr_api.domain_repositories.models.study_selections import StudySelection
+from common.config import NUMBER_OF_UID_DIGITS
 from common.exceptions import NotFoundException
 
 
@@ -22,82 +21,223 @@ class SelectionHistory:
     end_date: datetime.datetime | None
 
 
+@dataclass(frozen=True)
+class SelectionRelationship:
+    """
+    Relationship of a selection node to another node, declared by the subclasses of StudySelectionRepository.
+
+    `relationship` is the Cypher pattern of the relationship between `selection` and `node`, the other node.
+    `match` is the Cypher pattern matching `node` by `uid`, the value of the `uid_field` of the selection,
+    in which `study_value` is the latest value of the study.
+    The value of the optional `returns` Cypher expression on `node` is set to the `returns_field` of the saved selection.
+    """
+
+    relationship: str
+    match: str
+    uid_field: str
+    resource_name: str
+    returns: str | None = None
+    returns_field: str | None = None
+
+
 class StudySelectionRepository:
     """
     Base class for study selection.
 
     We handle common operations here.
+    Subclasses declare the selection node and its relationships,
+    which are written with their audit trail in one Cypher statement.
     """
 
-    def _from_repository_values(self, study_uid: str, selection):
-        """Must be defined by subclasses."""
-        raise NotImplementedError
+    selection_class: type[StudySelection]
+    # Name of the selection in the not found errors
+    selection_name: str
+    # Type of the relationship from the study value to the selection
+    study_value_relationship: str
+    selection_relationships: tuple[SelectionRelationship, ...] = ()
+
+    def _selection_labels(self) -> str:
+        return ":".join(self.selection_class.inherited_labels())
+
+    def _match_related_nodes(self) -> str:
+        return "".join(
+            f"""
+            CALL {{
+                WITH study_value
+                WITH study_value, $related_uids[{index}] AS uid
+                OPTIONAL MATCH {relationship.match}
+                RETURN node AS related_{index}, {relationship.returns or "null"} AS returned_{index}
+                LIMIT 1
+            }}"""
+            for index, relationship in enumerate(self.selection_relationships)
+        )
 
-    def perform_save(
-        self,
-        study_value_node: StudyValue,
-        selection_vo,
-        author_id: str,
-    ):
-        """Must be defined by subclasses."""
-        raise NotImplementedError
+    def _create_relationships(self, related_nodes: list[str]) -> str:
+        return "".join(
+            f"""
+                CALL {{
+                    WITH selection, {related_node}
+                    WITH selection, {related_node} AS node
+                    CREATE {relationship.relationship}
+                }}"""
+            for relationship, related_node in zip(
+                self.selection_relationships, related_nodes
+            )
+        )
 
-    def save(self, selection_vo, author_id: str):
-        study_root_node = StudyRoot.nodes.get_or_none(uid=selection_vo.study_uid)
+    def _save_query(self, edit: bool) -> str:
+        related = [
+            f"related_{index}" for index in range(len(self.selection_relationships))
+        ]
+        returned = [
+            f"returned_{index}" for index in range(len(self.selection_relationships))
+        ]
+        all_found = " AND ".join(f"{node} IS NOT NULL" for node in related) or "true"
+        object_name = self.selection_class.__name__
+        if edit:
+            create_selection = f"""
+                OPTIONAL MATCH (study_value)-[previous_relationship:{self.study_value_relationship}]->(previous:{object_name} {{uid: $uid}})
+                DELETE previous_relationship
+                CREATE (selection:{self._selection_labels()} {{uid: $uid}})
+                CREATE (study_root)-[:AUDIT_TRAIL]->(action:StudyAction:Edit {{author_id: $author_id, date: $date}})
+                FOREACH (_ IN CASE WHEN previous IS NULL THEN [] ELSE [1] END |
+                    CREATE (action)-[:BEFORE]->(previous))"""
+        else:
+            # Same UID counter as ClinicalMdrNodeWithUID.save
+            create_selection = f"""
+                MERGE (counter:Counter {{counterId: '{object_name}Counter'}})
+                ON CREATE SET counter:{object_name}Counter, counter.count = 0
+                SET counter.count = counter.count + 1
+                CREATE (selection:{self._selection_labels()} {{
+                    uid: '{object_name}_' + apoc.text.lpad(toString(counter.count), {NUMBER_OF_UID_DIGITS}, '0')
+                }})
+                CREATE (study_root)-[:AUDIT_TRAIL]->(action:StudyAction:Create {{author_id: $author_id, date: $date}})"""
+        return f"""
+            MATCH (study_root:StudyRoot {{uid: $study_uid}})-[:LATEST]->(study_value:StudyValue)
+            {self._match_related_nodes()}
+            CALL {{
+                WITH {", ".join(["study_root", "study_value"] + related)}
+                WITH * WHERE {all_found}
+                {create_selection}
+                CREATE (action)-[:AFTER]->(selection)
+                CREATE (study_value)-[:{self.study_value_relationship}]->(selection)
+                {self._create_relationships(related)}
+                // Always returns a row, without uid when a related node is missing
+                RETURN head(collect(selection.uid)) AS uid
+            }}
+            RETURN uid, [{", ".join(related)}] AS related, [{", ".join(returned)}] AS returned
+            """
 
-        NotFoundException.raise_if(
-            study_root_node is None, "Study", selection_vo.study_uid
+    def save(self, selection_vo, author_id: str):
+        """
+        Writes a new selection, or a new version of an existing selection, with its relationships
+        and its Create or Edit audit trail entry in one statement.
+        """
+        related_uids = [
+            getattr(selection_vo, relationship.uid_field)
+            for relationship in self.selection_relationships
+        ]
+        date = datetime.datetime.now(datetime.timezone.utc)
+        result, _ = db.cypher_query(
+            self._save_query(edit=selection_vo.uid is not None),
+            {
+                "study_uid": selection_vo.study_uid,
+                "uid": selection_vo.uid,
+                "related_uids": related_uids,
+                "author_id": author_id,
+                "date": date,
+            },
         )
 
-        latest_study_value_node = study_root_node.latest_value.single()
-        selection = self.perform_save(latest_study_value_node, selection_vo, author_id)
-        # Update audit trail
-        before_audit_node = None
-        if selection_vo.uid is not None:
-            before_audit_node = Edit(
-                author_id=author_id, date=datetime.datetime.now(datetime.timezone.utc)
-            )
-            before_audit_node.save()
-            study_root_node.audit_trail.connect(before_audit_node)
-            before_audit_node.has_before.connect(selection)
-            after_audit_node = Edit()
-        else:
-            after_audit_node = Create()
+        NotFoundException.raise_if(not result, "Study", selection_vo.study_uid)
 
-        after_audit_node.author_id = author_id
-        after_audit_node.date = datetime.datetime.now(datetime.timezone.utc)
-        after_audit_node.save()
-        study_root_node.audit_trail.connect(after_audit_node)
-        after_audit_node.has_after.connect(selection)
+        uid, related_nodes, returned_values = result[0]
+        for relationship, related_uid, related_node in zip(
+            self.selection_relationships, related_uids, related_nodes
+        ):
+            NotFoundException.raise_if(
+                related_node is None, relationship.resource_name, related_uid
+            )
 
-        return self._from_repository_values(selection_vo.study_uid, selection)
+        return dataclasses.replace(
+            selection_vo,
+            uid=uid,
+            start_date=date,
+            author_id=author_id,
+            **{
+                relationship.returns_field: value
+                for relationship, value in zip(
+                    self.selection_relationships, returned_values
+                )
+                if relationship.returns_field
+            },
+        )
 
-    def get_study_selection(self, study_value_node: StudyValue, selection_uid: str):
-        """Must be defined by subclasses."""
-        raise NotImplementedError
+    def _delete_query(self) -> str:
+        # The deleted selection keeps the relationships of the previous node
+        copy_relationships = "".join(
+            f"""
+                CALL {{
+                    WITH previous, deleted
+                    WITH previous AS selection, deleted
+                    MATCH {relationship.relationship}
+                    WITH DISTINCT node, deleted AS selection
+                    CREATE {relationship.relationship}
+                }}"""
+            for relationship in self.selection_relationships
+        )
+        return f"""
+            MATCH (study_root:StudyRoot {{uid: $study_uid}})-[:LATEST]->(study_value:StudyValue)
+            UNWIND $deletions AS deletion
+            OPTIONAL MATCH (study_value)-[previous_relationship:{self.study_value_relationship}]->(previous:{self.selection_class.__name__} {{uid: deletion.uid}})
+            CALL {{
+                WITH study_root, deletion, previous, previous_relationship
+                WITH * WHERE previous IS NOT NULL
+                DELETE previous_relationship
+                CREATE (deleted:{self._selection_labels()} {{uid: deletion.uid}})
+                CREATE (study_root)-[:AUDIT_TRAIL]->(action:StudyAction:Delete {{author_id: $author_id, date: deletion.date}})
+                CREATE (action)-[:BEFORE]->(previous)
+                CREATE (action)-[:AFTER]->(deleted)
+                {copy_relationships}
+                RETURN count(deleted) AS deleted_count
+            }}
+            RETURN deletion.uid, previous IS NOT NULL
+            """
+
+    def delete_all(
+        self,
+        study_uid: str,
+        deletions: list[tuple[str, datetime.datetime]],
+        author_id: str,
+    ) -> list[str]:
+        """
+        Detaches selections, given as (uid, date of the deletion), from the latest value of the study
+        and records each of them in a Delete audit trail entry, in one statement.
+        Returns the uids of the selections that were not found.
+        """
+        if not deletions:
+            return []
+        result, _ = db.cypher_query(
+            self._delete_query(),
+            {
+                "study_uid": study_uid,
+                "deletions": [{"uid": uid, "date": date} for uid, date in deletions],
+                "author_id": author_id,
+            },
+        )
 
-    def delete(self, study_uid: str, selection_uid: str, author_id: str) -> None:
-        study_root_node = StudyRoot.nodes.get_or_none(uid=study_uid)
+        NotFoundException.raise_if(not result, "Study", study_uid)
 
-        NotFoundException.raise_if(study_root_node is None, "Study", study_uid)
+        return [uid for uid, found in result if not found]
 
-        latest_study_value_node = study_root_node.latest_value.single()
-        selection = self.get_study_selection(latest_study_value_node, selection_uid)
-        selection_vo = self._from_repository_values(study_uid, selection)
-        new_selection = self.perform_save(
-            latest_study_value_node, selection_vo, author_id
-        )
-        # Audit trail
-        audit_node = Delete(
-            author_id=author_id, date=datetime.datetime.now(datetime.timezone.utc)
+    def delete(self, study_uid: str, selection_uid: str, author_id: str) -> None:
+        not_found = self.delete_all(
+            study_uid,
+            [(selection_uid, datetime.datetime.now(datetime.timezone.utc))],
+            author_id,
         )
-        audit_node.save()
-        study_root_node.audit_trail.connect(audit_node)
-        audit_node.has_before.connect(selection)
-        audit_node.has_after.connect(new_selection)
-        new_selection.study_value.disconnect(latest_study_value_node)
-        # Delete relation
-        selection.study_value.disconnect(latest_study_value_node)
+
+        NotFoundException.raise_if(not_found, self.selection_name, selection_uid)
 
     def _get_selection_with_history(
         self, study_uid: str, selection_uid: str | None = None
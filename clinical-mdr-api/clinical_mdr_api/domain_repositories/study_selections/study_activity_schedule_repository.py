@@ -1,10 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from neomodel import db
 
 from clinical_mdr_api import utils
-from clinical_mdr_api.domain_repositories.models._utils import ListDistinct
-from clinical_mdr_api.domain_repositories.models.study import StudyValue
+from clinical_mdr_api.domain_repositories.models._utils import (
+    ListDistinct,
+    convert_to_tz_aware_datetime,
+)
 from clinical_mdr_api.domain_repositories.models.study_selections import (
     StudyActivity,
     StudyActivitySchedule,
@@ -14,7 +16,7 @@ from clinical_mdr_api.domains.study_selections.study_activity_schedule import (
     StudyActivityScheduleVO,
 )
 from common import config
-from common.exceptions import BusinessLogicException, NotFoundException
+from common.exceptions import BusinessLogicException
 from common.utils import convert_to_datetime
 
 
@@ -27,7 +29,38 @@ class SelectionHistory(base.SelectionHistory):
     study_activity_instance_uid: str | None
 
 
+@dataclass
+class ScheduleBatchSnapshot:
+    """State of the latest version of a study against which a batch of schedule operations is validated."""
+
+    # Study activity uid -> uid of its study activity instance, if any
+    study_activities: dict[str, str | None]
+    study_visit_uids: set[str]
+    # Schedule uid -> (study activity uid, study visit uid)
+    schedules: dict[str, tuple[str, str]] = field(default_factory=dict)
+
+
 class StudyActivityScheduleRepository(base.StudySelectionRepository):
+    selection_class = StudyActivitySchedule
+    selection_name = "Study Activity Schedule"
+    study_value_relationship = "HAS_STUDY_ACTIVITY_SCHEDULE"
+    selection_relationships = (
+        base.SelectionRelationship(
+            relationship="(node)-[:STUDY_ACTIVITY_HAS_SCHEDULE]->(selection)",
+            match="(study_value)-[:HAS_STUDY_ACTIVITY]->(node:StudyActivity {uid: uid})",
+            uid_field="study_activity_uid",
+            resource_name="Study Activity",
+            returns="head([(node)-[:STUDY_ACTIVITY_HAS_STUDY_ACTIVITY_INSTANCE]->(instance:StudyActivityInstance) | instance.uid])",
+            returns_field="study_activity_instance_uid",
+        ),
+        base.SelectionRelationship(
+            relationship="(node)-[:STUDY_VISIT_HAS_SCHEDULE]->(selection)",
+            match="(study_value)-[:HAS_STUDY_VISIT]->(node:StudyVisit {uid: uid})",
+            uid_field="study_visit_uid",
+            resource_name="Study Visit",
+        ),
+    )
+
     @staticmethod
     def _acquire_write_lock_study_value(uid: str) -> None:
         db.cypher_query(
@@ -39,39 +72,11 @@ class StudyActivityScheduleRepository(base.StudySelectionRepository):
             {"uid": uid},
         )
 
-    def _from_repository_values(
-        self, study_uid: str, selection: StudyActivitySchedule
+    def save(
+        self, selection_vo: StudyActivityScheduleVO, author_id: str
     ) -> StudyActivityScheduleVO:
-        study_action = selection.has_after.all()[0]
-        study_activity = selection.study_activity.single()
-
-        study_visit = selection.study_visit.single()
-        study_activity_instance = (
-            study_activity.study_activity_has_study_activity_instance.single()
-        )
-        return StudyActivityScheduleVO(
-            uid=selection.uid,
-            study_uid=study_uid,
-            study_activity_uid=study_activity.uid,
-            study_activity_instance_uid=(
-                study_activity_instance.uid if study_activity_instance else None
-            ),
-            study_visit_uid=study_visit.uid,
-            start_date=study_action.date,
-            author_id=study_action.author_id,
-        )
-
-    def perform_save(
-        self,
-        study_value_node: StudyValue,
-        selection_vo: StudyActivityScheduleVO,
-        author_id: str,
-    ) -> StudyActivityScheduleVO:
-        # Detach previous node from study
-        if selection_vo.uid is not None:
-            self._remove_old_selection_if_exists(selection_vo.study_uid, selection_vo)
         # If this is a new selection we want to check if any other similar Schedule exists
-        else:
+        if selection_vo.uid is None:
             BusinessLogicException.raise_if(
                 self.find_schedule_for_study_visit_and_study_activity(
                     study_uid=selection_vo.study_uid,
@@ -80,36 +85,7 @@ class StudyActivityScheduleRepository(base.StudySelectionRepository):
                 ),
                 msg=f"There already exist a schedule for the same Activity and Visit in the Study with UID '{selection_vo.study_uid}'",
             )
-
-        # Create new node
-        schedule = StudyActivitySchedule(uid=selection_vo.uid)
-        schedule.save()
-
-        study_activity_node = study_value_node.has_study_activity.get_or_none(
-            uid=selection_vo.study_activity_uid
-        )
-
-        NotFoundException.raise_if(
-            study_activity_node is None,
-            "Study Activity",
-            selection_vo.study_activity_uid,
-        )
-
-        schedule.study_activity.connect(study_activity_node)
-
-        study_visit_node = study_value_node.has_study_visit.get_or_none(
-            uid=selection_vo.study_visit_uid
-        )
-
-        NotFoundException.raise_if(
-            study_visit_node is None, "Study Visit", selection_vo.study_visit_uid
-        )
-
-        # Create relations
-        schedule.study_visit.connect(study_visit_node)
-        study_value_node.has_study_activity_schedule.connect(schedule)
-
-        return schedule
+        return super().save(selection_vo, author_id)
 
     def find_schedule_for_study_visit_and_study_activity(
         self, study_uid: str, study_activity_uid: str, study_visit_uid: str
@@ -125,34 +101,6 @@ class StudyActivityScheduleRepository(base.StudySelectionRepository):
         ).distinct()
         return study_activity_schedules
 
-    def _remove_old_selection_if_exists(
-        self, study_uid: str, schedule: StudyActivityScheduleVO
-    ):
-        return db.cypher_query(
-            """
-            MATCH (:StudyRoot {uid: $study_uid})-[:LATEST]->(:StudyValue)
-            -[rel:HAS_STUDY_ACTIVITY_SCHEDULE]->(:StudyActivitySchedule {uid: $schedule_uid})
-            DELETE rel
-            """,
-            {
-                "study_uid": study_uid,
-                "schedule_uid": schedule.uid,
-            },
-        )
-
-    def get_study_selection(
-        self, study_value_node: StudyValue, selection_uid: str
-    ) -> StudyActivitySchedule:
-        schedule = study_value_node.has_study_activity_schedule.get_or_none(
-            uid=selection_uid
-        )
-
-        NotFoundException.raise_if(
-            schedule is None, "Study Activity Schedule", selection_uid
-        )
-
-        return schedule
-
     def generate_uid(self) -> str:
         return StudyActivity.get_next_free_uid_and_increment_counter()
 
@@ -294,6 +242,105 @@ class StudyActivityScheduleRepository(base.StudySelectionRepository):
             )
         return result
 
+    def get_batch_snapshot(self, study_uid: str) -> ScheduleBatchSnapshot | None:
+        """
+        Locks the study and returns the study activities, study visits and schedules of its latest version,
+        or None if the study doesn't exist.
+        """
+        self._acquire_write_lock_study_value(study_uid)
+        result, _ = db.cypher_query(
+            """
+            MATCH (:StudyRoot {uid: $study_uid})-[:LATEST]->(sv:StudyValue)
+            RETURN
+                [(sv)-[:HAS_STUDY_ACTIVITY]->(sa:StudyActivity) | [
+                    sa.uid,
+                    head([(sa)-[:STUDY_ACTIVITY_HAS_STUDY_ACTIVITY_INSTANCE]->(sai:StudyActivityInstance) | sai.uid])
+                ]] AS study_activities,
+                [(sv)-[:HAS_STUDY_VISIT]->(svi:StudyVisit) | svi.uid] AS study_visit_uids,
+                [(sv)-[:HAS_STUDY_ACTIVITY_SCHEDULE]->(sas:StudyActivitySchedule) | [
+                    sas.uid,
+                    head([(sa:StudyActivity)-[:STUDY_ACTIVITY_HAS_SCHEDULE]->(sas) | sa.uid]),
+                    head([(svi:StudyVisit)-[:STUDY_VISIT_HAS_SCHEDULE]->(sas) | svi.uid])
+                ]] AS schedules
+            """,
+            {"study_uid": study_uid},
+        )
+        if not result:
+            return None
+        study_activities, study_visit_uids, schedules = result[0]
+        return ScheduleBatchSnapshot(
+            study_activities=dict(study_activities),
+            study_visit_uids=set(study_visit_uids),
+            schedules={
+                uid: (study_activity_uid, study_visit_uid)
+                for uid, study_activity_uid, study_visit_uid in schedules
+            },
+        )
+
+    def create_batch(
+        self, selection_vos: list[StudyActivityScheduleVO], author_id: str
+    ) -> list[StudyActivityScheduleVO]:
+        """
+        Creates the schedules of a study and their audit trail in one statement, as `save` does for one schedule.
+        The study activities and visits are expected to have been validated against `get_batch_snapshot`.
+        """
+        if not selection_vos:
+            return []
+        uids = StudyActivitySchedule.reserve_uids(len(selection_vos))
+        for selection_vo, uid in zip(selection_vos, uids):
+            selection_vo.uid = uid
+            selection_vo.author_id = author_id
+        db.cypher_query(
+            """
+            UNWIND $schedules AS schedule
+            MATCH (sr:StudyRoot {uid: schedule.study_uid})-[:LATEST]->(sv:StudyValue)
+            MATCH (sv)-[:HAS_STUDY_ACTIVITY]->(sa:StudyActivity {uid: schedule.study_activity_uid})
+            MATCH (sv)-[:HAS_STUDY_VISIT]->(svi:StudyVisit {uid: schedule.study_visit_uid})
+            CREATE (sas:StudySelection:StudyActivitySchedule {uid: schedule.uid})
+            CREATE (sa)-[:STUDY_ACTIVITY_HAS_SCHEDULE]->(sas)
+            CREATE (svi)-[:STUDY_VISIT_HAS_SCHEDULE]->(sas)
+            CREATE (sv)-[:HAS_STUDY_ACTIVITY_SCHEDULE]->(sas)
+            CREATE (sr)-[:AUDIT_TRAIL]->(action:StudyAction:Create {author_id: $author_id, date: schedule.date})
+            CREATE (action)-[:AFTER]->(sas)
+            """,
+            {
+                "schedules": [
+                    self._batch_parameters(selection_vo)
+                    for selection_vo in selection_vos
+                ],
+                "author_id": author_id,
+            },
+        )
+        return selection_vos
+
+    def delete_batch(
+        self, selection_vos: list[StudyActivityScheduleVO], author_id: str
+    ) -> None:
+        """Deletes the schedules of a study in one statement, as `delete` does for one schedule."""
+        if not selection_vos:
+            return
+        self.delete_all(
+            selection_vos[0].study_uid,
+            [
+                (
+                    selection_vo.uid,
+                    convert_to_tz_aware_datetime(selection_vo.start_date),
+                )
+                for selection_vo in selection_vos
+            ],
+            author_id,
+        )
+
+    @staticmethod
+    def _batch_parameters(selection_vo: StudyActivityScheduleVO) -> dict:
+        return {
+            "uid": selection_vo.uid,
+            "study_uid": selection_vo.study_uid,
+            "study_activity_uid": selection_vo.study_activity_uid,
+            "study_visit_uid": selection_vo.study_visit_uid,
+            "date": convert_to_tz_aware_datetime(selection_vo.start_date),
+        }
+
     def close(self) -> None:
         # Our repository guidelines state that repos should have a close method
         # But nothing needs to be done in this one
@@ -149,6 +149,61 @@ class StudySoARepository:
 
         return cell_references, footnote_references
 
+    @staticmethod
+    @trace_calls
+    def find_study_versions_without_snapshot(
+        layout: SoALayout = SoALayout.PROTOCOL,
+        study_uids: list[str] | None = None,
+    ) -> list[tuple[str, str]]:
+        """Returns (study_uid, study_value_version) of released study versions having study activities but no SoA snapshot
+
+        Args:
+            layout (SoALayout): SoA layout of the snapshot, only protocol SoA snapshot is implemented.
+            study_uids (list[str] | None): Optionally restrict the search to the given studies.
+
+        Returns:
+            list[tuple[str, str]]: study uids and versions, ordered by study uid and version start date
+        """
+
+        if layout != SoALayout.PROTOCOL:
+            raise NotImplementedError("Only protocol SoA snapshot is implemented")
+
+        results, _ = db.cypher_query(
+            """
+            MATCH (sr:StudyRoot)-[hv:HAS_VERSION {status: $study_status}]->(sv:StudyValue)
+            WHERE ($study_uids IS NULL OR sr.uid IN $study_uids)
+                AND EXISTS((sv)-[:HAS_STUDY_ACTIVITY]->(:StudyActivity))
+                AND NOT EXISTS((sv)-[:HAS_PROTOCOL_SOA_CELL]->(:StudySelection))
+            WITH sr.uid AS study_uid, hv.version AS study_value_version, min(hv.start_date) AS start_date
+            RETURN study_uid, study_value_version
+            ORDER BY study_uid, start_date
+            """,
+            {"study_status": StudyStatus.RELEASED.value, "study_uids": study_uids},
+        )
+        return [(study_uid, version) for study_uid, version in results]
+
+    @staticmethod
+    @trace_calls
+    def get_study_change_state(study_uid: str) -> tuple | None:
+        """Returns a marker of the state of the latest version of a study
+
+        Every edit of the study or of any of its selections adds a StudyAction to the audit trail,
+        and every new version of the study has a new StudyValue node, so the marker changes on every write.
+
+        Returns:
+            tuple | None: StudyValue element id, number and date of the latest StudyAction, or None if the study doesn't exist
+        """
+
+        results, _ = db.cypher_query(
+            """
+            MATCH (sr:StudyRoot {uid: $study_uid})-[:LATEST]->(sv:StudyValue)
+            OPTIONAL MATCH (sr)-[:AUDIT_TRAIL]->(sa:StudyAction)
+            RETURN elementId(sv), count(sa), max(sa.date)
+            """,
+            {"study_uid": study_uid},
+        )
+        return tuple(results[0]) if results else None
+
     @classmethod
     def _to_soa_cell_reference(cls, relationship, study_selection, footnotes):
         known_labels = study_selection.labels & SOA_ITEM_TYPES
@@ -55,6 +55,10 @@ from clinical_mdr_api.domains.study_selections.study_visit import (
     VisitClass,
     VisitSubclass,
 )
+from clinical_mdr_api.repositories._utils import (
+    FilterOperator,
+    StudySelectionQueryFilter,
+)
 from common import config
 from common.config import (
     GLOBAL_ANCHOR_VISIT_NAME,
@@ -63,6 +67,35 @@ from common.config import (
 )
 from common.exceptions import ValidationException
 
+# StudyVisit response model fields that are stored in the database,
+# together with the Cypher expression returning them for a matched `study_visit`.
+# Other fields (visit names, timings, ...) are derived from the study timeline.
+STUDY_VISIT_FIELDS_CYPHER = {
+    "uid": "study_visit.uid",
+    "study_epoch_uid": "head([(study_visit)<-[:STUDY_EPOCH_HAS_STUDY_VISIT]-(study_epoch:StudyEpoch) | study_epoch.uid])",
+    "epoch_uid": "head([(study_visit)<-[:STUDY_EPOCH_HAS_STUDY_VISIT]-(:StudyEpoch)-[:HAS_EPOCH]->(epoch_term:CTTermRoot) | epoch_term.uid])",
+    "visit_type_uid": "head([(study_visit)-[:HAS_VISIT_TYPE]->(visit_type:CTTermRoot) | visit_type.uid])",
+    "visit_type_name": "head([(study_visit)-[:HAS_VISIT_TYPE]->(:CTTermRoot)-[:HAS_NAME_ROOT]->(:CTTermNameRoot)-[:LATEST]->(visit_type_value:CTTermNameValue) | visit_type_value.name])",
+    "visit_contact_mode_uid": "head([(study_visit)-[:HAS_VISIT_CONTACT_MODE]->(visit_contact_mode:CTTermRoot) | visit_contact_mode.uid])",
+    "epoch_allocation_uid": "head([(study_visit)-[:HAS_EPOCH_ALLOCATION]->(epoch_allocation:CTTermRoot) | epoch_allocation.uid])",
+    "repeating_frequency_uid": "head([(study_visit)-[:HAS_REPEATING_FREQUENCY]->(repeating_frequency:CTTermRoot) | repeating_frequency.uid])",
+    "visit_window_unit_uid": "head([(study_visit)-[:HAS_WINDOW_UNIT]->(window_unit:UnitDefinitionRoot) | window_unit.uid])",
+    "visit_sublabel_reference": "study_visit.visit_sublabel_reference",
+    "consecutive_visit_group": "study_visit.consecutive_visit_group",
+    "show_visit": "study_visit.show_visit",
+    "min_visit_window_value": "study_visit.visit_window_min",
+    "max_visit_window_value": "study_visit.visit_window_max",
+    "description": "study_visit.description",
+    "start_rule": "study_visit.start_rule",
+    "end_rule": "study_visit.end_rule",
+    "status": "study_visit.status",
+    "visit_class": "study_visit.visit_class",
+    "visit_subclass": "study_visit.visit_subclass",
+    "is_global_anchor_visit": "study_visit.is_global_anchor_visit",
+    "is_soa_milestone": "coalesce(study_visit.is_soa_milestone, false)",
+    "study_activity_count": "size([(study_visit)-[:STUDY_VISIT_HAS_SCHEDULE]->(activity_schedule:StudyActivitySchedule)<-[:HAS_STUDY_ACTIVITY_SCHEDULE]-(:StudyValue) | activity_schedule])",
+}
+
 
 def get_valid_time_references_for_study(
     study_uid: str, effective_date: datetime.datetime | None = None
@@ -492,6 +525,52 @@ class StudyVisitRepository:
             query += "RETURN * ORDER BY study_visit.unique_visit_number"
         return query, params
 
+    def find_visit_uids_by_study_uid(
+        self,
+        study_uid: str,
+        study_value_version: str | None = None,
+        filter_by: dict | None = None,
+        filter_operator: FilterOperator | None = FilterOperator.AND,
+        sort_by: dict | None = None,
+        page_number: int = 1,
+        page_size: int = 0,
+        total_count: bool = False,
+    ) -> tuple[list[str], int]:
+        """
+        Returns the uids of the visits matching the filter_by criteria, sorted and paginated in Cypher.
+        Pagination is only applied in Cypher if sort_by is provided,
+        as the default order of visits is defined by the study timeline.
+        Raises ValidationException if some of the filtered or sorted fields are derived fields,
+        see STUDY_VISIT_FIELDS_CYPHER.
+        """
+        if study_value_version:
+            match_clause = """
+                MATCH (study_root:StudyRoot {uid: $study_uid})-[:HAS_VERSION{status: $study_status, version: $study_value_version}]->(study_value:StudyValue)
+                MATCH (study_value)-[:HAS_STUDY_VISIT]->(study_visit:StudyVisit)
+            """
+        else:
+            match_clause = """
+                MATCH (study_root:StudyRoot {uid: $study_uid})-[:LATEST]->(study_value:StudyValue)
+                MATCH (study_value)-[:HAS_STUDY_VISIT]->(study_visit:StudyVisit)
+                WHERE NOT (study_visit)-[:BEFORE]-()
+            """
+        query_filter = StudySelectionQueryFilter(
+            match_clause=match_clause,
+            field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+            filter_by=filter_by,
+            filter_operator=filter_operator,
+            sort_by=sort_by,
+            page_number=page_number,
+            page_size=page_size,
+            total_count=total_count,
+            paginate=bool(sort_by),
+        )
+        query_filter.query.parameters["study_uid"] = study_uid
+        if study_value_version:
+            query_filter.query.parameters["study_value_version"] = study_value_version
+            query_filter.query.parameters["study_status"] = StudyStatus.RELEASED.value
+        return query_filter.execute()
+
     def find_all_visits_by_study_uid(
         self, study_uid: str, study_value_version: str | None = None
     ) -> list[StudyVisitVO]:
@@ -1,7 +1,9 @@
 import abc
 import re
+from collections import defaultdict
 from datetime import datetime
-from typing import Iterable, TypeVar
+from types import SimpleNamespace
+from typing import Any, Iterable, TypeVar
 
 from neomodel import db
 
@@ -16,26 +18,46 @@ from clinical_mdr_api.domain_repositories.models.generic import (
     VersionRoot,
     VersionValue,
 )
-from clinical_mdr_api.domains.libraries.object import ParametrizedTemplateVO
+from clinical_mdr_api.domains.libraries.object import (
+    ParametrizedTemplateARBase,
+    ParametrizedTemplateVO,
+)
 from clinical_mdr_api.domains.libraries.parameter_term import (
     ComplexParameterTerm,
     SimpleParameterTermVO,
 )
-from clinical_mdr_api.domains.versioned_object_aggregate import LibraryItemStatus
+from clinical_mdr_api.domains.versioned_object_aggregate import (
+    LibraryItemMetadataVO,
+    LibraryItemStatus,
+)
 from clinical_mdr_api.models.controlled_terminologies.ct_term import (
     SimpleCTTermNameAndAttributes,
     SimpleTermAttributes,
     SimpleTermName,
 )
+from clinical_mdr_api.repositories._utils import sb_clear_cache
+from clinical_mdr_api.services.user_info import UserInfoService
+from clinical_mdr_api.utils import convert_to_plain
 from common.exceptions import BusinessLogicException, NotFoundException
 
 _AggregateRootType = TypeVar("_AggregateRootType")
 
+# Number of instances updated per round trip by cascade_update_from_template
+CASCADE_UPDATE_BATCH_SIZE = 1000
+
+LATEST_STATUS_LABELS = {
+    LibraryItemStatus.DRAFT: "LATEST_DRAFT",
+    LibraryItemStatus.FINAL: "LATEST_FINAL",
+    LibraryItemStatus.RETIRED: "LATEST_RETIRED",
+}
+
 
 class GenericSyntaxInstanceRepository(
     GenericSyntaxRepository[_AggregateRootType], abc.ABC
 ):
     template_class: type
+    # Value properties that must be equal, besides the name, to reuse an existing value in a cascade update
+    cascade_value_identity_properties: tuple[str, ...] = ()
 
     def next_available_sequence_id(self, uid: str) -> str | None:
         rs = db.cypher_query(
@@ -173,12 +195,36 @@ class GenericSyntaxInstanceRepository(
         return item
 
     def _get_template_parameters(self, root, value):
+        cypher_query = self._template_parameters_query(
+            root_label=root.__label__,
+            value_label=value.__label__,
+            pre_instance=self.is_pre_instance(root),
+        )
+        results, _ = db.cypher_query(
+            cypher_query, params={"root_uid": root.uid, "value_name": value.name}
+        )
+
+        parameter_terms = self._parse_parameter_terms(instance_parameters=results)
+        return parameter_terms[0] if len(parameter_terms) > 0 else []
+
+    def _template_parameters_query(
+        self,
+        root_label: str,
+        value_label: str,
+        pre_instance: bool,
+        root_uid: str = "$root_uid",
+        value_name: str = "$value_name",
+    ) -> str:
+        """
+        Returns the query of the parameter terms of the latest value of an instance or pre-instance,
+        identified by the given Cypher expressions for its root uid and value name.
+        """
         # TODO: This should be refactored when we change the relationship between
         # syntax instance root and TemplateParameterTermRoot to value to value.
-        if self.is_pre_instance(root):
+        if pre_instance:
             cypher_query = f"""
-        MATCH (param:TemplateParameter)<-[u:USES_PARAMETER]-(:SyntaxTemplateRoot)<-[:CREATED_FROM]-(pre_instance_root:{root.__label__})-[:LATEST]->(pre_instance_value:{value.__label__})
-        WHERE pre_instance_root.uid=$root_uid AND pre_instance_value.name=$value_name
+        MATCH (param:TemplateParameter)<-[u:USES_PARAMETER]-(:SyntaxTemplateRoot)<-[:CREATED_FROM]-(pre_instance_root:{root_label})-[:LATEST]->(pre_instance_value:{value_label})
+        WHERE pre_instance_root.uid={root_uid} AND pre_instance_value.name={value_name}
         WITH pre_instance_value, param.name as parameter, u.position as position
         OPTIONAL MATCH (pre_instance_value)-[rel:USES_VALUE]->(tptv:TemplateParameterTermValue)<-[:HAS_VERSION]-(tptr:TemplateParameterTermRoot)
         CALL apoc.when(tptr IS NOT NULL AND tptr:StudyEndpoint,
@@ -235,9 +281,9 @@ class GenericSyntaxInstanceRepository(
             cypher_query = f"""
         MATCH  (param:TemplateParameter)<-[u:USES_PARAMETER]-
               (:SyntaxTemplateRoot)-[:HAS_OBJECTIVE|HAS_ENDPOINT|HAS_TIMEFRAME|HAS_CRITERIA|HAS_FOOTNOTE|HAS_ACTIVITY_INSTRUCTION]->
-              (vt:{root.__label__})-[:LATEST]->
-              (vv:{value.__label__})
-        WHERE vt.uid=$root_uid AND vv.name=$value_name
+              (vt:{root_label})-[:LATEST]->
+              (vv:{value_label})
+        WHERE vt.uid={root_uid} AND vv.name={value_name}
         WITH vv, param.name as parameter, u.position as position
         OPTIONAL MATCH (vv)-[rel:USES_VALUE]->(tptr:TemplateParameterTermRoot)
         CALL apoc.when(
@@ -294,13 +340,7 @@ class GenericSyntaxInstanceRepository(
         WITH position, parameter, data, coalesce(con.string, "") AS conjunction
         RETURN position, parameter, [row in data where row.position = position | row] as parameterterms, conjunction
         """
-
-        results, _ = db.cypher_query(
-            cypher_query, params={"root_uid": root.uid, "value_name": value.name}
-        )
-
-        parameter_terms = self._parse_parameter_terms(instance_parameters=results)
-        return parameter_terms[0] if len(parameter_terms) > 0 else []
+        return cypher_query
 
     def _from_repository_values(self, value):
         simple_parameter_term_vo = SimpleParameterTermVO.from_repository_values(
@@ -367,6 +407,271 @@ class GenericSyntaxInstanceRepository(
         )
         return template
 
+    @sb_clear_cache(caches=["cache_store_item_by_uid"])
+    def cascade_update_from_template(
+        self,
+        template_uid: str,
+        template_name: str,
+        template_library_name: str,
+        author_id: str,
+        date: datetime,
+    ) -> int:
+        """
+        Updates all instances (or pre-instances) created from a template to a new template name.
+        This has the same effect as calling cascade_update on each of them and saving them one by one,
+        but the instances are read and written in batches of CASCADE_UPDATE_BATCH_SIZE,
+        with one query for the parameter terms and one for the new values and versions per batch.
+
+        Returns the number of updated instances.
+        """
+        pre_instance = "PreInstance" in self.root_class.__name__
+        change_description = ParametrizedTemplateARBase.CASCADING_UPDATE_LABEL.format(
+            template_uid
+        )
+        # Same as _library_item_metadata_vo_to_datadict
+        author_username = UserInfoService.get_author_username_from_id(author_id)
+        instances = self._get_cascade_update_instances(template_uid, pre_instance)
+        for start in range(0, len(instances), CASCADE_UPDATE_BATCH_SIZE):
+            batch = instances[start : start + CASCADE_UPDATE_BATCH_SIZE]
+            parameter_terms = self._get_template_parameters_of_instances(
+                batch, pre_instance
+            )
+            rows = []
+            for instance in batch:
+                name = ParametrizedTemplateVO.from_name_and_parameter_terms(
+                    name=template_name,
+                    template_uid=template_uid,
+                    parameter_terms=parameter_terms.get(instance["root_uid"], []),
+                    library_name=template_library_name,
+                ).expanded_template_value
+                previous_metadata = instance["item_metadata"]
+                item_metadata = previous_metadata.new_version_start_date(
+                    author_id=author_id,
+                    change_description=change_description,
+                    date=date,
+                )
+                rows.append(
+                    {
+                        "root_uid": instance["root_uid"],
+                        "name": name,
+                        "name_plain": self._cascade_name_plain(name),
+                        "version": item_metadata.version,
+                        "status": item_metadata.status.value,
+                        "latest_status_label": LATEST_STATUS_LABELS[
+                            item_metadata.status
+                        ],
+                        # Same condition as _are_changes_possible and _is_new_version_necessary,
+                        # otherwise the name of the current value is updated
+                        "new_value": previous_metadata.status
+                        in (LibraryItemStatus.DRAFT, LibraryItemStatus.FINAL)
+                        and name != instance["value_name"],
+                    }
+                )
+            self._write_cascade_update(
+                rows,
+                versioning={
+                    "author_id": author_id,
+                    "author_username": author_username,
+                    "change_description": change_description,
+                    "start_date": date,
+                },
+                pre_instance=pre_instance,
+            )
+        return len(instances)
+
+    def _cascade_name_plain(self, name: str) -> str:
+        return convert_to_plain(name)
+
+    def _get_cascade_update_instances(
+        self, template_uid: str, pre_instance: bool
+    ) -> list[dict[str, Any]]:
+        """Locks the instances created from a template and returns their latest value name and version"""
+        template_label = self.template_class.__label__
+        root_label = self.root_class.__label__
+        if pre_instance:
+            template_match = f"MATCH (:{template_label} {{uid: $template_uid}})<-[:CREATED_FROM]-(root:{root_label})"
+        else:
+            template_match = f"MATCH (:{template_label} {{uid: $template_uid}})-[:{self.template_class.TEMPLATE_REL_LABEL}]->(root:{root_label})"
+        result, _ = db.cypher_query(
+            template_match
+            + """
+            WITH collect(root) AS roots
+            CALL apoc.lock.nodes(roots)
+            UNWIND roots AS root
+            MATCH (root)-[:LATEST]->(value)
+            MATCH (root)-[version:HAS_VERSION]->(value)
+            RETURN root.uid, value.name, collect(version {
+                .version, .status, .start_date, .end_date, .author_id, .change_description
+            })
+            ORDER BY root.uid
+            """,
+            {"template_uid": template_uid},
+        )
+        instances = []
+        for root_uid, value_name, versions in result:
+            versions = [SimpleNamespace(**version) for version in versions]
+            highest_version = self._get_max_version(versions)
+            latest = self._find_latest_version_in(
+                [version for version in versions if version.version == highest_version]
+            )
+            major, minor = latest.version.split(".")
+            instances.append(
+                {
+                    "root_uid": root_uid,
+                    "value_name": value_name,
+                    "item_metadata": LibraryItemMetadataVO.from_repository_values(
+                        change_description=latest.change_description,
+                        status=LibraryItemStatus(latest.status),
+                        author_id=latest.author_id,
+                        author_username=None,
+                        start_date=latest.start_date,
+                        end_date=latest.end_date,
+                        major_version=int(major),
+                        minor_version=int(minor),
+                    ),
+                }
+            )
+        return instances
+
+    def _get_template_parameters_of_instances(
+        self, instances: list[dict[str, Any]], pre_instance: bool
+    ) -> dict[str, list]:
+        """Returns the parameter terms of the latest value of the given instances, by root uid"""
+        cypher_query = self._template_parameters_query(
+            root_label=self.root_class.__label__,
+            value_label=self.value_class.__label__,
+            pre_instance=pre_instance,
+            root_uid="instance.root_uid",
+            value_name="instance.value_name",
+        )
+        results, _ = db.cypher_query(
+            f"""
+            UNWIND $instances AS instance
+            CALL {{
+                WITH instance
+                {cypher_query}
+            }}
+            RETURN instance.root_uid, position, parameter, parameterterms, conjunction
+            """,
+            {
+                "instances": [
+                    {
+                        "root_uid": instance["root_uid"],
+                        "value_name": instance["value_name"],
+                    }
+                    for instance in instances
+                ]
+            },
+        )
+        rows_by_instance = defaultdict(list)
+        for root_uid, *row in results:
+            rows_by_instance[root_uid].append(row)
+        parameter_terms = {}
+        for root_uid, rows in rows_by_instance.items():
+            terms = self._parse_parameter_terms(instance_parameters=rows)
+            parameter_terms[root_uid] = terms[0] if len(terms) > 0 else []
+        return parameter_terms
+
+    def _write_cascade_update(
+        self,
+        rows: list[dict[str, Any]],
+        versioning: dict[str, Any],
+        pre_instance: bool,
+    ) -> None:
+        """
+        Writes the new names and versions of a batch of instances, the same way as _update does for one instance:
+        a new or existing value with the new name becomes the latest value and gets the parameters of the previous one,
+        the LATEST_<status> and HAS_VERSION relationships are recreated and the previous versions are closed.
+        """
+        value_labels = ":".join(self.value_class.inherited_labels())
+        # Same properties as the value created by _get_or_create_value
+        copy_identity_properties = "".join(
+            f", {prop}: value.{prop}" for prop in self.cascade_value_identity_properties
+        )
+        same_value = "".join(
+            f" AND (existing.{prop} = value.{prop} OR (existing.{prop} IS NULL AND value.{prop} IS NULL))"
+            for prop in self.cascade_value_identity_properties
+        )
+        parameters_label = self.value_class.PARAMETERS_LABEL
+        # Parameters of pre-instances point to the latest value of the parameter terms
+        relink_parameter_terms = (
+            f"""
+            CALL {{
+                WITH new_value
+                MATCH (new_value)-[parameter:{parameters_label}]->(term_value:TemplateParameterTermValue)
+                    <-[:HAS_VERSION]-(:TemplateParameterTermRoot)-[:LATEST]->(latest_term_value)
+                WHERE latest_term_value <> term_value
+                WITH DISTINCT new_value, parameter, latest_term_value
+                CREATE (new_value)-[relinked:{parameters_label}]->(latest_term_value)
+                SET relinked = properties(parameter)
+                DELETE parameter
+                RETURN count(relinked) AS relinked
+            }}"""
+            if pre_instance
+            else ""
+        )
+        db.cypher_query(
+            f"""
+            UNWIND $rows AS row
+            MATCH (root:{self.root_class.__label__} {{uid: row.root_uid}})-[latest:LATEST]->(value)
+            OPTIONAL MATCH (root)-[:HAS_VERSION]->(existing:{self.value_class.__label__})
+            WHERE row.new_value AND existing.name = row.name{same_value}
+            WITH root, latest, value, row, head(collect(existing)) AS existing
+            CALL {{
+                WITH value, row, existing
+                WITH value, row WHERE row.new_value AND existing IS NULL
+                CREATE (new_value:{value_labels} {{
+                    name: row.name, name_plain: row.name_plain{copy_identity_properties}
+                }})
+                RETURN new_value
+                UNION
+                WITH value, row, existing
+                WITH value, row, existing WHERE NOT (row.new_value AND existing IS NULL)
+                RETURN coalesce(existing, value) AS new_value
+            }}
+            SET new_value.name = row.name
+            FOREACH (_ IN CASE WHEN new_value <> value THEN [1] ELSE [] END |
+                DELETE latest
+                CREATE (root)-[:LATEST]->(new_value)
+            )
+            WITH root, value, new_value, row
+            OPTIONAL MATCH (root)-[latest_status:LATEST_DRAFT|LATEST_FINAL|LATEST_RETIRED]->()
+            WHERE type(latest_status) = row.latest_status_label
+            DELETE latest_status
+            WITH DISTINCT root, value, new_value, row
+            OPTIONAL MATCH (root)-[open_version:HAS_VERSION]->(new_value)
+            WHERE open_version.end_date IS NULL
+            SET open_version.end_date = $versioning.start_date
+            WITH DISTINCT root, value, new_value, row
+            CREATE (root)-[new_version:HAS_VERSION]->(new_value)
+            SET new_version = $versioning, new_version.version = row.version, new_version.status = row.status
+            FOREACH (_ IN CASE WHEN row.latest_status_label = "LATEST_DRAFT" THEN [1] ELSE [] END |
+                CREATE (root)-[:LATEST_DRAFT]->(new_value))
+            FOREACH (_ IN CASE WHEN row.latest_status_label = "LATEST_FINAL" THEN [1] ELSE [] END |
+                CREATE (root)-[:LATEST_FINAL]->(new_value))
+            FOREACH (_ IN CASE WHEN row.latest_status_label = "LATEST_RETIRED" THEN [1] ELSE [] END |
+                CREATE (root)-[:LATEST_RETIRED]->(new_value))
+            WITH root, value, new_value, row
+            OPTIONAL MATCH (root)-[previous_version:HAS_VERSION]->()
+            WHERE previous_version.version <> row.version AND previous_version.end_date IS NULL
+            SET previous_version.end_date = $versioning.start_date
+            WITH DISTINCT value, new_value
+            CALL {{
+                WITH value, new_value
+                WITH value, new_value WHERE new_value <> value
+                OPTIONAL MATCH (new_value)-[stale:{parameters_label}|HAS_CONJUNCTION]->()
+                DELETE stale
+                WITH DISTINCT value, new_value
+                MATCH (value)-[parameter:{parameters_label}|HAS_CONJUNCTION]->(target)
+                CALL apoc.create.relationship(new_value, type(parameter), properties(parameter), target)
+                YIELD rel
+                RETURN count(rel) AS copied
+            }}{relink_parameter_terms}
+            RETURN count(*)
+            """,
+            {"rows": rows, "versioning": versioning},
+        )
+
     def check_usage_count(self, _: str) -> bool:
         return False
 
@@ -30,6 +30,7 @@ class CriteriaPreInstanceRepository(
     root_class = CriteriaPreInstanceRoot
     value_class = CriteriaPreInstanceValue
     template_class = CriteriaTemplateRoot
+    cascade_value_identity_properties = ("guidance_text",)
 
     def _create_ar(
         self,
@@ -170,3 +171,6 @@ class CriteriaPreInstanceRepository(
         self._db_save_node(new_value)
 
         return new_value
+
+    def _cascade_name_plain(self, name: str) -> str:
+        return strip_html(name)
@@ -2,13 +2,16 @@
 import json
 from datetime import datetime
 
-from cachetools import TTLCache, cached
+from cachetools import cached
 from neomodel import db
 
 from clinical_mdr_api.domain_repositories.models.user import User as UserNode
 from clinical_mdr_api.models.user import UserInfo, UserInfoPatchInput
+from common.cache import SharedTTLCache
 
-cache_get_user = TTLCache(maxsize=1000, ttl=10)
+cache_get_user = SharedTTLCache(
+    name="UserRepository.cache_get_user", maxsize=1000, ttl=10
+)
 
 
 class UserRepository:
@@ -99,6 +102,7 @@ class UserRepository:
             resolve_objects=True,
         )
 
+        cache_get_user.evict(user_id)
         if rs[0]:
             return self._transform_to_model(rs[0][0][0])
         return None
@@ -16,6 +16,7 @@ from pydantic import ValidationError
 from starlette.middleware import Middleware
 from starlette_context.middleware import RawContextMiddleware
 
+from clinical_mdr_api.services._utils import DatabaseWorkerPool
 from clinical_mdr_api.utils.api_version import get_api_version
 from common import config, exceptions
 from common.auth.config import OAUTH_ENABLED, SWAGGER_UI_INIT_OAUTH
@@ -92,6 +93,7 @@ async def lifespan(_app: FastAPI):
         # Reconfiguring Swagger UI settings with OpenID Connect discovery
         await reconfigure_with_openid_discovery()
     yield
+    DatabaseWorkerPool.shutdown_all()
 
 
 # Create app
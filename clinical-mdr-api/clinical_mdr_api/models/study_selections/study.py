@@ -1650,3 +1650,15 @@ class StudySubpartAuditTrail(BaseModel):
             nullable=True,
         ),
     ] = None
+
+
+class StudyLastChange(BaseModel):
+    study_uid: str
+    date: Annotated[
+        datetime | None,
+        Field(
+            description="Date of the most recent action in the audit trail of the study, "
+            "including the changes of the study selections.",
+            nullable=True,
+        ),
+    ] = None
@@ -4542,6 +4542,31 @@ class SoACellReference(BaseModel):
     ] = None
 
 
+class SoASnapshotBackfillItem(BaseModel):
+    study_uid: Annotated[str, Field()]
+    study_value_version: Annotated[str, Field()]
+    success: Annotated[bool, Field()]
+    num_cell_references: Annotated[int, Field()] = 0
+    build_seconds: Annotated[float, Field()] = 0
+    save_seconds: Annotated[float, Field()] = 0
+    error: Annotated[str | None, Field(nullable=True)] = None
+
+
+class SoASnapshotBackfillReport(BaseModel):
+    total: Annotated[
+        int, Field(description="Number of study versions without SoA snapshot")
+    ]
+    processed: Annotated[int, Field()] = 0
+    succeeded: Annotated[int, Field()] = 0
+    failed: Annotated[int, Field()] = 0
+    remaining: Annotated[
+        int,
+        Field(description="Number of study versions left for a following run"),
+    ] = 0
+    elapsed_seconds: Annotated[float, Field()] = 0
+    items: Annotated[list[SoASnapshotBackfillItem], Field()] = []
+
+
 class CellCoordinates(NamedTuple):
     row: int
     col: int
@@ -5,7 +5,7 @@ from copy import copy
 from typing import Any, Callable, Generic, Iterable, Self, Type, TypeVar
 
 from pydantic import BaseModel as PydanticBaseModel
-from pydantic import conint, root_validator
+from pydantic import Field, conint, root_validator
 from pydantic.fields import Undefined
 from pydantic.generics import GenericModel
 from starlette.responses import Response
@@ -246,16 +246,37 @@ class CustomPage(GenericModel, Generic[T]):
         total (int): The total number of items that match the query.
         page (int): The number of the current page.
         size (int): The maximum number of items per page.
+        next_page_token (str | None): The token of the next page, only set when a page_token was requested.
     """
 
     items: list[T]
     total: conint(ge=0)
     page: conint(ge=0)
     size: conint(ge=0)
+    next_page_token: str | None = Field(
+        None,
+        description="Token to pass as `page_token` to get the next page. "
+        "Only returned when a `page_token` was requested and the last page is not reached yet.",
+    )
 
     @classmethod
-    def create(cls, items: list[T], total: int, page: int, size: int) -> Self:
-        return cls(total=total, items=items, page=page, size=size)
+    def create(
+        cls,
+        items: list[T],
+        total: int,
+        page: int,
+        size: int,
+        next_page_token: str | None = None,
+    ) -> Self:
+        if next_page_token is None:
+            return cls(total=total, items=items, page=page, size=size)
+        return cls(
+            total=total,
+            items=items,
+            page=page,
+            size=size,
+            next_page_token=next_page_token,
+        )
 
 
 class GenericFilteringReturn(GenericModel, Generic[T]):
@@ -265,14 +286,18 @@ class GenericFilteringReturn(GenericModel, Generic[T]):
     Attributes:
         items (list[T]): The items returned by the query.
         total (int): The total number of items that match the query.
+        next_page_token (str | None): The token of the next page of a keyset paginated query.
     """
 
     items: list[T]
     total: conint(ge=0)
+    next_page_token: str | None = Field(None, exclude=True)
 
     @classmethod
-    def create(cls, items: list[T], total: int) -> Self:
-        return cls(items=items, total=total)
+    def create(
+        cls, items: list[T], total: int, next_page_token: str | None = None
+    ) -> Self:
+        return cls(items=items, total=total, next_page_token=next_page_token)
 
 
 class PrettyJSONResponse(Response):
@@ -1,12 +1,19 @@
+import base64
+import binascii
 import functools
+import hashlib
+import json
 import logging
 import re
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Annotated, Any, Callable
 
+from cachetools import TTLCache, cached
 from dateutil.parser import isoparse
-from neo4j.exceptions import CypherSyntaxError
+from neo4j.exceptions import CypherSyntaxError, Neo4jError
+from neo4j.time import Date, DateTime
 from neomodel import Q, db
 from pydantic import BaseModel, Field, validator
 from pydantic.types import T, conlist
@@ -17,6 +24,7 @@ from clinical_mdr_api.models.concepts.activities.activity import (
 from clinical_mdr_api.models.concepts.concept import VersionProperties
 from clinical_mdr_api.models.controlled_terminologies.ct_term import SimpleTermModel
 from clinical_mdr_api.models.standard_data_models.sponsor_model import SponsorModelBase
+from common import config
 from common.exceptions import ValidationException
 from common.utils import validate_max_skip_clause
 
@@ -399,6 +407,125 @@ class FilterDict(BaseModel):
         return val
 
 
+# Full-text indexes over the properties searched by the wildcard outside of the value nodes,
+# declared in neo4j-mdr-db/db_schema.py
+FULLTEXT_METADATA_INDEX = "fulltext_library_item_metadata"
+FULLTEXT_VERSION_INDEX = "fulltext_version_metadata"
+
+
+@dataclass(frozen=True)
+class WildcardFulltextIndex:
+    """
+    Full-text index that can answer the wildcard search of a listing.
+    The index is declared in neo4j-mdr-db/db_schema.py.
+
+    name : name of the full-text index
+    node_variables : variables of the match clause bound to the indexed nodes
+    value_labels : labels of the indexed nodes, whose versions are searched in FULLTEXT_VERSION_INDEX
+    metadata_labels : labels of the other nodes with properties searched by the wildcard
+        (e.g. uid of the root, name of the library), searched in FULLTEXT_METADATA_INDEX
+    """
+
+    name: str
+    node_variables: tuple[str, ...]
+    value_labels: tuple[str, ...]
+    metadata_labels: tuple[str, ...]
+
+
+# Search values that can be translated to a full-text query without changing their meaning
+_fulltext_search_regex = re.compile(r"^\w+( \w+)*$")
+
+
+@cached(cache=TTLCache(maxsize=1, ttl=config.WILDCARD_FULLTEXT_INDEX_STATE_TTL))
+def get_online_fulltext_indexes() -> frozenset[str]:
+    """Returns the names of the full-text indexes that are ready to be queried"""
+    try:
+        result, _ = db.cypher_query(
+            "SHOW FULLTEXT INDEXES YIELD name, state WHERE state = 'ONLINE' RETURN name"
+        )
+    except Neo4jError as exc:
+        log.warning("Could not list the full-text indexes: %s", exc)
+        return frozenset()
+    return frozenset(row[0] for row in result)
+
+
+def fulltext_wildcard_query(search_string: str) -> str | None:
+    """
+    Translates a wildcard search value to a Lucene query matching every word
+    of the value as a substring, or returns None if this is not possible.
+    """
+    search_string = " ".join(search_string.lower().split())
+    if not _fulltext_search_regex.match(search_string):
+        return None
+    return " AND ".join(f"*{word}*" for word in search_string.split(" "))
+
+
+# Temporal values returned by Neo4j, which have to be typed to be written in a page token
+_page_token_temporal_types = {"datetime": DateTime, "date": Date}
+
+
+def _encode_page_token_value(value: Any) -> Any:
+    for type_name, temporal_type in _page_token_temporal_types.items():
+        if isinstance(value, temporal_type):
+            return {"$t": type_name, "v": value.iso_format()}
+    return value
+
+
+def _decode_page_token_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        temporal_type = _page_token_temporal_types.get(value.get("$t"))
+        ValidationException.raise_if(
+            temporal_type is None, msg="Invalid page_token provided"
+        )
+        return temporal_type.from_iso_format(value["v"])
+    return value
+
+
+def encode_page_token(values: list[Any], sort_clause: str) -> str:
+    """
+    Returns the opaque token of the page following the row with the given sort key values.
+    The token is bound to the sort clause, so that it can't be used with another sorting.
+    """
+    try:
+        token = json.dumps(
+            {
+                "v": [_encode_page_token_value(value) for value in values],
+                "s": _sort_clause_fingerprint(sort_clause),
+            },
+            separators=(",", ":"),
+        )
+    except TypeError as exc:
+        raise ValidationException(
+            msg="Unsupported sort parameters specified for page_token pagination"
+        ) from exc
+    return base64.urlsafe_b64encode(token.encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(page_token: str, sort_clause: str) -> list[Any]:
+    """Returns the sort key values written in a token returned by encode_page_token"""
+    try:
+        token = json.loads(base64.urlsafe_b64decode(page_token.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValidationException(msg="Invalid page_token provided") from exc
+    ValidationException.raise_if_not(
+        isinstance(token, dict) and isinstance(token.get("v"), list),
+        msg="Invalid page_token provided",
+    )
+    ValidationException.raise_if(
+        token.get("s") != _sort_clause_fingerprint(sort_clause),
+        msg="The page_token was returned for another sort_by, it can't be used with the requested sorting",
+    )
+    return [_decode_page_token_value(value) for value in token["v"]]
+
+
+def _sort_clause_fingerprint(sort_clause: str) -> str:
+    return hashlib.sha256(sort_clause.encode("utf-8")).hexdigest()[:16]
+
+
+# Aliases defined by the projection_clause of a CypherQueryBuilder
+_projected_alias_regex = re.compile(r"\bAS\s+`?(\w+)`?", re.IGNORECASE)
+
+
 class CypherQueryBuilder:
     """
     This class builds two queries : items and total_count with filtering and pagination capabilities.
@@ -417,11 +544,17 @@ class CypherQueryBuilder:
     Optional inputs :
         sort_by: dictionary of Cypher aliases on which to apply sorting as keys, and
             boolean to define sort direction (true=ascending) as values.
-        implicit_sort_by: an alias on which to apply sorting, after the aliases given in
-            sort_by are applied. Used to ensure a stable order when just sort_by is not sufficient.
+        implicit_sort_by: an alias, or a list of aliases, on which to apply sorting, after the aliases
+            given in sort_by are applied. Used to ensure a stable order when just sort_by is not sufficient.
         page_number : int, number of the page to return. 1-based (will be converted
             to 0-based for Cypher by class methods).
         page_size : int, number of results per page
+        page_token : str, enables the keyset pagination when provided, page_number is then ignored.
+            An empty string returns the first page, and the token returned by next_page_token
+            for a page returns the following one. Instead of skipping the rows of the previous pages,
+            the rows are filtered on the sort key values of the last row of the previous page,
+            so that every page costs the same, whatever its depth.
+            Requires page_size and implicit_sort_by, whose aliases together have to be unique for the matched rows.
         filter_by : dict, keys are field names for filter_variable and values are
             objects describing the filtering to execute
             * v = list of values to filter against
@@ -436,6 +569,22 @@ class CypherQueryBuilder:
         format_filter_sort_keys: Callable. In some cases, the returned model property
             keys differ from the property keys defined in the database.
             To cover these cases, a conversion function can be provided.
+        wildcard_fulltext_index: WildcardFulltextIndex. When enabled with the WILDCARD_FULLTEXT_SEARCH
+            setting, the items matched by a wildcard filtering are looked up in this full-text index
+            by execute(), and the match clause is restricted to them. The wildcard predicates are still applied.
+            The full-text index is not used when it is not online, when the search value contains
+            characters with a meaning in the Lucene query syntax, when it matches too many items,
+            or when it also matches properties outside of the index (uid, library, version, author...),
+            so that the result is the same as without the index.
+        projection_clause : Cypher clauses (WITH, CALL, ...) computing the expensive part of the
+            returned aliases, e.g. pattern comprehensions and nested maps. When provided, alias_clause only
+            has to define the aliases used to filter and sort and the variables used by projection_clause,
+            and the rows are filtered, sorted and paginated before projection_clause is evaluated,
+            so that it is only evaluated for the rows of the returned page. projection_clause must keep
+            the aliases on which the rows are sorted. The count query does not evaluate it at all.
+            When the filtering or the sorting is requested on an alias defined in projection_clause,
+            or when the LATE_MATERIALIZATION setting is disabled, projection_clause is evaluated
+            on all rows, before the filtering.
 
     Output properties :
         full_query : Complete cypher query with all clauses. See build_full_query
@@ -449,6 +598,10 @@ class CypherQueryBuilder:
             defined in the filter_by dictionary.
         sort_clause : str - Generated on class init ; adds sorting on aliases as
             defined in the sort_by dictionary.
+        sort_keys : list - Generated with sort_clause ; (key, lowered, ascending) tuple
+            of each sorted key.
+        keyset_clause : str - Generated on class init ; keeps the rows following
+            the page_token in the sort order.
         pagination_clause : str - Generated on class init ; adds pagination.
     """
 
@@ -459,7 +612,7 @@ class CypherQueryBuilder:
         page_number: int = 1,
         page_size: int = 0,
         sort_by: dict | None = None,
-        implicit_sort_by: str | None = None,
+        implicit_sort_by: str | list[str] | None = None,
         filter_by: FilterDict | None = None,
         filter_operator: FilterOperator | None = FilterOperator.AND,
         total_count: bool = False,
@@ -467,6 +620,9 @@ class CypherQueryBuilder:
         wildcard_properties_list: list[str] | None = None,
         format_filter_sort_keys: Callable | None = None,
         union_match_clause: str | None = None,
+        wildcard_fulltext_index: WildcardFulltextIndex | None = None,
+        page_token: str | None = None,
+        projection_clause: str | None = None,
     ):
         if wildcard_properties_list is None:
             wildcard_properties_list = []
@@ -484,8 +640,14 @@ class CypherQueryBuilder:
         self.return_model = return_model
         self.wildcard_properties_list = wildcard_properties_list
         self.format_filter_sort_keys = format_filter_sort_keys
+        self.wildcard_fulltext_index = wildcard_fulltext_index
+        self.wildcard_fulltext_query = None
+        self.page_token = page_token
+        self.projection_clause = projection_clause
         self.filter_clause = ""
         self.sort_clause = ""
+        self.sort_keys = []
+        self.keyset_clause = ""
         self.pagination_clause = ""
         self.parameters = {}
 
@@ -497,16 +659,28 @@ class CypherQueryBuilder:
             )
         if filter_by and len(self.filter_by.elements) > 0:
             self.build_filter_clause()
+        if self.page_token is not None:
+            ValidationException.raise_if_not(
+                self.page_size > 0 and self.implicit_sort_by,
+                msg="page_token pagination requires a page_size and a unique sort key",
+            )
         if self.page_size > 0:
             self.build_pagination_clause()
-        if self.sort_by:
+        if self.sort_by or self.page_token is not None:
             ValidationException.raise_if_not(
                 isinstance(self.sort_by, dict), msg="sort_by must be a dict"
             )
 
             self.build_sort_clause()
+        if self.page_token:
+            self.build_keyset_clause()
 
         # Auto-generate final queries
+        self.late_projection = (
+            projection_clause is not None
+            and config.LATE_MATERIALIZATION
+            and not self._references_projected_aliases()
+        )
         self.build_full_query()
         self.build_count_query()
 
@@ -776,6 +950,9 @@ class CypherQueryBuilder:
                                     )
                                 self.parameters[_query_param_name] = elm
 
+                if _alias == "*":
+                    self._prepare_fulltext_restriction(_values)
+
                 # If multiple values, will create a clause with OR or AND, between ()
                 _predicate = _predicate_operator.join(_predicates)
                 if len(_values) > 1 or _alias == "*":
@@ -790,7 +967,103 @@ class CypherQueryBuilder:
             + f" {self.filter_operator.value.upper()} ".join(list(filter_predicates))
         )
 
+    def _prepare_fulltext_restriction(self, values: list[str]) -> None:
+        """
+        Keeps the full-text query of a wildcard search value if the full-text index can answer it,
+        the index is looked up when the query is executed.
+        """
+        if (
+            self.wildcard_fulltext_index is None
+            or not config.WILDCARD_FULLTEXT_SEARCH
+            or len(values) != 1
+            # With the OR operator, items not matching the wildcard can match other filters
+            or (
+                self.filter_operator != FilterOperator.AND
+                and len(self.filter_by.elements) > 1
+            )
+        ):
+            return
+        self.wildcard_fulltext_query = fulltext_wildcard_query(values[0])
+
+    def _restrict_to_fulltext_matches(self) -> None:
+        """
+        Restricts the match clause to the nodes found by the full-text index for the wildcard search value.
+        Nothing is changed, and the wildcard predicates scan all items, if the index can't be used,
+        or if the search value also matches properties outside of the index.
+        """
+        index = self.wildcard_fulltext_index
+        fulltext_query = self.wildcard_fulltext_query
+        # Only looked up once
+        self.wildcard_fulltext_query = None
+        if fulltext_query is None or not {
+            index.name,
+            FULLTEXT_METADATA_INDEX,
+            FULLTEXT_VERSION_INDEX,
+        }.issubset(get_online_fulltext_indexes()):
+            return
+        try:
+            result, _ = db.cypher_query(
+                """
+                CALL {
+                    CALL db.index.fulltext.queryNodes($index_name, $query, {limit: $limit})
+                    YIELD node
+                    RETURN collect(elementId(node)) AS ids
+                }
+                CALL {
+                    CALL db.index.fulltext.queryNodes($metadata_index_name, $query)
+                    YIELD node
+                    WITH node WHERE any(label IN labels(node) WHERE label IN $metadata_labels)
+                    LIMIT 1
+                    RETURN count(node) AS metadata_matches
+                }
+                CALL {
+                    CALL db.index.fulltext.queryRelationships($version_index_name, $query)
+                    YIELD relationship
+                    WITH relationship
+                    WHERE any(label IN labels(endNode(relationship)) WHERE label IN $value_labels)
+                    LIMIT 1
+                    RETURN count(relationship) AS version_matches
+                }
+                RETURN ids, metadata_matches + version_matches > 0
+                """,
+                {
+                    "index_name": index.name,
+                    "metadata_index_name": FULLTEXT_METADATA_INDEX,
+                    "version_index_name": FULLTEXT_VERSION_INDEX,
+                    "query": fulltext_query,
+                    "limit": config.WILDCARD_FULLTEXT_MAX_MATCHES,
+                    "metadata_labels": list(index.metadata_labels),
+                    "value_labels": list(index.value_labels),
+                },
+            )
+        except Neo4jError as exc:
+            log.warning("Full-text wildcard search failed, falling back: %s", exc)
+            return
+        ids, matches_metadata = result[0]
+        if matches_metadata:
+            # Items can match on the properties of their root, library or version
+            return
+        if len(ids) >= config.WILDCARD_FULLTEXT_MAX_MATCHES:
+            # Scanning is cheaper than looking up this many matches
+            return
+        self.parameters["wildcard_fulltext_ids"] = ids
+        restriction = " WITH * WHERE " + " OR ".join(
+            f"elementId({variable}) IN $wildcard_fulltext_ids"
+            for variable in index.node_variables
+        )
+        self.match_clause += restriction
+        if self.union_match_clause:
+            self.union_match_clause += restriction
+        self.build_full_query()
+        self.build_count_query()
+
     def build_pagination_clause(self) -> None:
+        if self.page_token is not None:
+            # The previous pages are filtered out by the keyset clause
+            self.pagination_clause = "LIMIT $page_size"
+            self.parameters["page_size"] = self.page_size
+            return
+
         validate_max_skip_clause(page_number=self.page_number, page_size=self.page_size)
 
         # Set clause
@@ -812,6 +1085,7 @@ class CypherQueryBuilder:
                 sort_order = " DESC"
             if self.format_filter_sort_keys:
                 key = self.format_filter_sort_keys(key)
+            lowered = False
             if self.return_model and issubclass(self.return_model, BaseModel):
                 attr_desc = self.return_model.__fields__.get(key)
                 # if property is of string type we should apply toLower() to sort
@@ -820,20 +1094,138 @@ class CypherQueryBuilder:
                     and attr_desc.type_ is str
                     and attr_desc.sub_fields is None
                 ):
-                    key = f"toLower({key})"
+                    lowered = True
+            self.sort_keys.append((key, lowered, bool(value)))
+            if lowered:
+                key = f"toLower({key})"
             sort_by_statements.append(key + sort_order)
 
-        if (
-            self.implicit_sort_by is not None
-            and self.implicit_sort_by not in self.sort_by
+        implicit_sort_by = (
+            [self.implicit_sort_by]
+            if isinstance(self.implicit_sort_by, str)
+            else self.implicit_sort_by or []
+        )
+        for implicit_key in implicit_sort_by:
+            if implicit_key in self.sort_by:
+                continue
+            if self.format_filter_sort_keys:
+                implicit_key = self.format_filter_sort_keys(implicit_key)
+            self.sort_keys.append((implicit_key, False, True))
+            sort_by_statements.append(implicit_key)
+        # Set clause
+        self.sort_clause = _sort_clause + ",".join(sort_by_statements)
+
+    def build_keyset_clause(self) -> None:
+        """
+        Keeps the rows which come after the sort key values of the page_token in the sort order,
+        which are the rows following the key values of the first key which differs.
+        Nulls are sorted last in ascending order and first in descending order.
+        """
+        values = decode_page_token(self.page_token, self.sort_clause)
+        ValidationException.raise_if(
+            len(values) != len(self.sort_keys), msg="Invalid page_token provided"
+        )
+
+        equal_predicates = []
+        keyset_predicates = []
+        for index, ((key, lowered, ascending), value) in enumerate(
+            zip(self.sort_keys, values)
         ):
-            sort_by_statements.append(
-                self.format_filter_sort_keys(self.implicit_sort_by)
-                if self.format_filter_sort_keys
-                else self.implicit_sort_by
+            param = f"$page_token_{index}"
+            self.parameters[f"page_token_{index}"] = value
+            if lowered:
+                key, param = f"toLower({key})", f"toLower({param})"
+            if ascending:
+                after = f"({param} IS NOT NULL AND ({key} > {param} OR {key} IS NULL))"
+            else:
+                after = f"coalesce(CASE WHEN {param} IS NULL THEN {key} IS NOT NULL ELSE {key} < {param} END, false)"
+            keyset_predicates.append(" AND ".join(equal_predicates + [after]))
+            equal_predicates.append(
+                f"({key} = {param} OR ({key} IS NULL AND {param} IS NULL))"
             )
+
         # Set clause
-        self.sort_clause = _sort_clause + ",".join(sort_by_statements)
+        self.keyset_clause = "WITH * WHERE " + " OR ".join(
+            f"({predicate})" for predicate in keyset_predicates
+        )
+
+    def next_page_token(
+        self, result_array: list[Any], attributes_names: list[str]
+    ) -> str | None:
+        """
+        Returns the page_token of the page following the returned rows,
+        or None if the keyset pagination is not used or if the last page was returned.
+        """
+        if self.page_token is None or len(result_array) < self.page_size:
+            return None
+
+        last_row = dict(zip(attributes_names, result_array[-1]))
+        values = []
+        for key, _, _ in self.sort_keys:
+            alias, *path = key.split(".")
+            ValidationException.raise_if(
+                alias not in last_row,
+                msg=f"Sorting on {key} is not supported for page_token pagination",
+            )
+            value = last_row[alias]
+            for prop in path:
+                value = value.get(prop) if value is not None else None
+            values.append(value)
+        return encode_page_token(values, self.sort_clause)
+
+    def _references_projected_aliases(self) -> bool:
+        """
+        Returns True if the filter, sort or keyset clause references an alias defined in projection_clause,
+        in which case the projection has to be evaluated before the filtering.
+        """
+        projected_aliases = set(
+            _projected_alias_regex.findall(self.projection_clause or "")
+        )
+        clauses = " ".join([self.filter_clause, self.sort_clause, self.keyset_clause])
+        return any(
+            re.search(rf"(?<![\w$.`]){re.escape(alias)}\b", clauses)
+            for alias in projected_aliases
+        )
+
+    def _filtered_rows_clauses(self, match_clause: str, projected: bool) -> list[str]:
+        """
+        Returns the clauses matching the rows and keeping the ones selected by the filter clause,
+        with the projection_clause evaluated on all of them if projected is True.
+        """
+        _with_alias_clause = f"WITH {self.alias_clause}"
+        if projected and self.projection_clause is not None:
+            return [
+                match_clause,
+                _with_alias_clause,
+                self.projection_clause,
+                "WITH *",
+                self.filter_clause,
+            ]
+        return [match_clause, _with_alias_clause, self.filter_clause]
+
+    def _page_query(self, match_clause: str) -> str:
+        _return_clause = "RETURN *"
+        if not self.late_projection:
+            return " ".join(
+                self._filtered_rows_clauses(match_clause, projected=True)
+                + [
+                    self.keyset_clause,
+                    _return_clause,
+                    self.sort_clause,
+                    self.pagination_clause,
+                ]
+            )
+
+        # The page is cut before the projection, and sorted again once projected
+        _page_clauses = []
+        if self.sort_clause or self.pagination_clause:
+            _page_clauses = ["WITH *", self.sort_clause, self.pagination_clause]
+        return " ".join(
+            self._filtered_rows_clauses(match_clause, projected=False)
+            + [self.keyset_clause]
+            + _page_clauses
+            + [self.projection_clause, _return_clause, self.sort_clause]
+        )
 
     def build_full_query(self) -> None:
         """
@@ -841,36 +1233,25 @@ class CypherQueryBuilder:
             MATCH caller-provided (and WITH, CALL, ... any custom pattern matching necessary)
             > WITH alias_clause caller-provided
             > WHERE filter_clause using aliases
+            > WITH * WHERE keyset_clause to skip the previous pages when a page_token is used
             > RETURN * to return results as is
             > ORDER BY to sort results using aliases
             > SKIP * LIMIT * to paginate results
+        With a projection_clause, it is evaluated after the WITH alias_clause, unless the projection is late.
+        A late projection gives the following pattern :
+            MATCH caller-provided
+            > WITH alias_clause caller-provided
+            > WHERE filter_clause using aliases
+            > WITH * WHERE keyset_clause to skip the previous pages when a page_token is used
+            > WITH * ORDER BY ... SKIP * LIMIT * to select the rows of the page
+            > projection_clause caller-provided, evaluated for the rows of the page only
+            > RETURN * ORDER BY ... to return the projected rows in the same order
         """
-        _with_alias_clause = f"WITH {self.alias_clause}"
-        _return_clause = "RETURN *"
-
         # Set clause
-        self.full_query = " ".join(
-            [
-                self.match_clause,
-                _with_alias_clause,
-                self.filter_clause,
-                _return_clause,
-                self.sort_clause,
-                self.pagination_clause,
-            ]
-        )
+        self.full_query = self._page_query(self.match_clause)
         if self.union_match_clause:
             self.full_query += " UNION "
-            self.full_query += " ".join(
-                [
-                    self.union_match_clause,
-                    _with_alias_clause,
-                    self.filter_clause,
-                    _return_clause,
-                    self.sort_clause,
-                    self.pagination_clause,
-                ]
-            )
+            self.full_query += self._page_query(self.union_match_clause)
 
     def build_count_query(self) -> None:
         """
@@ -879,33 +1260,23 @@ class CypherQueryBuilder:
             > WITH alias_clause caller-provided
             > WHERE filter_clause using aliases
             > RETURN results count
+        The projection_clause is only evaluated when the filtering needs it.
         """
-        _with_alias_clause = f"WITH {self.alias_clause}"
         _return_count_clause = "RETURN count(*) AS total_count"
+        projected = not self.late_projection
 
         # Set clause
         if not self.union_match_clause:
             self.count_query = " ".join(
-                [
-                    self.match_clause,
-                    _with_alias_clause,
-                    self.filter_clause,
-                    _return_count_clause,
-                ]
+                self._filtered_rows_clauses(self.match_clause, projected)
+                + [_return_count_clause]
             )
         else:
             self.count_query = " ".join(
-                [
-                    self.match_clause,
-                    _with_alias_clause,
-                    self.filter_clause,
-                    _return_count_clause,
-                    "UNION",
-                    self.union_match_clause,
-                    _with_alias_clause,
-                    self.filter_clause,
-                    _return_count_clause,
-                ]
+                self._filtered_rows_clauses(self.match_clause, projected)
+                + [_return_count_clause, "UNION"]
+                + self._filtered_rows_clauses(self.union_match_clause, projected)
+                + [_return_count_clause]
             )
 
     def build_header_query(self, header_alias: str, page_size: int) -> str:
@@ -919,8 +1290,6 @@ class CypherQueryBuilder:
             > WHERE filter_clause using aliases
             > RETURN list of possible headers for given alias, ordered, with a limit
         """
-        _with_alias_clause = f"WITH {self.alias_clause}"
-
         # support header clause for nested properties
         _escaped_header_alias = self.escape_alias(header_alias)
         alias_clause = None
@@ -952,12 +1321,8 @@ class CypherQueryBuilder:
         RETURN apoc.coll.toSet(apoc.coll.flatten(collect(DISTINCT {_escaped_header_alias}))) AS values"""
 
         return " ".join(
-            [
-                self.match_clause,
-                _with_alias_clause,
-                self.filter_clause,
-                _return_header_clause,
-            ]
+            self._filtered_rows_clauses(self.match_clause, projected=True)
+            + [_return_header_clause]
         )
 
     def escape_alias(self, alias: str) -> str:
@@ -968,6 +1333,11 @@ class CypherQueryBuilder:
         return re.sub(nested_regex, "_", alias)
 
     def execute(self) -> tuple[Any, Any]:
+        """
+        Runs the full query. The count query, when run afterwards,
+        is restricted to the same full-text matches.
+        """
+        self._restrict_to_fulltext_matches()
         try:
             result_array, attributes_names = db.cypher_query(
                 query=self.full_query, params=self.parameters
@@ -979,6 +1349,100 @@ class CypherQueryBuilder:
         return result_array, attributes_names
 
 
+class StudySelectionQueryFilter:
+    """
+    This class evaluates the filtering, sorting and pagination of a study selection listing
+    in Cypher, so that the service layer only has to build response models for the requested page.
+    It only returns the uids of the matching selections (and their total count) ;
+    the caller is then responsible for materializing the returned uids, in the returned order.
+
+    Mandatory inputs :
+        match_clause : Cypher pattern matching the selection nodes of one study value.
+            It has to bind every variable used in the field_to_cypher expressions.
+        field_to_cypher : dict, keys are field names of the response model and values are the
+            Cypher expressions that compute the same value from the matched pattern.
+            Only fields listed here can be filtered or sorted on in Cypher.
+            It must contain the "uid" key.
+
+    Optional inputs :
+        filter_by, filter_operator, sort_by, page_number, page_size, total_count :
+            same meaning as for the service_level_generic_filtering function.
+        paginate : bool, if False, the pagination is not applied in Cypher. This is needed
+            when the final order of the items is computed by the service layer
+            (e.g. visits are ordered by the study timeline).
+            Pagination is only stable when sort_by is provided, items are then
+            implicitly sorted by uid after the sort_by fields.
+    """
+
+    def __init__(
+        self,
+        match_clause: str,
+        field_to_cypher: dict[str, str],
+        filter_by: dict | None = None,
+        filter_operator: FilterOperator | None = FilterOperator.AND,
+        sort_by: dict | None = None,
+        page_number: int = 1,
+        page_size: int = 0,
+        total_count: bool = False,
+        paginate: bool = True,
+    ):
+        ValidationException.raise_if_not(
+            self.is_supported(
+                field_to_cypher=field_to_cypher, filter_by=filter_by, sort_by=sort_by
+            ),
+            msg="Filtering or sorting on derived fields can't be done at query level",
+        )
+        self.field_to_cypher = field_to_cypher
+        self.filter_by = filter_by or {}
+        self.sort_by = sort_by or {}
+        self.total_count = total_count
+        referenced_fields = {"uid"} | set(self.filter_by) | set(self.sort_by)
+        self.query = CypherQueryBuilder(
+            match_clause=match_clause,
+            alias_clause=", ".join(
+                f"{field_to_cypher[field]} AS {self.escape_field(field)}"
+                for field in sorted(referenced_fields)
+            ),
+            sort_by=self.sort_by,
+            implicit_sort_by="uid",
+            page_number=page_number,
+            page_size=page_size if paginate else 0,
+            filter_by=FilterDict(elements=self.filter_by),
+            filter_operator=filter_operator,
+            total_count=total_count,
+            format_filter_sort_keys=self.escape_field,
+        )
+
+    @staticmethod
+    def escape_field(field: str) -> str:
+        return re.sub(nested_regex, "__", field)
+
+    @staticmethod
+    def is_supported(
+        field_to_cypher: dict[str, str],
+        filter_by: dict | None = None,
+        sort_by: dict | None = None,
+    ) -> bool:
+        """
+        Returns True if every filtered and sorted field can be computed in Cypher.
+        Wildcard filtering and derived fields have to be handled by the service layer.
+        """
+        fields = set(filter_by or {}) | set(sort_by or {})
+        return all(field in field_to_cypher for field in fields)
+
+    def execute(self) -> tuple[list[str], int]:
+        result_array, attributes_names = self.query.execute()
+        uid_index = attributes_names.index("uid")
+        uids = [row[uid_index] for row in result_array]
+        total = 0
+        if self.total_count:
+            count_result, _ = db.cypher_query(
+                query=self.query.count_query, params=self.query.parameters
+            )
+            total = count_result[0][0] if count_result else 0
+        return uids, total
+
+
 def sb_clear_cache(caches: list[str] | None = None):
     """
     Decorator that will clear the specified caches after the wrapped function execution.
@@ -995,7 +1459,8 @@ def sb_clear_cache(caches: list[str] | None = None):
             finally:
                 for cache_name in caches:
                     cache = getattr(self, cache_name, None)
-                    if cache:
+                    # An empty local cache is falsy, but its shared tier and peers may still hold entries
+                    if cache is not None:
                         log.info(
                             "Clear cache '%s.%s' of size: %s",
                             type(self).__name__,
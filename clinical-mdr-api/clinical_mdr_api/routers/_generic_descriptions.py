@@ -69,6 +69,14 @@ In case the value is set to `0`, all rows will be returned.\n
 Errors: `page_number` not provided.
 """
 
+PAGE_TOKEN = """
+Token of the page to return, for walking through long lists.\n
+Functionality: an empty value returns the first page, and the `next_page_token` returned with a page selects the following one.
+`page_number` is then ignored and every page is returned as fast as the first one, whatever its depth.
+`next_page_token` is not returned with the last page.\n
+Errors: `page_size` not provided or `0`, token returned for another `sort_by`.
+"""
+
 FILTERS = """
 JSON dictionary of field names and search strings, with a choice of operators for building complex filtering queries.
 
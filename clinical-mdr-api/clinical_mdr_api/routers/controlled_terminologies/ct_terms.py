@@ -148,6 +148,9 @@ def get_all_terms(
             description=_generic_descriptions.PAGE_SIZE,
         ),
     ] = config.DEFAULT_PAGE_SIZE,
+    page_token: Annotated[
+        str | None, Query(description=_generic_descriptions.PAGE_TOKEN)
+    ] = None,
     filters: Annotated[
         Json | None,
         Query(
@@ -172,12 +175,17 @@ def get_all_terms(
         sort_by=sort_by,
         page_number=page_number,
         page_size=page_size,
+        page_token=page_token,
         total_count=total_count,
         filter_by=filters,
         filter_operator=FilterOperator.from_str(operator),
     )
     return CustomPage.create(
-        items=results.items, total=results.total, page=page_number, size=page_size
+        items=results.items,
+        total=results.total,
+        page=page_number,
+        size=page_size,
+        next_page_token=results.next_page_token,
     )
 
 
@@ -2,12 +2,13 @@ import re
 from pathlib import Path as PathFromPathLib
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Path, Request
+from fastapi import APIRouter, Path, Query, Request
 from fastapi.templating import Jinja2Templates
 
 from clinical_mdr_api.models.utils import PrettyJSONResponse
 from clinical_mdr_api.routers import _generic_descriptions
 from clinical_mdr_api.services.ddf.usdm_service import USDMService
+from clinical_mdr_api.services.studies.study_bundle import load_study_bundle
 from clinical_mdr_api.services.studies.study_design_figure import (
     StudyDesignFigureService,
 )
@@ -23,6 +24,43 @@ M11_TEMPLATES_DIR_PATH = (
 templates = Jinja2Templates(directory=str(M11_TEMPLATES_DIR_PATH))
 
 
+@router.get(
+    path="",
+    dependencies=[rbac.STUDY_READ],
+    response_class=PrettyJSONResponse,
+    status_code=200,
+    responses={
+        400: {
+            "model": ErrorResponse,
+            "description": "Forbidden - More studies were requested than allowed by the DDF_MAX_STUDIES_PER_REQUEST setting.",
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Not Found - One of the studies with the specified 'study_uids' wasn't found.",
+        },
+        500: _generic_descriptions.ERROR_500,
+    },
+    summary="""Return several entire studies in DDF USDM format""",
+    description="""
+State before:
+- Studies must exist.
+
+State after:
+- no change.
+
+Possible errors:
+- Invalid study-uid.
+- More than DDF_MAX_STUDIES_PER_REQUEST (20 by default) study-uids.
+""",
+)
+def get_studies(
+    study_uids: Annotated[
+        list[str], Query(description="The unique uids of the studies.")
+    ]
+) -> list[dict[str, Any]]:
+    return USDMService.get_by_uids(study_uids)
+
+
 @router.get(
     path="/{study_uid}",
     dependencies=[rbac.STUDY_READ],
@@ -79,8 +117,14 @@ def get_study_m11_protocol(
     request: Request,
     study_uid: Annotated[str, Path(description="The unique uid of the study.")],
 ):
+    # USDM and the design figure share one snapshot of the study
+    study_bundle = load_study_bundle(
+        study_uid,
+        parts=USDMService.study_bundle_parts
+        + StudyDesignFigureService.study_bundle_parts,
+    )
     usdm_service = USDMService(study_uid=study_uid)
-    ddf_study_wrapper = usdm_service.get_by_uid(study_uid)
+    ddf_study_wrapper = usdm_service.get_by_uid(study_uid, study_bundle=study_bundle)
     ddf_study = ddf_study_wrapper.get("study")
 
     study_flowchart = StudyFlowchartService().get_study_flowchart_html(
@@ -98,7 +142,7 @@ def get_study_m11_protocol(
     ).group(0)
 
     study_design_figure = StudyDesignFigureService(debug=False).get_svg_document(
-        study_uid, study_value_version=None
+        study_uid, study_value_version=None, study_bundle=study_bundle
     )
 
     context = {
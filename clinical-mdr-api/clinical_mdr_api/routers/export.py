@@ -1,9 +1,12 @@
 import collections
 import csv
 import functools
+import inspect
 import io
+import itertools
+import tempfile
 from copy import copy
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import yaml
 from dict2xml import dict2xml
@@ -12,9 +15,15 @@ from openpyxl import Workbook
 
 from clinical_mdr_api.models import utils
 from clinical_mdr_api.models.utils import BaseModel
+from common import config
 
 REGISTERED_EXPORT_FORMATS = {}
 
+# Number of rows rendered before a chunk is sent to the client
+EXPORT_CHUNK_ROWS = 500
+# Size of the chunks read from the temporary file holding an XLSX export
+EXPORT_CHUNK_BYTES = 64 * 1024
+
 
 def register_export_format(name: str):
     """Decorator used to register an export function.
@@ -118,59 +127,71 @@ def _convert_data_to_rows(data: dict, headers: list[Any]):
         yield rs
 
 
-def _convert_data_to_list(data: dict, headers: list[Any]) -> list[Any]:
-    """Generate a list of dictionaries based on given data."""
-    # First, convert received headers to a more usable representation
-    dict_headers = _convert_headers_to_dict(headers)
-    result = []
-    for value in _extract_values_from_data(data, dict_headers):
-        result.append(value)
-    return result
-
-
 @register_export_format("text/csv")
-def _export_to_csv(data: dict, headers: list[Any]):
+def _export_to_csv(data: Iterable, headers: list[Any]) -> Iterator[str]:
     """Export given data to CSV.
 
     The generated CSV content will only contain items listed in
-    headers.
+    headers. It is yielded in chunks of EXPORT_CHUNK_ROWS rows.
     """
     stream = io.StringIO()
     writer = csv.writer(stream, delimiter=",", quoting=csv.QUOTE_ALL)
-    for row in _convert_data_to_rows(data, headers):
-        writer.writerow(row)
-    return stream.getvalue()
+    for rows in itertools.batched(
+        _convert_data_to_rows(data, headers), EXPORT_CHUNK_ROWS
+    ):
+        writer.writerows(rows)
+        yield stream.getvalue()
+        stream.seek(0)
+        stream.truncate(0)
 
 
 @register_export_format(
     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 )
-def _export_to_xslx(data: dict, headers: list[Any]):
+def _export_to_xslx(data: Iterable, headers: list[Any]) -> Iterator[bytes]:
     """Export given data to XLSX.
 
     The generated content will only contain items listed in headers.
+    The workbook is written in write-only mode to a temporary file, which is then
+    yielded in chunks, so that the rows are never all held in memory.
     """
-    stream = io.BytesIO()
-    workbook = Workbook()
-    # grab the active worksheet
-    worksheet = workbook.active
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
     for row in _convert_data_to_rows(data, headers):
         worksheet.append(row)
-    workbook.save(stream)
-    return stream.getvalue()
+    with tempfile.TemporaryFile() as stream:
+        workbook.save(stream)
+        stream.seek(0)
+        while chunk := stream.read(EXPORT_CHUNK_BYTES):
+            yield chunk
 
 
 @register_export_format("text/xml")
-def _export_to_xml(data: dict, headers: list[Any]):
+def _export_to_xml(data: Iterable, headers: list[Any]) -> Iterator[str]:
     """Export given data to XML.
 
     The generated content will only contain items listed in headers.
+    Each item is rendered as its own <item> element, in chunks of EXPORT_CHUNK_ROWS items.
     """
-    export_dict = {"item": _convert_data_to_list(data, headers)}
+    dict_headers = _convert_headers_to_dict(headers)
     # If data is a single BaseModel instance we don't won't to wrap the export into <items> tags
     if isinstance(data, BaseModel):
-        return dict2xml(export_dict, indent="  ")
-    return dict2xml(export_dict, wrap="items", indent="  ")
+        yield dict2xml(
+            {"item": list(_extract_values_from_data(data, dict_headers))},
+            indent="  ",
+        )
+        return
+    yield "<items>\n"
+    empty = True
+    for values in itertools.batched(
+        _extract_values_from_data(data, dict_headers), EXPORT_CHUNK_ROWS
+    ):
+        empty = False
+        xml = dict2xml({"item": list(values)}, indent="  ")
+        yield "".join(f"  {line}\n" if line else "\n" for line in xml.split("\n"))
+    if empty:
+        yield "  <item></item>\n"
+    yield "</items>"
 
 
 @register_export_format("application/x-yaml")
@@ -180,12 +201,17 @@ def _export_to_yaml(data: BaseModel, headers: list[Any]):
     return yaml.dump(data.dict())
 
 
-def export(export_format: str, data: dict, export_definition: dict, *args, **kwargs):
+def export(
+    export_format: str, data: Iterable, export_definition: dict, *args, **kwargs
+):
     """Generic export function.
 
     Use this function when you want to export data to given data. It
     will return a StreamingResponse instance or the given data if
     format is not supported.
+
+    The data can be a page of items, a list or an iterator of items, which is consumed
+    while the response is streamed.
     """
     if export_format in export_definition:
         headers = export_definition[export_format]
@@ -196,38 +222,98 @@ def export(export_format: str, data: dict, export_definition: dict, *args, **kwa
             data = data.items
         extra_headers = export_definition.get("include_if_exists")
         headers = copy(headers)
-        if extra_headers and data:
-            headers += [
-                extra_header
-                for extra_header in extra_headers
-                if extra_header in data[0]
-            ]
+        if extra_headers and not isinstance(data, BaseModel):
+            # Peek the first item without consuming it
+            data = iter(data)
+            first_item = next(data, None)
+            if first_item is not None:
+                data = itertools.chain([first_item], data)
+                headers += [
+                    extra_header
+                    for extra_header in extra_headers
+                    if extra_header in first_item
+                ]
 
         result = REGISTERED_EXPORT_FORMATS[export_format](
             data, headers, *args, **kwargs
         )
-        response = StreamingResponse(iter([result]), media_type=export_format)
+        if isinstance(result, str | bytes):
+            result = iter([result])
+        response = StreamingResponse(result, media_type=export_format)
         response.headers["Content-Disposition"] = "attachment; filename=export"
         return response
     return data
 
 
+def _iterate_keyset_pages(func, first_page, args: tuple, kwargs: dict) -> Iterator:
+    """
+    Yields the items of the given first page, then fetches and yields the following pages,
+    each one starting after the last row of the previous one as given by its next_page_token.
+    """
+    page = first_page
+    while True:
+        yield from page.items
+        if not page.next_page_token:
+            return
+        page = func(*args, **(kwargs | {"page_token": page.next_page_token}))
+
+
+def _supports_keyset_paging(func) -> bool:
+    parameters = inspect.signature(func).parameters
+    return "page_token" in parameters and "page_size" in parameters
+
+
 def allow_exports(export_definition: dict):
-    """Decorator used to add export functionality to list type endpoint."""
+    """Decorator used to add export functionality to list type endpoint.
+
+    When all items are exported (page_size=0) from an endpoint supporting keyset pagination
+    (page_token), the items are fetched page by page while the export is streamed to the client,
+    instead of being loaded all at once. Other endpoints are called once, as skipping
+    the previous pages would rescan them for every page and could miss or repeat rows.
+    """
 
     def decorator(func):
+        paging_supported = _supports_keyset_paging(func)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             request = kwargs.get("request")
             accept = None
             if request:
                 accept = request.headers.get("accept", "application/json")
-            result = func(*args, **kwargs)
-            formats = export_definition.get("formats", [])
-            formats.extend(export_definition.keys())
-            if accept and accept in formats:
-                result = export(accept, result, export_definition)
-            return result
+            formats = export_definition.get("formats", []) + list(
+                export_definition.keys()
+            )
+            if not (
+                accept
+                and accept in formats
+                and accept in REGISTERED_EXPORT_FORMATS
+                and accept != "application/x-yaml"
+                and paging_supported
+                and kwargs.get("page_size") == 0
+            ):
+                result = func(*args, **kwargs)
+                if accept and accept in formats:
+                    result = export(accept, result, export_definition)
+                return result
+
+            paged_kwargs = kwargs | {
+                "page_size": config.EXPORT_PAGE_SIZE,
+                "page_token": "",
+            }
+            if "total_count" in kwargs:
+                paged_kwargs["total_count"] = False
+            # The first page is fetched before the response is returned, so that errors are reported as usual
+            first_page = func(*args, **paged_kwargs)
+            if not isinstance(
+                first_page, utils.CustomPage | utils.GenericFilteringReturn
+            ):
+                return export(accept, func(*args, **kwargs), export_definition)
+            return export(
+                accept,
+                _iterate_keyset_pages(func, first_page, args, paged_kwargs),
+                export_definition,
+            )
 
         return wrapper
 
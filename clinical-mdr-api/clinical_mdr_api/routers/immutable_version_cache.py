@@ -0,0 +1,202 @@
+"""
+Response cache of the study endpoints requested for a locked or released study version.
+
+Once a study version is locked or released its data never changes, so the response rendered
+for a `study_value_version` can be served again to any user allowed to read it, without running
+the endpoint. Responses are cached per route, path parameters, query parameters and `Accept` header,
+and returned with a strong `ETag`, so that clients sending it back in `If-None-Match` get a `304 Not Modified`.
+Requests without `study_value_version`, which return the draft version of a study, are never cached,
+and a response is only stored once the requested version is confirmed to exist as a locked or released version,
+as some endpoints return default values for any version.
+
+Only endpoints whose response is fully determined by the study version may opt in: endpoints reading
+the latest version of library nodes, such as CT term names, activities, units, compounds or visit names,
+change when the library does. This excludes, among others, the study definition, the SoA (flowchart),
+the study visits and study activities, whose CT term names and latest activity versions are read from the library,
+the ADaM and SDTM listings, and the DDF USDM and CTR-XML exports, which also read library nodes
+and are requested without a `study_value_version`.
+
+Endpoints opt in with the `cache_immutable_version` decorator, on a router created with
+`APIRouter(route_class=ImmutableVersionCacheRoute)`.
+The cache is looked up by a dependency added after the dependencies of each cached route,
+so that the authentication and authorization dependencies are always run before a cached response is returned.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from fastapi import Depends, Request, Response, status
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository_impl import (
+    StudyDefinitionRepositoryImpl,
+)
+from common import config
+from common.cache import SharedTTLCache
+
+log = logging.getLogger(__name__)
+
+STUDY_VALUE_VERSION_PARAM = "study_value_version"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: tuple[tuple[str, str], ...]
+    etag: str
+
+    @classmethod
+    def from_response(cls, response: Response) -> "CachedResponse":
+        return cls(
+            body=response.body,
+            headers=tuple(
+                (name, value)
+                for name, value in response.headers.items()
+                if name not in ("content-length", "etag")
+            ),
+            etag=f'"{hashlib.sha256(response.body).hexdigest()[:32]}"',
+        )
+
+    def to_response(self, request: Request) -> Response:
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": self.etag}
+            )
+        return Response(
+            content=self.body, headers=dict(self.headers) | {"ETag": self.etag}
+        )
+
+
+immutable_version_responses = SharedTTLCache(
+    name="immutable_version_responses",
+    maxsize=config.IMMUTABLE_VERSION_CACHE_MAX_BYTES,
+    ttl=config.IMMUTABLE_VERSION_CACHE_TTL,
+    getsizeof=lambda cached: len(cached.body),
+)
+
+
+def cache_immutable_version(endpoint: Callable) -> Callable:
+    """Decorator of the endpoints whose responses for a locked or released study version never change"""
+    endpoint.cache_immutable_version = True
+    return endpoint
+
+
+def is_immutable_study_version(study_uid: str, study_value_version: str) -> bool:
+    return StudyDefinitionRepositoryImpl.check_if_study_version_is_locked_or_released(
+        study_uid=study_uid, study_value_version=study_value_version
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an `If-None-Match` header with an ETag, as defined for conditional GET requests"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def immutable_version_cache_key(request: Request) -> tuple | None:
+    """Returns the cache key of a request for a study version, or None if its response can't be cached"""
+    study_value_version = request.query_params.get(STUDY_VALUE_VERSION_PARAM)
+    study_uid = request.path_params.get("study_uid")
+    route = request.scope.get("route")
+    if (
+        request.method != "GET"
+        or not study_value_version
+        or not study_uid
+        or route is None
+        or config.IMMUTABLE_VERSION_CACHE_MAX_BYTES <= 0
+    ):
+        return None
+    return (
+        route.path,
+        study_uid,
+        study_value_version,
+        tuple(sorted(request.path_params.items())),
+        tuple(sorted(request.query_params.multi_items())),
+        request.headers.get("accept", "application/json"),
+    )
+
+
+class _CachedResponseFound(Exception):
+    def __init__(self, cached: CachedResponse):
+        super().__init__()
+        self.cached = cached
+
+
+async def lookup_immutable_version_response(request: Request) -> None:
+    """Dependency interrupting the request with the cached response, if there is one"""
+    key = immutable_version_cache_key(request)
+    request.state.immutable_version_cache_key = key
+    if key is None:
+        return
+    try:
+        # Read through __getitem__, which also looks up the responses cached by the other workers
+        cached = immutable_version_responses[key]
+    except KeyError:
+        return
+    raise _CachedResponseFound(cached)
+
+
+class ImmutableVersionCacheRoute(APIRoute):
+    """Route caching the responses rendered for locked and released study versions, if its endpoint opted in"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        self.cache_immutable_version = getattr(
+            endpoint, "cache_immutable_version", False
+        )
+        if self.cache_immutable_version:
+            # The cache is looked up after all other dependencies, among which the authorization checks
+            kwargs["dependencies"] = [
+                dependency
+                for dependency in kwargs.get("dependencies") or []
+                if dependency.dependency is not lookup_immutable_version_response
+            ] + [Depends(lookup_immutable_version_response)]
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+        if not self.cache_immutable_version:
+            return route_handler
+
+        async def immutable_version_cache_route_handler(request: Request) -> Response:
+            try:
+                response = await route_handler(request)
+            except _CachedResponseFound as found:
+                return found.cached.to_response(request)
+
+            key = getattr(request.state, "immutable_version_cache_key", None)
+            if (
+                key is None
+                or response.status_code != status.HTTP_200_OK
+                # Streamed responses, e.g. exports of all items, are not rendered in memory
+                or getattr(response, "body", None) is None
+                or response.background is not None
+            ):
+                return response
+
+            _, study_uid, study_value_version, *_ = key
+            if not await run_in_threadpool(
+                is_immutable_study_version, study_uid, study_value_version
+            ):
+                return response
+
+            cached = CachedResponse.from_response(response)
+            try:
+                immutable_version_responses[key] = cached
+            except ValueError:
+                log.info(
+                    "Response of %s is too large to be cached (%i bytes)",
+                    request.url.path,
+                    len(cached.body),
+                )
+            return cached.to_response(request)
+
+        return immutable_version_cache_route_handler
@@ -19,6 +19,7 @@ from clinical_mdr_api.models.study_selections.study import (
     Study,
     StudyCreateInput,
     StudyFieldAuditTrailEntry,
+    StudyLastChange,
     StudyPatchRequestJsonModel,
     StudyPreferredTimeUnit,
     StudyPreferredTimeUnitInput,
@@ -38,6 +39,10 @@ from clinical_mdr_api.routers._generic_descriptions import (
     study_fields_audit_trail_section_description,
     study_section_description,
 )
+from clinical_mdr_api.routers.immutable_version_cache import (
+    ImmutableVersionCacheRoute,
+    cache_immutable_version,
+)
 from clinical_mdr_api.services.studies.study import StudyService
 from clinical_mdr_api.services.studies.study_pharma_cm import StudyPharmaCMService
 from common import config
@@ -46,7 +51,7 @@ from common.exceptions import ValidationException
 from common.models.error import ErrorResponse
 
 # Prefixed with "/studies"
-router = APIRouter()
+router = APIRouter(route_class=ImmutableVersionCacheRoute)
 
 StudyUID = Path(description="The unique id of the study.")
 
@@ -846,6 +851,29 @@ def get_study_subpart_audit_trail(
     )
 
 
+@router.get(
+    "/{study_uid}/last-change",
+    dependencies=[rbac.STUDY_READ],
+    summary="Returns the date of the most recent change of a specific study definition identified by 'study_uid'.",
+    description="The date of the most recent action in the audit trail of the study, "
+    "which also records the changes of the study selections. "
+    "It can be compared between two requests to detect that a study, including a draft study, has changed.",
+    response_model=StudyLastChange,
+    status_code=200,
+    responses={
+        404: {
+            "model": ErrorResponse,
+            "description": "Not Found - The study with the specified 'study_uid'"
+            " wasn't found.",
+        },
+        500: _generic_descriptions.ERROR_500,
+    },
+)
+def get_study_last_change(study_uid: Annotated[str, StudyUID]) -> StudyLastChange:
+    study_service = StudyService()
+    return study_service.get_last_change(uid=study_uid)
+
+
 @router.post(
     "",
     dependencies=[rbac.STUDY_WRITE],
@@ -1086,6 +1114,7 @@ def reorder_study_subparts(
         500: _generic_descriptions.ERROR_500,
     },
 )
+@cache_immutable_version
 def get_soa_preferences(
     study_uid: Annotated[str, StudyUID],
     study_value_version: Annotated[
@@ -11,7 +11,10 @@ from starlette.requests import Request
 from clinical_mdr_api.domain_repositories.study_selections.study_soa_repository import (
     SoALayout,
 )
-from clinical_mdr_api.models.study_selections.study_selection import DetailedSoAHistory
+from clinical_mdr_api.models.study_selections.study_selection import (
+    DetailedSoAHistory,
+    SoASnapshotBackfillReport,
+)
 from clinical_mdr_api.models.utils import CustomPage
 from clinical_mdr_api.routers import _generic_descriptions, decorators
 from clinical_mdr_api.routers import studies_router as router
@@ -546,3 +549,43 @@ def update_soa_snapshot(
         study_value_version=study_value_version,
         layout=layout,
     )
+
+
+@router.post(
+    "/flowchart/snapshots",
+    dependencies=[rbac.ADMIN_WRITE],
+    summary="Build and save SoA snapshots of all released study versions which have none (intended for data migration only)",
+    description="""
+Study versions without SoA snapshot are processed in parallel, and the snapshots are saved in batches.
+Study versions which already have a snapshot are skipped, so an interrupted or limited run can be resumed by calling this endpoint again.
+The response reports the progress and the timings of each study version.
+""",
+    status_code=200,
+    responses={
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _generic_descriptions.ERROR_500,
+    },
+    tags=["Data Migration"],
+)
+def backfill_soa_snapshots(
+    study_uids: Annotated[
+        list[str] | None,
+        Query(description="Only process the versions of these studies"),
+    ] = None,
+    layout: Annotated[
+        str, Query(description="SoA layout", pattern=SoALayout.PROTOCOL.value)
+    ] = SoALayout.PROTOCOL.value,
+    batch_size: Annotated[
+        int,
+        Query(ge=1, le=100, description="Number of snapshots saved per transaction"),
+    ] = 10,
+    limit: Annotated[
+        int | None,
+        Query(ge=1, description="Maximum number of study versions processed"),
+    ] = None,
+) -> SoASnapshotBackfillReport:
+    return StudyFlowchartService().backfill_soa_snapshots(
+        study_uids=study_uids,
+        layout=SoALayout(layout),
+        batch_size=batch_size,
+        limit=limit,
+    )
@@ -1,5 +1,9 @@
+import contextvars
 import functools
+import operator
+import threading
 from collections.abc import Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 from time import time
@@ -511,60 +515,15 @@ def generic_item_filtering(
         filter_by = {}
     validate_is_dict("sort_by", sort_by)
     validate_is_dict("filter_by", filter_by)
-
-    filters = FilterDict(elements=filter_by)
-    if filter_operator == FilterOperator.AND:
-        # Start from full list, then only keep items that match filter elements, one by one
-        filtered_items = items
-        # The list will decrease after each step (aka filtering out)
-        for key in filters.elements:
-            _values = filters.elements[key].v
-            _operator = filters.elements[key].op
-            filtered_items = list(
-                filter(
-                    lambda x, k=key, v=_values, o=_operator: filter_aggregated_items(
-                        x, k, v, o
-                    ),
-                    filtered_items,
-                )
-            )
-    elif filter_operator == FilterOperator.OR:
-        # Start from empty list then add element one by one
-        _filtered_items = []
-        # The list will increase after each step
-        for key in filters.elements:
-            _values = filters.elements[key].v
-            _operator = filters.elements[key].op
-            matching_items = list(
-                filter(
-                    lambda x, k=key, v=_values, o=_operator: filter_aggregated_items(
-                        x, k, v, o
-                    ),
-                    items,
-                )
-            )
-            _filtered_items += matching_items
-        # if passed filter dict is empty we should return all elements without any filtering
-        if not filters.elements:
-            filtered_items = items
-        else:
-            # Finally, deduplicate list
-            uids = set()
-            filtered_items = []
-            for item in _filtered_items:
-                if item.uid not in uids:
-                    filtered_items.append(item)
-                    uids.add(item.uid)
-    else:
+    if filter_operator not in (FilterOperator.AND, FilterOperator.OR):
         raise ValidationException(msg=f"Invalid filter_operator: {filter_operator}")
+
+    item_filter = CompiledItemFilter(
+        filters=FilterDict(elements=filter_by), filter_operator=filter_operator
+    )
+    filtered_items = item_filter.apply(items, deduplicate=True)
     # Do sorting
-    for sort_key, sort_order in sort_by.items():
-        filtered_items.sort(
-            key=lambda x, s=sort_key: (
-                elm if (elm := extract_nested_key_value(x, s)) is not None else "-1"
-            ),
-            reverse=not sort_order,
-        )
+    sort_items(filtered_items, sort_by)
     return filtered_items
 
 
@@ -667,49 +626,26 @@ def service_level_generic_header_filtering(
             "op": ComparisonOperator.CONTAINS,
         }
     filters = FilterDict(elements=filter_by)
-    if filter_operator == FilterOperator.AND:
-        # Start from full list, then only keep items that match filter elements, one by one
-        filtered_items = items
-        # The list will decrease after each step (aka filtering out)
-        for key in filters.elements:
-            _values = filters.elements[key].v
-            _operator = filters.elements[key].op
-            filtered_items = list(
-                filter(
-                    lambda x, k=key, v=_values, o=_operator: filter_aggregated_items(
-                        x, k, v, o
-                    ),
-                    filtered_items,
-                )
-            )
+    if filter_operator != FilterOperator.AND and not filters.elements:
+        # Union of the items matching each filter element, which is empty without any filter element
+        filtered_items = []
     else:
-        # Start from full list, then add items that match filter elements, one by one
-        _filtered_items = []
-        # The list will increase after each step
-        for key in filters.elements:
-            _values = filters.elements[key].v
-            _operator = filters.elements[key].op
-            matching_items = list(
-                filter(
-                    lambda x, k=key, v=_values, o=_operator: filter_aggregated_items(
-                        x, k, v, o
-                    ),
-                    items,
-                )
-            )
-            _filtered_items += matching_items
-        filtered_items = _filtered_items
+        item_filter = CompiledItemFilter(
+            filters=filters, filter_operator=filter_operator
+        )
+        filtered_items = item_filter.apply(items)
 
     # Return values for field_name
     extracted_values = []
+    get_field_value = compile_attribute_getter(field_name)
     for item in filtered_items:
-        extracted_value = extract_nested_key_value(item, field_name)
+        extracted_value = get_field_value(item)
         # The extracted value can be
         # * A list when the property associated with key is a list of objects
         # ** (e.g. categories.name.sponsor_preferred_name for an Objective Template)
         if isinstance(extracted_value, list):
             # Merge lists
-            extracted_values = extracted_values + extracted_value
+            extracted_values.extend(extracted_value)
         # * A single value when the property associated with key is a simple property
         # Skip if None
         elif extracted_value is not None:
@@ -727,6 +663,8 @@ def service_level_generic_header_filtering(
 
         if value_to_return not in return_values:
             return_values.append(value_to_return)
+            if len(return_values) >= page_size:
+                break
 
     # Limit results returned
     return_values = return_values[:page_size]
@@ -864,6 +802,262 @@ def apply_filter_operator(
     return value is None
 
 
+def _getattr_or_none(obj, attr):
+    if isinstance(obj, list):
+        return [_getattr_or_none(element, attr) for element in obj]
+    if isinstance(obj, dict):
+        return [_getattr_or_none(element, attr) for element in obj.values()]
+    return getattr(obj, attr, None)
+
+
+@functools.lru_cache(maxsize=512)
+def compile_attribute_getter(attr: str) -> Callable[[Any], Any]:
+    """
+    Returns a function returning the same value as `rgetattr(obj, attr)`.
+
+    The attribute path is parsed once, and plain attribute paths of models
+    are read with `operator.attrgetter`, falling back to `rgetattr` semantics
+    (lists, dicts and missing attributes) for other objects.
+
+    Args:
+        attr: The attribute to get, represented as a string (e.g. "study_epoch.term_uid").
+
+    Returns:
+        Callable[[Any], Any]: The attribute getter.
+    """
+    path = tuple(attr.split("."))
+    plain_getter = operator.attrgetter(attr)
+    # Model types for which the attribute path only goes through non-nullable nested models
+    plain_types: set[type] = set()
+    other_types: set[type] = set()
+
+    def _is_plain_path(obj_type: type) -> bool:
+        current_type = obj_type
+        for part in path[:-1]:
+            fields = getattr(current_type, "__fields__", None)
+            field = fields.get(part) if fields else None
+            if (
+                field is None
+                or field.allow_none
+                or field.sub_fields is not None
+                or not isinstance(field.type_, type)
+                or not issubclass(field.type_, BaseModel)
+            ):
+                return False
+            current_type = field.type_
+        fields = getattr(current_type, "__fields__", None)
+        return bool(fields and path[-1] in fields)
+
+    def _get(obj):
+        obj_type = type(obj)
+        if obj_type in plain_types:
+            return plain_getter(obj)
+        if obj_type not in other_types:
+            if _is_plain_path(obj_type):
+                plain_types.add(obj_type)
+                return plain_getter(obj)
+            other_types.add(obj_type)
+        for part in path:
+            obj = _getattr_or_none(obj, part)
+        return obj
+
+    return _get
+
+
+def compile_filter_operator(
+    operator_: ComparisonOperator, filter_values: list[Any]
+) -> Callable[[Any], bool]:
+    """
+    Returns a predicate equivalent to `apply_filter_operator(value, operator_, filter_values)`,
+    with the operator and the filter values parsed once.
+
+    Raises:
+        ValidationException: If filtering on a null value is attempted with an operator other than `equal`.
+    """
+    operator_ = ComparisonOperator(operator_)
+    if not filter_values:
+        ValidationException.raise_if(
+            operator_ != ComparisonOperator.EQUALS,
+            msg="Filtering on a null value can only be used with the 'equal' operator.",
+        )
+        return lambda value: value is None
+
+    if operator_ == ComparisonOperator.EQUALS:
+        return lambda value: value in filter_values
+    if operator_ == ComparisonOperator.NOT_EQUALS:
+        return lambda value: value not in filter_values
+    if operator_ == ComparisonOperator.CONTAINS:
+        lowered_values = [str(_v).lower() for _v in filter_values]
+
+        def _contains(value) -> bool:
+            lowered_value = str(value).lower()
+            return any(_v in lowered_value for _v in lowered_values)
+
+        return _contains
+    if operator_ == ComparisonOperator.GREATER_THAN:
+        return lambda value, _v=filter_values[0]: str(value) > _v
+    if operator_ == ComparisonOperator.GREATER_THAN_OR_EQUAL_TO:
+        return lambda value, _v=filter_values[0]: str(value) >= _v
+    if operator_ == ComparisonOperator.LESS_THAN:
+        return lambda value, _v=filter_values[0]: str(value) < _v
+    if operator_ == ComparisonOperator.LESS_THAN_OR_EQUAL_TO:
+        return lambda value, _v=filter_values[0]: str(value) <= _v
+    if operator_ == ComparisonOperator.BETWEEN:
+        filter_values.sort()
+        lower_bound = filter_values[0].lower()
+        upper_bound = filter_values[1].lower()
+        return lambda value: lower_bound <= str(value).lower() <= upper_bound
+    return lambda value: False
+
+
+def compile_filter_element(
+    filter_key: str, filter_values: list[Any], filter_operator: ComparisonOperator
+) -> Callable[[Any], bool]:
+    """
+    Returns a predicate equivalent to `filter_aggregated_items(item, filter_key, filter_values, filter_operator)`.
+    """
+    if filter_key == "*":
+        # Only accept requests with default operator (set to equal by FilterDict class) or specified contains operator
+        ValidationException.raise_if(
+            ComparisonOperator(filter_operator) != ComparisonOperator.EQUALS
+            and ComparisonOperator(filter_operator) != ComparisonOperator.CONTAINS,
+            msg="Only the default 'contains' operator is supported for wildcard filtering.",
+        )
+        # The wildcard properties depend on the values of each item (e.g. null nested models)
+        property_predicates: dict[str, Callable[[Any], bool]] = {}
+
+        def _wildcard(item) -> bool:
+            for _key in extract_properties_for_wildcard(item):
+                if _key not in property_predicates:
+                    property_predicates[_key] = compile_filter_element(
+                        _key, filter_values, ComparisonOperator.CONTAINS
+                    )
+                if property_predicates[_key](item):
+                    return True
+            return False
+
+        return _wildcard
+
+    get_value = compile_attribute_getter(filter_key)
+    matches = compile_filter_operator(filter_operator, filter_values)
+
+    def _predicate(item) -> bool:
+        _item_value_for_key = get_value(item)
+        # The property associated with the filter key can be inside a list
+        # e.g., categories.name.sponsor_preferred_name for Objective Templates
+        # Filtering then becomes "if any of the values matches with the operator"
+        if isinstance(_item_value_for_key, list):
+            if not filter_values:
+                return not _item_value_for_key
+            return any(matches(_val) for _val in _item_value_for_key)
+        if isinstance(_item_value_for_key, Enum):
+            return matches(_item_value_for_key.value)
+        return matches(_item_value_for_key)
+
+    return _predicate
+
+
+class CompiledItemFilter:
+    """
+    Compiles the elements of a FilterDict into one predicate, so that a list of items
+    is filtered in a single pass, instead of one pass per filter element.
+
+    Items are returned in the same order as filtering the list one filter element at a time:
+    * AND: items matching all the filter elements, in their original order.
+    * OR: items matching the first filter element, followed by the ones matching the second one, etc.
+    """
+
+    def __init__(self, filters: FilterDict, filter_operator: FilterOperator):
+        self.filter_operator = filter_operator
+        self.predicates = [
+            compile_filter_element(key, element.v, element.op)
+            for key, element in filters.elements.items()
+        ]
+
+    def apply(self, items: list[Any], deduplicate: bool = False) -> list[Any]:
+        """
+        Returns the items matching the filters.
+
+        Args:
+            items (list[Any]): The list of items to filter.
+            deduplicate (bool, optional): In OR mode, only keep the first item for a given uid.
+        """
+        if not self.predicates:
+            return list(items)
+        if self.filter_operator == FilterOperator.AND:
+            predicates = self.predicates
+            return [item for item in items if all(p(item) for p in predicates)]
+
+        # In OR mode, remember the first filter element matched by each item
+        matching_items = []
+        for item in items:
+            for index, predicate in enumerate(self.predicates):
+                if predicate(item):
+                    matching_items.append((index, item))
+                    break
+        matching_items.sort(key=operator.itemgetter(0))
+        filtered_items = [item for _, item in matching_items]
+        if deduplicate:
+            uids = set()
+            deduplicated_items = []
+            for item in filtered_items:
+                if item.uid not in uids:
+                    deduplicated_items.append(item)
+                    uids.add(item.uid)
+            filtered_items = deduplicated_items
+        return filtered_items
+
+
+class _Descending:
+    """Sort key wrapper reversing the order of the wrapped value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: Self) -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other) -> bool:
+        return self.value == other.value
+
+
+def sort_items(items: list[Any], sort_by: dict) -> None:
+    """
+    Sorts items in place, using one composite key built from all sort_by fields.
+
+    The result is the same as sorting the list successively on each sort_by field,
+    meaning the last field of sort_by is the primary sort key. Null values are sorted as "-1".
+    """
+    if not sort_by:
+        return
+
+    def _sort_value(get_value):
+        return lambda x: elm if (elm := get_value(x)) is not None else "-1"
+
+    sort_fields = list(reversed(sort_by.items()))
+    if len({bool(sort_order) for _, sort_order in sort_fields}) == 1:
+        getters = [_sort_value(compile_attribute_getter(key)) for key, _ in sort_fields]
+        if len(getters) == 1:
+            sort_key = getters[0]
+        else:
+            sort_key = lambda x: tuple(getter(x) for getter in getters)
+        items.sort(key=sort_key, reverse=not sort_fields[0][1])
+        return
+
+    getters = [
+        (_sort_value(compile_attribute_getter(key)), bool(sort_order))
+        for key, sort_order in sort_fields
+    ]
+    items.sort(
+        key=lambda x: tuple(
+            getter(x) if ascending else _Descending(getter(x))
+            for getter, ascending in getters
+        )
+    )
+
+
 # Recursive getattr to access properties in nested objects
 def rgetattr(obj, attr, *args):
     """
@@ -1050,3 +1244,75 @@ class AggregatedTransactionProxy(neomodel.sync_.core.TransactionProxy):
 def ensure_transaction(db: neomodel.sync_.core.Database) -> Callable:
     """decorator to ensure a database transaction: starts a new transaction if not already in an active transaction"""
     return AggregatedTransactionProxy(db)
+
+
+class DatabaseWorkerPool:
+    """
+    Long-lived pool of threads running database reads concurrently.
+
+    neomodel opens a Neo4j driver per thread, on the first query of the thread.
+    The threads of the pool are kept between calls, so that their drivers are reused
+    and at most max_workers drivers are opened. The drivers are closed when the pool is shut down,
+    and the pool is started again by the next submitted call.
+    """
+
+    _pools: list["DatabaseWorkerPool"] = []
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: ThreadPoolExecutor | None = None
+        self._drivers: set[Any] = set()
+        self._pending_calls = 0
+        self._lock = threading.Lock()
+        self._worker_state = threading.local()
+        DatabaseWorkerPool._pools.append(self)
+
+    def is_worker_thread(self) -> bool:
+        """Returns True when called by a call running on a thread of the pool."""
+        return getattr(self._worker_state, "running", False)
+
+    def is_saturated(self) -> bool:
+        """Returns True when every thread of the pool is taken by a submitted call that has not completed yet."""
+        with self._lock:
+            return self._pending_calls >= self.max_workers
+
+    def _run(self, call: Callable, *args) -> Any:
+        self._worker_state.running = True
+        try:
+            return call(*args)
+        finally:
+            self._worker_state.running = False
+            driver = neomodel.db.driver
+            with self._lock:
+                self._pending_calls -= 1
+                if driver is not None:
+                    self._drivers.add(driver)
+
+    def submit(self, call: Callable, *args) -> Future:
+        """Runs the call on a thread of the pool, in a copy of the caller's context (e.g. the authenticated user)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+            executor = self._executor
+            self._pending_calls += 1
+        return executor.submit(contextvars.copy_context().run, self._run, call, *args)
+
+    def shutdown(self) -> None:
+        """Waits for the submitted calls, then stops the threads and closes their drivers."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            drivers, self._drivers = self._drivers, set()
+        for driver in drivers:
+            driver.close()
+
+    @classmethod
+    def shutdown_all(cls) -> None:
+        for pool in cls._pools:
+            pool.shutdown()
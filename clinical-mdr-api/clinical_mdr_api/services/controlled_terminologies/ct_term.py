@@ -170,6 +170,7 @@ class CTTermService:
         sort_by: dict | None = None,
         page_number: int = 1,
         page_size: int = 0,
+        page_token: str | None = None,
         filter_by: dict | None = None,
         filter_operator: FilterOperator | None = FilterOperator.AND,
         total_count: bool = False,
@@ -191,6 +192,7 @@ class CTTermService:
                 filter_operator=filter_operator,
                 page_number=page_number,
                 page_size=page_size,
+                page_token=page_token,
             )
         )
 
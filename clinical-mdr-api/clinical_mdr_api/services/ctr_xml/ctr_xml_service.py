@@ -9,9 +9,6 @@ from xsdata.formats.dataclass.serializers.config import SerializerConfig
 from xsdata.models.datatype import XmlDateTime
 
 from clinical_mdr_api.domains._utils import get_iso_lang_data
-from clinical_mdr_api.domains.study_definition_aggregates.study_metadata import (
-    StudyComponentEnum,
-)
 from clinical_mdr_api.models.concepts.odms.odm_form import OdmForm
 from clinical_mdr_api.models.concepts.odms.odm_item import OdmItem
 from clinical_mdr_api.models.concepts.odms.odm_item_group import OdmItemGroup
@@ -34,9 +31,11 @@ from clinical_mdr_api.services.concepts.odms.odm_items import OdmItemService
 from clinical_mdr_api.services.controlled_terminologies.ct_codelist_attributes import (
     CTCodelistAttributesService,
 )
-from clinical_mdr_api.services.projects.project import ProjectService
-from clinical_mdr_api.services.studies.study import StudyService
-from clinical_mdr_api.services.studies.study_visit import StudyVisitService
+from clinical_mdr_api.services.studies.study_bundle import (
+    StudyBundle,
+    gather_concurrently,
+    load_study_bundle,
+)
 from common.exceptions import BusinessLogicException
 
 
@@ -59,8 +58,8 @@ class CTRXMLService:
         }
     )
 
-    def get_ctr_odm(self, study_uid: str):
-        odm_builder = ODMBuilder(study_uid)
+    def get_ctr_odm(self, study_uid: str, study_bundle: StudyBundle | None = None):
+        odm_builder = ODMBuilder(study_uid, study_bundle=study_bundle)
         odm = odm_builder.get_odm()
         # noinspection PyTypeChecker
         return self.serializer.render(odm, ns_map=self.namespaces)
@@ -69,12 +68,21 @@ class CTRXMLService:
 class ODMBuilder:
     study_uid: str
 
-    def __init__(self, study_uid: str):
+    # Parts of the study exported in the ODM
+    study_bundle_parts = ("study", "project", "visits")
+
+    def __init__(self, study_uid: str, study_bundle: StudyBundle | None = None):
         self.study_uid = study_uid
+        if study_bundle is not None:
+            self.study_bundle = study_bundle
+
+    @cached_property
+    def study_bundle(self) -> StudyBundle:
+        return load_study_bundle(self.study_uid, parts=self.study_bundle_parts)
 
     @cached_property
     def project(self) -> Project:
-        project = ProjectService().get_by_study_uid(self.study_uid)
+        project = self.study_bundle.project
 
         BusinessLogicException.raise_if_not(project, msg="Missing study project")
 
@@ -82,17 +90,7 @@ class ODMBuilder:
 
     @cached_property
     def study_metadata(self) -> StudyMetadataJsonModel:
-        include_sections = [
-            StudyComponentEnum.IDENTIFICATION_METADATA,
-            StudyComponentEnum.VERSION_METADATA,
-            StudyComponentEnum.STUDY_DESIGN,
-            StudyComponentEnum.STUDY_DESCRIPTION,
-            StudyComponentEnum.STUDY_POPULATION,
-            StudyComponentEnum.STUDY_INTERVENTION,
-        ]
-        study = StudyService().get_by_uid(
-            uid=self.study_uid, include_sections=include_sections
-        )
+        study = self.study_bundle.study
         BusinessLogicException.raise_if(
             study.current_metadata is None, msg="Missing study metadata"
         )
@@ -100,10 +98,7 @@ class ODMBuilder:
 
     @cached_property
     def study_visits(self) -> list[StudyVisit]:
-        result = StudyVisitService(study_uid=self.study_uid).get_all_visits(
-            self.study_uid
-        )
-        return result.items
+        return list(self.study_bundle.visits)
 
     @property
     def study_identification_metadata(self) -> StudyIdentificationMetadataJsonModel:
@@ -145,6 +140,13 @@ class ODMBuilder:
         return self.study_metadata.study_intervention
 
     def get_odm(self) -> ctrxml.Odm:
+        # The study and the ODM forms with their items and codelists are independent reads
+        gather_concurrently(
+            {
+                "study_bundle": lambda: self.study_bundle,
+                "ct_codelist_attributes": lambda: self.ct_codelist_attributes,
+            }
+        )
         return ctrxml.Odm(
             odmversion=ctrxml.Odmversion.VALUE_1_3_2,
             file_type=ctrxml.FileType.SNAPSHOT,
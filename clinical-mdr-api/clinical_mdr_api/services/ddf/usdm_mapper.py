@@ -3,6 +3,7 @@ from itertools import chain
 from typing import Any, Callable
 from uuid import uuid4
 
+from cachetools.keys import hashkey
 from neomodel import db
 from usdm_info import __model_version__ as usdm_package_version
 from usdm_model import Activity as USDMActivity
@@ -39,6 +40,8 @@ from clinical_mdr_api.domains.study_definition_aggregates.study_metadata import
     StudyStatus,
 )
 from clinical_mdr_api.models.study_selections.study import Study as OSBStudy
+from common import config
+from common.cache import SharedTTLCache
 
 DDF_CT_PACKAGE_EFFECTIVE_DATE = "2023-12-15"
 DDF_STUDY_PROTOCOL_STATUS_DRAFT = "C85255"
@@ -52,16 +55,90 @@ DDF_TIMING_TYPE_FIXED = "C201358"
 DDF_TIME_RELATIVE_TO_FROM_START_TO_START = "C201355"
 
 
-def get_ddf_timing_type_code_after():
-    return get_ct_package_term_as_usdm_code(DDF_TIMING_TYPE_AFTER)
+class DDFCodeIndex:
+    """
+    Terms of the DDF CT package, keyed by concept id.
+    The whole package is loaded with one query, so that mapping studies only does dictionary lookups.
+    """
+
+    def __init__(self, terms: dict[str, tuple[str, str]]):
+        # concept id -> (package name, code submission value)
+        self.terms = terms
+
+    @classmethod
+    def load(cls) -> "DDFCodeIndex":
+        query = """
+            MATCH (ctp:CTPackage)-[:CONTAINS_CODELIST]->()-[:CONTAINS_TERM]->()-[:CONTAINS_ATTRIBUTES]->
+            (cttav:CTTermAttributesValue)
+            WHERE ctp.name CONTAINS "DDF"
+            AND ctp.effective_date = date($ddf_ct_package_date)
+            RETURN cttav.concept_id AS concept_id, ctp.name AS package_name,
+            cttav.code_submission_value AS code_submission_value
+        """
+        result, _ = db.cypher_query(
+            query, {"ddf_ct_package_date": DDF_CT_PACKAGE_EFFECTIVE_DATE}
+        )
+        terms = {}
+        for concept_id, package_name, code_submission_value in result:
+            terms.setdefault(concept_id, (package_name, code_submission_value))
+        return cls(terms)
+
+    def get_usdm_code(self, concept_id: str) -> USDMCode | None:
+        if concept_id not in self.terms:
+            return None
+        package_name, code_submission_value = self.terms[concept_id]
+        return USDMCode(
+            id=str(uuid.uuid4()),
+            code=concept_id,
+            codeSystem=package_name,
+            codeSystemVersion=DDF_CT_PACKAGE_EFFECTIVE_DATE,
+            decode=code_submission_value,
+        )
+
+
+# Code indexes keyed by the state of the DDF CT packages
+cache_store_ddf_code_index = SharedTTLCache(
+    name="usdm_mapper.cache_store_ddf_code_index",
+    maxsize=10,
+    ttl=config.CACHE_TTL,
+)
+
+
+def get_ddf_ct_package_state() -> tuple:
+    """Identifies the imported DDF CT packages, it changes when a DDF package is imported."""
+    query = """
+        MATCH (ctp:CTPackage)
+        WHERE ctp.name CONTAINS "DDF"
+        AND ctp.effective_date = date($ddf_ct_package_date)
+        RETURN ctp.uid, toString(ctp.import_date)
+        ORDER BY ctp.uid
+    """
+    result, _ = db.cypher_query(
+        query, {"ddf_ct_package_date": DDF_CT_PACKAGE_EFFECTIVE_DATE}
+    )
+    return tuple(tuple(row) for row in result)
+
+
+def get_ddf_code_index() -> DDFCodeIndex:
+    # Packages are imported outside of the API, so the cached index is looked up by the state of the packages
+    key = hashkey(get_ddf_ct_package_state())
+    code_index = cache_store_ddf_code_index.get(key)
+    if code_index is None:
+        code_index = DDFCodeIndex.load()
+        cache_store_ddf_code_index[key] = code_index
+    return code_index
 
 
-def get_ddf_timing_type_code_before():
-    return get_ct_package_term_as_usdm_code(DDF_TIMING_TYPE_BEFORE)
+def get_ddf_timing_type_code_after(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_TIMING_TYPE_AFTER, code_index)
 
 
-def get_ddf_timing_type_code_fixed():
-    return get_ct_package_term_as_usdm_code(DDF_TIMING_TYPE_FIXED)
+def get_ddf_timing_type_code_before(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_TIMING_TYPE_BEFORE, code_index)
+
+
+def get_ddf_timing_type_code_fixed(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_TIMING_TYPE_FIXED, code_index)
 
 
 def get_ddf_timing_iso_duration_value(time_value: int, time_unit_name: str) -> str:
@@ -78,8 +155,10 @@ def get_ddf_timing_iso_duration_value(time_value: int, time_unit_name: str) -> s
     return timing_value
 
 
-def get_ddf_timing_relative_to_from():
-    return get_ct_package_term_as_usdm_code(DDF_TIME_RELATIVE_TO_FROM_START_TO_START)
+def get_ddf_timing_relative_to_from(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(
+        DDF_TIME_RELATIVE_TO_FROM_START_TO_START, code_index
+    )
 
 
 def get_void_usdm_code():
@@ -92,54 +171,32 @@ def get_void_usdm_code():
     )
 
 
-def get_ct_package_term_as_usdm_code(concept_id: str):
-    query = """
-        MATCH (ctp:CTPackage)-[:CONTAINS_CODELIST]->()-[:CONTAINS_TERM]->()-[:CONTAINS_ATTRIBUTES]->
-        (cttav:CTTermAttributesValue) 
-        WHERE ctp.name CONTAINS "DDF" 
-        AND ctp.effective_date = date($ddf_ct_package_date) 
-        AND cttav.concept_id = $concept_id 
-        RETURN ctp as package, cttav as term
-    """
-    result, _ = db.cypher_query(
-        query,
-        {
-            "ddf_ct_package_date": DDF_CT_PACKAGE_EFFECTIVE_DATE,
-            "concept_id": concept_id,
-        },
-    )
-    if len(result) == 0:
-        return None
-    package = result[0][0]
-    term = result[0][1]
-    code = USDMCode(
-        id=str(uuid.uuid4()),
-        code=concept_id,
-        codeSystem=package["name"],
-        codeSystemVersion=DDF_CT_PACKAGE_EFFECTIVE_DATE,
-        decode=term["code_submission_value"],
-    )
-    return code
+def get_ct_package_term_as_usdm_code(
+    concept_id: str, code_index: DDFCodeIndex | None = None
+):
+    if code_index is None:
+        code_index = get_ddf_code_index()
+    return code_index.get_usdm_code(concept_id)
 
 
-def get_ddf_study_protocol_status_draft():
-    return get_ct_package_term_as_usdm_code(DDF_STUDY_PROTOCOL_STATUS_DRAFT)
+def get_ddf_study_protocol_status_draft(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_STUDY_PROTOCOL_STATUS_DRAFT, code_index)
 
 
-def get_ddf_study_protocol_status_final():
-    return get_ct_package_term_as_usdm_code(DDF_STUDY_PROTOCOL_STATUS_FINAL)
+def get_ddf_study_protocol_status_final(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_STUDY_PROTOCOL_STATUS_FINAL, code_index)
 
 
-def get_ddf_study_population_sex_both():
-    return get_ct_package_term_as_usdm_code(DDF_STUDY_POPULATION_SEX_BOTH)
+def get_ddf_study_population_sex_both(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_STUDY_POPULATION_SEX_BOTH, code_index)
 
 
-def get_ddf_study_population_sex_female():
-    return get_ct_package_term_as_usdm_code(DDF_STUDY_POPULATION_SEX_FEMALE)
+def get_ddf_study_population_sex_female(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_STUDY_POPULATION_SEX_FEMALE, code_index)
 
 
-def get_ddf_study_population_sex_male():
-    return get_ct_package_term_as_usdm_code(DDF_STUDY_POPULATION_SEX_MALE)
+def get_ddf_study_population_sex_male(code_index: DDFCodeIndex | None = None):
+    return get_ct_package_term_as_usdm_code(DDF_STUDY_POPULATION_SEX_MALE, code_index)
 
 
 def _update_ddf_encounter_scheduled_at(encounters, schedule_timelines):
@@ -179,6 +236,7 @@ class USDMMapper:
         get_osb_study_visits: Callable,
         get_osb_study_activities: Callable,
         get_osb_activity_schedules: Callable,
+        ddf_code_index: DDFCodeIndex | None = None,
     ):
         self._get_osb_study_design_cells = get_osb_study_design_cells
         self._get_osb_study_arms = get_osb_study_arms
@@ -188,6 +246,14 @@ class USDMMapper:
         self._get_osb_study_visits = get_osb_study_visits
         self._get_osb_study_activities = get_osb_study_activities
         self._get_osb_activity_schedules = get_osb_activity_schedules
+        self._ddf_code_index = ddf_code_index
+
+    @property
+    def ddf_code_index(self) -> DDFCodeIndex:
+        # Mappers of several studies can share one index
+        if self._ddf_code_index is None:
+            self._ddf_code_index = get_ddf_code_index()
+        return self._ddf_code_index
 
     def map(self, study: OSBStudy) -> dict[str, Any]:
         usdm_study = USDMStudy(name=self._get_study_name(study), instanceType="Study")
@@ -675,11 +741,17 @@ class USDMMapper:
             )
             match sex_term_uid_upper:
                 case "BOTH":
-                    planned_sex_usdm_code = get_ddf_study_population_sex_both()
+                    planned_sex_usdm_code = get_ddf_study_population_sex_both(
+                        self.ddf_code_index
+                    )
                 case "FEMALE":
-                    planned_sex_usdm_code = get_ddf_study_population_sex_female()
+                    planned_sex_usdm_code = get_ddf_study_population_sex_female(
+                        self.ddf_code_index
+                    )
                 case "MALE":
-                    planned_sex_usdm_code = get_ddf_study_population_sex_male()
+                    planned_sex_usdm_code = get_ddf_study_population_sex_male(
+                        self.ddf_code_index
+                    )
         if planned_sex_usdm_code is None:
             planned_sex_usdm_code = get_void_usdm_code()
 
@@ -777,11 +849,13 @@ class USDMMapper:
 
         if osb_study_status == StudyStatus.DRAFT.value:
             ddf_protocol_status = (
-                get_ddf_study_protocol_status_draft() or get_void_usdm_code()
+                get_ddf_study_protocol_status_draft(self.ddf_code_index)
+                or get_void_usdm_code()
             )
         elif osb_study_status == StudyStatus.LOCKED.value:
             ddf_protocol_status = (
-                get_ddf_study_protocol_status_final() or get_void_usdm_code()
+                get_ddf_study_protocol_status_final(self.ddf_code_index)
+                or get_void_usdm_code()
             )
         else:
             # TODO raise exception if not draft or locked status
@@ -848,11 +922,17 @@ class USDMMapper:
             ddf_timing_code = None
             if osb_visit.time_value:
                 if osb_visit.time_value < 0:
-                    ddf_timing_code = get_ddf_timing_type_code_before()
+                    ddf_timing_code = get_ddf_timing_type_code_before(
+                        self.ddf_code_index
+                    )
                 elif osb_visit.time_value > 0:
-                    ddf_timing_code = get_ddf_timing_type_code_after()
+                    ddf_timing_code = get_ddf_timing_type_code_after(
+                        self.ddf_code_index
+                    )
                 else:
-                    ddf_timing_code = get_ddf_timing_type_code_fixed()
+                    ddf_timing_code = get_ddf_timing_type_code_fixed(
+                        self.ddf_code_index
+                    )
 
             if ddf_timing_code is None:
                 # No timing concept term in db
@@ -873,7 +953,7 @@ class USDMMapper:
                 label=osb_visit.study_epoch.sponsor_preferred_name,
                 description=osb_visit.study_epoch.sponsor_preferred_name,
                 type=ddf_timing_code,
-                relativeToFrom=get_ddf_timing_relative_to_from()
+                relativeToFrom=get_ddf_timing_relative_to_from(self.ddf_code_index)
                 or get_void_usdm_code(),
                 value=get_ddf_timing_iso_duration_value(
                     osb_visit.time_value, osb_visit.time_unit_name
@@ -1,58 +1,76 @@
 from typing import Any
 
-from clinical_mdr_api.domains.study_definition_aggregates.study_metadata import (
-    StudyComponentEnum,
+from clinical_mdr_api.models.utils import GenericFilteringReturn
+from clinical_mdr_api.services.ddf.usdm_mapper import (
+    DDFCodeIndex,
+    USDMMapper,
+    get_ddf_code_index,
 )
-from clinical_mdr_api.services.ddf.usdm_mapper import USDMMapper
-from clinical_mdr_api.services.studies.study import StudyService
-from clinical_mdr_api.services.studies.study_activity_schedule import (
-    StudyActivityScheduleService,
+from clinical_mdr_api.services.studies.study_bundle import (
+    StudyBundle,
+    load_study_bundle,
 )
-from clinical_mdr_api.services.studies.study_activity_selection import (
-    StudyActivitySelectionService,
-)
-from clinical_mdr_api.services.studies.study_arm_selection import (
-    StudyArmSelectionService,
-)
-from clinical_mdr_api.services.studies.study_design_cell import StudyDesignCellService
-from clinical_mdr_api.services.studies.study_element_selection import (
-    StudyElementSelectionService,
-)
-from clinical_mdr_api.services.studies.study_endpoint_selection import (
-    StudyEndpointSelectionService,
-)
-from clinical_mdr_api.services.studies.study_epoch import StudyEpochService
-from clinical_mdr_api.services.studies.study_visit import StudyVisitService
+from common import config
+from common.exceptions import ValidationException
 
 
 class USDMService:
-    _usdm_mapper: USDMMapper
-
-    def __init__(self, study_uid: str):
-        self._usdm_mapper = USDMMapper(
-            get_osb_study_design_cells=StudyDesignCellService().get_all_design_cells,
-            get_osb_study_arms=StudyArmSelectionService().get_all_selection,
-            get_osb_study_epochs=StudyEpochService().get_all_epochs,
-            get_osb_study_elements=StudyElementSelectionService().get_all_selection,
-            get_osb_study_endpoints=StudyEndpointSelectionService().get_all_selection,
-            get_osb_study_visits=StudyVisitService(study_uid=study_uid).get_all_visits,
-            get_osb_study_activities=StudyActivitySelectionService().get_all_selection,
-            get_osb_activity_schedules=StudyActivityScheduleService().get_all_schedules,
-        )
+    # Parts of the study read by the USDM mapper
+    study_bundle_parts = (
+        "study",
+        "design_cells",
+        "arms",
+        "epochs",
+        "elements",
+        "endpoints",
+        "visits",
+        "activities",
+        "activity_schedules",
+    )
 
-    def get_by_uid(self, uid: str) -> dict[str, Any]:
-        osb_study = StudyService().get_by_uid(
-            uid,
-            include_sections=[
-                StudyComponentEnum.IDENTIFICATION_METADATA,
-                StudyComponentEnum.REGISTRY_IDENTIFIERS,
-                StudyComponentEnum.VERSION_METADATA,
-                StudyComponentEnum.STUDY_DESCRIPTION,
-                StudyComponentEnum.STUDY_DESIGN,
-                StudyComponentEnum.STUDY_INTERVENTION,
-                StudyComponentEnum.STUDY_POPULATION,
-            ],
-        )
+    def __init__(self, study_uid: str, ddf_code_index: DDFCodeIndex | None = None):
+        self.study_uid = study_uid
+        self._ddf_code_index = ddf_code_index
 
-        usdm_wrapped_study = self._usdm_mapper.map(osb_study)
+    def get_by_uid(
+        self, uid: str, study_bundle: StudyBundle | None = None
+    ) -> dict[str, Any]:
+        if study_bundle is None:
+            study_bundle = load_study_bundle(uid, parts=self.study_bundle_parts)
+
+        def items(part: str):
+            return lambda *_args, **_kwargs: GenericFilteringReturn.create(
+                items=list(getattr(study_bundle, part)),
+                total=len(getattr(study_bundle, part)),
+            )
+
+        def values(part: str):
+            return lambda *_args, **_kwargs: list(getattr(study_bundle, part))
+
+        usdm_mapper = USDMMapper(
+            get_osb_study_design_cells=values("design_cells"),
+            get_osb_study_arms=items("arms"),
+            get_osb_study_epochs=items("epochs"),
+            get_osb_study_elements=items("elements"),
+            get_osb_study_endpoints=items("endpoints"),
+            get_osb_study_visits=items("visits"),
+            get_osb_study_activities=items("activities"),
+            get_osb_activity_schedules=values("activity_schedules"),
+            ddf_code_index=self._ddf_code_index,
+        )
+        usdm_wrapped_study = usdm_mapper.map(study_bundle.study)
         return usdm_wrapped_study
+
+    @staticmethod
+    def get_by_uids(uids: list[str]) -> list[dict[str, Any]]:
+        # Each study is mapped in full, the request is bounded to keep its duration reasonable
+        ValidationException.raise_if(
+            len(uids) > config.DDF_MAX_STUDIES_PER_REQUEST,
+            msg=f"At most {config.DDF_MAX_STUDIES_PER_REQUEST} studies can be requested at once, got {len(uids)}.",
+        )
+        # The DDF code index is loaded once for all studies
+        ddf_code_index = get_ddf_code_index()
+        return [
+            USDMService(study_uid=uid, ddf_code_index=ddf_code_index).get_by_uid(uid)
+            for uid in uids
+        ]
@@ -49,6 +49,7 @@ from clinical_mdr_api.models.study_selections.study import (
     StudyFieldAuditTrailEntry,
     StudyIdentificationMetadataJsonModel,
     StudyInterventionJsonModel,
+    StudyLastChange,
     StudyMetadataJsonModel,
     StudyPatchRequestJsonModel,
     StudyPopulationJsonModel,
@@ -785,6 +786,15 @@ class StudyService:
         finally:
             self._close_all_repos()
 
+    def get_last_change(self, uid: str) -> StudyLastChange:
+        try:
+            return StudyLastChange(
+                study_uid=uid,
+                date=self._repos.study_definition_repository.get_last_change_date(uid),
+            )
+        finally:
+            self._close_all_repos()
+
     @db.transaction
     def get_subpart_audit_trail_by_uid(
         self, uid: str, is_subpart: bool = False, study_value_version: str | None = None
@@ -8,6 +8,7 @@ from clinical_mdr_api.domain_repositories.models.study_selections import (
     StudyActivitySchedule as StudyActivityScheduleNeoModel,
 )
 from clinical_mdr_api.domain_repositories.study_selections.study_activity_schedule_repository import (
+    ScheduleBatchSnapshot,
     SelectionHistory,
 )
 from clinical_mdr_api.domains.study_selections.study_activity_schedule import (
@@ -225,6 +226,107 @@ class StudyActivityScheduleService(StudySelectionMixin):
         finally:
             repos.close()
 
+    def _validate_batch_operation(
+        self,
+        study_uid: str,
+        operation: StudyActivityScheduleBatchInput,
+        snapshot: ScheduleBatchSnapshot | None,
+        scheduled: set[tuple[str, str]],
+    ) -> StudyActivityScheduleVO:
+        """
+        Checks an operation of a batch against the snapshot of the study, with the same errors as `create` and `delete`,
+        and applies it to the snapshot so that the following operations are checked against the result.
+        """
+        if operation.method not in ("POST", "DELETE"):
+            raise exceptions.MethodNotAllowedException(method=operation.method)
+        exceptions.NotFoundException.raise_if(snapshot is None, "Study", study_uid)
+
+        if operation.method == "DELETE":
+            schedule = snapshot.schedules.pop(operation.content.uid, None)
+            exceptions.NotFoundException.raise_if(
+                schedule is None, "Study Activity Schedule", operation.content.uid
+            )
+            scheduled.discard(schedule)
+            study_activity_uid, study_visit_uid = schedule
+            return StudyActivityScheduleVO(
+                uid=operation.content.uid,
+                study_uid=study_uid,
+                study_activity_uid=study_activity_uid,
+                study_activity_instance_uid=None,
+                study_visit_uid=study_visit_uid,
+                author_id=self.author,
+                start_date=datetime.datetime.now(datetime.timezone.utc),
+            )
+
+        schedule_vo = self._from_input_values(study_uid, operation.content)
+        exceptions.BusinessLogicException.raise_if(
+            (schedule_vo.study_activity_uid, schedule_vo.study_visit_uid) in scheduled,
+            msg=f"There already exist a schedule for the same Activity and Visit in the Study with UID '{study_uid}'",
+        )
+        exceptions.NotFoundException.raise_if(
+            schedule_vo.study_activity_uid not in snapshot.study_activities,
+            "Study Activity",
+            schedule_vo.study_activity_uid,
+        )
+        exceptions.NotFoundException.raise_if(
+            schedule_vo.study_visit_uid not in snapshot.study_visit_uids,
+            "Study Visit",
+            schedule_vo.study_visit_uid,
+        )
+        schedule_vo.study_activity_instance_uid = snapshot.study_activities[
+            schedule_vo.study_activity_uid
+        ]
+        scheduled.add((schedule_vo.study_activity_uid, schedule_vo.study_visit_uid))
+        return schedule_vo
+
+    def apply_batch_operations(
+        self,
+        study_uid: str,
+        operations: list[StudyActivityScheduleBatchInput],
+    ) -> list[tuple[int, StudyActivitySchedule | BatchErrorResponse | None]]:
+        """
+        Validates all operations against one snapshot of the study, then writes all creations and all deletions
+        with one statement each, instead of saving the schedules one by one.
+        Returns the response code and content of each operation.
+        """
+        repository = self._repos.study_activity_schedule_repository
+        snapshot = repository.get_batch_snapshot(study_uid)
+        scheduled = set(snapshot.schedules.values()) if snapshot else set()
+
+        outcomes = []
+        created = []
+        deleted = []
+        for operation in operations:
+            try:
+                schedule_vo = self._validate_batch_operation(
+                    study_uid, operation, snapshot, scheduled
+                )
+            except exceptions.MDRApiBaseException as error:
+                outcomes.append(
+                    (error.status_code, BatchErrorResponse(message=str(error)))
+                )
+                continue
+            if operation.method == "POST":
+                created.append(schedule_vo)
+                outcomes.append((status.HTTP_201_CREATED, schedule_vo))
+            else:
+                deleted.append(schedule_vo)
+                outcomes.append((status.HTTP_204_NO_CONTENT, None))
+
+        repository.delete_batch(deleted, self.author)
+        repository.create_batch(created, self.author)
+        return [
+            (
+                response_code,
+                (
+                    StudyActivitySchedule.from_vo(content)
+                    if isinstance(content, StudyActivityScheduleVO)
+                    else content
+                ),
+            )
+            for response_code, content in outcomes
+        ]
+
     @ensure_transaction(db)
     def handle_batch_operations(
         self,
@@ -232,27 +334,16 @@ class StudyActivityScheduleService(StudySelectionMixin):
         operations: list[StudyActivityScheduleBatchInput],
     ) -> list[StudyActivityScheduleBatchOutput]:
         results = []
-        for operation in operations:
-            result = {}
-            item = None
-            try:
-                if operation.method == "POST":
-                    item = self.create(study_uid, operation.content)
-                    response_code = status.HTTP_201_CREATED
-                elif operation.method == "DELETE":
-                    self.delete(study_uid, operation.content.uid)
-                    response_code = status.HTTP_204_NO_CONTENT
-                else:
-                    raise exceptions.MethodNotAllowedException(method=operation.method)
-                result["response_code"] = response_code
-                if item:
-                    result["content"] = item.dict()
-                results.append(StudyActivityScheduleBatchOutput(**result))
-            except exceptions.MDRApiBaseException as error:
+        for response_code, item in self.apply_batch_operations(study_uid, operations):
+            if isinstance(item, BatchErrorResponse):
                 results.append(
                     StudyActivityScheduleBatchOutput.construct(
-                        response_code=error.status_code,
-                        content=BatchErrorResponse(message=str(error)),
+                        response_code=response_code, content=item
                     )
                 )
+                continue
+            result = {"response_code": response_code}
+            if item:
+                result["content"] = item.dict()
+            results.append(StudyActivityScheduleBatchOutput(**result))
         return results
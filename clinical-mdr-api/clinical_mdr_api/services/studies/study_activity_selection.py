@@ -1566,14 +1566,35 @@ class StudyActivitySelectionService(StudyActivitySelectionBaseService):
     ) -> list[StudySoAEditBatchOutput]:
         study_activity_schedules_service = StudyActivityScheduleService()
         results = []
-        for operation in operations:
+        schedule_operations = []
+        for index, operation in enumerate(operations):
+            # Consecutive operations on schedules are applied together, in the order of the batch
+            if operation.object == SoAItemType.STUDY_ACTIVITY_SCHEDULE.value:
+                schedule_operations.append(operation)
+                if (
+                    index + 1 < len(operations)
+                    and operations[index + 1].object == operation.object
+                ):
+                    continue
+                outcomes = study_activity_schedules_service.apply_batch_operations(
+                    study_uid, schedule_operations
+                )
+                for response_code, item in outcomes:
+                    results.append(
+                        StudySoAEditBatchOutput.construct(
+                            response_code=response_code, content=item
+                        )
+                        if isinstance(item, BatchErrorResponse)
+                        else StudySoAEditBatchOutput(
+                            response_code=response_code, content=item
+                        )
+                    )
+                schedule_operations = []
+                continue
             result = {}
             item = None
             try:
-                if (
-                    operation.method == "PATCH"
-                    and operation.object == SoAItemType.STUDY_ACTIVITY.value
-                ):
+                if operation.method == "PATCH":
                     item = self.patch_selection(
                         study_uid,
                         operation.content.study_activity_uid,
@@ -1581,22 +1602,12 @@ class StudyActivitySelectionService(StudyActivitySelectionBaseService):
                     )
                     response_code = status.HTTP_200_OK
                 elif operation.method == "POST":
-                    if operation.object == SoAItemType.STUDY_ACTIVITY.value:
-                        item = self.make_selection(study_uid, operation.content)
-                    elif operation.object == SoAItemType.STUDY_ACTIVITY_SCHEDULE.value:
-                        item = study_activity_schedules_service.create(
-                            study_uid, operation.content
-                        )
+                    item = self.make_selection(study_uid, operation.content)
                     response_code = status.HTTP_201_CREATED
                 elif operation.method == "DELETE":
-                    if operation.object == SoAItemType.STUDY_ACTIVITY.value:
-                        self.delete_selection(
-                            study_uid, operation.content.study_activity_uid
-                        )
-                    elif operation.object == SoAItemType.STUDY_ACTIVITY_SCHEDULE.value:
-                        item = study_activity_schedules_service.delete(
-                            study_uid, operation.content.uid
-                        )
+                    self.delete_selection(
+                        study_uid, operation.content.study_activity_uid
+                    )
                     response_code = status.HTTP_204_NO_CONTENT
                 else:
                     raise MethodNotAllowedException(method=operation.method)
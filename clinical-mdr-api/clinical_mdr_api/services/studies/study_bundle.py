@@ -0,0 +1,191 @@
+"""
+Concurrent loading of the study data shared by the study exports (USDM, CTR-XML, study design figure).
+
+The parts of a study bundle are independent reads of the same study version.
+They are loaded in parallel, each on a worker thread with its own database session,
+and returned as one immutable snapshot that can be shared by all exports of a request.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping
+
+from clinical_mdr_api.domains.study_definition_aggregates.study_metadata import (
+    StudyComponentEnum,
+)
+from clinical_mdr_api.models.projects.project import Project
+from clinical_mdr_api.models.study_selections.study import Study, StudySoaPreferences
+from clinical_mdr_api.services._utils import DatabaseWorkerPool
+from clinical_mdr_api.services.projects.project import ProjectService
+from clinical_mdr_api.services.studies.study import StudyService
+from clinical_mdr_api.services.studies.study_activity_schedule import (
+    StudyActivityScheduleService,
+)
+from clinical_mdr_api.services.studies.study_activity_selection import (
+    StudyActivitySelectionService,
+)
+from clinical_mdr_api.services.studies.study_arm_selection import (
+    StudyArmSelectionService,
+)
+from clinical_mdr_api.services.studies.study_design_cell import StudyDesignCellService
+from clinical_mdr_api.services.studies.study_element_selection import (
+    StudyElementSelectionService,
+)
+from clinical_mdr_api.services.studies.study_endpoint_selection import (
+    StudyEndpointSelectionService,
+)
+from clinical_mdr_api.services.studies.study_epoch import StudyEpochService
+from clinical_mdr_api.services.studies.study_visit import StudyVisitService
+from common import config
+
+STUDY_SECTIONS = (
+    StudyComponentEnum.IDENTIFICATION_METADATA,
+    StudyComponentEnum.REGISTRY_IDENTIFIERS,
+    StudyComponentEnum.VERSION_METADATA,
+    StudyComponentEnum.STUDY_DESCRIPTION,
+    StudyComponentEnum.STUDY_DESIGN,
+    StudyComponentEnum.STUDY_INTERVENTION,
+    StudyComponentEnum.STUDY_POPULATION,
+)
+
+
+@dataclass(frozen=True)
+class StudyBundle:
+    """
+    Snapshot of the data of one study version, parts that were not requested are None.
+    Lists of selections are stored as tuples, so that the exports sharing a bundle can't alter them.
+    """
+
+    study_uid: str
+    study_value_version: str | None = None
+    study: Study | None = None
+    project: Project | None = None
+    arms: tuple | None = None
+    epochs: tuple | None = None
+    elements: tuple | None = None
+    design_cells: tuple | None = None
+    endpoints: tuple | None = None
+    visits: tuple | None = None
+    activities: tuple | None = None
+    activity_schedules: tuple | None = None
+    soa_preferences: StudySoaPreferences | None = None
+    preferred_time_unit_name: str | None = None
+
+
+# Loader of each part of a bundle, called with the study uid and study value version
+STUDY_BUNDLE_LOADERS: Mapping[str, Callable[[str, str | None], Any]] = {
+    # First part, so that a missing study raises the usual not found error
+    "study": lambda uid, version: StudyService().get_by_uid(
+        uid, include_sections=list(STUDY_SECTIONS), study_value_version=version
+    ),
+    "project": lambda uid, _version: ProjectService().get_by_study_uid(uid),
+    "arms": lambda uid, version: tuple(
+        StudyArmSelectionService()
+        .get_all_selection(
+            study_uid=uid, sort_by={"order": True}, study_value_version=version
+        )
+        .items
+    ),
+    "epochs": lambda uid, version: tuple(
+        StudyEpochService()
+        .get_all_epochs(
+            study_uid=uid, sort_by={"order": True}, study_value_version=version
+        )
+        .items
+    ),
+    "elements": lambda uid, version: tuple(
+        StudyElementSelectionService()
+        .get_all_selection(study_uid=uid, study_value_version=version)
+        .items
+    ),
+    "design_cells": lambda uid, version: tuple(
+        StudyDesignCellService().get_all_design_cells(uid, study_value_version=version)
+    ),
+    "endpoints": lambda uid, version: tuple(
+        StudyEndpointSelectionService()
+        .get_all_selection(uid, no_brackets=True, study_value_version=version)
+        .items
+    ),
+    "visits": lambda uid, version: tuple(
+        StudyVisitService(study_uid=uid)
+        .get_all_visits(uid, study_value_version=version)
+        .items
+    ),
+    "activities": lambda uid, version: tuple(
+        StudyActivitySelectionService()
+        .get_all_selection(study_uid=uid, study_value_version=version)
+        .items
+    ),
+    "activity_schedules": lambda uid, version: tuple(
+        StudyActivityScheduleService().get_all_schedules(
+            uid, study_value_version=version
+        )
+    ),
+    "soa_preferences": lambda uid, version: StudyService().get_study_soa_preferences(
+        uid, study_value_version=version
+    ),
+    "preferred_time_unit_name": lambda uid, version: StudyService()
+    .get_study_preferred_time_unit(uid, study_value_version=version)
+    .time_unit_name,
+}
+
+
+# Shared by all requests, so that the number of threads and database drivers stays bounded
+study_bundle_workers = DatabaseWorkerPool(
+    max_workers=config.STUDY_BUNDLE_MAX_WORKERS, thread_name_prefix="study-bundle"
+)
+
+
+def gather_concurrently(calls: Mapping[str, Callable[[], Any]]) -> dict[str, Any]:
+    """
+    Runs independent read calls on the study_bundle_workers threads and returns their results by name.
+
+    Each call runs in a copy of the caller's context (e.g. the authenticated user),
+    and gets its own database session, so the calls must not rely on the caller's transaction.
+    Calls gathered by a call already running on the pool run sequentially,
+    since workers waiting for other workers could exhaust the pool.
+    They also run sequentially on the caller's thread while all the workers are busy,
+    so that concurrent exports don't queue behind each other.
+    If calls fail, the exception of the first one, in the order of `calls`, is raised again.
+    """
+    if (
+        study_bundle_workers.max_workers <= 1
+        or len(calls) <= 1
+        or study_bundle_workers.is_worker_thread()
+        or study_bundle_workers.is_saturated()
+    ):
+        return {name: call() for name, call in calls.items()}
+    futures = {name: study_bundle_workers.submit(call) for name, call in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def load_study_bundle(
+    study_uid: str,
+    parts: Iterable[str],
+    study_value_version: str | None = None,
+) -> StudyBundle:
+    """
+    Loads the requested parts of a study version concurrently.
+
+    Args:
+        study_uid (str): The unique identifier of the study.
+        parts (Iterable[str]): Names of the `StudyBundle` fields to load, see `STUDY_BUNDLE_LOADERS`.
+        study_value_version (str | None): The study version, the latest draft version by default.
+
+    Returns:
+        StudyBundle: The snapshot of the study version.
+    """
+    parts = set(parts)
+    unknown_parts = parts - STUDY_BUNDLE_LOADERS.keys()
+    if unknown_parts:
+        raise ValueError(f"Unknown study bundle parts: {sorted(unknown_parts)}")
+    return StudyBundle(
+        study_uid=study_uid,
+        study_value_version=study_value_version,
+        **gather_concurrently(
+            {
+                part: (lambda loader=loader: loader(study_uid, study_value_version))
+                for part, loader in STUDY_BUNDLE_LOADERS.items()
+                if part in parts
+            }
+        ),
+    )
@@ -1,7 +1,7 @@
 import logging
 import os
 from collections import OrderedDict
-from typing import Mapping, MutableMapping
+from typing import Iterable, Mapping, MutableMapping
 
 import yattag
 from colour import Color
@@ -19,6 +19,10 @@ from clinical_mdr_api.services.studies.study import StudyService
 from clinical_mdr_api.services.studies.study_arm_selection import (
     StudyArmSelectionService,
 )
+from clinical_mdr_api.services.studies.study_bundle import (
+    StudyBundle,
+    gather_concurrently,
+)
 from clinical_mdr_api.services.studies.study_design_cell import StudyDesignCellService
 from clinical_mdr_api.services.studies.study_element_selection import (
     StudyElementSelectionService,
@@ -154,32 +158,64 @@ class StudyDesignFigureService:
         self.font_size = int(round(FONT_SIZE * FONT_SIZE_POINT_TO_PIXELS_RATIO))
         self.font = ImageFont.truetype(font_path, self.font_size)
 
+    # Parts of the study drawn in the figure
+    study_bundle_parts = (
+        "arms",
+        "epochs",
+        "elements",
+        "design_cells",
+        "visits",
+        "soa_preferences",
+        "preferred_time_unit_name",
+    )
+
     @trace_calls
-    def get_svg_document(self, study_uid: str, study_value_version: str | None = None):
-        """Fetches necessary data and returns the SVG drawing as text"""
+    def get_svg_document(
+        self,
+        study_uid: str,
+        study_value_version: str | None = None,
+        study_bundle: StudyBundle | None = None,
+    ):
+        """Fetches necessary data and returns the SVG drawing as text
+
+        The data is taken from `study_bundle` when given, otherwise the independent reads are run concurrently.
+        """
 
         # fetch data
-        study_arms = self._get_study_arms(
-            study_uid, study_value_version=study_value_version
-        )
-        study_epochs = self._get_study_epochs(
-            study_uid, study_value_version=study_value_version
-        )
-        study_elements = self._get_study_elements(
-            study_uid, study_value_version=study_value_version
-        )
-        study_design_cells = self._get_study_design_cells(
-            study_uid, study_value_version=study_value_version
-        )
-        study_visits = self._get_study_visits(
-            study_uid, study_value_version=study_value_version
-        )
-        soa_preferences = self._get_soa_preferences(
-            study_uid, study_value_version=study_value_version
-        )
-        time_unit_name = self._get_preferred_time_unit_name(
-            study_uid, study_value_version=study_value_version
-        )
+        if study_bundle is not None:
+            study_arms = self._arms_by_uid(study_bundle.arms)
+            study_epochs = self._epochs_without_basic(study_bundle.epochs)
+            study_elements = self._elements_by_uid(study_bundle.elements)
+            study_design_cells = list(study_bundle.design_cells)
+            study_visits = list(study_bundle.visits)
+            soa_preferences = study_bundle.soa_preferences
+            time_unit_name = study_bundle.preferred_time_unit_name
+        else:
+            data = gather_concurrently(
+                {
+                    name: (
+                        lambda getter=getter: getter(
+                            study_uid, study_value_version=study_value_version
+                        )
+                    )
+                    for name, getter in (
+                        ("study_arms", self._get_study_arms),
+                        ("study_epochs", self._get_study_epochs),
+                        ("study_elements", self._get_study_elements),
+                        ("study_design_cells", self._get_study_design_cells),
+                        ("study_visits", self._get_study_visits),
+                        ("soa_preferences", self._get_soa_preferences),
+                        ("time_unit_name", self._get_preferred_time_unit_name),
+                    )
+                }
+            )
+            study_arms = data["study_arms"]
+            study_epochs = data["study_epochs"]
+            study_elements = data["study_elements"]
+            study_design_cells = data["study_design_cells"]
+            study_visits = data["study_visits"]
+            soa_preferences = data["soa_preferences"]
+            time_unit_name = data["time_unit_name"]
 
         # organise the data
         table = self._mk_data_matrix(
@@ -246,23 +282,34 @@ class StudyDesignFigureService:
             sort_by={"order": True},
             study_value_version=study_value_version,
         )
-        study_arms = OrderedDict((arm.arm_uid, arm) for arm in study_arms.items)
-        return study_arms
+        return self._arms_by_uid(study_arms.items)
+
+    @staticmethod
+    def _arms_by_uid(
+        study_arms: Iterable[StudySelectionArmWithConnectedBranchArms],
+    ) -> Mapping[str, StudySelectionArmWithConnectedBranchArms]:
+        return OrderedDict((arm.arm_uid, arm) for arm in study_arms)
 
     @trace_calls
     def _get_study_epochs(
         self, study_uid, study_value_version: str | None = None
     ) -> list[StudyEpoch]:
         """Returns the list of StudyEpochs except Basic epoch."""
-        return [
-            epoch
-            for epoch in StudyEpochService()
+        return self._epochs_without_basic(
+            StudyEpochService()
             .get_all_epochs(
                 study_uid=study_uid,
                 sort_by={"order": True},
                 study_value_version=study_value_version,
             )
             .items
+        )
+
+    @staticmethod
+    def _epochs_without_basic(study_epochs: Iterable[StudyEpoch]) -> list[StudyEpoch]:
+        return [
+            epoch
+            for epoch in study_epochs
             if epoch.epoch_ctterm.sponsor_preferred_name != config.BASIC_EPOCH_NAME
         ]
 
@@ -274,10 +321,13 @@ class StudyDesignFigureService:
         study_elements = StudyElementSelectionService().get_all_selection(
             study_uid=study_uid, study_value_version=study_value_version
         )
-        study_elements = OrderedDict(
-            (element.element_uid, element) for element in study_elements.items
-        )
-        return study_elements
+        return self._elements_by_uid(study_elements.items)
+
+    @staticmethod
+    def _elements_by_uid(
+        study_elements: Iterable[StudySelectionElement],
+    ) -> Mapping[str, StudySelectionElement]:
+        return OrderedDict((element.element_uid, element) for element in study_elements)
 
     @trace_calls
     def _get_study_design_cells(
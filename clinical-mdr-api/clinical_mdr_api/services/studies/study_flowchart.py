@@ -1,8 +1,12 @@
+import itertools
 import logging
+import time
 from collections import defaultdict
+from concurrent.futures import Future
 from datetime import datetime
 from typing import Iterable, Mapping, Sequence
 
+from cachetools.keys import hashkey
 from docx.enum.style import WD_STYLE_TYPE
 from neomodel import db
 from openpyxl.workbook import Workbook
@@ -26,6 +30,8 @@ from clinical_mdr_api.models.study_selections.study_selection import (
     ReferencedItem,
     SoACellReference,
     SoAFootnoteReference,
+    SoASnapshotBackfillItem,
+    SoASnapshotBackfillReport,
     StudyActivityGroup,
     StudyActivitySchedule,
     StudyActivitySubGroup,
@@ -37,7 +43,7 @@ from clinical_mdr_api.models.study_selections.study_soa_footnote import StudySoA
 from clinical_mdr_api.models.study_selections.study_visit import StudyVisit
 from clinical_mdr_api.models.syntax_instances.footnote import Footnote
 from clinical_mdr_api.models.utils import BaseModel
-from clinical_mdr_api.services._utils import ensure_transaction
+from clinical_mdr_api.services._utils import DatabaseWorkerPool, ensure_transaction
 from clinical_mdr_api.services.studies.study import StudyService
 from clinical_mdr_api.services.studies.study_activity_group import (
     StudyActivityGroupService,
@@ -72,12 +78,19 @@ from clinical_mdr_api.services.utils.table_f import (
 from clinical_mdr_api.utils import enumerate_letters
 from common import config
 from common.auth.user import user
+from common.cache import SharedTTLCache
 from common.exceptions import BusinessLogicException, NotFoundException
 from common.telemetry import trace_calls
 
 NUM_OPERATIONAL_CODE_ROWS = 2
 SOA_CHECK_MARK = "X"
 
+# Builds the SoA snapshots of the backfill, see StudyFlowchartService.backfill_soa_snapshots
+soa_snapshot_workers = DatabaseWorkerPool(
+    max_workers=config.SOA_SNAPSHOT_BACKFILL_MAX_WORKERS,
+    thread_name_prefix="soa-snapshot",
+)
+
 # Strings prepared for localization
 _T = {
     "study_epoch": "",
@@ -158,6 +171,13 @@ OPERATIONAL_XLSX_STYLES = {
 class StudyFlowchartService:
     """Service to build/retrieve Study Shedule-of-Activities (SoA, was: Flowchart) table and footnotes"""
 
+    # SoA tables of the latest draft version of studies, keyed by study change state
+    cache_store_flowchart_table = SharedTTLCache(
+        name="StudyFlowchartService.cache_store_flowchart_table",
+        maxsize=config.SOA_TABLE_CACHE_MAX_SIZE,
+        ttl=config.SOA_TABLE_CACHE_TTL,
+    )
+
     def __init__(self) -> None:
         self.user = user().id()
         self._study_service = StudyService()
@@ -584,33 +604,66 @@ class StudyFlowchartService:
         layout: SoALayout = SoALayout.PROTOCOL,
         force_build: bool = False,
     ) -> TableWithFootnotes:
-        """Returns internal TableWithFootnotes representation of SoA, either from snapshot or freshly built"""
+        """Returns internal TableWithFootnotes representation of SoA, either from snapshot, from cache or freshly built"""
 
         if study_value_version and layout == SoALayout.PROTOCOL and not force_build:
             # Return protocol SoA from snapshot for a locked study version
-            table = self.load_soa_snapshot(
+            return self.load_soa_snapshot(
                 study_uid=study_uid,
                 study_value_version=study_value_version,
                 layout=layout,
                 time_unit=time_unit,
             )
 
-        else:
-            # Build SoA (of the latest draft version or detailed and operational SoA of locked versions too)
-            table = self.build_flowchart_table(
+        if study_value_version or force_build:
+            return self._build_flowchart_table_for_layout(
                 study_uid=study_uid,
                 time_unit=time_unit,
                 study_value_version=study_value_version,
-                operational=(layout == SoALayout.OPERATIONAL),
-                hide_soa_groups=(layout == SoALayout.PROTOCOL),
+                layout=layout,
+            )
+
+        # SoA of the latest draft version is cached until the study or any of its selections changes
+        change_state = self.repository.get_study_change_state(study_uid)
+        if change_state is None:
+            # Let the build raise NotFoundException
+            return self._build_flowchart_table_for_layout(
+                study_uid=study_uid, time_unit=time_unit, layout=layout
             )
 
-            if layout == SoALayout.PROTOCOL:
-                # propagate checkmarks from hidden rows for protocol layout
-                self.propagate_hidden_rows(table.rows)
+        key = hashkey(study_uid, layout.value, time_unit, change_state)
+        table = self.cache_store_flowchart_table.get(key)
+        if table is None:
+            table = self._build_flowchart_table_for_layout(
+                study_uid=study_uid, time_unit=time_unit, layout=layout
+            )
+            self.cache_store_flowchart_table[key] = table
 
-                # remove hidden rows
-                self.remove_hidden_rows(table)
+        # Callers alter the returned table, so they get their own copy
+        return table.copy(deep=True)
+
+    def _build_flowchart_table_for_layout(
+        self,
+        study_uid: str,
+        time_unit: str | None = None,
+        study_value_version: str | None = None,
+        layout: SoALayout = SoALayout.PROTOCOL,
+    ) -> TableWithFootnotes:
+        # Build SoA (of the latest draft version or detailed and operational SoA of locked versions too)
+        table = self.build_flowchart_table(
+            study_uid=study_uid,
+            time_unit=time_unit,
+            study_value_version=study_value_version,
+            operational=(layout == SoALayout.OPERATIONAL),
+            hide_soa_groups=(layout == SoALayout.PROTOCOL),
+        )
+
+        if layout == SoALayout.PROTOCOL:
+            # propagate checkmarks from hidden rows for protocol layout
+            self.propagate_hidden_rows(table.rows)
+
+            # remove hidden rows
+            self.remove_hidden_rows(table)
 
         return table
 
@@ -2142,6 +2195,179 @@ class StudyFlowchartService:
 
         return cell_references, footnote_references
 
+    @trace_calls
+    def backfill_soa_snapshots(
+        self,
+        study_uids: list[str] | None = None,
+        layout: SoALayout = SoALayout.PROTOCOL,
+        batch_size: int = 10,
+        limit: int | None = None,
+    ) -> SoASnapshotBackfillReport:
+        """
+        Builds and saves SoA snapshots of all released study versions which have no snapshot yet
+
+        Snapshots are built in parallel by the soa_snapshot_workers threads, and saved in batches, one transaction per batch.
+        Saved snapshots are not looked up again, so an interrupted or limited run is resumed by running it again.
+
+        Args:
+            study_uids (list[str] | None): Only backfill the versions of these studies. Defaults to all studies.
+            layout (SoALayout): SoA layout, only protocol SoA snapshot is implemented.
+            batch_size (int): Number of snapshots saved in a transaction.
+            limit (int | None): Maximum number of study versions processed in this run.
+
+        Returns:
+            SoASnapshotBackfillReport: Progress and per-study-version timings.
+        """
+
+        start_time = time.perf_counter()
+        study_versions = self.repository.find_study_versions_without_snapshot(
+            layout=layout, study_uids=study_uids
+        )
+        report = SoASnapshotBackfillReport(total=len(study_versions))
+        if limit is not None:
+            study_versions = study_versions[:limit]
+        log.info(
+            "Backfilling %s SoA snapshots of %d study versions (%d without snapshot)",
+            layout,
+            len(study_versions),
+            report.total,
+        )
+
+        def build(study_uid: str, study_value_version: str):
+            build_start_time = time.perf_counter()
+            try:
+                # Each worker has its own services and repositories
+                (
+                    cell_references,
+                    footnote_references,
+                ) = StudyFlowchartService().build_soa_snapshot(
+                    study_uid=study_uid,
+                    study_value_version=study_value_version,
+                    layout=layout,
+                )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                log.exception(
+                    "Failed to build SoA snapshot of study %s version %s",
+                    study_uid,
+                    study_value_version,
+                )
+                return SoASnapshotBackfillItem(
+                    study_uid=study_uid,
+                    study_value_version=study_value_version,
+                    success=False,
+                    build_seconds=time.perf_counter() - build_start_time,
+                    error=str(exc),
+                )
+            return (
+                SoASnapshotBackfillItem(
+                    study_uid=study_uid,
+                    study_value_version=study_value_version,
+                    success=True,
+                    num_cell_references=len(cell_references),
+                    build_seconds=time.perf_counter() - build_start_time,
+                ),
+                cell_references,
+                footnote_references,
+            )
+
+        # Snapshots of the next batch are built while the current batch is saved
+        batches: Iterable[list[Future]] = (
+            [
+                soa_snapshot_workers.submit(build, *study_version)
+                for study_version in batch
+            ]
+            for batch in itertools.batched(study_versions, batch_size)
+        )
+        next_batch = next(batches, None)
+        while next_batch is not None:
+            batch, next_batch = next_batch, next(batches, None)
+            results = [future.result() for future in batch]
+            built = [result for result in results if isinstance(result, tuple)]
+            failed = [result for result in results if not isinstance(result, tuple)]
+
+            self._save_soa_snapshots_batch(built, layout)
+
+            for item in [item for item, _, _ in built] + failed:
+                report.items.append(item)
+                report.processed += 1
+                if item.success:
+                    report.succeeded += 1
+                else:
+                    report.failed += 1
+                log.info(
+                    "SoA snapshot %d/%d of study %s version %s: %s in %.2fs (build %.2fs, save %.2fs)",
+                    report.processed,
+                    len(study_versions),
+                    item.study_uid,
+                    item.study_value_version,
+                    "saved" if item.success else "failed",
+                    item.build_seconds + item.save_seconds,
+                    item.build_seconds,
+                    item.save_seconds,
+                )
+
+        report.remaining = report.total - report.succeeded
+        report.elapsed_seconds = time.perf_counter() - start_time
+        log.info(
+            "Backfilled %d SoA snapshots (%d failed, %d remaining) in %.2fs",
+            report.succeeded,
+            report.failed,
+            report.remaining,
+            report.elapsed_seconds,
+        )
+        return report
+
+    def _save_soa_snapshots_batch(
+        self,
+        built: list[
+            tuple[
+                SoASnapshotBackfillItem,
+                list[SoACellReference],
+                list[SoAFootnoteReference],
+            ]
+        ],
+        layout: SoALayout,
+    ):
+        """Saves a batch of built SoA snapshots in a transaction, or one by one if the batch fails"""
+
+        def save(item, cell_references, footnote_references):
+            save_start_time = time.perf_counter()
+            self.repository.save(
+                study_uid=item.study_uid,
+                study_value_version=item.study_value_version,
+                cell_references=cell_references,
+                footnote_references=footnote_references,
+                layout=layout,
+            )
+            item.save_seconds = time.perf_counter() - save_start_time
+
+        if not built:
+            return
+
+        try:
+            with db.transaction:
+                for snapshot in built:
+                    save(*snapshot)
+            return
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.warning(
+                "Failed to save batch of %d SoA snapshots, saving them one by one",
+                len(built),
+            )
+
+        for item, cell_references, footnote_references in built:
+            try:
+                with db.transaction:
+                    save(item, cell_references, footnote_references)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                log.exception(
+                    "Failed to save SoA snapshot of study %s version %s",
+                    item.study_uid,
+                    item.study_value_version,
+                )
+                item.success = False
+                item.error = str(exc)
+
     @trace_calls
     @ensure_transaction(db)
     def load_soa_snapshot(
@@ -8,6 +8,7 @@ from clinical_mdr_api.domain_repositories.models.study_visit import (
     StudyVisit as StudyVisitNeoModel,
 )
 from clinical_mdr_api.domain_repositories.study_selections.study_visit_repository import (
+    STUDY_VISIT_FIELDS_CYPHER,
     get_valid_time_references_for_study,
 )
 from clinical_mdr_api.domains.concepts.simple_concepts.numeric_value import (
@@ -87,10 +88,14 @@ from clinical_mdr_api.models.utils import (
     GenericFilteringReturn,
     get_latest_on_datetime_str,
 )
-from clinical_mdr_api.repositories._utils import FilterOperator
+from clinical_mdr_api.repositories._utils import (
+    FilterOperator,
+    StudySelectionQueryFilter,
+)
 from clinical_mdr_api.services._meta_repository import MetaRepository
 from clinical_mdr_api.services._utils import (
     calculate_diffs,
+    generic_pagination,
     service_level_generic_filtering,
     service_level_generic_header_filtering,
 )
@@ -528,25 +533,71 @@ class StudyVisitService(StudySelectionMixin):
         visits = self._get_all_visits(
             study_uid, study_value_version=study_value_version
         )
-        visits = [
-            self._transform_all_to_response_model(
-                visit,
-                study_activity_count=visit.number_of_assigned_activities,
+        if not StudySelectionQueryFilter.is_supported(
+            field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+            filter_by=filter_by,
+            sort_by=sort_by,
+        ):
+            # Derived fields are only known once the response models are built
+            visits = [
+                self._transform_all_to_response_model(
+                    visit,
+                    study_activity_count=visit.number_of_assigned_activities,
+                    study_value_version=study_value_version,
+                )
+                for visit in visits
+            ]
+            return service_level_generic_filtering(
+                items=visits,
+                filter_by=filter_by,
+                filter_operator=filter_operator,
+                sort_by=sort_by,
+                total_count=total_count,
+                page_number=page_number,
+                page_size=page_size,
+            )
+
+        # Filtering, sorting and pagination are done in Cypher,
+        # only the visits of the requested page are transformed into response models
+        if filter_by or sort_by:
+            uids, total = self.repo.find_visit_uids_by_study_uid(
+                study_uid=study_uid,
                 study_value_version=study_value_version,
+                filter_by=filter_by,
+                filter_operator=filter_operator,
+                sort_by=sort_by,
+                page_number=page_number,
+                page_size=page_size,
+                total_count=total_count,
+            )
+            visits_by_uid = {visit.uid: visit for visit in visits}
+            if sort_by:
+                visits = [visits_by_uid[uid] for uid in uids if uid in visits_by_uid]
+            else:
+                # Keep the timeline order, and paginate it
+                matching_uids = set(uids)
+                visits = [visit for visit in visits if visit.uid in matching_uids]
+                total = len(visits)
+                visits = generic_pagination(
+                    items=visits, page_number=page_number, page_size=page_size
+                )
+        else:
+            total = len(visits)
+            visits = generic_pagination(
+                items=visits, page_number=page_number, page_size=page_size
             )
-            for visit in visits
-        ]
 
-        filtered_visits = service_level_generic_filtering(
-            items=visits,
-            filter_by=filter_by,
-            filter_operator=filter_operator,
-            sort_by=sort_by,
-            total_count=total_count,
-            page_number=page_number,
-            page_size=page_size,
+        return GenericFilteringReturn.create(
+            items=[
+                self._transform_all_to_response_model(
+                    visit,
+                    study_activity_count=visit.number_of_assigned_activities,
+                    study_value_version=study_value_version,
+                )
+                for visit in visits
+            ],
+            total=total if total_count else 0,
         )
-        return filtered_visits
 
     def get_distinct_values_for_header(
         self,
@@ -143,36 +143,17 @@ class GenericSyntaxTemplateService(GenericSyntaxService[_AggregateRootType], abc
         item.approve(author_id=self.author_id)
         self.repository.save(item)
 
-        related_instance_uids = (
-            self.instance_repository.find_instance_uids_by_template_uid(uid)
-        )
-        for related_instance_uid in related_instance_uids:
-            related_instance = self.instance_repository.find_by_uid(
-                related_instance_uid, for_update=True
-            )
-            if related_instance:
-                related_instance.cascade_update(
+        # The related instances and pre-instances are updated in bulk,
+        # which is equivalent to calling cascade_update on each of them
+        for repository in (self.instance_repository, self.pre_instance_repository):
+            if repository:
+                repository.cascade_update_from_template(
+                    template_uid=uid,
+                    template_name=item.name,
+                    template_library_name=item.library.name,
                     author_id=self.author_id,
                     date=item.item_metadata.start_date,
-                    new_template_name=item.name,
                 )
-                self.instance_repository.save(related_instance)
-
-        if self.pre_instance_repository:
-            related_pre_instance_uids = (
-                self.pre_instance_repository.find_pre_instance_uids_by_template_uid(uid)
-            )
-            for related_pre_instance_uid in related_pre_instance_uids:
-                related_pre_instance = self.pre_instance_repository.find_by_uid(
-                    related_pre_instance_uid, for_update=True
-                )
-                if related_pre_instance:
-                    related_pre_instance.cascade_update(
-                        author_id=self.author_id,
-                        date=item.item_metadata.start_date,
-                        new_template_name=item.name,
-                    )
-                    self.pre_instance_repository.save(related_pre_instance)
 
         return self._transform_aggregate_root_to_pydantic_model(item)
 
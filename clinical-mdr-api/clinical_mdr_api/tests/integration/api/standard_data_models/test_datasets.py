@@ -9,6 +9,8 @@ Tests for /standards/datasets endpoints
 # pytest fixture functions have other fixture functions as arguments,
 # which pylint interprets as unused arguments
 
+import csv
+import io
 import json
 import logging
 from functools import reduce
@@ -26,6 +28,7 @@ from clinical_mdr_api.tests.integration.utils.api import (
 )
 from clinical_mdr_api.tests.integration.utils.utils import TestUtils
 from clinical_mdr_api.tests.utils.checks import assert_response_status_code
+from common import config
 
 log = logging.getLogger(__name__)
 
@@ -532,3 +535,25 @@ def test_get_datasets_csv_xml_excel(api_client, export_format):
             "data_model_ig_version": data_model_igs[0].version_number,
         },
     )
+
+
+def test_get_all_datasets_csv_export_is_complete(api_client, monkeypatch):
+    monkeypatch.setattr(config, "EXPORT_PAGE_SIZE", 2)
+    url = "/standards/datasets"
+    params = {
+        "data_model_ig_name": data_model_igs[0].uid,
+        "data_model_ig_version": data_model_igs[0].version_number,
+        "page_size": 0,
+        "sort_by": json.dumps({"uid": True}),
+    }
+    response = api_client.get(url, params=params)
+    assert_response_status_code(response, 200)
+    expected_uids = [item["uid"] for item in response.json()["items"]]
+    assert len(expected_uids) > 2
+
+    response = TestUtils.verify_exported_data_format(
+        api_client, "text/csv", url, params=params
+    )
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8"))))
+    assert rows[0][0] == "uid"
+    assert [row[0] for row in rows[1:]] == expected_uids
@@ -499,3 +499,39 @@ def test_soa_preferences_versioning(
     assert_json_response(response4)
     data = response4.json()
     assert data.items() >= soa_preferences_initial.items()
+
+
+def test_soa_preferences_of_locked_version_are_cached(dummy_study, api_client):
+    response = api_client.post(
+        f"/studies/{dummy_study.uid}/locks",
+        json={"change_description": "testing"},
+    )
+    assert_response_status_code(response, 201)
+    version = response.json()["current_metadata"]["version_metadata"]["version_number"]
+
+    response = api_client.get(
+        f"/studies/{dummy_study.uid}/soa-preferences",
+        params={"study_value_version": version},
+    )
+    assert_response_status_code(response, 200)
+    etag = response.headers["etag"]
+
+    response = api_client.get(
+        f"/studies/{dummy_study.uid}/soa-preferences",
+        params={"study_value_version": version},
+        headers={"If-None-Match": etag},
+    )
+    assert_response_status_code(response, 304)
+
+    # Default preferences are returned for a version which doesn't exist, but not cached
+    response = api_client.get(
+        f"/studies/{dummy_study.uid}/soa-preferences",
+        params={"study_value_version": "99"},
+    )
+    assert_response_status_code(response, 200)
+    assert "etag" not in response.headers
+
+    # The draft version is never cached
+    response = api_client.get(f"/studies/{dummy_study.uid}/soa-preferences")
+    assert_response_status_code(response, 200)
+    assert "etag" not in response.headers
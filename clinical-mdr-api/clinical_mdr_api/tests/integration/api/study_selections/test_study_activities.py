@@ -9,15 +9,23 @@ Tests for /studies/{study_uid}/study-activities endpoints
 # pytest fixture functions have other fixture functions as arguments,
 # which pylint interprets as unused arguments
 
+import dataclasses
 import json
 import logging
 from datetime import datetime, timezone
 from unittest import mock
 
+import neomodel
 import pytest
 from fastapi.testclient import TestClient
 from neomodel import db
 
+from clinical_mdr_api.domain_repositories.study_selections.study_activity_instruction_repository import (
+    StudyActivityInstructionRepository,
+)
+from clinical_mdr_api.domains.study_selections.study_activity_instruction import (
+    StudyActivityInstructionVO,
+)
 from clinical_mdr_api.main import app
 from clinical_mdr_api.models.biomedical_concepts.activity_instance_class import (
     ActivityInstanceClass,
@@ -71,7 +79,12 @@ from clinical_mdr_api.tests.integration.utils.method_library import (
 )
 from clinical_mdr_api.tests.integration.utils.utils import TestUtils
 from clinical_mdr_api.tests.utils.checks import assert_response_status_code
-from common.config import REQUESTED_LIBRARY_NAME
+from common.config import REQUESTED_LIBRARY_NAME, TRACING_DISABLED
+from common.telemetry.request_metrics import (
+    get_request_metrics,
+    init_request_metrics,
+    patch_neomodel_database,
+)
 
 log = logging.getLogger(__name__)
 
@@ -3214,3 +3227,75 @@ def test_batch_operations_for_combined_study_activity_and_activity_schedules(
     assert_response_status_code(response, 200)
     study_activity_schedules = response.json()
     assert len(study_activity_schedules) == 0
+
+
+def test_study_activity_instruction_writes_in_one_statement(api_client, monkeypatch):
+    response = api_client.post(
+        f"/studies/{study.uid}/study-activities",
+        json={
+            "activity_uid": "activity_root1",
+            "activity_subgroup_uid": "activity_subgroup_root1",
+            "activity_group_uid": "activity_group_root1",
+            "soa_group_term_uid": term_efficacy_uid,
+        },
+    )
+    assert_response_status_code(response, 201)
+    study_activity_uid = response.json()["study_activity_uid"]
+
+    # Count the Cypher queries in the cypher.count request metric.
+    # The app already patched the database when tracing is enabled,
+    # wrapping it again would count each query twice.
+    if TRACING_DISABLED:
+        # Restores the unpatched function after the test
+        monkeypatch.setattr(
+            neomodel.sync_.core.Database,
+            "_run_cypher_query",
+            neomodel.sync_.core.Database._run_cypher_query,
+        )
+        patch_neomodel_database()
+
+    def cypher_count(write):
+        init_request_metrics()
+        result = write()
+        return get_request_metrics().cypher_count, result
+
+    repository = StudyActivityInstructionRepository()
+    selection_vo = StudyActivityInstructionVO(
+        study_uid=study.uid,
+        study_activity_uid=study_activity_uid,
+        activity_instruction_uid=activity_instruction.uid,
+        start_date=datetime.now(timezone.utc),
+    )
+
+    count, created = cypher_count(lambda: repository.save(selection_vo, "Test"))
+    assert count == 1
+    assert created.uid
+    assert created.activity_instruction_name == activity_instruction.name
+
+    count, edited = cypher_count(
+        lambda: repository.save(
+            dataclasses.replace(selection_vo, uid=created.uid), "Test"
+        )
+    )
+    assert count == 1
+    assert edited.uid == created.uid
+
+    count, _ = cypher_count(lambda: repository.delete(study.uid, created.uid, "Test"))
+    assert count == 1
+
+    # The edit is recorded by a single Edit action
+    actions, _ = db.cypher_query(
+        """
+        MATCH (:StudyRoot {uid: $study_uid})-[:AUDIT_TRAIL]->(action:StudyAction)
+            -[:AFTER]->(:StudyActivityInstruction {uid: $uid})
+        RETURN [label IN labels(action) WHERE label <> 'StudyAction'][0]
+        ORDER BY action.date
+        """,
+        {"study_uid": study.uid, "uid": created.uid},
+    )
+    assert [action for action, in actions] == ["Create", "Edit", "Delete"]
+    response = api_client.get(f"/studies/{study.uid}/study-activity-instructions")
+    assert_response_status_code(response, 200)
+    assert created.uid not in [
+        item["study_activity_instruction_uid"] for item in response.json()
+    ]
@@ -15,7 +15,9 @@ from functools import reduce
 
 import pytest
 from fastapi.testclient import TestClient
+from neomodel import db
 
+from clinical_mdr_api.domains.libraries.object import ParametrizedTemplateARBase
 from clinical_mdr_api.main import app
 from clinical_mdr_api.models.concepts.concept import TextValue
 from clinical_mdr_api.models.controlled_terminologies.ct_term import CTTerm
@@ -28,6 +30,7 @@ from clinical_mdr_api.models.syntax_templates.template_parameter_term import (
     IndexedTemplateParameterTerm,
     MultiTemplateParameterTerm,
 )
+from clinical_mdr_api.services.user_info import UserInfoService
 from clinical_mdr_api.tests.integration.utils.api import (
     inject_and_clear_db,
     inject_base_data,
@@ -928,6 +931,35 @@ def test_cascade_approve_objective_template(api_client):
     assert res["status"] == "Final"
 
 
+def test_cascade_approve_objective_template_versions(api_client):
+    # Versions written by the cascading update of test_cascade_approve_objective_template
+    result, _ = db.cypher_query(
+        """
+        MATCH (:ObjectiveTemplateRoot {uid: $template_uid})--(root)-[version:HAS_VERSION]->(value)
+        WHERE version.change_description = $change_description
+        MATCH (root)-[:LATEST]->(latest)
+        RETURN labels(root), properties(version), properties(value), value = latest
+        """,
+        {
+            "template_uid": objective_templates[5].uid,
+            "change_description": ParametrizedTemplateARBase.CASCADING_UPDATE_LABEL.format(
+                objective_templates[5].uid
+            ),
+        },
+    )
+
+    # The instance and the pre-instance
+    assert len(result) == 2
+    for labels, version, value, is_latest in result:
+        assert "ObjectiveRoot" in labels or "ObjectivePreInstanceRoot" in labels, labels
+        assert is_latest
+        assert version[
+            "author_username"
+        ] == UserInfoService.get_author_username_from_id(version["author_id"])
+        assert set(value) == {"name", "name_plain"}
+        assert value["name"] == f"cascade check [{text_value_1.name_sentence_case}]"
+
+
 def test_inactivate_objective_template(api_client):
     response = api_client.delete(f"{URL}/{objective_templates[5].uid}/activations")
     res = response.json()
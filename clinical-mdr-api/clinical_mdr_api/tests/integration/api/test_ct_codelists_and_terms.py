@@ -8,6 +8,8 @@ Tests for /ct/codelists and /ct/terms endpoints
 
 # pytest fixture functions have other fixture functions as arguments,
 # which pylint interprets as unused arguments
+import csv
+import io
 import json
 import logging
 from functools import reduce
@@ -16,6 +18,9 @@ import pytest
 from fastapi.testclient import TestClient
 
 from clinical_mdr_api.main import app
+from clinical_mdr_api.models.controlled_terminologies.ct_codelist import (
+    CTCodelistTermInput,
+)
 from clinical_mdr_api.models.controlled_terminologies.ct_term import CTTerm
 from clinical_mdr_api.tests.integration.utils.api import (
     inject_and_clear_db,
@@ -23,6 +28,7 @@ from clinical_mdr_api.tests.integration.utils.api import (
 )
 from clinical_mdr_api.tests.integration.utils.utils import TestUtils
 from clinical_mdr_api.tests.utils.checks import assert_response_status_code
+from common import config
 
 log = logging.getLogger(__name__)
 
@@ -130,6 +136,34 @@ def test_get_ct_terms_pagination(api_client, base_url, page_size, sort_by):
     assert len(results_all_in_one_page) == len(results_paginated_merged)
 
 
+def test_get_ct_terms_page_token_term_in_two_codelists(api_client):
+    first_codelist = TestUtils.create_ct_codelist(extensible=True, approve=True)
+    term = TestUtils.create_ct_term(codelist_uid=first_codelist.codelist_uid)
+    second_codelist = TestUtils.create_ct_codelist(
+        extensible=True,
+        approve=True,
+        terms=[CTCodelistTermInput(term_uid=term.term_uid)],
+    )
+
+    # Each page ends on one of the two rows of the term
+    params = {
+        "page_size": 1,
+        "page_token": "",
+        "filters": json.dumps({"term_uid": {"v": [term.term_uid]}}),
+    }
+    codelist_uids = []
+    while params["page_token"] is not None:
+        response = api_client.get("/ct/terms", params=params)
+        assert_response_status_code(response, 200)
+        res = response.json()
+        codelist_uids.extend(item["codelist_uid"] for item in res["items"])
+        params["page_token"] = res.get("next_page_token")
+
+    assert sorted(codelist_uids) == sorted(
+        [first_codelist.codelist_uid, second_codelist.codelist_uid]
+    )
+
+
 @pytest.mark.parametrize(
     "export_format",
     [
@@ -145,6 +179,26 @@ def test_get_ct_terms_csv_xml_excel(api_client, export_format):
     TestUtils.verify_exported_data_format(api_client, export_format, url)
 
 
+def test_get_all_ct_terms_csv_export_is_fetched_page_by_page(api_client, monkeypatch):
+    monkeypatch.setattr(config, "EXPORT_PAGE_SIZE", 2)
+    url = "/ct/terms"
+    params = {"page_size": 0, "sort_by": json.dumps({"term_uid": True})}
+    response = api_client.get(url, params=params)
+    assert_response_status_code(response, 200)
+    expected_uids = [
+        (item["term_uid"], item["codelist_uid"]) for item in response.json()["items"]
+    ]
+    assert len(expected_uids) > 2
+
+    response = TestUtils.verify_exported_data_format(
+        api_client, "text/csv", url, params=params
+    )
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8"))))
+    assert rows[0][:3] == ["term_uid", "catalogue_name", "codelist_uid"]
+    # Terms in several codelists have one row per codelist, in no specific order
+    assert sorted((row[0], row[2]) for row in rows[1:]) == sorted(expected_uids)
+
+
 @pytest.mark.parametrize(
     "export_format",
     [
@@ -189,6 +189,28 @@ def test_get_study_by_uid(api_client):
     assert_response_status_code(response, 422)
 
 
+def test_get_study_last_change(api_client):
+    created_study = TestUtils.create_study()
+
+    response = api_client.get(f"/studies/{created_study.uid}/last-change")
+    assert_response_status_code(response, 200)
+    res = response.json()
+    assert res["study_uid"] == created_study.uid
+    created = res["date"]
+    assert created is not None
+
+    # Selection edits of a draft study don't change its version, only its audit trail
+    TestUtils.create_study_arm(
+        study_uid=created_study.uid, name="Arm A", short_name="A"
+    )
+    response = api_client.get(f"/studies/{created_study.uid}/last-change")
+    assert_response_status_code(response, 200)
+    assert response.json()["date"] > created
+
+    response = api_client.get("/studies/Study_999999/last-change")
+    assert_response_status_code(response, 404)
+
+
 def test_get_study_fields_audit_trail(api_client):
     created_study = TestUtils.create_study()
 
@@ -0,0 +1,125 @@
+import unittest
+
+from neo4j.time import DateTime
+
+from clinical_mdr_api.repositories._utils import (
+    CypherQueryBuilder,
+    decode_page_token,
+    encode_page_token,
+)
+from common.exceptions import ValidationException
+
+MATCH_CLAUSE = "MATCH (term_root:CTTermRoot)-->(:CTTermNameRoot)-[:LATEST]->(term_name_value:CTTermNameValue)"
+ALIAS_CLAUSE = "term_root.uid AS term_uid, term_name_value AS value_node"
+
+
+def build_query(page_token, sort_by=None, page_size=2):
+    return CypherQueryBuilder(
+        match_clause=MATCH_CLAUSE,
+        alias_clause=ALIAS_CLAUSE,
+        sort_by=sort_by,
+        implicit_sort_by="term_uid",
+        page_size=page_size,
+        page_number=1000,
+        page_token=page_token,
+    )
+
+
+class TestKeysetPagination(unittest.TestCase):
+    def test_first_page(self):
+        query = build_query("")
+
+        self.assertTrue(
+            query.full_query.endswith("RETURN * ORDER BY term_uid LIMIT $page_size")
+        )
+        self.assertNotIn("SKIP", query.full_query)
+        self.assertNotIn("page_number", query.parameters)
+
+    def test_next_page_is_filtered_on_last_row(self):
+        first_page = build_query("", sort_by={"value_node.name": False})
+        rows = [
+            ["CTTerm_000002", {"name": "b"}],
+            ["CTTerm_000001", {"name": "a"}],
+        ]
+        page_token = first_page.next_page_token(rows, ["term_uid", "value_node"])
+
+        query = build_query(page_token, sort_by={"value_node.name": False})
+
+        self.assertEqual(query.parameters["page_token_0"], "a")
+        self.assertEqual(query.parameters["page_token_1"], "CTTerm_000001")
+        self.assertIn(
+            "WITH * WHERE (coalesce(CASE WHEN $page_token_0 IS NULL THEN value_node.name IS NOT NULL"
+            " ELSE value_node.name < $page_token_0 END, false))"
+            " OR ((value_node.name = $page_token_0 OR (value_node.name IS NULL AND $page_token_0 IS NULL))"
+            " AND ($page_token_1 IS NOT NULL AND (term_uid > $page_token_1 OR term_uid IS NULL)))"
+            " RETURN * ORDER BY value_node.name DESC,term_uid LIMIT $page_size",
+            query.full_query,
+        )
+        # The total count is not restricted to the following pages
+        self.assertNotIn("page_token", query.count_query)
+
+    def test_no_next_page_token_on_last_page(self):
+        query = build_query("")
+
+        self.assertIsNone(
+            query.next_page_token([["CTTerm_000001", None]], ["term_uid", "value_node"])
+        )
+        self.assertIsNone(
+            build_query(None).next_page_token(
+                [["CTTerm_000001", None], ["CTTerm_000002", None]],
+                ["term_uid", "value_node"],
+            )
+        )
+
+    def test_page_token_values(self):
+        values = [DateTime(2024, 5, 1, 12, 30, 0), None, "CTTerm_000001", 3]
+        page_token = encode_page_token(values, "ORDER BY start_date,term_uid")
+
+        self.assertEqual(
+            decode_page_token(page_token, "ORDER BY start_date,term_uid"), values
+        )
+
+    def test_invalid_page_token(self):
+        page_token = encode_page_token(["CTTerm_000001"], "ORDER BY term_uid")
+
+        with self.assertRaises(ValidationException):
+            build_query("not a token")
+        # Token returned for another sorting
+        with self.assertRaises(ValidationException):
+            build_query(page_token, sort_by={"value_node.name": True})
+        # Page size is mandatory
+        with self.assertRaises(ValidationException):
+            build_query("", page_size=0)
+
+    def test_term_in_two_codelists_across_page_boundary(self):
+        def build_codelist_query(page_token):
+            return CypherQueryBuilder(
+                match_clause=MATCH_CLAUSE
+                + " OPTIONAL MATCH (codelist_root:CTCodelistRoot)-[rel_term:HAS_TERM]->(term_root)",
+                alias_clause=ALIAS_CLAUSE + ", codelist_root.uid AS codelist_uid",
+                implicit_sort_by=["term_uid", "codelist_uid"],
+                page_size=2,
+                page_token=page_token,
+            )
+
+        # CTTerm_000002 belongs to CTCodelist_000001 and CTCodelist_000002
+        rows = [
+            ["CTTerm_000001", None, "CTCodelist_000001"],
+            ["CTTerm_000002", None, "CTCodelist_000001"],
+        ]
+        page_token = build_codelist_query("").next_page_token(
+            rows, ["term_uid", "value_node", "codelist_uid"]
+        )
+
+        query = build_codelist_query(page_token)
+
+        self.assertEqual(query.parameters["page_token_0"], "CTTerm_000002")
+        self.assertEqual(query.parameters["page_token_1"], "CTCodelist_000001")
+        # The second membership of the last term is kept on the next page
+        self.assertIn(
+            "WITH * WHERE (($page_token_0 IS NOT NULL AND (term_uid > $page_token_0 OR term_uid IS NULL)))"
+            " OR ((term_uid = $page_token_0 OR (term_uid IS NULL AND $page_token_0 IS NULL))"
+            " AND ($page_token_1 IS NOT NULL AND (codelist_uid > $page_token_1 OR codelist_uid IS NULL)))"
+            " RETURN * ORDER BY term_uid,codelist_uid LIMIT $page_size",
+            query.full_query,
+        )
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+
+from clinical_mdr_api.repositories import _utils
+from clinical_mdr_api.repositories._utils import CypherQueryBuilder, FilterDict
+
+MATCH_CLAUSE = "MATCH (term_root:CTTermRoot)-->(:CTTermNameRoot)-[:LATEST]->(term_name_value:CTTermNameValue)"
+ALIAS_CLAUSE = "term_root, term_name_value, term_root.uid AS term_uid"
+PROJECTION_CLAUSE = "WITH term_uid, {name: term_name_value.name, order: size([(term_root)--() | 1])} AS name_data"
+
+
+def build_query(sort_by=None, filter_by=None):
+    return CypherQueryBuilder(
+        match_clause=MATCH_CLAUSE,
+        alias_clause=ALIAS_CLAUSE,
+        sort_by=sort_by,
+        implicit_sort_by="term_uid",
+        page_number=3,
+        page_size=10,
+        filter_by=FilterDict(elements=filter_by or {}),
+        projection_clause=PROJECTION_CLAUSE,
+    )
+
+
+@patch.object(_utils.config, "LATE_MATERIALIZATION", True)
+class TestLateMaterialization(unittest.TestCase):
+    def test_projection_of_page_rows(self):
+        query = build_query(
+            sort_by={"term_uid": False},
+            filter_by={"term_uid": {"v": ["CTTerm_0001"], "op": "eq"}},
+        )
+
+        self.assertTrue(query.late_projection)
+        self.assertEqual(
+            " ".join(query.full_query.split()),
+            f"{MATCH_CLAUSE} WITH {ALIAS_CLAUSE}"
+            " WHERE term_uid=$term_uid_0"
+            " WITH * ORDER BY term_uid DESC SKIP $page_number * $page_size LIMIT $page_size"
+            f" {PROJECTION_CLAUSE} RETURN * ORDER BY term_uid DESC",
+        )
+        # The count query never evaluates the projection
+        self.assertNotIn("name_data", query.count_query)
+
+    def test_projection_before_filtering_on_projected_alias(self):
+        for sort_by, filter_by in [
+            ({"name_data.name": True}, None),
+            (None, {"name_data.name": {"v": ["Visit"], "op": "eq"}}),
+        ]:
+            query = build_query(sort_by=sort_by, filter_by=filter_by)
+
+            self.assertFalse(query.late_projection)
+            self.assertTrue(
+                " ".join(query.full_query.split()).startswith(
+                    f"{MATCH_CLAUSE} WITH {ALIAS_CLAUSE} {PROJECTION_CLAUSE} WITH *"
+                )
+            )
+            self.assertIn(PROJECTION_CLAUSE, query.count_query)
+
+    def test_disabled_late_materialization(self):
+        with patch.object(_utils.config, "LATE_MATERIALIZATION", False):
+            query = build_query(sort_by={"term_uid": True})
+
+        self.assertFalse(query.late_projection)
+        self.assertTrue(
+            query.full_query.endswith(
+                "RETURN * ORDER BY term_uid ASC SKIP $page_number * $page_size LIMIT $page_size"
+            )
+        )
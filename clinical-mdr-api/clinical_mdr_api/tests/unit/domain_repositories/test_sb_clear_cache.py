@@ -0,0 +1,51 @@
+import unittest
+
+from cachetools.keys import hashkey
+
+from clinical_mdr_api.repositories._utils import sb_clear_cache
+from common.cache import LocalCacheBackend, SharedTTLCache
+
+
+def make_worker_cache(backend, worker_id: str) -> SharedTTLCache:
+    return SharedTTLCache(
+        name="BrandRepository.cache_store_item_by_uid",
+        maxsize=100,
+        ttl=60,
+        backend=backend,
+        worker_id=worker_id,
+    )
+
+
+class BrandRepository:
+    def __init__(self, cache: SharedTTLCache):
+        self.cache_store_item_by_uid = cache
+
+    @sb_clear_cache(caches=["cache_store_item_by_uid"])
+    def save(self):
+        pass
+
+
+class TestSbClearCache(unittest.TestCase):
+    def test_empty_local_cache_invalidates_shared_tier_and_peers(self):
+        backend = LocalCacheBackend()
+        worker_1 = make_worker_cache(backend, "worker-1")
+        worker_2 = make_worker_cache(backend, "worker-2")
+        key = hashkey("BrandRepository", "Brand_000001", None, False)
+        worker_2[key] = "value"
+        self.assertEqual(len(worker_1), 0)
+
+        BrandRepository(worker_1).save()
+
+        self.assertEqual(
+            backend.published_messages,
+            [
+                {
+                    "namespace": "BrandRepository.cache_store_item_by_uid",
+                    "origin": "worker-1",
+                    "action": "clear",
+                }
+            ],
+        )
+        self.assertIsNone(worker_1.get(key))
+        self.assertNotIn(key, worker_2)
+        self.assertIsNone(worker_2.get(key))
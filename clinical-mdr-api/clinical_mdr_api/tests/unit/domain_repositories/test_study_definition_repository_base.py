@@ -2,6 +2,7 @@ import copy
 import random
 import unittest
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import AbstractSet, Any, Callable, Generic, Sequence, TypeVar, cast
 from unittest.mock import patch
 
@@ -135,12 +136,21 @@ class StudyDefinitionRepositoryFake(StudyDefinitionRepository):
     def check_if_study_is_locked(self, study_uid: str) -> bool:
         return False
 
+    def get_last_change_date(self, study_uid: str) -> datetime | None:
+        raise NotImplementedError("Study audit trail is not yet mocked.")
+
     @staticmethod
     def check_if_study_uid_and_version_exists(
         study_uid: str, study_value_version: str | None = None
     ) -> bool:
         return True
 
+    @staticmethod
+    def check_if_study_version_is_locked_or_released(
+        study_uid: str, study_value_version: str
+    ) -> bool:
+        return True
+
     def get_preferred_time_unit(
         self,
         study_uid: str,
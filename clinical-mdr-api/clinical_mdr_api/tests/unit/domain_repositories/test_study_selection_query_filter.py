@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+
+from clinical_mdr_api.domain_repositories.study_selections.study_visit_repository import (
+    STUDY_VISIT_FIELDS_CYPHER,
+)
+from clinical_mdr_api.repositories import _utils
+from clinical_mdr_api.repositories._utils import (
+    FilterOperator,
+    StudySelectionQueryFilter,
+)
+from common.exceptions import ValidationException
+
+MATCH_CLAUSE = (
+    "MATCH (study_value:StudyValue)-[:HAS_STUDY_VISIT]->(study_visit:StudyVisit)"
+)
+
+
+class TestStudySelectionQueryFilter(unittest.TestCase):
+    def test_is_supported(self):
+        self.assertTrue(
+            StudySelectionQueryFilter.is_supported(
+                field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+                filter_by={"visit_type_name": {"v": ["Treatment"]}},
+                sort_by={"status": True},
+            )
+        )
+        self.assertTrue(
+            StudySelectionQueryFilter.is_supported(STUDY_VISIT_FIELDS_CYPHER)
+        )
+        # Derived field
+        self.assertFalse(
+            StudySelectionQueryFilter.is_supported(
+                field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+                filter_by={"study_day_label": {"v": ["Day 1"]}},
+            )
+        )
+        # Wildcard filtering is always done in memory
+        self.assertFalse(
+            StudySelectionQueryFilter.is_supported(
+                field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+                filter_by={"*": {"v": ["Visit"]}},
+            )
+        )
+
+    def test_unsupported_field_raises(self):
+        with self.assertRaises(ValidationException):
+            StudySelectionQueryFilter(
+                match_clause=MATCH_CLAUSE,
+                field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+                sort_by={"visit_name": True},
+            )
+
+    def test_query_only_projects_referenced_fields(self):
+        query_filter = StudySelectionQueryFilter(
+            match_clause=MATCH_CLAUSE,
+            field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+            filter_by={"visit_type_name": {"v": ["Treatment"], "op": "co"}},
+            filter_operator=FilterOperator.AND,
+            sort_by={"min_visit_window_value": False},
+            page_number=3,
+            page_size=10,
+            total_count=True,
+        )
+        full_query = query_filter.query.full_query
+        self.assertIn("study_visit.uid AS uid", full_query)
+        self.assertIn("AS visit_type_name", full_query)
+        self.assertIn(
+            "study_visit.visit_window_min AS min_visit_window_value", full_query
+        )
+        self.assertNotIn("AS study_activity_count", full_query)
+        self.assertIn(
+            "toLower(toString(visit_type_name)) CONTAINS $visit_type_name_0", full_query
+        )
+        self.assertIn("ORDER BY min_visit_window_value DESC,uid", full_query)
+        self.assertIn("SKIP $page_number * $page_size LIMIT $page_size", full_query)
+        self.assertEqual(query_filter.query.parameters["page_number"], 2)
+        self.assertEqual(
+            query_filter.query.parameters["visit_type_name_0"], "treatment"
+        )
+        self.assertNotIn("SKIP", query_filter.query.count_query)
+
+    def test_query_without_pagination(self):
+        query_filter = StudySelectionQueryFilter(
+            match_clause=MATCH_CLAUSE,
+            field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+            filter_by={"status": {"v": ["DRAFT"]}},
+            page_number=2,
+            page_size=10,
+            paginate=False,
+        )
+        self.assertNotIn("SKIP", query_filter.query.full_query)
+        self.assertIn("WHERE status=$status_0", query_filter.query.full_query)
+
+    @patch(_utils.__name__ + ".db")
+    def test_execute_returns_uids_and_total(self, db_mock):
+        db_mock.cypher_query.side_effect = [
+            ([["Visit_1", 1], ["Visit_2", 2]], ["uid", "min_visit_window_value"]),
+            ([[12]], ["total_count"]),
+        ]
+        query_filter = StudySelectionQueryFilter(
+            match_clause=MATCH_CLAUSE,
+            field_to_cypher=STUDY_VISIT_FIELDS_CYPHER,
+            sort_by={"min_visit_window_value": True},
+            page_size=2,
+            total_count=True,
+        )
+        uids, total = query_filter.execute()
+        self.assertEqual(uids, ["Visit_1", "Visit_2"])
+        self.assertEqual(total, 12)
@@ -0,0 +1,113 @@
+import datetime
+import unittest
+from unittest.mock import patch
+
+from clinical_mdr_api.domain_repositories.study_selections import base
+from clinical_mdr_api.domain_repositories.study_selections.study_activity_instruction_repository import (
+    StudyActivityInstructionRepository,
+)
+from clinical_mdr_api.domains.study_selections.study_activity_instruction import (
+    StudyActivityInstructionVO,
+)
+from common.exceptions import NotFoundException
+
+
+def instruction_vo(uid=None):
+    return StudyActivityInstructionVO(
+        uid=uid,
+        study_uid="Study_000001",
+        study_activity_uid="StudyActivity_000001",
+        activity_instruction_uid="ActivityInstruction_000001",
+        start_date=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+
+
+@patch.object(base, "db")
+class TestStudySelectionRepositoryWrite(unittest.TestCase):
+    def test_save_in_one_statement(self, db):
+        db.cypher_query.return_value = (
+            [
+                [
+                    "StudyActivityInstruction_000010",
+                    [{"uid": "StudyActivity_000001"}, {"name": "Fasting"}],
+                    [None, "Fasting"],
+                ]
+            ],
+            None,
+        )
+
+        saved = StudyActivityInstructionRepository().save(instruction_vo(), "author")
+
+        db.cypher_query.assert_called_once()
+        query, parameters = db.cypher_query.call_args.args
+        self.assertEqual(
+            parameters["related_uids"],
+            ["StudyActivity_000001", "ActivityInstruction_000001"],
+        )
+        self.assertIn(":StudyAction:Create", query)
+        self.assertIn(
+            "CREATE (selection)-[:HAS_SELECTED_ACTIVITY_INSTRUCTION]->(node)", query
+        )
+        self.assertIn("counterId: 'StudyActivityInstructionCounter'", query)
+        self.assertEqual(saved.uid, "StudyActivityInstruction_000010")
+        self.assertEqual(saved.activity_instruction_name, "Fasting")
+        self.assertEqual(saved.author_id, "author")
+
+    def test_edit_records_previous_node(self, db):
+        db.cypher_query.return_value = (
+            [["StudyActivityInstruction_000001", [{}, {}], [None, "Fasting"]]],
+            None,
+        )
+
+        StudyActivityInstructionRepository().save(
+            instruction_vo("StudyActivityInstruction_000001"), "author"
+        )
+
+        query, parameters = db.cypher_query.call_args.args
+        self.assertEqual(parameters["uid"], "StudyActivityInstruction_000001")
+        self.assertIn(":StudyAction:Edit", query)
+        self.assertIn("CREATE (action)-[:BEFORE]->(previous)", query)
+        self.assertNotIn("Counter", query)
+
+    def test_missing_related_node(self, db):
+        db.cypher_query.return_value = ([[None, [{}, None], [None, None]]], None)
+
+        with self.assertRaises(NotFoundException) as context:
+            StudyActivityInstructionRepository().save(instruction_vo(), "author")
+
+        self.assertEqual(
+            context.exception.msg,
+            "Study Activity Instruction with UID 'ActivityInstruction_000001' doesn't exist.",
+        )
+
+    def test_missing_study(self, db):
+        db.cypher_query.return_value = ([], None)
+
+        with self.assertRaises(NotFoundException):
+            StudyActivityInstructionRepository().save(instruction_vo(), "author")
+        with self.assertRaises(NotFoundException):
+            StudyActivityInstructionRepository().delete(
+                "Study_000001", "StudyActivityInstruction_000001", "author"
+            )
+
+    def test_delete_in_one_statement(self, db):
+        db.cypher_query.return_value = (
+            [["StudyActivityInstruction_000001", False]],
+            None,
+        )
+
+        with self.assertRaises(NotFoundException):
+            StudyActivityInstructionRepository().delete(
+                "Study_000001", "StudyActivityInstruction_000001", "author"
+            )
+
+        db.cypher_query.assert_called_once()
+        query, parameters = db.cypher_query.call_args.args
+        self.assertEqual(
+            [deletion["uid"] for deletion in parameters["deletions"]],
+            ["StudyActivityInstruction_000001"],
+        )
+        self.assertIn(":StudyAction:Delete", query)
+        self.assertIn(
+            "CREATE (node)-[:STUDY_ACTIVITY_HAS_INSTRUCTION]->(selection)", query
+        )
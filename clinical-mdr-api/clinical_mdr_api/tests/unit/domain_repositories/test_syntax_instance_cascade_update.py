@@ -0,0 +1,193 @@
+import datetime
+import unittest
+from unittest.mock import patch
+
+from clinical_mdr_api.domain_repositories.syntax_instances import (
+    generic_syntax_instance_repository,
+)
+from clinical_mdr_api.domain_repositories.syntax_instances.objective_repository import (
+    ObjectiveRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_pre_instances.criteria_pre_instance_repository import (
+    CriteriaPreInstanceRepository,
+)
+
+START_DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+CASCADE_DATE = datetime.datetime(2024, 6, 1, tzinfo=datetime.timezone.utc)
+
+
+def version(number, status, start_date=START_DATE, end_date=None):
+    return {
+        "version": number,
+        "status": status,
+        "start_date": start_date,
+        "end_date": end_date,
+        "author_id": "unknown-user",
+        "change_description": "Approved version",
+    }
+
+
+def parameter_row(root_uid, term):
+    return [
+        root_uid,
+        1,
+        "Intervention",
+        [
+            {
+                "set_number": 0,
+                "position": 1,
+                "index": 1,
+                "parameter_name": "Intervention",
+                "parameter_term": term,
+                "parameter_uid": f"Term_{term}",
+                "definition": None,
+                "template": None,
+                "labels": ["TemplateParameterTermRoot"],
+            }
+        ],
+        "",
+    ]
+
+
+INSTANCES = [
+    # Final instance, a new value is needed
+    [
+        "Objective_000001",
+        "To evaluate [Aspirin]",
+        [
+            version("0.1", "Draft", end_date=START_DATE),
+            version("1.0", "Final"),
+        ],
+    ],
+    # Draft instance
+    ["Objective_000002", "To evaluate [Placebo]", [version("0.2", "Draft")]],
+    # Retired instance, the name of the current value is updated
+    ["Objective_000003", "To evaluate [Aspirin]", [version("1.0", "Retired")]],
+]
+
+PARAMETERS = {
+    "Objective_000001": parameter_row("Objective_000001", "Aspirin"),
+    "Objective_000002": parameter_row("Objective_000002", "Placebo"),
+    "Objective_000003": parameter_row("Objective_000003", "Aspirin"),
+}
+
+
+class FakeDatabase:
+    def __init__(self, instances):
+        self.instances = instances
+        self.writes = []
+
+    def cypher_query(self, query, params=None, **_kwargs):
+        if "apoc.lock.nodes" in query:
+            return self.instances, None
+        if "UNWIND $instances" in query:
+            return [
+                PARAMETERS[instance["root_uid"]] for instance in params["instances"]
+            ], None
+        self.writes.append((query, params))
+        return [[len(params["rows"])]], None
+
+
+class TestCascadeUpdateFromTemplate(unittest.TestCase):
+    def cascade_update(self, repository, instances):
+        database = FakeDatabase(instances)
+        with patch.object(
+            generic_syntax_instance_repository, "db", database
+        ), patch.object(
+            generic_syntax_instance_repository.UserInfoService,
+            "get_author_username_from_id",
+            return_value="new-author@example.com",
+        ):
+            count = repository.cascade_update_from_template(
+                template_uid="ObjectiveTemplate_000001",
+                template_name="To assess [Intervention]",
+                template_library_name="Sponsor",
+                author_id="new-author",
+                date=CASCADE_DATE,
+            )
+        return count, database.writes
+
+    def test_rows_written_for_instances(self):
+        count, writes = self.cascade_update(ObjectiveRepository(), INSTANCES)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(len(writes), 1)
+        query, params = writes[0]
+        self.assertIn("MATCH (root:ObjectiveRoot {uid: row.root_uid})", query)
+        self.assertIn(
+            "CREATE (new_value:ObjectiveValue:SyntaxIndexingInstanceValue:SyntaxInstanceValue {",
+            query,
+        )
+        # Only the properties of a new value are written, not a copy of the previous one
+        self.assertIn("name: row.name, name_plain: row.name_plain\n", query)
+        self.assertNotIn("properties(value)", query)
+        # Parameters are only relinked to the latest term values for pre-instances
+        self.assertNotIn("latest_term_value", query)
+        self.assertEqual(
+            params["versioning"],
+            {
+                "author_id": "new-author",
+                "author_username": "new-author@example.com",
+                "change_description": "Cascading update triggered by template update uid: 'ObjectiveTemplate_000001'",
+                "start_date": CASCADE_DATE,
+            },
+        )
+        self.assertEqual(
+            params["rows"],
+            [
+                {
+                    "root_uid": "Objective_000001",
+                    "name": "To assess [Aspirin]",
+                    "name_plain": "To assess Aspirin",
+                    "version": "2.0",
+                    "status": "Final",
+                    "latest_status_label": "LATEST_FINAL",
+                    "new_value": True,
+                },
+                {
+                    "root_uid": "Objective_000002",
+                    "name": "To assess [Placebo]",
+                    "name_plain": "To assess Placebo",
+                    "version": "0.3",
+                    "status": "Draft",
+                    "latest_status_label": "LATEST_DRAFT",
+                    "new_value": True,
+                },
+                {
+                    "root_uid": "Objective_000003",
+                    "name": "To assess [Aspirin]",
+                    "name_plain": "To assess Aspirin",
+                    "version": "2.0",
+                    "status": "Retired",
+                    "latest_status_label": "LATEST_RETIRED",
+                    "new_value": False,
+                },
+            ],
+        )
+
+    def test_unchanged_name_does_not_create_a_value(self):
+        instances = [
+            ["Objective_000002", "To assess [Placebo]", [version("0.2", "Draft")]]
+        ]
+        _, writes = self.cascade_update(ObjectiveRepository(), instances)
+        row = writes[0][1]["rows"][0]
+        self.assertEqual(row["version"], "0.3")
+        self.assertFalse(row["new_value"])
+
+    @patch.object(generic_syntax_instance_repository, "CASCADE_UPDATE_BATCH_SIZE", 2)
+    def test_instances_are_written_in_batches(self):
+        count, writes = self.cascade_update(ObjectiveRepository(), INSTANCES)
+        self.assertEqual(count, 3)
+        self.assertEqual([len(params["rows"]) for _, params in writes], [2, 1])
+
+    def test_pre_instances(self):
+        _, writes = self.cascade_update(CriteriaPreInstanceRepository(), INSTANCES)
+        query, params = writes[0]
+        self.assertIn("MATCH (root:CriteriaPreInstanceRoot", query)
+        self.assertIn("existing.guidance_text = value.guidance_text", query)
+        self.assertIn(
+            "name: row.name, name_plain: row.name_plain, guidance_text: value.guidance_text",
+            query,
+        )
+        self.assertIn("latest_term_value", query)
+        self.assertEqual(params["rows"][0]["name_plain"], "To assess [Aspirin]")
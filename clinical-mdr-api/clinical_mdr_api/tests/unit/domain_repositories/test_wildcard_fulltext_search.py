@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from clinical_mdr_api.repositories import _utils
+from clinical_mdr_api.repositories._utils import (
+    CypherQueryBuilder,
+    FilterDict,
+    FilterOperator,
+    WildcardFulltextIndex,
+    fulltext_wildcard_query,
+)
+
+MATCH_CLAUSE = "MATCH (term_root:CTTermRoot)-->(:CTTermNameRoot)-[:LATEST]->(term_name_value:CTTermNameValue)"
+ALIAS_CLAUSE = "term_root.uid AS term_uid, term_name_value.name AS name"
+INDEX = WildcardFulltextIndex(
+    name="fulltext_ct_term_value",
+    node_variables=("term_name_value",),
+    value_labels=("CTTermNameValue",),
+    metadata_labels=("CTTermRoot", "Library"),
+)
+ONLINE_INDEXES = frozenset(
+    [
+        "fulltext_ct_term_value",
+        "fulltext_library_item_metadata",
+        "fulltext_version_metadata",
+    ]
+)
+
+
+def build_query(filter_by, filter_operator=FilterOperator.AND):
+    return CypherQueryBuilder(
+        match_clause=MATCH_CLAUSE,
+        alias_clause=ALIAS_CLAUSE,
+        filter_by=FilterDict(elements=filter_by),
+        filter_operator=filter_operator,
+        wildcard_properties_list=["term_uid", "name"],
+        wildcard_fulltext_index=INDEX,
+    )
+
+
+@patch.object(_utils.config, "WILDCARD_FULLTEXT_SEARCH", True)
+@patch.object(_utils.config, "WILDCARD_FULLTEXT_MAX_MATCHES", 3)
+@patch.object(
+    _utils,
+    "get_online_fulltext_indexes",
+    MagicMock(return_value=ONLINE_INDEXES),
+)
+class TestWildcardFulltextSearch(unittest.TestCase):
+    def test_fulltext_wildcard_query(self):
+        self.assertEqual(fulltext_wildcard_query("Screening"), "*screening*")
+        self.assertEqual(
+            fulltext_wildcard_query(" Screening  visit "), "*screening* AND *visit*"
+        )
+        self.assertIsNone(fulltext_wildcard_query("C-12345"))
+        self.assertIsNone(fulltext_wildcard_query("name:visit"))
+        self.assertIsNone(fulltext_wildcard_query(""))
+
+    @patch.object(_utils, "db")
+    def test_match_clause_is_restricted_to_fulltext_matches(self, db_mock):
+        db_mock.cypher_query.side_effect = [
+            ([[["4:abc:1", "4:abc:2"], False]], ["ids", "matches_metadata"]),
+            ([], []),
+        ]
+        query = build_query({"*": {"v": ["Screening Visit"]}})
+        # The index is only looked up when the query is executed
+        db_mock.cypher_query.assert_not_called()
+        self.assertNotIn("elementId", query.full_query)
+
+        query.execute()
+
+        lookup_params = db_mock.cypher_query.call_args_list[0][0][1]
+        self.assertEqual(lookup_params["index_name"], "fulltext_ct_term_value")
+        self.assertEqual(lookup_params["query"], "*screening* AND *visit*")
+        self.assertEqual(lookup_params["metadata_labels"], ["CTTermRoot", "Library"])
+        self.assertEqual(lookup_params["value_labels"], ["CTTermNameValue"])
+        self.assertIn(
+            f"{MATCH_CLAUSE} WITH * WHERE elementId(term_name_value) IN $wildcard_fulltext_ids",
+            query.full_query,
+        )
+        self.assertEqual(
+            db_mock.cypher_query.call_args_list[1][1]["query"], query.full_query
+        )
+        self.assertEqual(
+            query.parameters["wildcard_fulltext_ids"], ["4:abc:1", "4:abc:2"]
+        )
+        # The wildcard predicates are kept
+        self.assertIn("toLower(name) CONTAINS $wildcard_0", query.full_query)
+        self.assertIn("elementId(term_name_value)", query.count_query)
+
+    @patch.object(_utils, "db")
+    def test_fallback_when_matching_properties_outside_of_the_index(self, db_mock):
+        # E.g. the value is part of a term uid, a library name or a change description
+        db_mock.cypher_query.side_effect = [
+            ([[["4:abc:1"], True]], ["ids", "matches_metadata"]),
+            ([], []),
+        ]
+        query = build_query({"*": {"v": ["sponsor"]}})
+
+        query.execute()
+
+        self.assertEqual(db_mock.cypher_query.call_count, 2)
+        self.assertNotIn("wildcard_fulltext_ids", query.parameters)
+        self.assertNotIn("elementId", query.full_query)
+        self.assertNotIn("elementId", query.count_query)
+
+    @patch.object(_utils, "db")
+    def test_fallback_to_wildcard_predicates(self, db_mock):
+        db_mock.cypher_query.return_value = ([[["1", "2", "3"], False]], ["ids"])
+        cases = [
+            # Too many matches
+            ({"*": {"v": ["visit"]}}, FilterOperator.AND),
+            # Lucene syntax in the search value
+            ({"*": {"v": ["visit*"]}}, FilterOperator.AND),
+            # Several search values
+            ({"*": {"v": ["visit", "screening"]}}, FilterOperator.AND),
+            # Other items can match other filters
+            ({"*": {"v": ["visit"]}, "name": {"v": ["Visit"]}}, FilterOperator.OR),
+        ]
+        for filter_by, filter_operator in cases:
+            query = build_query(filter_by, filter_operator)
+            query.execute()
+            self.assertNotIn("wildcard_fulltext_ids", query.parameters)
+            self.assertNotIn("elementId", query.full_query)
+            self.assertIn("toLower(name) CONTAINS $wildcard_0", query.full_query)
+
+    @patch.object(_utils, "db")
+    def test_disabled(self, db_mock):
+        db_mock.cypher_query.return_value = ([], [])
+        with patch.object(_utils.config, "WILDCARD_FULLTEXT_SEARCH", False):
+            query = build_query({"*": {"v": ["visit"]}})
+        query.execute()
+        db_mock.cypher_query.assert_called_once()
+        self.assertNotIn("elementId", query.full_query)
+
+    @patch.object(_utils, "db")
+    def test_index_not_online(self, db_mock):
+        db_mock.cypher_query.return_value = ([], [])
+        with patch.object(
+            _utils,
+            "get_online_fulltext_indexes",
+            return_value=frozenset(["fulltext_ct_term_value"]),
+        ):
+            query = build_query({"*": {"v": ["visit"]}})
+            query.execute()
+        db_mock.cypher_query.assert_called_once()
+        self.assertNotIn("elementId", query.full_query)
@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from clinical_mdr_api.routers import immutable_version_cache
+from clinical_mdr_api.routers.immutable_version_cache import (
+    ImmutableVersionCacheRoute,
+    cache_immutable_version,
+    etag_matches,
+    immutable_version_responses,
+)
+
+calls = {"endpoint": 0, "authorization": 0}
+# Versions of Study_000001, as (version, status)
+study_versions = {("1", "RELEASED"), ("2", "LOCKED"), ("3", "DRAFT")}
+
+
+def authorize(request: Request):
+    calls["authorization"] += 1
+    if request.headers.get("authorization") != "Bearer reader":
+        raise HTTPException(status_code=403)
+
+
+router = APIRouter(route_class=ImmutableVersionCacheRoute)
+
+
+@router.get("/studies/{study_uid}/visits", dependencies=[Depends(authorize)])
+@cache_immutable_version
+def get_visits(study_uid: str, study_value_version: str | None = None):
+    calls["endpoint"] += 1
+    return {"study_uid": study_uid, "version": study_value_version}
+
+
+@router.get("/studies/{study_uid}/activities", dependencies=[Depends(authorize)])
+def get_activities(study_uid: str, study_value_version: str | None = None):
+    calls["endpoint"] += 1
+    return []
+
+
+def is_immutable_study_version(study_uid: str, study_value_version: str) -> bool:
+    return study_uid == "Study_000001" and any(
+        version == study_value_version and status in ("LOCKED", "RELEASED")
+        for version, status in study_versions
+    )
+
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app, headers={"Authorization": "Bearer reader"})
+
+
+class TestImmutableVersionCache(unittest.TestCase):
+    def setUp(self):
+        immutable_version_responses.clear()
+        calls.update(endpoint=0, authorization=0)
+        patcher = patch.object(
+            immutable_version_cache,
+            "is_immutable_study_version",
+            is_immutable_study_version,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_response_of_study_version_is_cached(self):
+        first = client.get("/studies/Study_000001/visits?study_value_version=1")
+        second = client.get("/studies/Study_000001/visits?study_value_version=1")
+
+        self.assertEqual(calls["endpoint"], 1)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), {"study_uid": "Study_000001", "version": "1"})
+        self.assertEqual(second.headers["content-type"], "application/json")
+        self.assertEqual(first.headers["etag"], second.headers["etag"])
+
+        client.get("/studies/Study_000001/visits?study_value_version=2")
+        self.assertEqual(calls["endpoint"], 2)
+
+    def test_not_modified(self):
+        etag = client.get("/studies/Study_000001/visits?study_value_version=1").headers[
+            "etag"
+        ]
+
+        response = client.get(
+            "/studies/Study_000001/visits?study_value_version=1",
+            headers={"If-None-Match": f"W/{etag}"},
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_draft_version_is_not_cached(self):
+        client.get("/studies/Study_000001/visits")
+        response = client.get("/studies/Study_000001/visits")
+
+        self.assertEqual(calls["endpoint"], 2)
+        self.assertNotIn("etag", response.headers)
+        self.assertEqual(len(immutable_version_responses), 0)
+
+    def test_unknown_or_draft_version_is_not_cached(self):
+        for url in [
+            "/studies/Study_000001/visits?study_value_version=3",
+            "/studies/Study_000001/visits?study_value_version=9",
+            "/studies/Study_000009/visits?study_value_version=1",
+        ]:
+            client.get(url)
+            response = client.get(url)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("etag", response.headers)
+        self.assertEqual(calls["endpoint"], 6)
+        self.assertEqual(len(immutable_version_responses), 0)
+
+    def test_endpoint_not_opted_in_is_not_cached(self):
+        client.get("/studies/Study_000001/activities?study_value_version=1")
+        response = client.get("/studies/Study_000001/activities?study_value_version=1")
+
+        self.assertEqual(calls["endpoint"], 2)
+        self.assertNotIn("etag", response.headers)
+        self.assertEqual(len(immutable_version_responses), 0)
+
+    def test_authorization_is_checked_on_cached_responses(self):
+        client.get("/studies/Study_000001/visits?study_value_version=1")
+
+        response = client.get(
+            "/studies/Study_000001/visits?study_value_version=1",
+            headers={"Authorization": "Bearer someone-else"},
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(calls["authorization"], 2)
+        self.assertEqual(calls["endpoint"], 1)
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from clinical_mdr_api.domain_repositories.study_selections.study_activity_schedule_repository import (
+    ScheduleBatchSnapshot,
+)
+from clinical_mdr_api.models.error import BatchErrorResponse
+from clinical_mdr_api.models.study_selections.study_selection import (
+    StudyActivityScheduleBatchInput,
+    StudyActivityScheduleCreateInput,
+    StudyActivityScheduleDeleteInput,
+)
+from clinical_mdr_api.services.studies import study_activity_schedule
+from clinical_mdr_api.services.studies.study_activity_schedule import (
+    StudyActivityScheduleService,
+)
+
+
+def create(study_activity_uid, study_visit_uid):
+    return StudyActivityScheduleBatchInput(
+        method="POST",
+        content=StudyActivityScheduleCreateInput(
+            study_activity_uid=study_activity_uid, study_visit_uid=study_visit_uid
+        ),
+    )
+
+
+def delete(uid):
+    return StudyActivityScheduleBatchInput(
+        method="DELETE", content=StudyActivityScheduleDeleteInput(uid=uid)
+    )
+
+
+class TestStudyActivityScheduleBatch(unittest.TestCase):
+    def setUp(self):
+        with patch.object(study_activity_schedule, "user") as user:
+            user.return_value.id.return_value = "author"
+            self.service = StudyActivityScheduleService()
+        self.repository = MagicMock()
+        self.repository.get_batch_snapshot.return_value = ScheduleBatchSnapshot(
+            study_activities={
+                "StudyActivity_000001": "StudyActivityInstance_000001",
+                "StudyActivity_000002": None,
+            },
+            study_visit_uids={"StudyVisit_000001", "StudyVisit_000002"},
+            schedules={
+                "StudyActivitySchedule_000001": (
+                    "StudyActivity_000001",
+                    "StudyVisit_000001",
+                )
+            },
+        )
+        self.repository.create_batch.side_effect = self.assign_uids
+        self.service._repos = MagicMock(
+            study_activity_schedule_repository=self.repository
+        )
+
+    @staticmethod
+    def assign_uids(selection_vos, _author_id):
+        for index, selection_vo in enumerate(selection_vos):
+            selection_vo.uid = f"StudyActivitySchedule_00010{index}"
+        return selection_vos
+
+    def test_operations_are_written_together(self):
+        outcomes = self.service.apply_batch_operations(
+            "Study_000001",
+            [
+                create("StudyActivity_000001", "StudyVisit_000002"),
+                delete("StudyActivitySchedule_000001"),
+                create("StudyActivity_000002", "StudyVisit_000001"),
+            ],
+        )
+
+        self.assertEqual([code for code, _ in outcomes], [201, 204, 201])
+        self.assertEqual(
+            outcomes[0][1].study_activity_schedule_uid, "StudyActivitySchedule_000100"
+        )
+        self.assertEqual(
+            outcomes[0][1].study_activity_instance_uid, "StudyActivityInstance_000001"
+        )
+        self.assertIsNone(outcomes[1][1])
+        self.assertEqual(
+            outcomes[2][1].study_activity_schedule_uid, "StudyActivitySchedule_000101"
+        )
+        self.repository.get_batch_snapshot.assert_called_once_with("Study_000001")
+        self.repository.create_batch.assert_called_once()
+        self.repository.delete_batch.assert_called_once()
+        deleted, author_id = self.repository.delete_batch.call_args.args
+        self.assertEqual(
+            [(vo.uid, vo.study_activity_uid, vo.study_visit_uid) for vo in deleted],
+            [
+                (
+                    "StudyActivitySchedule_000001",
+                    "StudyActivity_000001",
+                    "StudyVisit_000001",
+                )
+            ],
+        )
+        self.assertEqual(author_id, "author")
+
+    def test_operations_are_validated_in_order(self):
+        outcomes = self.service.apply_batch_operations(
+            "Study_000001",
+            [
+                create("StudyActivity_000001", "StudyVisit_000001"),
+                delete("StudyActivitySchedule_000001"),
+                create("StudyActivity_000001", "StudyVisit_000001"),
+                delete("StudyActivitySchedule_000001"),
+                create("StudyActivity_000003", "StudyVisit_000001"),
+                create("StudyActivity_000002", "StudyVisit_000003"),
+                StudyActivityScheduleBatchInput(
+                    method="PATCH",
+                    content=StudyActivityScheduleDeleteInput(
+                        uid="StudyActivitySchedule_000001"
+                    ),
+                ),
+            ],
+        )
+
+        self.assertEqual(
+            [code for code, _ in outcomes], [400, 204, 201, 404, 404, 404, 405]
+        )
+        self.assertIsInstance(outcomes[0][1], BatchErrorResponse)
+        self.assertEqual(
+            outcomes[4][1].message,
+            "Study Activity with UID 'StudyActivity_000003' doesn't exist.",
+        )
+        created, _ = self.repository.create_batch.call_args.args
+        self.assertEqual(len(created), 1)
+
+    def test_missing_study(self):
+        self.repository.get_batch_snapshot.return_value = None
+
+        outcomes = self.service.apply_batch_operations(
+            "Study_000009", [create("StudyActivity_000001", "StudyVisit_000001")]
+        )
+
+        self.assertEqual(outcomes[0][0], 404)
+        self.assertEqual(
+            outcomes[0][1].message, "Study with UID 'Study_000009' doesn't exist."
+        )
+        self.repository.create_batch.assert_called_once_with([], "author")
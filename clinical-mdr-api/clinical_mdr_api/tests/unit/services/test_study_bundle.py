@@ -0,0 +1,129 @@
+import dataclasses
+import threading
+import unittest
+from unittest.mock import patch
+
+from clinical_mdr_api.services._utils import DatabaseWorkerPool
+from clinical_mdr_api.services.studies import study_bundle
+from clinical_mdr_api.services.studies.study_bundle import (
+    gather_concurrently,
+    load_study_bundle,
+)
+from common.exceptions import NotFoundException
+
+
+class TestStudyBundle(unittest.TestCase):
+    def use_workers(self, max_workers):
+        pool = DatabaseWorkerPool(max_workers=max_workers, thread_name_prefix="test")
+        self.addCleanup(DatabaseWorkerPool._pools.remove, pool)
+        self.addCleanup(pool.shutdown)
+        patcher = patch.object(study_bundle, "study_bundle_workers", pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return pool
+
+    def test_parts_are_loaded_concurrently(self):
+        self.use_workers(3)
+        # Each loader waits for the others, which only completes if they run in parallel
+        barrier = threading.Barrier(3, timeout=5)
+
+        def loader(value):
+            def load(uid, version):
+                barrier.wait()
+                return (uid, version, value)
+
+            return load
+
+        loaders = {
+            "arms": loader("arms"),
+            "epochs": loader("epochs"),
+            "visits": loader("visits"),
+            "elements": loader("elements"),
+        }
+        with patch.object(study_bundle, "STUDY_BUNDLE_LOADERS", loaders):
+            bundle = load_study_bundle(
+                "Study_000001",
+                parts=["visits", "arms", "epochs"],
+                study_value_version="1.0",
+            )
+
+        self.assertEqual(bundle.arms, ("Study_000001", "1.0", "arms"))
+        self.assertEqual(bundle.visits, ("Study_000001", "1.0", "visits"))
+        self.assertIsNone(bundle.elements)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            bundle.arms = ()
+
+    def test_unknown_part(self):
+        with self.assertRaises(ValueError):
+            load_study_bundle("Study_000001", parts=["arms", "unknown"])
+
+    def test_error_of_first_failing_call_is_raised(self):
+        self.use_workers(2)
+
+        def study():
+            raise NotFoundException(msg="Study not found")
+
+        def visits():
+            raise ValueError("Visits of a missing study")
+
+        with self.assertRaises(NotFoundException):
+            gather_concurrently({"study": study, "visits": visits})
+
+    def test_sequential_loading(self):
+        self.use_workers(1)
+        main_thread = threading.current_thread()
+        result = gather_concurrently(
+            {"a": threading.current_thread, "b": threading.current_thread}
+        )
+        self.assertEqual(result, {"a": main_thread, "b": main_thread})
+
+    def test_workers_are_reused_across_calls(self):
+        self.use_workers(2)
+        threads = set()
+        for _ in range(5):
+            result = gather_concurrently(
+                {"a": threading.current_thread, "b": threading.current_thread}
+            )
+            threads |= set(result.values())
+        self.assertLessEqual(len(threads), 2)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_nested_calls_run_on_the_calling_worker(self):
+        # With one busy worker, nested calls queued on the pool would never run
+        pool = self.use_workers(2)
+        busy = threading.Event()
+        self.addCleanup(busy.set)
+        pool.submit(busy.wait)
+
+        def nested():
+            return gather_concurrently(
+                {"a": threading.current_thread, "b": threading.current_thread}
+            )
+
+        outer = pool.submit(nested).result(timeout=5)
+        self.assertEqual(outer["a"], outer["b"])
+
+    def test_calls_run_on_the_caller_thread_when_all_workers_are_busy(self):
+        pool = self.use_workers(2)
+        busy = threading.Event()
+        self.addCleanup(busy.set)
+        started = threading.Barrier(3, timeout=5)
+
+        def wait():
+            started.wait()
+            busy.wait()
+
+        pool.submit(wait)
+        pool.submit(wait)
+        started.wait()
+        self.assertTrue(pool.is_saturated())
+
+        main_thread = threading.current_thread()
+        result = gather_concurrently(
+            {"a": threading.current_thread, "b": threading.current_thread}
+        )
+        self.assertEqual(result, {"a": main_thread, "b": main_thread})
+
+        busy.set()
+        pool.shutdown()
+        self.assertFalse(pool.is_saturated())
@@ -2,16 +2,21 @@
 
 from collections import defaultdict
 from copy import deepcopy
+from unittest.mock import Mock, patch
 
 import pytest
 from pydantic import BaseModel
 
+from clinical_mdr_api.domain_repositories.study_selections.study_soa_repository import (
+    SoALayout,
+)
 from clinical_mdr_api.domains.study_selections.study_selection_base import SoAItemType
 from clinical_mdr_api.models.controlled_terminologies.ct_term_name import CTTermName
 from clinical_mdr_api.models.study_selections.study import StudySoaPreferencesInput
 from clinical_mdr_api.models.study_selections.study_epoch import StudyEpoch
 from clinical_mdr_api.models.study_selections.study_soa_footnote import StudySoAFootnote
 from clinical_mdr_api.models.study_selections.study_visit import StudyVisit
+from clinical_mdr_api.services.studies import study_flowchart
 from clinical_mdr_api.services.studies.study_flowchart import _T as _gettext
 from clinical_mdr_api.services.studies.study_flowchart import StudyFlowchartService
 from clinical_mdr_api.services.utils.table_f import TableRow, TableWithFootnotes
@@ -780,3 +785,107 @@ def test_add_protocol_section_column(test_table, expected_table):
     table = deepcopy(test_table)
     StudyFlowchartService.add_protocol_section_column(table)
     assert table.dict() == expected_table.dict()
+
+
+def test_get_flowchart_table_of_draft_is_cached_by_study_change_state():
+    service = MockStudyFlowchartService()
+    service._repository = Mock()  # pylint: disable=protected-access
+    service.repository.get_study_change_state.return_value = ("sv-1", 10, None)
+    service.build_flowchart_table = Mock(
+        side_effect=lambda **_kwargs: deepcopy(DETAILED_SOA_TABLE)
+    )
+    StudyFlowchartService.cache_store_flowchart_table.clear()
+
+    table = service.get_flowchart_table(
+        study_uid="Study_000001", time_unit="day", layout=SoALayout.DETAILED
+    )
+    # Altering the returned table doesn't alter the cached one
+    table.rows.clear()
+    cached_table = service.get_flowchart_table(
+        study_uid="Study_000001", time_unit="day", layout=SoALayout.DETAILED
+    )
+    assert service.build_flowchart_table.call_count == 1
+    assert cached_table.dict() == DETAILED_SOA_TABLE.dict()
+
+    # Other layout, time unit or study are built separately
+    service.get_flowchart_table(
+        study_uid="Study_000001", time_unit="week", layout=SoALayout.DETAILED
+    )
+    service.get_flowchart_table(
+        study_uid="Study_000002", time_unit="day", layout=SoALayout.DETAILED
+    )
+    assert service.build_flowchart_table.call_count == 3
+
+    # Any write to the study changes its state
+    service.repository.get_study_change_state.return_value = ("sv-1", 11, None)
+    service.get_flowchart_table(
+        study_uid="Study_000001", time_unit="day", layout=SoALayout.DETAILED
+    )
+    assert service.build_flowchart_table.call_count == 4
+
+    # Locked versions and forced builds are not cached
+    service.get_flowchart_table(
+        study_uid="Study_000001",
+        time_unit="day",
+        layout=SoALayout.DETAILED,
+        study_value_version="1",
+    )
+    service.get_flowchart_table(
+        study_uid="Study_000001",
+        time_unit="day",
+        layout=SoALayout.DETAILED,
+        force_build=True,
+    )
+    assert service.build_flowchart_table.call_count == 6
+    StudyFlowchartService.cache_store_flowchart_table.clear()
+
+
+@patch(study_flowchart.__name__ + ".db")
+def test_backfill_soa_snapshots(db_mock):
+    study_versions = [(f"Study_{i:06}", "1") for i in range(7)]
+    service = MockStudyFlowchartService()
+    service._repository = Mock()  # pylint: disable=protected-access
+    service.repository.find_study_versions_without_snapshot.return_value = (
+        study_versions
+    )
+
+    def build_soa_snapshot(study_uid, study_value_version, layout):
+        if study_uid == "Study_000003":
+            raise RuntimeError("Broken SoA")
+        return [Mock()] * int(study_uid[-1]), []
+
+    worker_service = Mock()
+    worker_service.build_soa_snapshot.side_effect = build_soa_snapshot
+    with patch.object(
+        study_flowchart, "StudyFlowchartService", return_value=worker_service
+    ):
+        report = service.backfill_soa_snapshots(batch_size=3, limit=6)
+
+    assert report.total == 7
+    assert report.processed == 6
+    assert report.succeeded == 5
+    assert report.failed == 1
+    assert report.remaining == 2
+    assert {(item.study_uid, item.success) for item in report.items} == {
+        (study_uid, study_uid != "Study_000003") for study_uid, _ in study_versions[:6]
+    }
+    failed_item = next(item for item in report.items if not item.success)
+    assert failed_item.error == "Broken SoA"
+    assert all(
+        item.num_cell_references == int(item.study_uid[-1])
+        for item in report.items
+        if item.success
+    )
+
+    # One transaction per batch
+    assert db_mock.transaction.__enter__.call_count == 2
+    saved = [
+        call.kwargs["study_uid"] for call in service.repository.save.call_args_list
+    ]
+    assert saved == [
+        "Study_000000",
+        "Study_000001",
+        "Study_000002",
+        "Study_000004",
+        "Study_000005",
+    ]
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from clinical_mdr_api.services.ddf import usdm_mapper, usdm_service
+from clinical_mdr_api.services.ddf.usdm_mapper import (
+    DDF_STUDY_POPULATION_SEX_BOTH,
+    DDF_TIMING_TYPE_AFTER,
+    DDFCodeIndex,
+    get_ddf_code_index,
+    get_ddf_study_population_sex_both,
+)
+from clinical_mdr_api.services.ddf.usdm_service import USDMService
+from common.exceptions import ValidationException
+
+PACKAGE_NAME = "DDF CT 2023-12-15"
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.package_state = [["CTPackage_000001", "2024-01-01T00:00:00Z"]]
+        self.terms = [
+            [DDF_STUDY_POPULATION_SEX_BOTH, PACKAGE_NAME, "BOTH"],
+            [DDF_TIMING_TYPE_AFTER, PACKAGE_NAME, "AFTER"],
+        ]
+        self.term_queries = 0
+
+    def cypher_query(self, query, params=None, **_kwargs):
+        if "CONTAINS_TERM" in query:
+            self.term_queries += 1
+            return self.terms, None
+        return self.package_state, None
+
+
+class TestDDFCodeIndex(unittest.TestCase):
+    def setUp(self):
+        self.database = FakeDatabase()
+        patcher = patch.object(usdm_mapper, "db", self.database)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        usdm_mapper.cache_store_ddf_code_index.clear()
+        self.addCleanup(usdm_mapper.cache_store_ddf_code_index.clear)
+
+    def test_usdm_code(self):
+        code_index = DDFCodeIndex.load()
+        code = code_index.get_usdm_code(DDF_STUDY_POPULATION_SEX_BOTH)
+        self.assertEqual(code.code, DDF_STUDY_POPULATION_SEX_BOTH)
+        self.assertEqual(code.codeSystem, PACKAGE_NAME)
+        self.assertEqual(code.codeSystemVersion, "2023-12-15")
+        self.assertEqual(code.decode, "BOTH")
+        self.assertIsNone(code_index.get_usdm_code("C00000"))
+        # Each code gets its own id
+        self.assertNotEqual(
+            code.id, code_index.get_usdm_code(DDF_STUDY_POPULATION_SEX_BOTH).id
+        )
+
+    def test_index_is_loaded_once(self):
+        for _ in range(3):
+            self.assertEqual(get_ddf_study_population_sex_both().decode, "BOTH")
+        self.assertEqual(self.database.term_queries, 1)
+
+    def test_index_is_reloaded_when_a_package_is_imported(self):
+        get_ddf_code_index()
+        self.database.package_state = self.database.package_state + [
+            ["CTPackage_000002", "2024-06-01T00:00:00Z"]
+        ]
+        self.database.terms = [[DDF_STUDY_POPULATION_SEX_BOTH, PACKAGE_NAME, "Both"]]
+        self.assertEqual(get_ddf_study_population_sex_both().decode, "Both")
+        self.assertEqual(self.database.term_queries, 2)
+
+    def test_shared_index_is_used(self):
+        code_index = DDFCodeIndex({DDF_TIMING_TYPE_AFTER: (PACKAGE_NAME, "AFTER")})
+        mapper = usdm_mapper.USDMMapper(*[MagicMock()] * 8, ddf_code_index=code_index)
+        self.assertIs(mapper.ddf_code_index, code_index)
+        self.assertIsNone(get_ddf_study_population_sex_both(mapper.ddf_code_index))
+        self.assertEqual(self.database.term_queries, 0)
+
+
+class TestUSDMServiceGetByUids(unittest.TestCase):
+    @patch.object(usdm_service.config, "DDF_MAX_STUDIES_PER_REQUEST", 2)
+    @patch.object(usdm_service, "get_ddf_code_index")
+    def test_number_of_studies_is_bounded(self, get_index):
+        with self.assertRaises(ValidationException) as context:
+            USDMService.get_by_uids(["Study_000001", "Study_000002", "Study_000003"])
+
+        self.assertEqual(
+            context.exception.msg,
+            "At most 2 studies can be requested at once, got 3.",
+        )
+        get_index.assert_not_called()
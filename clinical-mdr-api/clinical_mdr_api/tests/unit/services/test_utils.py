@@ -1,3 +1,5 @@
+import contextvars
+import threading
 import unittest
 import uuid
 from unittest import mock
@@ -266,3 +268,130 @@ class TestServiceUtils(unittest.TestCase):
             item, filter_key, filter_values, filter_operator
         )
         assert out == expected
+
+    @parameterized.expand(
+        [
+            (BaseTestObject(k1="k1.value1", k2="k2.value2"), "k1", ["val"], "co"),
+            (BaseTestObject(k1="k1.value1", k2="k2.value2"), "k2", ["k2.value2"], "eq"),
+            (BaseTestObject(k1="k1.value1", k2="k2.value2"), "k2", ["k2.value2"], "ne"),
+            (BaseTestObject(k1="k1.value1", k2="k2.value2"), "k1", ["k1.a"], "gt"),
+            (BaseTestObject(k1="k1.value1"), "k1", ["K1.A", "k1.z"], "bw"),
+            (BaseTestObject(k3=["value1", "value2"]), "k3", ["valu"], "co"),
+            (BaseTestObject(k3=[]), "k3", [], "eq"),
+            (BaseTestObject(k3=["value1"]), "k3", [], "eq"),
+            (BaseTestObject(k1="k1.value1"), "missing", [], "eq"),
+            (BaseTestObject(k1="k1.value1"), "*", ["value1"], "co"),
+            (BaseTestObject(k1="k1.value1"), "*", ["xyz"], "eq"),
+        ]
+    )
+    def test_compile_filter_element(
+        self, item, filter_key, filter_values, filter_operator
+    ):
+        predicate = _utils.compile_filter_element(
+            filter_key, list(filter_values), ComparisonOperator(filter_operator)
+        )
+        assert predicate(item) == _utils.filter_aggregated_items(
+            item, filter_key, list(filter_values), filter_operator
+        )
+
+    def test_compile_attribute_getter(self):
+        class NestedTestObject(BaseModel):
+            child: BaseTestObject
+            optional_child: BaseTestObject | None = None
+            children: list[BaseTestObject] = []
+
+        item = NestedTestObject(
+            child=BaseTestObject(k1="child"),
+            children=[BaseTestObject(k1="a"), BaseTestObject(k1="b")],
+        )
+        for attr in [
+            "child.k1",
+            "optional_child.k1",
+            "children.k1",
+            "child.missing",
+            "missing.k1",
+        ]:
+            for _ in range(2):
+                assert _utils.compile_attribute_getter(attr)(item) == _utils.rgetattr(
+                    item, attr
+                )
+
+    def test_compiled_item_filter_or_keeps_filter_element_order(self):
+        items = BaseTestObject.get_all_items()
+        filters = _utils.FilterDict(
+            elements={
+                "k1": {"v": ["k1.row30"], "op": "co"},
+                "k2": {"v": ["k2.row1"], "op": "co"},
+            }
+        )
+        out = _utils.CompiledItemFilter(filters, FilterOperator.OR).apply(
+            items + items[:20], deduplicate=True
+        )
+        assert [item.k1 for item in out] == ["k1.row30"] + [
+            f"k1.row{index}" for index in [1] + list(range(10, 20))
+        ]
+
+    @parameterized.expand(
+        [
+            ({"k1": True},),
+            ({"k1": False},),
+            ({"k2": True, "k1": True},),
+            ({"k2": False, "k1": False},),
+            ({"k2": True, "k1": False},),
+            ({"k1": False, "k2": True, "uid": False},),
+        ]
+    )
+    def test_sort_items(self, sort_by):
+        items = [
+            BaseTestObject(k1=f"k1.{index % 3}", k2=f"k2.{index % 4}", uid=str(index))
+            for index in range(24)
+        ]
+        expected = list(items)
+        for sort_key, sort_order in sort_by.items():
+            expected.sort(
+                key=lambda x, s=sort_key: getattr(x, s), reverse=not sort_order
+            )
+        _utils.sort_items(items, sort_by)
+        assert [item.uid for item in items] == [item.uid for item in expected]
+
+
+class FakeDatabase(threading.local):
+    driver = None
+
+    def cypher_query(self):
+        # Like neomodel, opens a driver on the first query of the thread
+        if self.driver is None:
+            self.driver = mock.Mock()
+        return threading.get_ident()
+
+
+class TestDatabaseWorkerPool(unittest.TestCase):
+    def test_threads_and_drivers_are_reused_and_closed_on_shutdown(self):
+        fake_db = FakeDatabase()
+        pool = _utils.DatabaseWorkerPool(max_workers=2, thread_name_prefix="test")
+        self.addCleanup(_utils.DatabaseWorkerPool._pools.remove, pool)
+        with mock.patch.object(_utils.neomodel, "db", fake_db):
+            thread_ids = {
+                future.result()
+                for future in [pool.submit(fake_db.cypher_query) for _ in range(20)]
+            }
+            thread_ids |= {pool.submit(fake_db.cypher_query).result()}
+            drivers = set(pool._drivers)
+
+            pool.shutdown()
+
+        self.assertLessEqual(len(thread_ids), 2)
+        self.assertEqual(len(drivers), len(thread_ids))
+        for driver in drivers:
+            driver.close.assert_called_once_with()
+        self.assertEqual(pool._drivers, set())
+        self.assertIsNone(pool._executor)
+
+    def test_calls_run_in_a_copy_of_the_caller_context(self):
+        variable = contextvars.ContextVar("variable")
+        variable.set("caller")
+        pool = _utils.DatabaseWorkerPool(max_workers=1, thread_name_prefix="test")
+        self.addCleanup(_utils.DatabaseWorkerPool._pools.remove, pool)
+        self.addCleanup(pool.shutdown)
+
+        self.assertEqual(pool.submit(variable.get).result(), "caller")
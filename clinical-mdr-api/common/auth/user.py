@@ -1,12 +1,13 @@
 import logging
 
-from cachetools import TTLCache, cached
+from cachetools import cached
 from neomodel.sync_.core import db
 from starlette_context import context
 
 from common.auth.models import Auth, User
+from common.cache import SharedTTLCache
 
-cache_persist_user = TTLCache(maxsize=1000, ttl=10)
+cache_persist_user = SharedTTLCache(name="persist_user", maxsize=1000, ttl=10)
 
 log = logging.getLogger(__name__)
 
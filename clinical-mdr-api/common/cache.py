@@ -0,0 +1,396 @@
+"""
+Cache stores shared between API workers.
+
+`SharedTTLCache` is a drop-in replacement for `cachetools.TTLCache` that can be used with `cachetools.cached`.
+It keeps the in-process TTL cache as the first tier, and optionally uses a shared backend as:
+    * a second cache tier, shared between all workers and pods
+    * an invalidation channel, so that clearing a cache store (or evicting a uid from it)
+      in the worker doing the write also clears it in every other worker.
+
+The shared backend is configured with the CACHE_SHARED_BACKEND_URL environment variable:
+    * unset: no shared tier, caches behave like plain `TTLCache` instances
+    * "local://": in-process stand-in backend, used by tests to simulate several workers
+    * "redis://..." or "rediss://...": Redis backend, requires the `redis` package
+"""
+
+import abc
+import hashlib
+import logging
+import pickle
+import threading
+import time
+import uuid
+import weakref
+from typing import Any, Callable
+
+from cachetools import TTLCache
+
+from common import config
+
+log = logging.getLogger(__name__)
+
+# Identifies the current worker process in invalidation messages
+WORKER_ID = str(uuid.uuid4())
+
+INVALIDATION_CHANNEL = "sb-cache-invalidation"
+
+
+class CacheBackend(abc.ABC):
+    """
+    Shared cache tier and invalidation channel.
+
+    Values are stored as bytes, under a key made of the cache store name (namespace) and a string key.
+    Each value can be tagged (e.g. with the uids it was built from), so that it can be evicted by tag.
+    """
+
+    @abc.abstractmethod
+    def get(self, namespace: str, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(
+        self, namespace: str, key: str, value: bytes, ttl: float, tags: list[str]
+    ) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_tagged(self, namespace: str, tag: str) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self, namespace: str) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def publish(self, message: dict) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        raise NotImplementedError
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    In-process stand-in for a shared backend.
+
+    All `SharedTTLCache` instances using the same `LocalCacheBackend` behave
+    as if they were running in different workers connected to the same shared backend.
+    """
+
+    def __init__(self, timer: Callable[[], float] = time.monotonic):
+        self.timer = timer
+        self.lock = threading.Lock()
+        self.values: dict[tuple[str, str], tuple[bytes, float]] = {}
+        self.tags: dict[tuple[str, str], set[str]] = {}
+        self.subscribers: list[Callable[[dict], None]] = []
+        self.published_messages: list[dict] = []
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        with self.lock:
+            value, expires = self.values.get((namespace, key), (None, 0))
+            if value is not None and expires <= self.timer():
+                del self.values[(namespace, key)]
+                return None
+            return value
+
+    def set(
+        self, namespace: str, key: str, value: bytes, ttl: float, tags: list[str]
+    ) -> None:
+        with self.lock:
+            self.values[(namespace, key)] = (value, self.timer() + ttl)
+            for tag in tags:
+                self.tags.setdefault((namespace, tag), set()).add(key)
+
+    def delete_tagged(self, namespace: str, tag: str) -> None:
+        with self.lock:
+            for key in self.tags.pop((namespace, tag), set()):
+                self.values.pop((namespace, key), None)
+
+    def clear(self, namespace: str) -> None:
+        with self.lock:
+            for store in (self.values, self.tags):
+                for key in [key for key in store if key[0] == namespace]:
+                    del store[key]
+
+    def publish(self, message: dict) -> None:
+        self.published_messages.append(message)
+        for callback in list(self.subscribers):
+            callback(message)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        self.subscribers.append(callback)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis implementation of the shared backend.
+    Invalidation messages are sent over Redis pub/sub, and received by a daemon thread in each worker.
+    """
+
+    prefix = "sb-cache"
+
+    def __init__(self, url: str):
+        # Optional dependency, only needed when a Redis backend is configured
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = None
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _tag_key(self, namespace: str, tag: str) -> str:
+        return f"{self.prefix}:{namespace}:tag:{tag}"
+
+    def _keys_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:keys"
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        return self.client.get(self._key(namespace, key))
+
+    def set(
+        self, namespace: str, key: str, value: bytes, ttl: float, tags: list[str]
+    ) -> None:
+        redis_key = self._key(namespace, key)
+        pipeline = self.client.pipeline()
+        pipeline.set(redis_key, value, px=int(ttl * 1000))
+        pipeline.sadd(self._keys_key(namespace), redis_key)
+        for tag in tags:
+            pipeline.sadd(self._tag_key(namespace, tag), redis_key)
+            pipeline.expire(self._tag_key(namespace, tag), int(ttl) + 1)
+        pipeline.execute()
+
+    def delete_tagged(self, namespace: str, tag: str) -> None:
+        tag_key = self._tag_key(namespace, tag)
+        redis_keys = self.client.smembers(tag_key)
+        pipeline = self.client.pipeline()
+        if redis_keys:
+            pipeline.delete(*redis_keys)
+            pipeline.srem(self._keys_key(namespace), *redis_keys)
+        pipeline.delete(tag_key)
+        pipeline.execute()
+
+    def clear(self, namespace: str) -> None:
+        keys_key = self._keys_key(namespace)
+        redis_keys = self.client.smembers(keys_key)
+        tag_keys = list(self.client.scan_iter(match=self._tag_key(namespace, "*")))
+        pipeline = self.client.pipeline()
+        for keys in (redis_keys, tag_keys):
+            if keys:
+                pipeline.delete(*keys)
+        pipeline.delete(keys_key)
+        pipeline.execute()
+
+    def publish(self, message: dict) -> None:
+        self.client.publish(INVALIDATION_CHANNEL, pickle.dumps(message))
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        def _handler(redis_message):
+            try:
+                callback(pickle.loads(redis_message["data"]))
+            except Exception:  # pylint: disable=broad-exception-caught
+                log.exception("Failed to process cache invalidation message")
+
+        if self.pubsub is None:
+            self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(**{INVALIDATION_CHANNEL: _handler})
+        self.pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+
+def create_cache_backend(url: str | None) -> CacheBackend | None:
+    if not url:
+        return None
+    if url.startswith("local://"):
+        return LocalCacheBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: '{url}'")
+
+
+_shared_backend_lock = threading.Lock()
+_shared_backend: CacheBackend | None = None
+_shared_backend_initialized = False
+
+
+def get_shared_cache_backend() -> CacheBackend | None:
+    """Returns the shared backend configured with CACHE_SHARED_BACKEND_URL, if any."""
+    global _shared_backend, _shared_backend_initialized
+    with _shared_backend_lock:
+        if not _shared_backend_initialized:
+            _shared_backend = create_cache_backend(config.CACHE_SHARED_BACKEND_URL)
+            _shared_backend_initialized = True
+    return _shared_backend
+
+
+class _CacheRegistry:
+    """Dispatches the invalidation messages received from a backend to the cache stores of this worker."""
+
+    def __init__(self, backend: CacheBackend):
+        # Cache stores compare equal by content, so they are indexed by identity
+        self.caches: weakref.WeakValueDictionary[int, "SharedTTLCache"] = (
+            weakref.WeakValueDictionary()
+        )
+        backend.subscribe(self.on_message)
+
+    def on_message(self, message: dict) -> None:
+        for cache in list(self.caches.values()):
+            if cache.name == message.get(
+                "namespace"
+            ) and cache.worker_id != message.get("origin"):
+                cache.apply_invalidation(message)
+
+
+_registries: weakref.WeakKeyDictionary[CacheBackend, _CacheRegistry] = (
+    weakref.WeakKeyDictionary()
+)
+_registries_lock = threading.Lock()
+
+
+def _register(cache: "SharedTTLCache", backend: CacheBackend) -> None:
+    with _registries_lock:
+        registry = _registries.get(backend)
+        if registry is None:
+            registry = _registries[backend] = _CacheRegistry(backend)
+        registry.caches[id(cache)] = cache
+
+
+def cache_key_to_str(key: Any) -> str:
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+def cache_key_tags(key: Any) -> list[str]:
+    """Tags a cache entry with the string members of its key, among which the uid of the cached item."""
+    if isinstance(key, tuple):
+        return sorted({element for element in key if isinstance(element, str)})
+    return [key] if isinstance(key, str) else []
+
+
+class SharedTTLCache(TTLCache):
+    """
+    TTL cache store with an optional shared tier and cross-worker invalidation.
+
+    Args:
+        name: Unique name of the cache store, used as namespace in the shared backend and invalidation messages.
+        maxsize: Maximum number of items of the in-process tier.
+        ttl: Time to live of the items, in seconds, in both tiers.
+        backend: Shared backend, defaults to the one configured with CACHE_SHARED_BACKEND_URL.
+            Without backend, the cache behaves like a plain `TTLCache`.
+        worker_id: Identifier of the worker owning this cache store, only needed to simulate several workers in tests.
+    """
+
+    _no_backend = object()
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        backend: CacheBackend | None | object = _no_backend,
+        worker_id: str = WORKER_ID,
+        **kwargs,
+    ):
+        super().__init__(maxsize=maxsize, ttl=ttl, **kwargs)
+        self.name = name
+        self.worker_id = worker_id
+        self._backend = backend
+        self._backend_registered = False
+        self._local_lock = threading.RLock()
+
+    @property
+    def backend(self) -> CacheBackend | None:
+        # The configured backend is resolved lazily, as cache stores are created at import time
+        if self._backend is SharedTTLCache._no_backend:
+            self._backend = get_shared_cache_backend()
+        if self._backend is not None and not self._backend_registered:
+            _register(self, self._backend)
+            self._backend_registered = True
+        return self._backend
+
+    def __missing__(self, key):
+        backend = self.backend
+        if backend is not None:
+            try:
+                value = backend.get(self.name, cache_key_to_str(key))
+                if value is not None:
+                    value = pickle.loads(value)
+                    self._set_local(key, value)
+                    return value
+            except Exception:  # pylint: disable=broad-exception-caught
+                log.warning("Failed to read '%s' from shared cache", self.name)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        # Cache.get only looks up the in-process tier, __getitem__ falls back to the shared tier
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self._set_local(key, value)
+        backend = self.backend
+        if backend is None:
+            return
+        try:
+            payload = pickle.dumps(value)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Only picklable values are shared, the others stay in the in-process tier
+            log.debug("Value of '%s' cache can't be shared: %s", self.name, key)
+            return
+        try:
+            backend.set(
+                self.name, cache_key_to_str(key), payload, self.ttl, cache_key_tags(key)
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.warning("Failed to write '%s' to shared cache", self.name)
+
+    def _set_local(self, key, value):
+        with self._local_lock:
+            super().__setitem__(key, value)
+
+    def clear(self):
+        """Clears the cache store in every worker."""
+        self._clear_local()
+        self._invalidate({"action": "clear"})
+
+    def evict(self, uid: str) -> None:
+        """Evicts the items cached for the given uid, in every worker."""
+        self._evict_local(uid)
+        self._invalidate({"action": "evict", "uid": uid})
+
+    def _clear_local(self):
+        with self._local_lock:
+            super().clear()
+
+    def _evict_local(self, uid: str):
+        with self._local_lock:
+            for key in [key for key in list(self.keys()) if uid in cache_key_tags(key)]:
+                self.pop(key, None)
+
+    def _invalidate(self, message: dict) -> None:
+        backend = self.backend
+        if backend is None:
+            return
+        message = {"namespace": self.name, "origin": self.worker_id, **message}
+        try:
+            if message["action"] == "clear":
+                backend.clear(self.name)
+            else:
+                backend.delete_tagged(self.name, message["uid"])
+            backend.publish(message)
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.exception("Failed to invalidate '%s' shared cache", self.name)
+
+    def apply_invalidation(self, message: dict) -> None:
+        """Applies an invalidation message sent by another worker to the in-process tier."""
+        log.info(
+            "Invalidating cache '%s' (%s) on request of worker %s",
+            self.name,
+            message.get("action"),
+            message.get("origin"),
+        )
+        if message.get("action") == "evict":
+            self._evict_local(message["uid"])
+        else:
+            self._clear_local()
@@ -35,6 +35,27 @@ NUMBER_OF_UID_DIGITS = 6
 
 CACHE_MAX_SIZE = int(environ.get("CACHE_MAX_SIZE", 1000))
 CACHE_TTL = int(environ.get("CACHE_TTL", 3600))
+# Shared cache tier and cross-worker invalidation, see common/cache.py
+CACHE_SHARED_BACKEND_URL = environ.get("CACHE_SHARED_BACKEND_URL")
+# Cache of SoA tables built for the latest draft version of studies
+SOA_TABLE_CACHE_MAX_SIZE = int(environ.get("SOA_TABLE_CACHE_MAX_SIZE", 100))
+SOA_TABLE_CACHE_TTL = int(environ.get("SOA_TABLE_CACHE_TTL", 600))
+# Cache of the responses rendered for locked and released study versions, see routers/immutable_version_cache.py
+# The size is the total size of the cached response bodies in bytes, 0 disables the cache
+IMMUTABLE_VERSION_CACHE_MAX_BYTES = int(
+    environ.get("IMMUTABLE_VERSION_CACHE_MAX_BYTES", 128 * 1024 * 1024)
+)
+IMMUTABLE_VERSION_CACHE_TTL = int(environ.get("IMMUTABLE_VERSION_CACHE_TTL", 86400))
+# Number of threads loading the parts of studies for the study exports, shared by all requests,
+# the parts are loaded on the request thread while all of them are busy,
+# see services/studies/study_bundle.py
+STUDY_BUNDLE_MAX_WORKERS = int(environ.get("STUDY_BUNDLE_MAX_WORKERS", 4))
+# Maximum number of studies returned in DDF USDM format by one request, see routers/ddf/study_definitions.py
+DDF_MAX_STUDIES_PER_REQUEST = int(environ.get("DDF_MAX_STUDIES_PER_REQUEST", 20))
+# Number of SoA snapshots built in parallel by the snapshot backfill, see services/studies/study_flowchart.py
+SOA_SNAPSHOT_BACKFILL_MAX_WORKERS = int(
+    environ.get("SOA_SNAPSHOT_BACKFILL_MAX_WORKERS", 4)
+)
 
 MAX_INT_NEO4J = 9223372036854775807
 DEFAULT_PAGE_NUMBER = 1
@@ -43,6 +64,23 @@ DEFAULT_HEADER_PAGE_SIZE = 10
 DEFAULT_FILTER_OPERATOR = "and"
 MAX_PAGE_SIZE = 1000
 PAGE_SIZE_100 = 100
+# Number of items fetched per page when streaming an export of all items
+EXPORT_PAGE_SIZE = int(environ.get("EXPORT_PAGE_SIZE", 1000))
+# Wildcard search of library listings backed by the full-text indexes of neo4j-mdr-db/db_schema.py
+WILDCARD_FULLTEXT_SEARCH = (
+    environ.get("WILDCARD_FULLTEXT_SEARCH", "").upper().strip()
+    in _UPPERCASE_TRUE_STRINGS
+)
+# Above this number of full-text matches, the wildcard search falls back to scanning all items
+WILDCARD_FULLTEXT_MAX_MATCHES = int(environ.get("WILDCARD_FULLTEXT_MAX_MATCHES", 5000))
+WILDCARD_FULLTEXT_INDEX_STATE_TTL = int(
+    environ.get("WILDCARD_FULLTEXT_INDEX_STATE_TTL", 300)
+)
+# Evaluate the projection of the listings only for the rows of the returned page
+LATE_MATERIALIZATION = (
+    environ.get("LATE_MATERIALIZATION", "true").upper().strip()
+    in _UPPERCASE_TRUE_STRINGS
+)
 NON_VISIT_NUMBER = 29999
 UNSCHEDULED_VISIT_NUMBER = 29500
 VISIT_0_NUMBER = 0
@@ -0,0 +1,180 @@
+from threading import Lock
+
+import pytest
+from cachetools import cached
+from cachetools.keys import hashkey
+
+from common import cache as cache_module
+from common.cache import LocalCacheBackend, SharedTTLCache, create_cache_backend
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="backend")
+def fixture_backend():
+    return LocalCacheBackend()
+
+
+def make_worker_cache(backend, worker_id: str, timer=None) -> SharedTTLCache:
+    kwargs = {"timer": timer} if timer else {}
+    return SharedTTLCache(
+        name="TestRepository.cache_store_item_by_uid",
+        maxsize=100,
+        ttl=60,
+        backend=backend,
+        worker_id=worker_id,
+        **kwargs,
+    )
+
+
+def test_without_backend_behaves_like_ttl_cache():
+    cache = SharedTTLCache(name="no_backend", maxsize=2, ttl=60, backend=None)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache["c"] = 3
+    assert len(cache) == 2
+    assert "a" not in cache
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_value_is_shared_between_workers(backend):
+    worker_1 = make_worker_cache(backend, "worker-1")
+    worker_2 = make_worker_cache(backend, "worker-2")
+
+    key = hashkey("BrandRepository", "Brand_000001")
+    worker_1[key] = {"uid": "Brand_000001", "name": "Brand"}
+
+    assert key not in worker_2
+    assert worker_2[key] == {"uid": "Brand_000001", "name": "Brand"}
+    # Now also in the local tier of worker 2
+    assert key in worker_2
+
+
+def test_get_reads_value_shared_by_another_worker(backend):
+    worker_1 = make_worker_cache(backend, "worker-1")
+    worker_2 = make_worker_cache(backend, "worker-2")
+
+    key = hashkey("BrandRepository", "Brand_000001")
+    assert worker_2.get(key) is None
+    worker_1[key] = {"uid": "Brand_000001", "name": "Brand"}
+
+    assert worker_2.get(key) == {"uid": "Brand_000001", "name": "Brand"}
+    assert key in worker_2
+    assert worker_2.get(hashkey("BrandRepository", "Brand_000002"), "none") == "none"
+
+
+def test_clear_invalidates_all_workers(backend):
+    worker_1 = make_worker_cache(backend, "worker-1")
+    worker_2 = make_worker_cache(backend, "worker-2")
+    key = hashkey("BrandRepository", "Brand_000001")
+    worker_1[key] = "value"
+    assert worker_2[key] == "value"
+
+    worker_1.clear()
+
+    assert key not in worker_2
+    with pytest.raises(KeyError):
+        _ = worker_2[key]
+    assert backend.published_messages == [
+        {
+            "namespace": "TestRepository.cache_store_item_by_uid",
+            "origin": "worker-1",
+            "action": "clear",
+        }
+    ]
+
+
+def test_evict_only_removes_affected_uid(backend):
+    worker_1 = make_worker_cache(backend, "worker-1")
+    worker_2 = make_worker_cache(backend, "worker-2")
+    key_1 = hashkey("BrandRepository", "Brand_000001", None, False)
+    key_2 = hashkey("BrandRepository", "Brand_000002", None, False)
+    worker_1[key_1] = "value 1"
+    worker_1[key_2] = "value 2"
+    assert worker_2[key_1] == "value 1"
+    assert worker_2[key_2] == "value 2"
+
+    worker_2.evict("Brand_000001")
+
+    for worker in (worker_1, worker_2):
+        assert key_1 not in worker
+        assert worker.get(key_1) is None
+        assert worker[key_2] == "value 2"
+
+
+def test_other_cache_stores_are_not_invalidated(backend):
+    worker_1 = make_worker_cache(backend, "worker-1")
+    other_cache = SharedTTLCache(
+        name="OtherRepository.cache_store_item_by_uid",
+        maxsize=100,
+        ttl=60,
+        backend=backend,
+        worker_id="worker-2",
+    )
+    other_cache["key"] = "value"
+    worker_1.clear()
+    assert other_cache["key"] == "value"
+
+
+def test_shared_tier_expires(backend):
+    timer = FakeTimer()
+    backend.timer = timer
+    worker_1 = make_worker_cache(backend, "worker-1", timer=timer)
+    worker_2 = make_worker_cache(backend, "worker-2", timer=timer)
+    worker_1["key"] = "value"
+    timer.now = 61
+    assert worker_1.get("key") is None
+    assert worker_2.get("key") is None
+
+
+def test_unpicklable_values_stay_local(backend):
+    worker_1 = make_worker_cache(backend, "worker-1")
+    worker_2 = make_worker_cache(backend, "worker-2")
+    worker_1["key"] = lambda: "not picklable"
+    assert callable(worker_1["key"])
+    assert worker_2.get("key") is None
+
+
+def test_cached_decorator(backend):
+    worker_1 = make_worker_cache(backend, "worker-1")
+    worker_2 = make_worker_cache(backend, "worker-2")
+    calls = []
+
+    def find_by_uid(uid: str):
+        calls.append(uid)
+        return {"uid": uid}
+
+    find_1 = cached(cache=worker_1, lock=Lock())(find_by_uid)
+    find_2 = cached(cache=worker_2, lock=Lock())(find_by_uid)
+
+    assert find_1("uid_1") == {"uid": "uid_1"}
+    assert find_2("uid_1") == {"uid": "uid_1"}
+    assert find_1("uid_1") == {"uid": "uid_1"}
+    assert calls == ["uid_1"]
+
+    worker_2.evict("uid_1")
+    assert find_1("uid_1") == {"uid": "uid_1"}
+    assert calls == ["uid_1", "uid_1"]
+
+
+def test_create_cache_backend(monkeypatch):
+    assert create_cache_backend(None) is None
+    assert create_cache_backend("") is None
+    assert isinstance(create_cache_backend("local://"), LocalCacheBackend)
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached://localhost")
+
+    monkeypatch.setattr(cache_module, "_shared_backend_initialized", False)
+    monkeypatch.setattr(cache_module.config, "CACHE_SHARED_BACKEND_URL", "local://")
+    backend = cache_module.get_shared_cache_backend()
+    assert isinstance(backend, LocalCacheBackend)
+    assert cache_module.get_shared_cache_backend() is backend
+    monkeypatch.setattr(cache_module, "_shared_backend_initialized", False)
+    monkeypatch.setattr(cache_module, "_shared_backend", None)
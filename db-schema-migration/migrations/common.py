@@ -1,4 +1,5 @@
 import csv
+from collections import Counter
 
 from migrations.utils.utils import api_post, drop_indexes_and_constraints
 from neo4j_mdr_db.db_schema import build_schema_queries
@@ -40,3 +41,61 @@ def migrate_ct_config_values(db_connection, logger):
                 line["study_field_name"],
             )
             api_post(path="/configurations", payload=line)
+
+
+def migrate_protocol_soa_snapshots(
+    logger,
+    max_workers: int = 4,
+    batch_size: int = 10,
+    chunk_size: int = 50,
+    max_attempts: int = 3,
+):
+    """Saves the protocol SoA snapshots of all released study versions which have study activities but no snapshot.
+
+    The study versions are found and their snapshots built by the API, see `POST /studies/flowchart/snapshots`,
+    which is called for `chunk_size` study versions at a time to report the progress.
+    Study versions which fail are retried in the following calls, up to `max_attempts` times.
+    Saved snapshots are not built again, so a failed migration is resumed by running it again.
+    """
+    logger.info("Saving missing protocol SoA snapshots of released study versions...")
+    attempts = Counter()
+    saved = 0
+    failed = []
+    while True:
+        report = api_post(
+            path="/studies/flowchart/snapshots",
+            payload=None,
+            params={
+                "max_workers": max_workers,
+                "batch_size": batch_size,
+                # Study versions which failed too often are still returned, in place of others
+                "limit": chunk_size + len(failed),
+            },
+            ok_status_codes=frozenset({200}),
+            timeout=600,
+        ).json()
+        saved += report["succeeded"]
+        for item in report["items"]:
+            if not item["success"]:
+                version = (item["study_uid"], item["study_value_version"])
+                attempts[version] += 1
+                logger.warning(
+                    "Failed to save SoA snapshot of study %s version %s (attempt %d): %s",
+                    *version,
+                    attempts[version],
+                    item["error"],
+                )
+        logger.info(
+            "Saved %d SoA snapshots in %.1fs, %d saved in total, %d remaining",
+            report["succeeded"],
+            report["elapsed_seconds"],
+            saved,
+            report["remaining"],
+        )
+        failed = sorted(
+            version for version, nbr in attempts.items() if nbr >= max_attempts
+        )
+        if report["remaining"] <= len(failed) or report["processed"] == 0:
+            break
+
+    assert not failed, f"SoA snapshots of study versions {failed} could not be saved"
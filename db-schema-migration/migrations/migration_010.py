@@ -4,11 +4,14 @@ import asyncio
 import os
 
 from clinical_mdr_api.clinical_mdr_api.models.integrations.msgraph import GraphUser
-from migrations.common import migrate_ct_config_values, migrate_indexes_and_constraints
+from migrations.common import (
+    migrate_ct_config_values,
+    migrate_indexes_and_constraints,
+    migrate_protocol_soa_snapshots,
+)
 from migrations.utils import msgraph
+from migrations.utils.batched_migration import DRY_RUN, BatchedMigration
 from migrations.utils.utils import (
-    api_get,
-    api_post,
     get_db_connection,
     get_db_driver,
     get_logger,
@@ -26,6 +29,14 @@ SB_APP_REGISTRATION_ID = "fd909732-bc9e-492b-a1ed-6e27757a4f00"
 def main():
     logger.info("Running migration on DB '%s'", os.environ["DATABASE_NAME"])
 
+    if DRY_RUN:
+        # Only the batched steps support dry runs, the other steps would write for real
+        logger.warning(
+            "Dry run: only counting the rows of the batched steps, skipping the other steps"
+        )
+        migrate_unit_definition_properties(DB_DRIVER, logger)
+        return
+
     ### Common migrations
     migrate_indexes_and_constraints(DB_CONNECTION, logger)
     migrate_ct_config_values(DB_CONNECTION, logger)
@@ -34,7 +45,7 @@ def main():
     migrate_unit_definition_properties(DB_DRIVER, logger)
     migrate_preferred_time_unit(DB_DRIVER, logger)
     migrate_soa_preferred_time_unit(DB_DRIVER, logger)
-    save_protocol_soa_snapshot_for_locked_study_versions()
+    migrate_protocol_soa_snapshots(logger)
     migrate_unify_study_visit_window_units(DB_DRIVER, logger)
     migrate_study_selection_metadata_merge(DB_DRIVER, logger)
     migrate_user_initials_into_author_id_and_user_nodes(DB_DRIVER, logger)
@@ -42,14 +53,20 @@ def main():
 
 def migrate_unit_definition_properties(db_driver, log) -> list:
     contains_updates = []
+    migration = BatchedMigration(db_driver, MIGRATION_DESC)
 
     log.info(
         "Updating values of `UnitDefinitionValue.molecular_weight_conv_expon` from `null` to `false, `0` to `false` and `1` to `true`"
     )
-    _, summary = run_cypher_query(
-        db_driver,
-        """
+    summary = migration.run_step(
+        "unit_definition_molecular_weight_conv_expon_to_boolean",
+        match="""
         MATCH (u:UnitDefinitionValue)
+        WHERE (u.molecular_weight_conv_expon IS NULL AND u.use_molecular_weight IS NULL)
+            OR u.molecular_weight_conv_expon IN [0, 1]
+        """,
+        variables="u",
+        update="""
         SET u.molecular_weight_conv_expon = 
         CASE 
             WHEN u.molecular_weight_conv_expon IS NULL AND u.use_molecular_weight IS NULL THEN false
@@ -59,36 +76,40 @@ def migrate_unit_definition_properties(db_driver, log) -> list:
         END
         """,
     )
-    print_counters_table(summary.counters)
-    contains_updates.append(summary.counters.contains_updates)
+    contains_updates.append(summary is not None and summary.counters.contains_updates)
 
     log.info("Renaming `molecular_weight_conv_expon` to `use_molecular_weight`")
-    _, summary = run_cypher_query(
-        db_driver,
-        """
+    summary = migration.run_step(
+        "unit_definition_rename_molecular_weight_conv_expon",
+        match="""
         MATCH (u:UnitDefinitionValue)
         WHERE u.molecular_weight_conv_expon IS NOT NULL
+        """,
+        variables="u",
+        update="""
         SET u.use_molecular_weight = u.molecular_weight_conv_expon
         REMOVE u.molecular_weight_conv_expon
         """,
     )
-    print_counters_table(summary.counters)
-    contains_updates.append(summary.counters.contains_updates)
+    contains_updates.append(summary is not None and summary.counters.contains_updates)
 
     log.info(
         "Adding new `use_complex_unit_conversion` property to `UnitDefinitionValue`"
     )
-    _, summary = run_cypher_query(
-        db_driver,
-        """
+    summary = migration.run_step(
+        "unit_definition_add_use_complex_unit_conversion",
+        match="""
         MATCH (u:UnitDefinitionValue)
         WHERE u.use_complex_unit_conversion IS NULL
+        """,
+        variables="u",
+        update="""
         SET u.use_complex_unit_conversion = false
         """,
     )
-    print_counters_table(summary.counters)
-    contains_updates.append(summary.counters.contains_updates)
+    contains_updates.append(summary is not None and summary.counters.contains_updates)
 
+    migration.print_report()
     return contains_updates
 
 
@@ -469,115 +490,6 @@ def migrate_soa_preferred_time_unit(db_driver, log):
     return contains_updates
 
 
-def save_protocol_soa_snapshot_for_locked_study_versions():
-    """Update SoA snapshot for all locked versions of all studies"""
-
-    # get a list of studies
-    payload = api_get(
-        "/studies", params={"page_size": 1000, "total_count": True}
-    ).json()
-    assert payload["total"] <= 1000, "Pagination not implemented"
-    study_uids = {item["uid"] for item in payload["items"]}
-
-    for study_uid in study_uids:
-        # get study versions
-        payload = api_get(
-            f"/studies/{study_uid}/snapshot-history", params={"page_size": 1000}
-        ).json()
-
-        for study in payload["items"]:
-            study_status = study["current_metadata"]["version_metadata"]["study_status"]
-            study_version = study["current_metadata"]["version_metadata"][
-                "version_number"
-            ]
-
-            # on locked versions
-            if study_status != "LOCKED":
-                continue
-
-            # only if the study version has no study activites
-            if not _has_study_activity(study_uid, study_version):
-                logger.info(
-                    "Skipping study %s version %s has no study activities",
-                    study_uid,
-                    study_version,
-                )
-                continue
-
-            # only if the study version has no protocol SoA snapshot saved
-            if _has_protocol_soa_snapshot(study_uid, study_version):
-                logger.info(
-                    "Skipping study %s version %s already has protocol SoA snapshot",
-                    study_uid,
-                    study_version,
-                )
-                continue
-
-            # get protocol SoA before updating the snapshot
-            soa_before = api_get(
-                f"/studies/{study_uid}/flowchart",
-                params={
-                    "study_value_version": study_version,
-                    "detailed": False,
-                    "operational": False,
-                    "force_build": True,
-                },
-            ).json()
-
-            # update SoA snapshot of the specific study version
-            api_post(
-                f"/studies/{study_uid}/flowchart/snapshot",
-                params={"study_value_version": study_version},
-                payload=None,
-            )
-
-            # get SoA snapshot of the specific study version
-            soa_snapshot = api_get(
-                f"/studies/{study_uid}/flowchart/snapshot",
-                params={"study_value_version": study_version},
-            ).json()
-
-            assert (
-                soa_snapshot == soa_before
-            ), "protocol SoA snapshot does not match the inital SoA"
-
-            # get protocol SoA after updating the snapshot
-            # according to API code if protocol SoA of a locked study-version is requested,
-            # always returns the snapshot
-            soa_after = api_get(
-                f"/studies/{study_uid}/flowchart",
-                params={
-                    "study_value_version": study_version,
-                    "detailed": False,
-                    "operational": False,
-                },
-            ).json()
-
-            assert (
-                soa_after == soa_before
-            ), "protocol SoA snapshots do not match before and after the update"
-
-
-def _has_protocol_soa_snapshot(study_uid: str, study_version: str) -> bool:
-    """Check if the study version has protocol SoA snapshot saved"""
-    response = api_get(
-        f"/studies/{study_uid}/flowchart/snapshot",
-        params={"study_value_version": study_version},
-        check_ok_status=False,
-    )
-    assert response.status_code in {200, 404}, "Unexpected response status code"
-    return response.status_code == 200
-
-
-def _has_study_activity(study_uid: str, study_version: str) -> bool:
-    """Check if the study version has any study activities"""
-    activities = api_get(
-        f"/studies/{study_uid}/study-activities",
-        params={"study_value_version": study_version},
-    ).json()["items"]
-    return bool(len(activities))
-
-
 def migrate_unify_study_visit_window_units(db_driver, log):
     studies, _ = run_cypher_query(
         db_driver,
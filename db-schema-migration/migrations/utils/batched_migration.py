@@ -0,0 +1,172 @@
+"""Runner of data migration steps that update large numbers of nodes or relationships.
+
+A step is made of a `match` part, which selects the rows still to migrate,
+and of an `update` part, which is run on those rows in batches with `CALL { ... } IN TRANSACTIONS`,
+so that each batch is committed on its own instead of the whole step holding its locks and changes in memory.
+
+Completed steps are recorded in `MigrationCheckpoint` nodes and skipped when the migration is run again.
+As every committed batch is kept when a step fails, the `match` part must only select the rows
+which are not migrated yet (e.g. `WHERE n.new_property IS NULL`), so that running the step again
+resumes it from the first row left to migrate.
+"""
+
+import time
+from dataclasses import dataclass
+
+import neo4j
+
+from migrations.utils.utils import (
+    DATABASE_NAME,
+    get_logger,
+    load_env,
+    print_counters_table,
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_BATCH_SIZE = int(load_env("MIGRATION_BATCH_SIZE", "1000"))
+DRY_RUN = load_env("MIGRATION_DRY_RUN", "false").lower() == "true"
+
+
+@dataclass
+class StepReport:
+    name: str
+    status: str
+    rows: int = 0
+    seconds: float = 0.0
+
+
+def build_batched_query(
+    match: str,
+    variables: str,
+    update: str,
+    batch_size: int,
+    concurrency: int | None = None,
+) -> str:
+    """Returns the query running `update` on the rows of `match` in transactions of `batch_size` rows.
+    With `concurrency`, that many transactions are run in parallel, which needs Neo4j 5.21 or later
+    and is only safe when the batches do not update the same nodes or relationships."""
+    concurrent = f"{concurrency} CONCURRENT " if concurrency else ""
+    return f"""
+        {match.strip()}
+        CALL {{
+            WITH {variables}
+            {update.strip()}
+        }} IN {concurrent}TRANSACTIONS OF {batch_size} ROWS
+        RETURN count(*) AS rows
+    """
+
+
+class BatchedMigration:
+    """
+    Runs the batched steps of a migration and reports the time spent in each of them.
+
+    :param db_driver: driver of the database to migrate.
+    :param migration_desc: name of the migration, the checkpoints of its steps are stored under it.
+    :param batch_size: default number of rows committed per transaction.
+    :param dry_run: only count the rows each step would update, without changing any data.
+    """
+
+    def __init__(
+        self,
+        db_driver: neo4j.Driver,
+        migration_desc: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dry_run: bool = DRY_RUN,
+    ):
+        self.db_driver = db_driver
+        self.migration_desc = migration_desc
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.reports: list[StepReport] = []
+
+    def _run(
+        self, query, params=None
+    ) -> tuple[list[neo4j.Record], neo4j.ResultSummary]:
+        # `CALL { ... } IN TRANSACTIONS` can only be run in an auto-commit transaction
+        with self.db_driver.session(database=DATABASE_NAME) as session:
+            result = session.run(query, params)
+            records = list(result)
+            return records, result.consume()
+
+    def _is_completed(self, step: str) -> bool:
+        records, _ = self._run(
+            """
+            MATCH (checkpoint:MigrationCheckpoint {migration: $migration, step: $step})
+            RETURN checkpoint.completed_at IS NOT NULL AS completed
+            """,
+            {"migration": self.migration_desc, "step": step},
+        )
+        return bool(records) and records[0]["completed"]
+
+    def _complete(self, step: str, rows: int):
+        self._run(
+            """
+            MERGE (checkpoint:MigrationCheckpoint {migration: $migration, step: $step})
+            SET checkpoint.completed_at = datetime(), checkpoint.rows = $rows
+            """,
+            {"migration": self.migration_desc, "step": step, "rows": rows},
+        )
+
+    def run_step(
+        self,
+        step: str,
+        match: str,
+        variables: str,
+        update: str,
+        params: dict | None = None,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> neo4j.ResultSummary | None:
+        """
+        Runs the `update` part on the rows of the `match` part, in batches, unless the step was already completed.
+
+        :param step: name of the step, unique within the migration.
+        :param match: query part selecting the rows which are not migrated yet, without RETURN.
+        :param variables: comma separated variables of `match` which are used by `update`.
+        :param update: query part updating a single row.
+        :param params: parameters of the query.
+        :param batch_size: number of rows committed per transaction, defaults to the batch size of the migration.
+        :param concurrency: number of transactions run in parallel, see `build_batched_query`.
+        :return: the summary of the update, or None if the step was skipped or only counted.
+        """
+        start_time = time.time()
+        if self._is_completed(step):
+            logger.info("Skipping completed step '%s'", step)
+            self.reports.append(StepReport(step, "skipped"))
+            return None
+
+        if self.dry_run:
+            records, _ = self._run(f"{match.strip()} RETURN count(*) AS rows", params)
+            rows = records[0]["rows"]
+            logger.info("Dry run of step '%s': %i rows to migrate", step, rows)
+            self.reports.append(
+                StepReport(step, "dry run", rows, time.time() - start_time)
+            )
+            return None
+
+        logger.info("Running step '%s'", step)
+        records, summary = self._run(
+            build_batched_query(
+                match,
+                variables,
+                update,
+                batch_size or self.batch_size,
+                concurrency,
+            ),
+            params,
+        )
+        rows = records[0]["rows"]
+        print_counters_table(summary.counters)
+        self._complete(step, rows)
+        self.reports.append(StepReport(step, "done", rows, time.time() - start_time))
+        return summary
+
+    def print_report(self):
+        print(f"---- Migration steps: {self.migration_desc} ----")
+        print(f"{'Step':48}{'Status':^10}{'Rows':>10}{'Seconds':>10}")
+        for report in self.reports:
+            print(
+                f"{report.name:48}{report.status:^10}{report.rows:>10}{report.seconds:>10.1f}"
+            )
+        print("--------------------------------------------")
@@ -249,19 +249,25 @@ def api_get_paged(
     return all_data
 
 
-def api_post(path: str, payload: dict, params: Optional[Any] = None):
-    """Issues http POST request with specified payload.
+def api_post(
+    path: str,
+    payload: dict,
+    params: Optional[Any] = None,
+    ok_status_codes: frozenset[int] = frozenset({201, 204}),
+    timeout: int = 60,
+):
+    """Issues http POST request with specified payload,
+    asserts that http response status is one of {ok_status_codes}.
     Returns the response."""
     refresh_token()
     url = API_BASE_URL + path
     logger.info("POST %s %s", url, params)
     res = requests.post(
-        url, json=payload, params=params, timeout=60, headers=API_HEADERS
+        url, json=payload, params=params, timeout=timeout, headers=API_HEADERS
     )
-    assert res.status_code in {
-        201,
-        204,
-    }, f"Response status {res.status_code} is not in [201, 204]"
+    assert (
+        res.status_code in ok_status_codes
+    ), f"Response status {res.status_code} is not in {sorted(ok_status_codes)}"
     return res
 
 
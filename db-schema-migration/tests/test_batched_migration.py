@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+from migrations.utils.batched_migration import BatchedMigration, build_batched_query
+
+
+class FakeSession:
+    """Answers the checkpoint and count queries from `completed_steps` and `rows`."""
+
+    def __init__(self, queries, completed_steps, rows):
+        self.queries = queries
+        self.completed_steps = completed_steps
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def run(self, query, params=None):
+        self.queries.append(query)
+        result = MagicMock()
+        result.consume.return_value.counters.contains_updates = False
+        if "RETURN checkpoint" in query:
+            completed = params["step"] in self.completed_steps
+            result.__iter__.return_value = [{"completed": True}] if completed else []
+        elif "MERGE (checkpoint" in query:
+            self.completed_steps.add(params["step"])
+            result.__iter__.return_value = []
+        else:
+            result.__iter__.return_value = [{"rows": self.rows}]
+        return result
+
+
+def fake_driver(completed_steps=None, rows=3):
+    driver = MagicMock()
+    driver.queries = []
+    driver.completed_steps = completed_steps if completed_steps is not None else set()
+    driver.session.side_effect = lambda **_kwargs: FakeSession(
+        driver.queries, driver.completed_steps, rows
+    )
+    return driver
+
+
+def run_step(migration):
+    return migration.run_step(
+        "add_property",
+        match="MATCH (n:Node) WHERE n.property IS NULL",
+        variables="n",
+        update="SET n.property = true",
+    )
+
+
+def test_build_batched_query():
+    query = build_batched_query(
+        "MATCH (n:Node) WHERE n.property IS NULL",
+        "n",
+        "SET n.property = true",
+        batch_size=500,
+    )
+    assert " ".join(query.split()) == (
+        "MATCH (n:Node) WHERE n.property IS NULL"
+        " CALL { WITH n SET n.property = true } IN TRANSACTIONS OF 500 ROWS"
+        " RETURN count(*) AS rows"
+    )
+
+
+def test_build_batched_query_with_concurrency():
+    query = build_batched_query("MATCH (n)", "n", "DELETE n", 10, concurrency=4)
+    assert "IN 4 CONCURRENT TRANSACTIONS OF 10 ROWS" in query
+
+
+def test_run_step_records_completed_step():
+    driver = fake_driver()
+    migration = BatchedMigration(driver, "migration", batch_size=100, dry_run=False)
+
+    assert run_step(migration) is not None
+    assert "IN TRANSACTIONS OF 100 ROWS" in driver.queries[1]
+    assert driver.completed_steps == {"add_property"}
+    assert [
+        (report.name, report.status, report.rows) for report in migration.reports
+    ] == [("add_property", "done", 3)]
+
+
+def test_run_step_skips_completed_step():
+    driver = fake_driver(completed_steps={"add_property"})
+    migration = BatchedMigration(driver, "migration", dry_run=False)
+
+    assert run_step(migration) is None
+    assert len(driver.queries) == 1
+    assert migration.reports[0].status == "skipped"
+
+
+def test_run_step_dry_run_only_counts_rows():
+    driver = fake_driver(rows=42)
+    migration = BatchedMigration(driver, "migration", dry_run=True)
+
+    assert run_step(migration) is None
+    assert " ".join(driver.queries[1].split()) == (
+        "MATCH (n:Node) WHERE n.property IS NULL RETURN count(*) AS rows"
+    )
+    assert not driver.completed_steps
+    assert (migration.reports[0].status, migration.reports[0].rows) == ("dry run", 42)
@@ -0,0 +1,74 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from migrations import common
+from migrations.utils.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class FakeBackfillApi:
+    """Answers `POST /studies/flowchart/snapshots` for the study versions of `missing`,
+    failing for the versions of `broken` and saving the others."""
+
+    def __init__(self, missing, broken=()):
+        self.missing = list(missing)
+        self.broken = set(broken)
+        self.limits = []
+
+    def post(self, path, payload, params, ok_status_codes, timeout):
+        assert path == "/studies/flowchart/snapshots"
+        self.limits.append(params["limit"])
+        total = len(self.missing)
+        items = [
+            {
+                "study_uid": study_uid,
+                "study_value_version": version,
+                "success": (study_uid, version) not in self.broken,
+                "error": "broken" if (study_uid, version) in self.broken else None,
+            }
+            for study_uid, version in self.missing[: params["limit"]]
+        ]
+        succeeded = [item for item in items if item["success"]]
+        for item in succeeded:
+            self.missing.remove((item["study_uid"], item["study_value_version"]))
+        response = MagicMock()
+        response.json.return_value = {
+            "total": total,
+            "processed": len(items),
+            "succeeded": len(succeeded),
+            "failed": len(items) - len(succeeded),
+            "remaining": total - len(succeeded),
+            "elapsed_seconds": 0.1,
+            "items": items,
+        }
+        return response
+
+
+def migrate(api, **kwargs):
+    with patch.object(common, "api_post", api.post):
+        common.migrate_protocol_soa_snapshots(logger, **kwargs)
+
+
+def test_migrate_protocol_soa_snapshots_in_chunks():
+    api = FakeBackfillApi([(f"Study_{i}", "1") for i in range(5)])
+
+    migrate(api, chunk_size=2)
+
+    assert not api.missing
+    assert api.limits == [2, 2, 2]
+
+
+def test_migrate_protocol_soa_snapshots_retries_failed_versions():
+    api = FakeBackfillApi(
+        [(f"Study_{i}", "1") for i in range(1, 5)],
+        broken={("Study_1", "1")},
+    )
+
+    with pytest.raises(AssertionError, match="Study_1"):
+        migrate(api, chunk_size=2, max_attempts=2)
+
+    assert api.missing == [("Study_1", "1")]
+    # the broken version takes a place in the chunk once it failed too often
+    assert api.limits == [2, 2, 3]
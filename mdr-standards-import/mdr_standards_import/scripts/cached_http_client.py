@@ -0,0 +1,147 @@
+"""
+HTTP client of the CDISC API downloads, with a local cache of the responses.
+
+The response bodies are stored under the SHA-256 of their content, and an index maps each URL
+to its body and to the ETag and Last-Modified headers of its response.
+Requests of cached URLs are conditional, so unchanged resources are not downloaded again,
+and a cached body is only used while its content still matches its hash.
+Files are written to a temporary file and then renamed, so that an interrupted download
+never leaves a partial file behind.
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os import replace
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def write_file_atomically(file_path, content: bytes):
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(
+        dir=file_path.parent, prefix=f".{file_path.name}.", delete=False
+    ) as tmp_file:
+        tmp_file.write(content)
+    replace(tmp_file.name, file_path)
+
+
+class CachedHttpClient:
+    """
+    Thread safe client for GET requests, each thread uses its own HTTP session.
+
+    :param headers: headers sent with every request, e.g. the API key.
+    :param cache_directory: directory of the cache, created on the first download.
+    :param max_workers: number of requests that `map` runs in parallel.
+    :param retries: number of retries of failed connections and 429/5xx responses.
+    """
+
+    def __init__(
+        self,
+        headers: dict,
+        cache_directory: str,
+        max_workers: int = 4,
+        retries: int = 3,
+    ):
+        self.headers = headers
+        self.cache_directory = Path(cache_directory)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.stats = {"downloaded": 0, "not_modified": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                max_retries=Retry(
+                    total=self.retries,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                )
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def _index_path(self, url: str) -> Path:
+        return (
+            self.cache_directory
+            / "index"
+            / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+        )
+
+    def _object_path(self, digest: str) -> Path:
+        return self.cache_directory / "objects" / digest[:2] / digest
+
+    def _read_cache(self, url: str):
+        """Returns the index entry and the body cached for the url, or (None, None) if missing or corrupted."""
+        try:
+            entry = json.loads(self._index_path(url).read_text())
+            content = self._object_path(entry["sha256"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None, None
+        if hashlib.sha256(content).hexdigest() != entry["sha256"]:
+            return None, None
+        return entry, content
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, url: str) -> bytes:
+        """Returns the body of the response, from the cache if the resource has not been modified."""
+        entry, content = self._read_cache(url)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self._count("not_modified")
+            return content
+        response.raise_for_status()
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            write_file_atomically(object_path, content)
+        write_file_atomically(
+            self._index_path(url),
+            json.dumps(
+                {
+                    "url": url,
+                    "sha256": digest,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+            ).encode(),
+        )
+        self._count("downloaded")
+        return content
+
+    def get_json(self, url: str):
+        return json.loads(self.get(url))
+
+    def map(self, function, items) -> list:
+        """Calls the function with each item on a pool of `max_workers` threads, and returns the results in order."""
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(function, items))
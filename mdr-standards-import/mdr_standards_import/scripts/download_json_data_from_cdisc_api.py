@@ -1,12 +1,15 @@
 import json
 from typing import Sequence
-import requests
 from requests.exceptions import HTTPError
 from os import listdir
 from os import environ
 from os import mkdir
 from os import path
 from pathlib import Path
+from mdr_standards_import.scripts.cached_http_client import (
+    CachedHttpClient,
+    write_file_atomically,
+)
 from mdr_standards_import.scripts.entities.cdisc_ct.package import Package
 from mdr_standards_import.scripts.entities.cdisc_ct.ct_import import CTImport
 from mdr_standards_import.scripts.entities.cdisc_data_models.version import Version
@@ -17,6 +20,7 @@ from mdr_standards_import.scripts.entities.cdisc_data_models.data_model_type imp
     DataModelType,
 )
 from mdr_standards_import.scripts.utils import (
+    CDISC_DIR,
     get_cdisc_neo4j_driver,
     is_newer_than,
     get_classes_directory_name,
@@ -28,6 +32,22 @@ CDISC_IMPORT_DATABASE = environ.get("NEO4J_CDISC_IMPORT_DATABASE", "cdisc")
 AUTH_TOKEN = environ.get("CDISC_AUTH_TOKEN")
 HEADERS = {"api-key": AUTH_TOKEN, "Accept": "application/json"}
 BASE_URL = environ.get("CDISC_BASE_URL")
+# Responses of the API are cached, so that only modified resources are downloaded again
+CDISC_API_CLIENT = CachedHttpClient(
+    headers=HEADERS,
+    cache_directory=environ.get(
+        "CDISC_API_CACHE_DIR", path.join(CDISC_DIR, ".cdisc_api_cache")
+    ),
+    max_workers=int(environ.get("CDISC_API_MAX_WORKERS", 4)),
+)
+
+
+def _get_json(href: str):
+    return CDISC_API_CLIENT.get_json(BASE_URL + href)
+
+
+def _write_json_file(file_path: str, data):
+    write_file_atomically(file_path, (json.dumps(data) + "\n").encode())
 
 
 def download_newer_packages_than(last_effective_date: str, to_directory: str):
@@ -97,10 +117,9 @@ def get_available_packages_meta_data_from_api() -> json:
         }
     }
     """
-    response = requests.get(BASE_URL + "/mdr/ct/packages", headers=HEADERS)
-    response.raise_for_status()
-    print(json.dumps(response.json(), indent=2))
-    return response.json()
+    packages = _get_json("/mdr/ct/packages")
+    print(json.dumps(packages, indent=2))
+    return packages
 
 
 def download_packages_data(packages_to_download: Sequence[Package], to_directory: str):
@@ -123,9 +142,10 @@ def download_packages_data(packages_to_download: Sequence[Package], to_directory
             if path.splitext(x)[1] == ".json"
         ]
     )
-    step = 1
     number_of_packages = len(packages_to_download)
-    for package in packages_to_download:
+
+    def download_package(step_and_package):
+        step, package = step_and_package
         package_id = (
             package.catalogue_name + "-" + package.get_ct_import().effective_date
         )
@@ -138,19 +158,20 @@ def download_packages_data(packages_to_download: Sequence[Package], to_directory
                 f"  Step: {step}/{number_of_packages} - Downloading package '{package_id}'."
             )
             try:
-                response = requests.get(BASE_URL + package.href, headers=HEADERS)
-                response.raise_for_status()
-                package_data = response.json()
+                package_data = _get_json(package.href)
             except HTTPError as http_err:
                 print(f"    HTTP error occurred: {http_err}")
             except Exception as err:
                 print(f"    Other error occurred: {err}")
             else:
                 filename = package_id.split("/")[-1].lower() + ".json"
-                with open(path.join(to_directory, filename), "w") as ctpkg_file:
-                    ctpkg_file.write(json.dumps(package_data))
-                    ctpkg_file.write("\n")
-        step += 1
+                _write_json_file(path.join(to_directory, filename), package_data)
+
+    CDISC_API_CLIENT.map(download_package, enumerate(packages_to_download, start=1))
+    print(
+        f"Downloaded {CDISC_API_CLIENT.stats['downloaded']} responses, "
+        f"{CDISC_API_CLIENT.stats['not_modified']} were not modified."
+    )
 
 
 def get_available_model_versions_meta_data_from_api() -> json:
@@ -188,9 +209,7 @@ def get_available_model_versions_meta_data_from_api() -> json:
         Note : _links top level and self objects are removed before concatenating to prevent conflicts
     """
     # Get data tabulation (SDTM, SEND)
-    response = requests.get(BASE_URL + "/mdr/products/DataTabulation", headers=HEADERS)
-    response.raise_for_status()
-    data_tabulation = response.json()
+    data_tabulation = _get_json("/mdr/products/DataTabulation")
     if "self" in data_tabulation["_links"]:
         del data_tabulation["_links"]["self"]
 
@@ -305,19 +324,12 @@ def download_versions_data(
                 f"  Catalogue {catalogue} - Step: {step}/{number_of_versions} - Downloading version '{version_number}'."
             )
             try:
-                response = requests.get(BASE_URL + version.href, headers=HEADERS)
-                response.raise_for_status()
-                version_data = response.json()
+                version_data = _get_json(version.href)
             except HTTPError as http_err:
                 print(f"    HTTP error occurred: {http_err}")
             except Exception as err:
                 print(f"    Other error occurred: {err}")
             else:
-                filename = f"{version_number}.json"
-                with open(path.join(sub_directory, filename), "w") as version_file:
-                    version_file.write(json.dumps(version_data))
-                    version_file.write("\n")
-
                 url_suffix = _map_classes_or_datasets_url_suffix(
                     catalogue=catalogue, data_model_type=data_model_type
                 )
@@ -334,6 +346,9 @@ def download_versions_data(
                         version_number,
                     ),
                 )
+                # The version file is written last, so that an interrupted download is resumed
+                filename = f"{version_number}.json"
+                _write_json_file(path.join(sub_directory, filename), version_data)
         step += 1
 
 
@@ -347,10 +362,7 @@ def download_classes_data(base_version_href: str, suffix: str, to_directory: str
     """
     print(" * Downloading classes/datasets.")
     try:
-        classes_url = f"{BASE_URL}{base_version_href}/{suffix.lower()}"
-        response = requests.get(classes_url, headers=HEADERS)
-        response.raise_for_status()
-        classes_data = response.json()
+        classes_data = _get_json(f"{base_version_href}/{suffix.lower()}")
     except HTTPError as http_err:
         print(f"    HTTP error occurred: {http_err}")
     except Exception as err:
@@ -358,32 +370,35 @@ def download_classes_data(base_version_href: str, suffix: str, to_directory: str
     else:
         if suffix in classes_data["_links"]:
             classes = classes_data["_links"][suffix]
-            for _class in classes:
-                class_data = _download_element(
+            class_data_list = CDISC_API_CLIENT.map(
+                lambda _class: _download_element(
                     to_directory=to_directory, element_ref=_class
-                )
+                ),
+                classes,
+            )
 
-                if "scenarios" in class_data["_links"]:
-                    scenarios = class_data["_links"]["scenarios"]
-                    for _scenario in scenarios:
-                        _download_element(
-                            to_directory=path.join(to_directory, "scenarios"),
-                            element_ref=_scenario,
-                        )
+            scenarios = [
+                _scenario
+                for class_data in class_data_list
+                for _scenario in class_data["_links"].get("scenarios", [])
+            ]
+            CDISC_API_CLIENT.map(
+                lambda _scenario: _download_element(
+                    to_directory=path.join(to_directory, "scenarios"),
+                    element_ref=_scenario,
+                ),
+                scenarios,
+            )
         else:
             print(f" -- No {suffix} found for version.")
 
 
 def _download_element(to_directory: str, element_ref: dict) -> dict:
     href = element_ref["href"]
-    response = requests.get(BASE_URL + href, headers=HEADERS)
-    response.raise_for_status()
-    download_data = response.json()
-    _file = Path(path.join(to_directory, f"{path.basename(href)}.json"))
-    _file.parent.mkdir(exist_ok=True, parents=True)
-    with open(_file, "w") as download_file:
-        download_file.write(json.dumps(download_data))
-        download_file.write("\n")
+    download_data = _get_json(href)
+    _write_json_file(
+        path.join(to_directory, f"{path.basename(href)}.json"), download_data
+    )
 
     return download_data
 
@@ -1,11 +1,16 @@
-
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from os import path
+from queue import Queue
 
 from mdr_standards_import.scripts.utils import (
+    get_cdisc_neo4j_driver,
     get_ordered_package_dates,
 )
 from mdr_standards_import.scripts.wrapper.cdisc_ct.wrapper_import_into_cdisc_db import (
-    wrapper_import_cdisc_ct_into_cdisc_db,
+    wrapper_import_cdisc_ct_package_into_cdisc_db,
 )
 from mdr_standards_import.scripts.wrapper.cdisc_ct.wrapper_import_from_cdisc_db_into_mdr import (
     wrapper_import_cdisc_ct_from_cdisc_db_into_mdr,
@@ -18,35 +23,131 @@ from mdr_standards_import.scripts.wrapper.cdisc_data_models.wrapper_import_from_
 )
 
 
+class StageMetrics:
+    """Number of items and time spent in each stage of the bulk import, shared by its threads."""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage: str):
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                items, seconds = self.stages.get(stage, (0, 0.0))
+                self.stages[stage] = (items + 1, seconds + time.time() - start_time)
+
+    def print_summary(self, elapsed_time: float):
+        print("============================================")
+        print("== Bulk import stages:")
+        for stage, (items, seconds) in self.stages.items():
+            print(
+                f"==   {stage:<28} {items:4} items {round(seconds, 1):8} seconds"
+                f" {round(seconds / items, 1):6} seconds/item"
+            )
+        print(f"== Duration: {round(elapsed_time, 1)} seconds")
+        print("============================================")
+
+
 def bulk_import(
-    author_id: str, json_data_directory: str = "", import_ct: bool = True, import_data_models: bool = True
+    author_id: str,
+    json_data_directory: str = "",
+    import_ct: bool = True,
+    import_data_models: bool = True,
 ):
-    # Import into CDISC db
-    # CDISC CT
-    if import_ct:
-        wrapper_import_cdisc_ct_into_cdisc_db(
-            author_id, path.join(json_data_directory, "cdisc_ct")
-        )
-
-    # CDISC Data models
-    if import_data_models:
-        wrapper_import_cdisc_data_models_into_cdisc_db(
-            author_id, path.join(json_data_directory, "cdisc_data_models")
-        )
-
-    # Import from CDISC db into MDR db
-    # CDISC CT
-    if import_ct:
-        package_dates = get_ordered_package_dates(
-            path.join(json_data_directory, "cdisc_ct")
-        )
-        for effective_date in package_dates:
-            wrapper_import_cdisc_ct_from_cdisc_db_into_mdr(
-                author_id=author_id, effective_date=effective_date
+    """
+    Imports the CDISC CT packages and the data models into the CDISC DB and from there into the MDR DB.
+
+    The CDISC CT packages are loaded into the CDISC DB by a worker, ahead of their import into the MDR DB,
+    which still happens one package after the other in effective date order.
+    The data models are loaded into the CDISC DB in parallel to the CDISC CT.
+    They are imported into the MDR DB after the CDISC CT, as their variables refer to CT terms.
+    """
+    start_time = time.time()
+    metrics = StageMetrics()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        if import_data_models:
+            data_models_staging = executor.submit(
+                _measured,
+                metrics,
+                "Data models into CDISC DB",
+                wrapper_import_cdisc_data_models_into_cdisc_db,
+                author_id,
+                path.join(json_data_directory, "cdisc_data_models"),
+            )
+
+        # CDISC CT
+        if import_ct:
+            _pipelined_ct_import(
+                executor, metrics, author_id, path.join(json_data_directory, "cdisc_ct")
             )
 
-    # CDISC Data models
-    if import_data_models:
-        wrapper_import_cdisc_data_models_from_cdisc_db_into_mdr(
-            author_id=author_id, json_data_directory=json_data_directory
-        )
+        # CDISC Data models
+        if import_data_models:
+            data_models_staging.result()
+            _measured(
+                metrics,
+                "Data models into MDR DB",
+                wrapper_import_cdisc_data_models_from_cdisc_db_into_mdr,
+                author_id=author_id,
+                json_data_directory=json_data_directory,
+            )
+
+    metrics.print_summary(time.time() - start_time)
+
+
+def _measured(metrics: StageMetrics, stage: str, function, *args, **kwargs):
+    with metrics.measure(stage):
+        return function(*args, **kwargs)
+
+
+def _pipelined_ct_import(
+    executor: ThreadPoolExecutor,
+    metrics: StageMetrics,
+    author_id: str,
+    ct_directory: str,
+):
+    package_dates = get_ordered_package_dates(ct_directory)
+    print(f"Found the following dates: {str(package_dates)}")
+    # Effective dates loaded into the CDISC DB, in order, followed by None
+    staged_dates = Queue()
+    stopped = threading.Event()
+
+    def stage_packages():
+        cdisc_neo4j_driver = get_cdisc_neo4j_driver()
+        try:
+            for effective_date in package_dates:
+                if stopped.is_set():
+                    break
+                _measured(
+                    metrics,
+                    "CT into CDISC DB",
+                    wrapper_import_cdisc_ct_package_into_cdisc_db,
+                    author_id,
+                    ct_directory,
+                    effective_date,
+                    cdisc_neo4j_driver,
+                )
+                staged_dates.put(effective_date)
+        finally:
+            staged_dates.put(None)
+            cdisc_neo4j_driver.close()
+
+    staging = executor.submit(stage_packages)
+    try:
+        while (effective_date := staged_dates.get()) is not None:
+            _measured(
+                metrics,
+                "CT into MDR DB",
+                wrapper_import_cdisc_ct_from_cdisc_db_into_mdr,
+                author_id=author_id,
+                effective_date=effective_date,
+            )
+    finally:
+        # Stops the staging of the next packages if the import into the MDR DB failed
+        stopped.set()
+    staging.result()
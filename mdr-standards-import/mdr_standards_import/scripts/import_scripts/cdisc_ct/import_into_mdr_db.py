@@ -1,5 +1,10 @@
 import time
 import re
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import batched
+from os import environ
+
 from mdr_standards_import.scripts.utils import (
     are_lists_equal,
     get_sentence_case_string,
@@ -9,6 +14,9 @@ from mdr_standards_import.scripts.utils import (
 
 AUTHOR_ID = "CDISC_IMPORT"
 
+# Number of codelists and terms written per transaction
+BATCH_SIZE = int(environ.get("CDISC_CT_IMPORT_BATCH_SIZE", 500))
+
 
 def print_ignored_stats(tx, effective_date):
     result = tx.run(
@@ -104,25 +112,47 @@ def get_codelists(tx, effective_date):
     return result.data()
 
 
-def merge_codelist_version_independent_data(tx, codelist_data):
+def batched_codelists(codelists_data, batch_size):
+    """Splits the codelists into batches of up to batch_size codelists and terms.
+    A codelist with more terms than batch_size makes a batch on its own."""
+    batch = []
+    size = 0
+    for codelist_data in codelists_data:
+        codelist_size = 1 + len(codelist_data.get("terms_data", []))
+        if batch and size + codelist_size > batch_size:
+            yield batch
+            batch = []
+            size = 0
+        batch.append(codelist_data)
+        size += codelist_size
+    if batch:
+        yield batch
+
+
+def merge_codelists_version_independent_data(tx, codelists_data):
     tx.run(
         """
         MERGE (library:Library{name: 'CDISC'})
-        WITH library, $codelist_data as data
+        WITH library
+        UNWIND $codelists_data as data
         MERGE (cl_root:CTCodelistRoot{uid: data.codelist.concept_id})
         MERGE (library)-[:CONTAINS_CODELIST]->(cl_root)
         MERGE (cl_root)-[:HAS_ATTRIBUTES_ROOT]->(:CTCodelistAttributesRoot)
         MERGE (cl_root)-[:HAS_NAME_ROOT]->(:CTCodelistNameRoot)
         """,
-        codelist_data=codelist_data,
-        author_id=AUTHOR_ID,
+        codelists_data=[
+            {"codelist": {"concept_id": data["codelist"]["concept_id"]}}
+            for data in codelists_data
+        ],
     )
 
 
-def merge_codelist_packages_version_independent_data(tx, codelist_data, effective_date):
+def merge_codelists_packages_version_independent_data(
+    tx, codelists_data, effective_date
+):
     tx.run(
         """
-        WITH $codelist_data as data
+        UNWIND $codelists_data as data
         MATCH (library:Library{name: 'CDISC'})-[:CONTAINS_CODELIST]->(cl_root:CTCodelistRoot{uid: data.codelist.concept_id})
 
         WITH library, data, cl_root
@@ -138,16 +168,22 @@ def merge_codelist_packages_version_independent_data(tx, codelist_data, effectiv
             MERGE (ct_package)-[:CONTAINS_CODELIST]->(package_codelist)
         )
         """,
-        codelist_data=codelist_data,
+        codelists_data=[
+            {
+                "codelist": {"concept_id": data["codelist"]["concept_id"]},
+                "packages": data["packages"],
+            }
+            for data in codelists_data
+        ],
         start_date=effective_date,
         author_id=AUTHOR_ID,
     )
 
 
-def merge_codelist_terms_version_independent_data(tx, codelist_data):
+def merge_codelists_terms_version_independent_data(tx, codelists_data):
     tx.run(
         """
-        WITH $codelist_data as data
+        UNWIND $codelists_data as data
         MATCH (library:Library{name: 'CDISC'})-[:CONTAINS_CODELIST]->(cl_root:CTCodelistRoot{uid: data.codelist.concept_id})
 
         WITH library, data, cl_root
@@ -165,96 +201,130 @@ def merge_codelist_terms_version_independent_data(tx, codelist_data):
             )
         )
         """,
-        codelist_data=codelist_data,
-        author_id=AUTHOR_ID,
+        codelists_data=[
+            {
+                "codelist": {"concept_id": data["codelist"]["concept_id"]},
+                "terms_data": [
+                    {
+                        "term": {
+                            "uid": term_data["term"]["uid"],
+                            "concept_id": term_data["term"]["concept_id"],
+                        },
+                        "packages": term_data["packages"],
+                    }
+                    for term_data in data["terms_data"]
+                ],
+            }
+            for data in codelists_data
+        ],
     )
 
 
 def update_has_term_and_had_term_relationships(tx, codelists_data, effective_date):
+    codelist_uids = [
+        codelist_data["codelist"]["concept_id"] for codelist_data in codelists_data
+    ]
+    result = tx.run(
+        """
+        UNWIND $codelist_uids AS codelist_uid
+        MATCH (:CTCodelistRoot{uid: codelist_uid})-[ht:HAS_TERM]->(term_root)
+        WHERE ht.start_date <= datetime($effective_date)
+        RETURN codelist_uid, collect(DISTINCT term_root.uid) AS uids
+        """,
+        codelist_uids=codelist_uids,
+        effective_date=effective_date,
+    )
+    active_term_uids = {
+        record["codelist_uid"]: set(record["uids"]) for record in result
+    }
+
+    result = tx.run(
+        """
+        UNWIND $codelist_uids AS codelist_uid
+        MATCH (:CTCodelistRoot{uid: codelist_uid})-[ht:HAD_TERM]->(term_root)
+        WHERE ht.start_date <= datetime($effective_date) AND ht.end_date > datetime($effective_date)
+        RETURN codelist_uid, collect(DISTINCT term_root.uid) AS uids
+        """,
+        codelist_uids=codelist_uids,
+        effective_date=effective_date,
+    )
+    retired_term_uids = {
+        record["codelist_uid"]: set(record["uids"]) for record in result
+    }
+
     nbr_added_terms = 0
     nbr_removed_terms = 0
     nbr_unchanged_terms = 0
-    for codelist_data in codelists_data:
-        codelist = codelist_data.get("codelist", None)
-
+    deactivations = []
+    additions = []
+    for codelist_uid, codelist_data in zip(codelist_uids, codelists_data):
         codelist_term_uids = [
             terms_data["term"]["uid"] for terms_data in codelist_data["terms_data"]
         ]
-
-        result = tx.run(
-            """
-            MATCH (:CTCodelistRoot{uid: $codelist_uid})-[ht:HAS_TERM]->(term_root)
-            WHERE ht.start_date <= datetime($effective_date)
-            RETURN DISTINCT term_root.uid AS uid, ht.start_date as start_date
-            """,
-            codelist_uid=codelist["concept_id"],
-            effective_date=effective_date,
-        )
-        matching_active_term_uids = list(result.value())
-
-        result = tx.run(
-            """
-            MATCH (:CTCodelistRoot{uid: $codelist_uid})-[ht:HAD_TERM]->(term_root)
-            WHERE ht.start_date <= datetime($effective_date) AND ht.end_date > datetime($effective_date)
-            RETURN DISTINCT term_root.uid AS uid
-            """,
-            codelist_uid=codelist["concept_id"],
-            effective_date=effective_date,
-        )
-        retired_term_uids = list(result.value())
+        matching_active_term_uids = active_term_uids.get(codelist_uid, set())
+        retired = retired_term_uids.get(codelist_uid, set())
 
         term_uids_to_deactivate = [
             term_uid
             for term_uid in matching_active_term_uids
-            if term_uid not in codelist_term_uids and term_uid not in retired_term_uids
+            if term_uid not in codelist_term_uids and term_uid not in retired
         ]
-
-        nbr_removed_terms += len(term_uids_to_deactivate)
-        tx.run(
-            """
-            MATCH (codelist_root:CTCodelistRoot{uid: $codelist_uid})-[has_term:HAS_TERM]->(term_root)
-            WHERE term_root.uid IN $term_uids_to_deactivate
-
-            CREATE (codelist_root)-[had_term:HAD_TERM]->(term_root)
-            SET
-                had_term.start_date = has_term.start_date,
-                had_term.end_date = datetime($end_date),
-                had_term.author_id = has_term.author_id
-            DELETE has_term
-            """,
-            end_date=effective_date,
-            codelist_uid=codelist["concept_id"],
-            term_uids_to_deactivate=term_uids_to_deactivate,
-        )
-
         term_uids_to_add = [
             term_uid
             for term_uid in codelist_term_uids
-            if term_uid not in matching_active_term_uids
-            and term_uid not in retired_term_uids
+            if term_uid not in matching_active_term_uids and term_uid not in retired
         ]
+        if term_uids_to_deactivate:
+            deactivations.append(
+                {"codelist_uid": codelist_uid, "term_uids": term_uids_to_deactivate}
+            )
+        if term_uids_to_add:
+            additions.append(
+                {
+                    "codelist_uid": codelist_uid,
+                    "term_uids": list(dict.fromkeys(term_uids_to_add)),
+                }
+            )
+        nbr_removed_terms += len(term_uids_to_deactivate)
         nbr_added_terms += len(term_uids_to_add)
-        tx.run(
-            """
-            MATCH (codelist_root:CTCodelistRoot{uid: $codelist_uid})
-            MATCH (term_root:CTTermRoot)
-            WHERE term_root.uid IN $new_term_uids
-
-            CREATE (codelist_root)-[:HAS_TERM{
-                start_date: datetime($start_date),
-                author_id: $author_id
-            }]->(term_root)
-            """,
-            start_date=effective_date,
-            codelist_uid=codelist["concept_id"],
-            new_term_uids=term_uids_to_add,
-            author_id=AUTHOR_ID,
-        )
         nbr_unchanged_terms += (
             len(codelist_term_uids)
             - len(term_uids_to_add)
             - len(term_uids_to_deactivate)
         )
+
+    tx.run(
+        """
+        UNWIND $deactivations AS deactivation
+        MATCH (codelist_root:CTCodelistRoot{uid: deactivation.codelist_uid})-[has_term:HAS_TERM]->(term_root)
+        WHERE term_root.uid IN deactivation.term_uids
+
+        CREATE (codelist_root)-[had_term:HAD_TERM]->(term_root)
+        SET
+            had_term.start_date = has_term.start_date,
+            had_term.end_date = datetime($end_date),
+            had_term.author_id = has_term.author_id
+        DELETE has_term
+        """,
+        end_date=effective_date,
+        deactivations=deactivations,
+    )
+    tx.run(
+        """
+        UNWIND $additions AS addition
+        MATCH (codelist_root:CTCodelistRoot{uid: addition.codelist_uid})
+        UNWIND addition.term_uids AS term_uid
+        MATCH (term_root:CTTermRoot{uid: term_uid})
+
+        CREATE (codelist_root)-[:HAS_TERM{
+            start_date: datetime($start_date),
+            author_id: $author_id
+        }]->(term_root)
+        """,
+        start_date=effective_date,
+        additions=additions,
+        author_id=AUTHOR_ID,
+    )
     # delete_contains_term_relationships(tx)
     return nbr_added_terms, nbr_removed_terms, nbr_unchanged_terms
 
@@ -525,40 +595,90 @@ def _fetch_all_codelists(tx, concept_ids, effective_date):
     return codelists
 
 
-def update_attributes(tx, codelists_data, effective_date):
-    new_terms = 0
-    updated_terms = 0
-    unchanged_terms = 0
+def _are_term_attribute_values_equal(a, b):
+    result = (
+        a.get("code_submission_value", None) == b.get("code_submission_value", None)
+        and a.get("name_submission_value", None) == b.get("name_submission_value", None)
+        and a.get("preferred_term", None) == b.get("preferred_term", None)
+        and a.get("definition", None) == b.get("definition", None)
+        and are_lists_equal(a.get("synonyms", None), b.get("synonyms", None))
+        and a.get("concept_id", None) == b.get("concept_id", None)
+    )
+    return result
+
+
+def _fetch_all_terms(tx, term_uids, effective_date):
+    query = """
+        MATCH (root:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]->(attr_root)-[:LATEST]->(t_attributes_value)
+        WHERE root.uid IN $term_uids
+        OPTIONAL MATCH (attr_root)-[hv:HAS_VERSION]->(t_attributes_value_for_date)
+        WHERE hv.end_date IS NOT NULL AND hv.start_date <= datetime($effective_date) AND hv.end_date > datetime($effective_date)
+        RETURN root.uid AS uid, t_attributes_value, t_attributes_value_for_date
+    """
+    result = tx.run(query, effective_date=effective_date, term_uids=term_uids)
+    terms = {}
+    for term in result:
+        terms[term["uid"]] = term
+    # print(f"got {len(terms)} terms")
+    return terms
+
 
-    new_codelists = 0
-    updated_codelists = 0
-    unchanged_codelists = 0
+def _fetch_in_batches(tx, fetch, uids, effective_date, batch_size):
+    records = {}
+    for batch in batched(uids, batch_size):
+        records.update(fetch(tx, list(batch), effective_date))
+    return records
+
+
+def plan_attribute_updates(tx, codelists_data, effective_date, batch_size):
+    """Compares the codelists and terms with their existing values, without writing anything.
+
+    Returns the summary of the changes and the rows to write, grouped in rounds.
+    Each round maps the name of a write function of ATTRIBUTE_WRITES to its rows.
+    Round n holds the n-th change of each term, so that a term shared by several codelists
+    ends up as if the codelists had been written one after the other.
+    """
+    summary = {
+        "new_codelists": 0,
+        "updated_codelists": 0,
+        "unchanged_codelists": 0,
+        "new_terms": 0,
+        "updated_terms": 0,
+        "unchanged_terms": 0,
+    }
+    rounds = []
+
+    def add_row(round_index, write, row):
+        while len(rounds) <= round_index:
+            rounds.append({write.__name__: [] for write in ATTRIBUTE_WRITES})
+        rounds[round_index][write.__name__].append(row)
 
     cl_concept_ids = [cl["codelist"]["concept_id"] for cl in codelists_data]
-    all_existing_codelists = _fetch_all_codelists(tx, cl_concept_ids, effective_date)
+    all_existing_codelists = _fetch_in_batches(
+        tx, _fetch_all_codelists, cl_concept_ids, effective_date, batch_size
+    )
     for codelist_data in codelists_data:
         codelist = codelist_data.get("codelist", None)
-        terms_data = codelist_data.get("terms_data", {})
         packages = codelist_data.get("packages", None)
+        row = {"codelist": codelist, "packages": packages}
 
         record = all_existing_codelists.get(codelist["concept_id"])
 
         if record is None:
-            create_initial_codelist_attributes_value(
-                tx, effective_date, codelist, packages
-            )
-            create_initial_codelist_name(
-                tx, codelist, codelist.get("name", None), "Initial import from CDISC"
+            add_row(0, create_initial_codelist_attributes_values, row)
+            add_row(
+                0,
+                create_initial_codelist_names,
+                {"uid": codelist["concept_id"], "name": codelist.get("name", None)},
             )
-            new_codelists += 1
+            summary["new_codelists"] += 1
         else:
             value = record["cl_attributes_value"]
             value_for_date = record["cl_attributes_value_for_date"]
 
             if value_for_date is not None:
                 if _are_attribute_values_equal(value_for_date, codelist):
-                    # print(f"Codelist {codelist['concept_id']} already has a version for {effective_date}, skipping")
-                    unchanged_codelists += 1
+                    summary["unchanged_codelists"] += 1
                 else:
                     print(codelist)
                     print(value_for_date)
@@ -567,46 +687,86 @@ def update_attributes(tx, codelists_data, effective_date):
                     )
 
             elif not _are_attribute_values_equal(value, codelist):
-                # if codelist["concept_id"] == "C100133":
-                #    print("create_new_version_codelist_attributes_value", effective_date, codelist, packages)
-                create_new_version_codelist_attributes_value(
-                    tx, effective_date, codelist, packages
-                )
-                updated_codelists += 1
+                add_row(0, create_new_version_codelist_attributes_values, row)
+                summary["updated_codelists"] += 1
             else:
-                use_existing_codelist_attributes_value(tx, codelist, packages)
-                unchanged_codelists += 1
-
-        new_t, upd_t, unch_t = merge_term_values(
-            tx, codelist, effective_date, terms_data
+                add_row(0, use_existing_codelist_attributes_values, row)
+                summary["unchanged_codelists"] += 1
+
+    term_uids = list(
+        dict.fromkeys(
+            term_data["term"]["uid"]
+            for codelist_data in codelists_data
+            for term_data in codelist_data.get("terms_data", [])
         )
-        new_terms += new_t
-        updated_terms += upd_t
-        unchanged_terms += unch_t
-    return {
-        "new_codelists": new_codelists,
-        "updated_codelists": updated_codelists,
-        "unchanged_codelists": unchanged_codelists,
-        "new_terms": new_terms,
-        "updated_terms": updated_terms,
-        "unchanged_terms": unchanged_terms,
+    )
+    existing_terms = {
+        uid: {
+            "value": record["t_attributes_value"],
+            "value_for_date": record["t_attributes_value_for_date"],
+        }
+        for uid, record in _fetch_in_batches(
+            tx, _fetch_all_terms, term_uids, effective_date, batch_size
+        ).items()
     }
+    nbr_term_changes = defaultdict(int)
+    for codelist_data in codelists_data:
+        codelist = codelist_data.get("codelist", None)
+        for term_data in codelist_data.get("terms_data", []):
+            term = term_data.get("term", None)
+            row = {"term": term, "packages": term_data.get("packages", None)}
+            round_index = nbr_term_changes[term["uid"]]
+
+            record = existing_terms.get(term["uid"])
+
+            if record is None:
+                name = sponsor_specific_parse_term_name(codelist, term)
+                add_row(round_index, create_initial_term_attributes_values, row)
+                add_row(
+                    round_index,
+                    create_initial_term_names,
+                    {
+                        "uid": term["uid"],
+                        "name": name,
+                        "name_sentence_case": get_sentence_case_string(name),
+                    },
+                )
+                existing_terms[term["uid"]] = {"value": term, "value_for_date": None}
+                summary["new_terms"] += 1
+            elif record["value_for_date"] is not None:
+                if _are_term_attribute_values_equal(record["value_for_date"], term):
+                    summary["unchanged_terms"] += 1
+                else:
+                    print(term)
+                    print(record["value_for_date"])
+                    raise RuntimeError(
+                        f"Oh my god! Term {term['concept_id']} already has a version for {effective_date} but the definition has changed!"
+                    )
+                continue
+            elif not _are_term_attribute_values_equal(record["value"], term):
+                add_row(round_index, create_new_version_term_attributes_values, row)
+                record["value"] = term
+                summary["updated_terms"] += 1
+            else:
+                add_row(round_index, use_existing_term_attributes_values, row)
+                summary["unchanged_terms"] += 1
+            nbr_term_changes[term["uid"]] += 1
+    return summary, rounds
 
 
-def create_initial_codelist_attributes_value(
-    tx, effective_date_string, codelist, packages
-):
+def create_initial_codelist_attributes_values(tx, rows, effective_date_string):
     tx.run(
         """
-        MATCH (:CTCodelistRoot{uid: $codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]->(cl_attributes_root)
+        UNWIND $rows AS row
+        MATCH (:CTCodelistRoot{uid: row.codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]->(cl_attributes_root)
         CREATE (cl_attributes_value: CTCodelistAttributesValue)
         SET
-            cl_attributes_value.name = $codelist.name,
-            cl_attributes_value.submission_value = $codelist.submission_value,
-            cl_attributes_value.preferred_term = $codelist.preferred_term,
-            cl_attributes_value.definition = $codelist.definition,
-            cl_attributes_value.extensible = coalesce(toBoolean($codelist.extensible), false),
-            cl_attributes_value.synonyms = $codelist.synonyms
+            cl_attributes_value.name = row.codelist.name,
+            cl_attributes_value.submission_value = row.codelist.submission_value,
+            cl_attributes_value.preferred_term = row.codelist.preferred_term,
+            cl_attributes_value.definition = row.codelist.definition,
+            cl_attributes_value.extensible = coalesce(toBoolean(row.codelist.extensible), false),
+            cl_attributes_value.synonyms = row.codelist.synonyms
         CREATE (cl_attributes_root)-[:LATEST]->(cl_attributes_value)
         CREATE (cl_attributes_root)-[:LATEST_FINAL]->(cl_attributes_value)
         CREATE (cl_attributes_root)-[:HAS_VERSION{
@@ -617,27 +777,27 @@ def create_initial_codelist_attributes_value(
             author_id: $author_id
         }]->(cl_attributes_value)
 
-        WITH cl_attributes_value
-        FOREACH (package IN $packages |
-            MERGE (package_codelist:CTPackageCodelist{uid: package.name + "_" + $codelist.concept_id})
+        WITH row, cl_attributes_value
+        FOREACH (package IN row.packages |
+            MERGE (package_codelist:CTPackageCodelist{uid: package.name + "_" + row.codelist.concept_id})
             CREATE (package_codelist)-[:CONTAINS_ATTRIBUTES]->(cl_attributes_value)
         )
         """,
         effective_date_string=effective_date_string,
-        codelist=codelist,
-        packages=packages,
+        rows=rows,
         author_id=AUTHOR_ID,
     )
 
 
-def create_initial_codelist_name(tx, codelist, name, change_description):
+def create_initial_codelist_names(tx, rows, _effective_date_string):
     tx.run(
         """
-        MATCH (codelist_root:CTCodelistRoot{uid: $codelist_uid})-[:HAS_NAME_ROOT]->(name_root)
+        UNWIND $rows AS row
+        MATCH (codelist_root:CTCodelistRoot{uid: row.uid})-[:HAS_NAME_ROOT]->(name_root)
         WHERE NOT (name_root)-[:LATEST]->()
         CREATE (name_root)-[:LATEST]->(name_value:CTCodelistNameValue)
         SET
-            name_value.name = $name
+            name_value.name = row.name
         CREATE (name_root)-[:LATEST_FINAL]->(name_value)
         CREATE (name_root)-[:HAS_VERSION{
             start_date: datetime(),
@@ -647,35 +807,36 @@ def create_initial_codelist_name(tx, codelist, name, change_description):
             author_id: $author_id
         }]->(name_value)
         """,
-        codelist_uid=codelist["concept_id"],
-        name=name,
+        rows=rows,
         author_id=AUTHOR_ID,
-        change_description=change_description,
+        change_description="Initial import from CDISC",
     ).consume()
 
 
-def create_new_version_codelist_attributes_value(
-    tx, effective_date_string, codelist, packages
-):
+def create_new_version_codelist_attributes_values(tx, rows, effective_date_string):
     tx.run(
         """
-        MATCH (:CTCodelistRoot{uid: $codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]
-            ->(cl_attributes_root)-[latest_final:LATEST_FINAL]->(cl_old_attributes_value)
-            <-[latest:LATEST]-(cl_attributes_root)
-        WITH cl_attributes_root, cl_old_attributes_value, latest, latest_final
-        MATCH (cl_attributes_root)-[has_version:HAS_VERSION]->(cl_old_attributes_value)
-        SET has_version.end_date = datetime($effective_date_string)
-        DELETE latest, latest_final
-
-        WITH cl_attributes_root, has_version.version AS version LIMIT 1
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTCodelistRoot{uid: row.codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]
+                ->(cl_attributes_root)-[latest_final:LATEST_FINAL]->(cl_old_attributes_value)
+                <-[latest:LATEST]-(cl_attributes_root)
+            WITH cl_attributes_root, cl_old_attributes_value, latest, latest_final
+            MATCH (cl_attributes_root)-[has_version:HAS_VERSION]->(cl_old_attributes_value)
+            SET has_version.end_date = datetime($effective_date_string)
+            DELETE latest, latest_final
+
+            WITH cl_attributes_root, has_version.version AS version LIMIT 1
+            RETURN cl_attributes_root, version
+        }
         CREATE (cl_new_attributes_value:CTCodelistAttributesValue)
         SET
-            cl_new_attributes_value.name = $codelist.name,
-            cl_new_attributes_value.submission_value = $codelist.submission_value,
-            cl_new_attributes_value.preferred_term = $codelist.preferred_term,
-            cl_new_attributes_value.definition = $codelist.definition,
-            cl_new_attributes_value.extensible = coalesce(toBoolean($codelist.extensible), false),
-            cl_new_attributes_value.synonyms = $codelist.synonyms
+            cl_new_attributes_value.name = row.codelist.name,
+            cl_new_attributes_value.submission_value = row.codelist.submission_value,
+            cl_new_attributes_value.preferred_term = row.codelist.preferred_term,
+            cl_new_attributes_value.definition = row.codelist.definition,
+            cl_new_attributes_value.extensible = coalesce(toBoolean(row.codelist.extensible), false),
+            cl_new_attributes_value.synonyms = row.codelist.synonyms
         CREATE (cl_attributes_root)-[:LATEST_FINAL]->(cl_new_attributes_value)
         CREATE (cl_attributes_root)-[:HAS_VERSION{
             start_date: datetime($effective_date_string),
@@ -686,121 +847,45 @@ def create_new_version_codelist_attributes_value(
         }]->(cl_new_attributes_value)
         CREATE (cl_attributes_root)-[:LATEST]->(cl_new_attributes_value)
 
-        WITH cl_new_attributes_value
-        FOREACH (package IN $packages |
-            MERGE (package_codelist:CTPackageCodelist{uid: package.name + "_" + $codelist.concept_id})
+        WITH row, cl_new_attributes_value
+        FOREACH (package IN row.packages |
+            MERGE (package_codelist:CTPackageCodelist{uid: package.name + "_" + row.codelist.concept_id})
             CREATE (package_codelist)-[:CONTAINS_ATTRIBUTES]->(cl_new_attributes_value)
         )
         """,
         effective_date_string=effective_date_string,
-        codelist=codelist,
-        packages=packages,
+        rows=rows,
         author_id=AUTHOR_ID,
     )
 
 
-def use_existing_codelist_attributes_value(tx, codelist, packages):
+def use_existing_codelist_attributes_values(tx, rows, _effective_date_string):
     tx.run(
         """
-        MATCH (:CTCodelistRoot{uid: $codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]->()-[:LATEST]->(cl_attributes_value)
-        WITH cl_attributes_value
-        UNWIND $packages AS package
-            MATCH (package_codelist:CTPackageCodelist{uid: package.name + "_" + $codelist.concept_id})
+        UNWIND $rows AS row
+        MATCH (:CTCodelistRoot{uid: row.codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]->()-[:LATEST]->(cl_attributes_value)
+        WITH row, cl_attributes_value
+        UNWIND row.packages AS package
+            MATCH (package_codelist:CTPackageCodelist{uid: package.name + "_" + row.codelist.concept_id})
             MERGE (package_codelist)-[:CONTAINS_ATTRIBUTES]->(cl_attributes_value)
         """,
-        codelist=codelist,
-        packages=packages,
+        rows=rows,
     )
 
 
-def _are_term_attribute_values_equal(a, b):
-    result = (
-        a.get("code_submission_value", None) == b.get("code_submission_value", None)
-        and a.get("name_submission_value", None) == b.get("name_submission_value", None)
-        and a.get("preferred_term", None) == b.get("preferred_term", None)
-        and a.get("definition", None) == b.get("definition", None)
-        and are_lists_equal(a.get("synonyms", None), b.get("synonyms", None))
-        and a.get("concept_id", None) == b.get("concept_id", None)
-    )
-    return result
-
-
-def _fetch_all_terms(tx, term_uids, effective_date):
-    query = """
-        MATCH (root:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]->(attr_root)-[:LATEST]->(t_attributes_value)
-        WHERE root.uid IN $term_uids
-        OPTIONAL MATCH (attr_root)-[hv:HAS_VERSION]->(t_attributes_value_for_date)
-        WHERE hv.end_date IS NOT NULL AND hv.start_date <= datetime($effective_date) AND hv.end_date > datetime($effective_date)
-        RETURN root.uid AS uid, t_attributes_value, t_attributes_value_for_date
-    """
-    result = tx.run(query, effective_date=effective_date, term_uids=term_uids)
-    terms = {}
-    for term in result:
-        terms[term["uid"]] = term
-    # print(f"got {len(terms)} terms")
-    return terms
-
-
-def merge_term_values(tx, codelist, effective_date_string, terms_data):
-    new_terms = 0
-    updated_terms = 0
-    unchanged_terms = 0
-    term_uids = [term["term"]["uid"] for term in terms_data]
-    all_existing_terms = _fetch_all_terms(tx, term_uids, effective_date_string)
-    for term_data in terms_data:
-        term = term_data.get("term", None)
-        packages = term_data.get("packages", None)
-
-        record = all_existing_terms.get(term["uid"])
-
-        if record is None:
-            create_initial_term_attributes_value(
-                tx, effective_date_string, term, packages
-            )
-            create_initial_term_names(
-                tx,
-                term,
-                sponsor_specific_parse_term_name(codelist, term),
-                "Initial import from CDISC",
-            )
-            new_terms += 1
-        else:
-            value = record["t_attributes_value"]
-            value_for_date = record["t_attributes_value_for_date"]
-
-            if value_for_date is not None:
-                if _are_term_attribute_values_equal(value_for_date, term):
-                    unchanged_terms += 1
-                else:
-                    print(term)
-                    print(value_for_date)
-                    raise RuntimeError(
-                        f"Oh my god! Term {term['concept_id']} already has a version for {effective_date_string} but the definition has changed!"
-                    )
-
-            elif not _are_term_attribute_values_equal(value, term):
-                create_new_version_term_attributes_value(
-                    tx, effective_date_string, term, packages
-                )
-                updated_terms += 1
-            else:
-                use_existing_term_attributes_value(tx, term, packages)
-                unchanged_terms += 1
-    return new_terms, updated_terms, unchanged_terms
-
-
-def create_initial_term_attributes_value(tx, effective_date_string, term, packages):
+def create_initial_term_attributes_values(tx, rows, effective_date_string):
     tx.run(
         """
-        MATCH (:CTTermRoot{uid: $term.uid})-[:HAS_ATTRIBUTES_ROOT]->(t_attributes_root)
+        UNWIND $rows AS row
+        MATCH (:CTTermRoot{uid: row.term.uid})-[:HAS_ATTRIBUTES_ROOT]->(t_attributes_root)
         CREATE (t_attributes_value: CTTermAttributesValue)
         SET
-            t_attributes_value.code_submission_value = $term.code_submission_value,
-            t_attributes_value.name_submission_value = $term.name_submission_value,
-            t_attributes_value.preferred_term = $term.preferred_term,
-            t_attributes_value.definition = $term.definition,
-            t_attributes_value.synonyms = $term.synonyms,
-            t_attributes_value.concept_id = $term.concept_id
+            t_attributes_value.code_submission_value = row.term.code_submission_value,
+            t_attributes_value.name_submission_value = row.term.name_submission_value,
+            t_attributes_value.preferred_term = row.term.preferred_term,
+            t_attributes_value.definition = row.term.definition,
+            t_attributes_value.synonyms = row.term.synonyms,
+            t_attributes_value.concept_id = row.term.concept_id
         CREATE (t_attributes_root)-[:LATEST]->(t_attributes_value)
         CREATE (t_attributes_root)-[:LATEST_FINAL]->(t_attributes_value)
         CREATE (t_attributes_root)-[:HAS_VERSION{
@@ -811,28 +896,28 @@ def create_initial_term_attributes_value(tx, effective_date_string, term, packag
             author_id: $author_id
         }]->(t_attributes_value)
 
-        WITH t_attributes_value
-        FOREACH (package IN $packages |
-            MERGE (package_term:CTPackageTerm{uid: package.name + "_" + $term.uid})
+        WITH row, t_attributes_value
+        FOREACH (package IN row.packages |
+            MERGE (package_term:CTPackageTerm{uid: package.name + "_" + row.term.uid})
             CREATE (package_term)-[:CONTAINS_ATTRIBUTES]->(t_attributes_value)
         )
         """,
         effective_date_string=effective_date_string,
-        term=term,
-        packages=packages,
+        rows=rows,
         author_id=AUTHOR_ID,
     )
 
 
-def create_initial_term_names(tx, term, name, change_description):
+def create_initial_term_names(tx, rows, _effective_date_string):
     tx.run(
         """
-        MATCH (term_root:CTTermRoot{uid: $term_uid})-[:HAS_NAME_ROOT]->(name_root)
+        UNWIND $rows AS row
+        MATCH (term_root:CTTermRoot{uid: row.uid})-[:HAS_NAME_ROOT]->(name_root)
         WHERE NOT (name_root)-[:LATEST]->()
         CREATE (name_root)-[:LATEST]->(name_value:CTTermNameValue)
         SET
-            name_value.name = $name,
-            name_value.name_sentence_case = $name_sentence_case
+            name_value.name = row.name,
+            name_value.name_sentence_case = row.name_sentence_case
         CREATE (name_root)-[:LATEST_FINAL]->(name_value)
         CREATE (name_root)-[:HAS_VERSION{
             start_date: datetime(),
@@ -842,34 +927,36 @@ def create_initial_term_names(tx, term, name, change_description):
             author_id: $author_id
         }]->(name_value)
         """,
-        term_uid=term["uid"],
-        name=name,
-        name_sentence_case=get_sentence_case_string(name),
+        rows=rows,
         author_id=AUTHOR_ID,
-        change_description=change_description,
+        change_description="Initial import from CDISC",
     ).consume()
 
 
-def create_new_version_term_attributes_value(tx, effective_date_string, term, packages):
+def create_new_version_term_attributes_values(tx, rows, effective_date_string):
     tx.run(
         """
-        MATCH (:CTTermRoot{uid: $term.uid})-[:HAS_ATTRIBUTES_ROOT]
-            ->(t_attributes_root)-[latest_final:LATEST_FINAL]->(t_old_attributes_value)
-            <-[latest:LATEST]-(t_attributes_root)
-        WITH t_attributes_root, t_old_attributes_value, latest, latest_final
-        MATCH (t_attributes_root)-[has_version:HAS_VERSION]->(t_old_attributes_value)
-        SET has_version.end_date = datetime($effective_date_string)
-        DELETE latest, latest_final
-
-        WITH t_attributes_root, has_version.version AS version LIMIT 1
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTTermRoot{uid: row.term.uid})-[:HAS_ATTRIBUTES_ROOT]
+                ->(t_attributes_root)-[latest_final:LATEST_FINAL]->(t_old_attributes_value)
+                <-[latest:LATEST]-(t_attributes_root)
+            WITH t_attributes_root, t_old_attributes_value, latest, latest_final
+            MATCH (t_attributes_root)-[has_version:HAS_VERSION]->(t_old_attributes_value)
+            SET has_version.end_date = datetime($effective_date_string)
+            DELETE latest, latest_final
+
+            WITH t_attributes_root, has_version.version AS version LIMIT 1
+            RETURN t_attributes_root, version
+        }
         CREATE (t_new_attributes_value:CTTermAttributesValue)
         SET
-            t_new_attributes_value.code_submission_value = $term.code_submission_value,
-            t_new_attributes_value.name_submission_value = $term.name_submission_value,
-            t_new_attributes_value.preferred_term = $term.preferred_term,
-            t_new_attributes_value.definition = $term.definition,
-            t_new_attributes_value.synonyms = $term.synonyms,
-            t_new_attributes_value.concept_id = $term.concept_id
+            t_new_attributes_value.code_submission_value = row.term.code_submission_value,
+            t_new_attributes_value.name_submission_value = row.term.name_submission_value,
+            t_new_attributes_value.preferred_term = row.term.preferred_term,
+            t_new_attributes_value.definition = row.term.definition,
+            t_new_attributes_value.synonyms = row.term.synonyms,
+            t_new_attributes_value.concept_id = row.term.concept_id
         CREATE (t_attributes_root)-[:LATEST_FINAL]->(t_new_attributes_value)
         CREATE (t_attributes_root)-[:HAS_VERSION{
             start_date: datetime($effective_date_string),
@@ -880,33 +967,45 @@ def create_new_version_term_attributes_value(tx, effective_date_string, term, pa
         }]->(t_new_attributes_value)
         CREATE (t_attributes_root)-[:LATEST]->(t_new_attributes_value)
 
-        WITH t_new_attributes_value
-        FOREACH (package IN $packages |
-            MERGE (package_term:CTPackageTerm{uid: package.name + "_" + $term.uid})
+        WITH row, t_new_attributes_value
+        FOREACH (package IN row.packages |
+            MERGE (package_term:CTPackageTerm{uid: package.name + "_" + row.term.uid})
             CREATE (package_term)-[:CONTAINS_ATTRIBUTES]->(t_new_attributes_value)
         )
         """,
         effective_date_string=effective_date_string,
-        term=term,
-        packages=packages,
+        rows=rows,
         author_id=AUTHOR_ID,
     )
 
 
-def use_existing_term_attributes_value(tx, term, packages):
+def use_existing_term_attributes_values(tx, rows, _effective_date_string):
     tx.run(
         """
-        MATCH (:CTTermRoot{uid: $term.uid})-[:HAS_ATTRIBUTES_ROOT]->()-[:LATEST]->(t_attributes_value)
-        WITH t_attributes_value
-        UNWIND $packages AS package
-            MATCH (package_term:CTPackageTerm{uid: package.name + "_" + $term.uid})
+        UNWIND $rows AS row
+        MATCH (:CTTermRoot{uid: row.term.uid})-[:HAS_ATTRIBUTES_ROOT]->()-[:LATEST]->(t_attributes_value)
+        WITH row, t_attributes_value
+        UNWIND row.packages AS package
+            MATCH (package_term:CTPackageTerm{uid: package.name + "_" + row.term.uid})
             MERGE (package_term)-[:CONTAINS_ATTRIBUTES]->(t_attributes_value)
         """,
-        term=term,
-        packages=packages,
+        rows=rows,
     )
 
 
+# Writes of the attributes phase, in the order they are applied within a round
+ATTRIBUTE_WRITES = (
+    create_initial_codelist_attributes_values,
+    create_initial_codelist_names,
+    create_new_version_codelist_attributes_values,
+    use_existing_codelist_attributes_values,
+    create_initial_term_attributes_values,
+    create_initial_term_names,
+    create_new_version_term_attributes_values,
+    use_existing_term_attributes_values,
+)
+
+
 ##########################################################################
 # Update this part of the code to apply sponsor-specific transformations #
 ##########################################################################
@@ -1050,6 +1149,14 @@ def sponsor_specific_parse_term_name(codelist, term):
     return newname
 
 
+@contextmanager
+def timed_phase(timings, name):
+    start_time = time.time()
+    yield
+    timings[name] = time.time() - start_time
+    print(f"==      Duration: {round(timings[name], 1)} seconds")
+
+
 def import_from_cdisc_db_into_mdr(
     effective_date,
     cdisc_ct_neo4j_driver,
@@ -1057,11 +1164,13 @@ def import_from_cdisc_db_into_mdr(
     mdr_neo4j_driver,
     mdr_db_name,
     author_id,
+    batch_size=BATCH_SIZE,
 ):
     global AUTHOR_ID
     AUTHOR_ID = author_id
 
     start_time = time.time()
+    timings = {}
 
     if effective_date is None:
         print("WARNING: No effective date specified. Not importing anything.")
@@ -1073,11 +1182,14 @@ def import_from_cdisc_db_into_mdr(
             tx.commit()
 
         # read from the CDISC DB
-        packages_data = session.read_transaction(get_packages, effective_date)
-        codelists_data = session.read_transaction(get_codelists, effective_date)
+        with timed_phase(timings, "Reading the CDISC DB"):
+            packages_data = session.read_transaction(get_packages, effective_date)
+            codelists_data = session.read_transaction(get_codelists, effective_date)
 
         session.close()
 
+    codelists_batches = list(batched_codelists(codelists_data, batch_size))
+
     with mdr_neo4j_driver.session(database=mdr_db_name) as session:
         # write to the clinical MDR db
 
@@ -1085,34 +1197,44 @@ def import_from_cdisc_db_into_mdr(
         # session.write_transaction(retire_codelists, packages_data, effective_date)
 
         print("==  * Merging structure nodes and relationships.")
-        session.write_transaction(
-            merge_catalogues_and_packages,
-            packages_data,
-            effective_date,
-        )
+        with timed_phase(timings, "Structure nodes"):
+            session.write_transaction(
+                merge_catalogues_and_packages,
+                packages_data,
+                effective_date,
+            )
         session.close()
     print("==  * Merging version independant codelist data.")
     with mdr_neo4j_driver.session(database=mdr_db_name) as session:
-        for data in codelists_data:
-            # This is split into three separate transactions to reduce ram footprint
-            session.write_transaction(
-                merge_codelist_version_independent_data,
-                data,
-            )
-            session.write_transaction(
-                merge_codelist_packages_version_independent_data, data, effective_date
-            )
-            session.write_transaction(
-                merge_codelist_terms_version_independent_data,
-                data,
-            )
+        with timed_phase(timings, "Version independent data"):
+            for batch in codelists_batches:
+                # This is split into three separate transactions to reduce ram footprint
+                session.write_transaction(
+                    merge_codelists_version_independent_data,
+                    batch,
+                )
+                session.write_transaction(
+                    merge_codelists_packages_version_independent_data,
+                    batch,
+                    effective_date,
+                )
+                session.write_transaction(
+                    merge_codelists_terms_version_independent_data,
+                    batch,
+                )
         session.close()
 
     with mdr_neo4j_driver.session(database=mdr_db_name) as session:
         print("==  * Updating HAS_TERM and HAD_TERM relationships.")
-        added_terms, removed_terms, unchanged_terms = session.write_transaction(
-            update_has_term_and_had_term_relationships, codelists_data, effective_date
-        )
+        added_terms = removed_terms = unchanged_terms = 0
+        with timed_phase(timings, "HAS_TERM and HAD_TERM relationships"):
+            for batch in codelists_batches:
+                added, removed, unchanged = session.write_transaction(
+                    update_has_term_and_had_term_relationships, batch, effective_date
+                )
+                added_terms += added
+                removed_terms += removed
+                unchanged_terms += unchanged
         print(f"==      Terms added to codelists:     {added_terms:6}")
         print(f"==      Terms removed from codelists: {removed_terms:6}")
         print(f"==      Unchanged terms in codelists: {unchanged_terms:6}")
@@ -1120,9 +1242,16 @@ def import_from_cdisc_db_into_mdr(
 
     with mdr_neo4j_driver.session(database=mdr_db_name) as session:
         print("==  * Updating attributes.")
-        summary = session.write_transaction(
-            update_attributes, codelists_data, effective_date
-        )
+        with timed_phase(timings, "Attributes"):
+            # All changes are planned before writing, so that a conflicting
+            # definition aborts the phase before anything is written
+            summary, rounds = session.read_transaction(
+                plan_attribute_updates, codelists_data, effective_date, batch_size
+            )
+            for writes in rounds:
+                for write in ATTRIBUTE_WRITES:
+                    for rows in batched(writes[write.__name__], batch_size):
+                        session.write_transaction(write, list(rows), effective_date)
         print(f"==      New codelists:       {summary['new_codelists']:6}")
         print(f"==      Updated codelists:   {summary['updated_codelists']:6}")
         print(f"==      Unchanged codelists: {summary['unchanged_codelists']:6}")
@@ -1134,5 +1263,7 @@ def import_from_cdisc_db_into_mdr(
 
     end_time = time.time()
     elapsed_time = end_time - start_time
+    for phase, duration in timings.items():
+        print(f"== {phase}: {round(duration, 1)} seconds")
     print(f"== Duration: {round(elapsed_time, 1)} seconds")
     print("============================================")
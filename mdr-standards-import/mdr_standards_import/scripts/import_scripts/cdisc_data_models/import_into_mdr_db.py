@@ -1,5 +1,9 @@
 import time
 import os
+import hashlib
+import json
+from collections import defaultdict
+from itertools import batched
 from typing import List
 import csv
 from mdr_standards_import.scripts.entities.cdisc_data_models.data_model_type import (
@@ -8,6 +12,7 @@ from mdr_standards_import.scripts.entities.cdisc_data_models.data_model_type imp
 from mdr_standards_import.scripts.utils import parse_ig_name, sanitize_string, load_env
 
 AUTHOR_ID = "CDISC_IMPORT"
+BATCH_SIZE = int(os.environ.get("CDISC_DATA_MODELS_IMPORT_BATCH_SIZE", 500))
 DATA_MODEL_ROOT_LABEL = "DataModelRoot"
 DATA_MODEL_VALUE_LABEL = "DataModelValue"
 DATA_MODEL_IG_ROOT_LABEL = "DataModelIGRoot"
@@ -463,7 +468,8 @@ def merge_data_model(tx, version_data):
         link_ig_with_data_model(tx, version_data)
 
 
-def _get_class_instances(tx, catalogue, data_model_type, uid):
+def _get_class_instances(tx, catalogue, data_model_type, uids):
+    """Returns the existing instances of the classes with the given uids, by uid."""
     class_root_label = ""
     version_to_class_rel_type = ""
     if data_model_type == DataModelType.FOUNDATIONAL.value:
@@ -474,36 +480,40 @@ def _get_class_instances(tx, catalogue, data_model_type, uid):
         version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
     result = tx.run(
         f"""
-                MATCH (:{class_root_label}{{uid: $uid}})-[:{CLASS_VERSION_REL_TYPE}]->(value)
+                MATCH (root:{class_root_label})-[:{CLASS_VERSION_REL_TYPE}]->(value)
                     <-[:{version_to_class_rel_type}]-(:DataModelVersion)<-[:CONTAINS_VERSION]-(catalogue:DataModelCatalogue {{name: $catalogue}})
-                RETURN DISTINCT value
+                WHERE root.uid IN $uids
+                RETURN root.uid AS uid, collect(DISTINCT value) AS instances
                 """,
-        uid=uid,
+        uids=uids,
         catalogue=catalogue,
     )
-    records = [record for record in result]
 
-    return records
+    return {record["uid"]: record["instances"] for record in result}
 
 
-def _get_scenario_instances(tx, catalogue, uid):
+def _get_scenario_instances(tx, catalogue, uids):
+    """Returns the existing instances of the scenarios with the given uids, by uid."""
     scenario_root_label = SCENARIO_ROOT_LABEL
     version_to_scenario_rel_type = VERSION_TO_SCENARIO_REL_TYPE
     result = tx.run(
         f"""
-                MATCH (:{scenario_root_label}{{uid: $uid}})-[:HAS_INSTANCE]->(instance)
+                MATCH (root:{scenario_root_label})-[:HAS_INSTANCE]->(instance)
                     <-[:{version_to_scenario_rel_type}]-(:DataModelVersion)<-[:CONTAINS_VERSION]-(catalogue:DataModelCatalogue {{name: $catalogue}})
-                RETURN DISTINCT instance
+                WHERE root.uid IN $uids
+                RETURN root.uid AS uid, collect(DISTINCT instance) AS instances
                 """,
-        uid=uid,
+        uids=uids,
         catalogue=catalogue,
     )
-    records = [record for record in result]
 
-    return records
+    return {record["uid"]: record["instances"] for record in result}
 
 
-def _get_variable_instances(tx, catalogue, data_model_type, parent_type, uid):
+def _get_variable_instances(tx, catalogue, data_model_type, parent_type, uids):
+    """Returns the existing instances of the variables with the given uids, by uid.
+    The instances of the variables of a scenario include the properties of their scenario implementation.
+    """
     model_root_label = ""
     model_value_label = ""
     class_value_label = ""
@@ -532,78 +542,164 @@ def _get_variable_instances(tx, catalogue, data_model_type, parent_type, uid):
 
     if parent_type == "class":
         query = f"""
-            MATCH (:{variable_root_label}{{uid: $uid}})-[:HAS_INSTANCE]->(instance)
+            MATCH (root:{variable_root_label})-[:HAS_INSTANCE]->(instance)
                 <-[:{version_to_variable_rel_type}]-(:DataModelVersion)<-[:CONTAINS_VERSION]-(catalogue:DataModelCatalogue {{name: $catalogue}})
-            RETURN DISTINCT instance
+            WHERE root.uid IN $uids
+            RETURN root.uid AS uid, collect(DISTINCT instance) AS instances
         """
     elif parent_type == "scenario":
         query = f"""
-            MATCH (:{variable_root_label}{{uid: $uid}})-[:HAS_INSTANCE]->(instance)
+            MATCH (root:{variable_root_label})-[:HAS_INSTANCE]->(instance)
                 <-[:{scenario_to_variable_rel_type}]-(scenario:{scenario_value_label})<-[:{class_to_scenario_rel_type}]-(:{class_value_label})
                 <--(:{model_value_label})<--(:{model_root_label})<--(catalogue:DataModelCatalogue {{name: $catalogue}})
+            WHERE root.uid IN $uids
             MATCH (scenario)<-[:{scenario_variable_to_scenario_rel_type}]-(impl:{scenario_variable_value_label})
                 <-[:{variable_to_scenario_variable_rel_type}]-(instance)
-            RETURN DISTINCT apoc.map.mergeList([{{id: id(instance)}}, instance{{.*}}, impl{{.*}}]) AS instance
+            RETURN root.uid AS uid, collect(DISTINCT apoc.map.mergeList([{{id: id(instance)}}, instance{{.*}}, impl{{.*}}])) AS instances
         """
     result = tx.run(
         query,
-        uid=uid,
+        uids=uids,
         catalogue=catalogue,
     )
-    records = [record for record in result]
 
-    return records
+    return {record["uid"]: record["instances"] for record in result}
+
+
+CLASS_CONTENT_PROPERTIES = ("title", "label", "description")
+SCENARIO_CONTENT_PROPERTIES = ("label",)
+VARIABLE_CONTENT_PROPERTIES = (
+    "title",
+    "label",
+    "description",
+    "role",
+    "notes",
+    "variable_c_code",
+    "usage_restrictions",
+    "examples",
+    "value_list",
+    "described_value_domain",
+    "role_description",
+    "simple_datatype",
+    "length",
+    "implementation_notes",
+    "mapping_instructions",
+    "prompt",
+    "question_text",
+    "completion_instructions",
+    "core",
+)
 
 
-def _get_reusable_class(existing_classes, target_class):
-    for _class in existing_classes:
-        value = _class["value"]
-        reusable_version_id = (
-            value.id if hasattr(value, "id") else value.get("id", None)
-        )
+def _content_hash(value, properties) -> str:
+    return hashlib.sha256(
+        json.dumps([value.get(p, None) for p in properties], default=str).encode()
+    ).hexdigest()
 
-        if (
-            value.get("title", None) != target_class.get("title", None)
-            or value.get("label", None) != target_class.get("label", None)
-            or value.get("description", None) != target_class.get("description", None)
-        ):
-            continue
-        else:
-            return reusable_version_id
-    return None
+
+def _index_by_content(instances_by_uid, properties):
+    """
+    Maps each uid to the ids of its instances by content hash.
+    An instance can be reused by an item of the same uid which has the same content,
+    the first one is kept when several instances have the same content.
+    """
+    index = {}
+    for uid, instances in instances_by_uid.items():
+        ids_by_hash = {}
+        for instance in instances:
+            ids_by_hash.setdefault(
+                _content_hash(instance, properties),
+                instance.id if hasattr(instance, "id") else instance.get("id", None),
+            )
+        index[uid] = ids_by_hash
+    return index
+
+
+def _rounds_by_uid(items, get_uid):
+    """
+    Splits the items in rounds, the n-th round holds the n-th item of each uid.
+    An item can then reuse an instance created in a previous round for another item with the same uid.
+    """
+    rounds = []
+    nbr_items_by_uid = defaultdict(int)
+    for item in items:
+        uid = get_uid(item)
+        if nbr_items_by_uid[uid] == len(rounds):
+            rounds.append([])
+        rounds[nbr_items_by_uid[uid]].append(item)
+        nbr_items_by_uid[uid] += 1
+    return rounds
+
+
+def _run_batched(tx, query, rows, **parameters):
+    for batch in batched(rows, BATCH_SIZE):
+        tx.run(query, rows=list(batch), **parameters).consume()
 
 
 def merge_classes(tx, version_data, classes_data):
     nbr_unchanged = 0
     nbr_updated = 0
     nbr_new = 0
-    for class_data in classes_data:
-        _class = class_data.get("class", None)
+    classes = [class_data.get("class", None) for class_data in classes_data]
 
-        records = _get_class_instances(
+    existing_instances = _index_by_content(
+        _get_class_instances(
             tx,
             catalogue=version_data["catalogue"],
             data_model_type=version_data["data_model_type"],
-            uid=_class["uid"],
-        )
-        if records:
-            reusable_version_id = _get_reusable_class(records, _class)
+            uids=[_class["uid"] for _class in classes],
+        ),
+        CLASS_CONTENT_PROPERTIES,
+    )
+    rounds = _rounds_by_uid(classes, lambda _class: _class["uid"])
+    for round_index, round_classes in enumerate(rounds):
+        new_classes = []
+        reused_classes = []
+        for _class in round_classes:
+            instances = existing_instances.get(_class["uid"])
+            if instances:
+                reusable_version_id = instances.get(
+                    _content_hash(_class, CLASS_CONTENT_PROPERTIES)
+                )
 
-            if reusable_version_id is None:
-                create_new_class_instance(tx, version_data=version_data, _class=_class)
-                nbr_updated += 1
+                if reusable_version_id is None:
+                    new_classes.append(_class)
+                    nbr_updated += 1
 
+                else:
+                    reused_classes.append(
+                        {
+                            "class_data": _class,
+                            "reusable_instance_id": reusable_version_id,
+                        }
+                    )
+                    nbr_unchanged += 1
             else:
-                use_existing_class_instance(
+                new_classes.append(_class)
+                nbr_new += 1
+
+        create_class_instances(tx, version_data=version_data, classes=new_classes)
+        use_existing_class_instances(tx, version_data=version_data, rows=reused_classes)
+        if version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
+            for _class in round_classes:
+                link_dataset_with_class(
                     tx,
-                    version_data=version_data,
-                    _class=_class,
-                    reusable_instance_id=reusable_version_id,
+                    _class,
+                    _prettify_version_number(version_data["version_number"]),
                 )
-                nbr_unchanged += 1
-        else:
-            create_initial_class_instance(tx, version_data=version_data, _class=_class)
-            nbr_new += 1
+
+        if new_classes and round_index < len(rounds) - 1:
+            existing_instances.update(
+                _index_by_content(
+                    _get_class_instances(
+                        tx,
+                        catalogue=version_data["catalogue"],
+                        data_model_type=version_data["data_model_type"],
+                        uids=[_class["uid"] for _class in new_classes],
+                    ),
+                    CLASS_CONTENT_PROPERTIES,
+                )
+            )
 
     for class_data in [
         c["class"]
@@ -621,156 +717,169 @@ def merge_classes(tx, version_data, classes_data):
     return nbr_new, nbr_updated, nbr_unchanged
 
 
-def _get_reusable_scenario(existing_scenarios, target_scenario):
-    for scenario in existing_scenarios:
-        instance = scenario["instance"]
-        reusable_version_id = (
-            instance.id if hasattr(instance, "id") else instance.get("id", None)
-        )
-        if instance.get("label", None) != target_scenario.get("label", None):
-            continue
-        else:
-            return reusable_version_id
-
-
 def merge_scenarios(tx, version_data, scenarios_data):
     nbr_unchanged = 0
     nbr_updated = 0
     nbr_new = 0
-    for scenario_data in scenarios_data:
-        scenario = scenario_data.get("scenario", None)
-        dataset_href = scenario_data.get("dataset_href", None)
 
-        records = _get_scenario_instances(
+    existing_instances = _index_by_content(
+        _get_scenario_instances(
             tx,
             catalogue=version_data["catalogue"],
-            uid=scenario["uid"],
-        )
-        if records:
-            reusable_instance_id = _get_reusable_scenario(records, scenario)
-            if reusable_instance_id is None:
-                create_new_scenario_instance(
-                    tx,
-                    version_data=version_data,
-                    scenario=scenario,
-                    dataset_href=dataset_href,
+            uids=[scenario_data["scenario"]["uid"] for scenario_data in scenarios_data],
+        ),
+        SCENARIO_CONTENT_PROPERTIES,
+    )
+    rounds = _rounds_by_uid(
+        scenarios_data, lambda scenario_data: scenario_data["scenario"]["uid"]
+    )
+    for round_index, round_scenarios in enumerate(rounds):
+        new_scenarios = []
+        reused_scenarios = []
+        for scenario_data in round_scenarios:
+            scenario = scenario_data.get("scenario", None)
+            row = {
+                "scenario_data": scenario,
+                "dataset_href": scenario_data.get("dataset_href", None),
+            }
+
+            instances = existing_instances.get(scenario["uid"])
+            if instances:
+                reusable_instance_id = instances.get(
+                    _content_hash(scenario, SCENARIO_CONTENT_PROPERTIES)
                 )
-                nbr_updated += 1
+                if reusable_instance_id is None:
+                    new_scenarios.append(row)
+                    nbr_updated += 1
+                else:
+                    reused_scenarios.append(
+                        {**row, "reusable_instance_id": reusable_instance_id}
+                    )
+                    nbr_unchanged += 1
             else:
-                use_existing_scenario_instance(
-                    tx,
-                    version_data=version_data,
-                    scenario=scenario,
-                    dataset_href=dataset_href,
-                    reusable_instance_id=reusable_instance_id,
+                new_scenarios.append(row)
+                nbr_new += 1
+
+        create_scenario_instances(tx, version_data=version_data, rows=new_scenarios)
+        use_existing_scenario_instances(
+            tx, version_data=version_data, rows=reused_scenarios
+        )
+
+        if new_scenarios and round_index < len(rounds) - 1:
+            existing_instances.update(
+                _index_by_content(
+                    _get_scenario_instances(
+                        tx,
+                        catalogue=version_data["catalogue"],
+                        uids=[row["scenario_data"]["uid"] for row in new_scenarios],
+                    ),
+                    SCENARIO_CONTENT_PROPERTIES,
                 )
-                nbr_unchanged += 1
-        else:
-            create_initial_scenario_instance(tx, version_data, scenario, dataset_href)
-            nbr_new += 1
+            )
 
     return nbr_new, nbr_updated, nbr_unchanged
 
 
-def _get_reusable_variable(existing_variables, target_variable):
-    for _variable in existing_variables:
-        value = _variable["instance"]
-        reusable_version_id = (
-            value.id if hasattr(value, "id") else value.get("id", None)
-        )
-        if (
-            value.get("title", None) != target_variable.get("title", None)
-            or value.get("label", None) != target_variable.get("label", None)
-            or value.get("description", None)
-            != target_variable.get("description", None)
-            or value.get("role", None) != target_variable.get("role", None)
-            or value.get("notes", None) != target_variable.get("notes", None)
-            or value.get("variable_c_code", None)
-            != target_variable.get("variable_c_code", None)
-            or value.get("usage_restrictions", None)
-            != target_variable.get("usage_restrictions", None)
-            or value.get("examples", None) != target_variable.get("examples", None)
-            or value.get("value_list", None) != target_variable.get("value_list", None)
-            or value.get("described_value_domain", None)
-            != target_variable.get("described_value_domain", None)
-            or value.get("role_description", None)
-            != target_variable.get("role_description", None)
-            or value.get("simple_datatype", None)
-            != target_variable.get("simple_datatype", None)
-            or value.get("length", None)
-            != target_variable.get("length", None)
-            or value.get("implementation_notes", None)
-            != target_variable.get("implementation_notes", None)
-            or value.get("mapping_instructions", None)
-            != target_variable.get("mapping_instructions", None)
-            or value.get("prompt", None) != target_variable.get("prompt", None)
-            or value.get("question_text", None)
-            != target_variable.get("question_text", None)
-            or value.get("completion_instructions", None)
-            != target_variable.get("completion_instructions", None)
-            or value.get("core", None) != target_variable.get("core", None)
-        ):
-            continue
-        else:
-            return reusable_version_id
-    return None
+def _get_variable_instances_by_parent_type(tx, version_data, variables_data):
+    """Returns the content index of the existing instances of the variables, by parent type and uid."""
+    index = {}
+    for parent_type in ("class", "scenario"):
+        uids = [
+            variable_data["variable"]["uid"]
+            for variable_data in variables_data
+            if variable_data.get("parent_type", None) == parent_type
+        ]
+        if uids:
+            index.update(
+                {
+                    (parent_type, uid): instances
+                    for uid, instances in _index_by_content(
+                        _get_variable_instances(
+                            tx,
+                            catalogue=version_data["catalogue"],
+                            data_model_type=version_data["data_model_type"],
+                            parent_type=parent_type,
+                            uids=list(dict.fromkeys(uids)),
+                        ),
+                        VARIABLE_CONTENT_PROPERTIES,
+                    ).items()
+                }
+            )
+    return index
 
 
 def merge_variables(tx, version_data, variables_data):
     nbr_unchanged = 0
     nbr_updated = 0
     nbr_new = 0
-    for variable_data in variables_data:
-        # First, iterate over all variables
-        # If this uid already has at least one instance
-        # Then either create a new one if some properties changed
-        # Or reuse the instance with same properties
-        # If there are no instances at all, create one for the first time
-        variable = variable_data.get("variable", None)
-        parent_href = variable_data.get("parent_href", None)
-        parent_type = variable_data.get("parent_type", None)
 
-        value_list_mappings = parse_value_list_mapping_file()
+    value_list_mappings = parse_value_list_mapping_file()
 
-        records = _get_variable_instances(
-            tx,
-            catalogue=version_data["catalogue"],
-            data_model_type=version_data["data_model_type"],
-            parent_type=parent_type,
-            uid=variable["uid"],
+    # First, iterate over all variables
+    # If this uid already has at least one instance
+    # Then either create a new one if some properties changed
+    # Or reuse the instance with same properties
+    # If there are no instances at all, create one for the first time
+    existing_instances = _get_variable_instances_by_parent_type(
+        tx, version_data, variables_data
+    )
+    rounds = _rounds_by_uid(
+        variables_data, lambda variable_data: variable_data["variable"]["uid"]
+    )
+    for round_index, round_variables in enumerate(rounds):
+        new_variables = []
+        reused_variables = []
+        for variable_data in round_variables:
+            variable = variable_data.get("variable", None)
+            parent_type = variable_data.get("parent_type", None)
+            row = {
+                "variable_data": variable,
+                "parent_href": variable_data.get("parent_href", None),
+                "parent_type": parent_type,
+            }
+
+            instances = existing_instances.get((parent_type, variable["uid"]))
+            if instances:
+                reusable_instance_id = instances.get(
+                    _content_hash(variable, VARIABLE_CONTENT_PROPERTIES)
+                )
+                if reusable_instance_id is None:
+                    new_variables.append(row)
+                    nbr_updated += 1
+                else:
+                    reused_variables.append(
+                        {**row, "instance_node_id": reusable_instance_id}
+                    )
+                    nbr_unchanged += 1
+            else:
+                new_variables.append(row)
+                nbr_new += 1
+
+        create_variable_instances(tx, version_data=version_data, rows=new_variables)
+        use_existing_variable_instances(
+            tx, version_data=version_data, rows=reused_variables
         )
-        if records:
-            reusable_instance_id = _get_reusable_variable(records, variable)
-            if reusable_instance_id is None:
-                create_new_variable_instance(
+        for row in new_variables:
+            if "value_list" in row["variable_data"]:
+                link_variable_with_value_terms(
                     tx,
                     version_data=version_data,
-                    variable=variable,
-                    parent_href=parent_href,
-                    parent_type=parent_type,
+                    variable=row["variable_data"],
+                    parent_href=row["parent_href"],
                     value_list_mappings=value_list_mappings,
                 )
-                nbr_updated += 1
-            else:
-                use_existing_variable_instance(
+
+        if new_variables and round_index < len(rounds) - 1:
+            existing_instances.update(
+                _get_variable_instances_by_parent_type(
                     tx,
-                    version_data=version_data,
-                    variable=variable,
-                    parent_href=parent_href,
-                    instance_node_id=reusable_instance_id,
-                    parent_type=parent_type,
+                    version_data,
+                    [
+                        {"variable": row["variable_data"], "parent_type": row["parent_type"]}
+                        for row in new_variables
+                    ],
                 )
-                nbr_unchanged += 1
-        else:
-            create_initial_variable_instance(
-                tx,
-                version_data=version_data,
-                variable=variable,
-                parent_href=parent_href,
-                parent_type=parent_type,
-                value_list_mappings=value_list_mappings,
             )
-            nbr_new += 1
 
     for variable_data in variables_data:
         # Iterate again over all variables to create the QUALIFIES_VARIABLES relationships
@@ -826,7 +935,8 @@ def parse_value_list_mapping_file() -> "dict[str, ValueListMapping]":
     return value_list_mappings
 
 
-def create_initial_class_instance(tx, version_data, _class):
+def create_class_instances(tx, version_data, classes):
+    """Creates a new instance of each class, whether it is the first one of the class or not."""
     model_value_label = ""
     class_root_label = ""
     class_value_label = ""
@@ -849,107 +959,46 @@ def create_initial_class_instance(tx, version_data, _class):
         version_to_model_rel_type = VERSION_TO_DATA_MODEL_IG_REL_TYPE
         version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
 
-    tx.run(
+    _run_batched(
+        tx,
         f"""
-            MATCH (root:{class_root_label}{{uid: $uid}})
+            UNWIND $rows AS class_data
+            MATCH (root:{class_root_label}{{uid: class_data.uid}})
             CREATE (instance: {class_value_label})
             SET
-               instance.title = $class_data.title,
-               instance.label = $class_data.label,
-               instance.description = $class_data.description
+               instance.title = class_data.title,
+               instance.label = class_data.label,
+               instance.description = class_data.description
             CREATE (root)-[:{CLASS_VERSION_REL_TYPE}]->(instance)
 
-            WITH instance
+            WITH class_data, instance
             MATCH (dmv:DataModelVersion {{href: $version_href}})-[{version_to_model_rel_type}]->(model_value:{model_value_label})
             MERGE (dmv)-[contains_class:{version_to_class_rel_type}]->(instance)
-            SET contains_class.href=$class_data.href
+            SET contains_class.href=class_data.href
             MERGE (model_value)-[has_class:{model_to_class_rel_type}]->(instance)
-            ON CREATE SET has_class.ordinal = $class_data.ordinal
+            ON CREATE SET has_class.ordinal = class_data.ordinal
 
-            WITH instance
+            WITH class_data, instance
             MATCH ()-[rel]->(prior_instance_node)<-[:{CLASS_VERSION_REL_TYPE}]-(prior_root_node)
-            WHERE rel.href=$class_data.prior_version AND (rel:{VERSION_TO_CLASS_REL_TYPE} OR rel:{VERSION_TO_DATASET_REL_TYPE})
-            CALL apoc.do.when($uid<>prior_root_node.uid,
+            WHERE rel.href=class_data.prior_version AND (rel:{VERSION_TO_CLASS_REL_TYPE} OR rel:{VERSION_TO_DATASET_REL_TYPE})
+            CALL apoc.do.when(class_data.uid<>prior_root_node.uid,
                 'WITH $instance AS instance, $prior_instance_node AS prior_instance_node MERGE (instance)<-[rep:REPLACED_BY]-(prior_instance_node) SET rep.catalogue=$catalogue, rep.version_number=$prefixed_version_number RETURN rep',
                 '',
-                {{prior_instance_node: prior_instance_node, instance: instance, catalogue: $class_data.catalogue, prefixed_version_number: $prefixed_version_number}}
-            )
-            YIELD value AS result
-            RETURN result
-        """,
-        uid=_class["uid"],
-        effective_date=version_data["effective_date"],
-        class_data=_class,
-        version_href=version_data["href"],
-        prefixed_version_number=prefixed_version_number,
-        author_id=AUTHOR_ID,
-    )
-
-    if version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
-        link_dataset_with_class(tx, _class, prefixed_version_number)
-
-
-def create_new_class_instance(tx, version_data, _class):
-    model_value_label = ""
-    class_value_label = ""
-    model_to_class_rel_type = ""
-    version_to_model_rel_type = ""
-    version_to_class_rel_type = ""
-    prefixed_version_number = _prettify_version_number(version_data["version_number"])
-    if version_data["data_model_type"] == DataModelType.FOUNDATIONAL.value:
-        model_value_label = DATA_MODEL_VALUE_LABEL
-        class_value_label = DATASET_CLASS_VALUE_LABEL
-        model_to_class_rel_type = CATALOGUE_TO_CLASS_ROOT_REL_TYPE
-        version_to_model_rel_type = VERSION_TO_DATA_MODEL_REL_TYPE
-        version_to_class_rel_type = VERSION_TO_CLASS_REL_TYPE
-    elif version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
-        model_value_label = DATA_MODEL_IG_VALUE_LABEL
-        class_value_label = DATASET_VALUE_LABEL
-        model_to_class_rel_type = CATALOGUE_TO_DATASET_ROOT_REL_TYPE
-        version_to_model_rel_type = VERSION_TO_DATA_MODEL_IG_REL_TYPE
-        version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
-
-    tx.run(
-        f"""
-            MATCH (root{{uid: $uid}})
-            CREATE (new_instance: {class_value_label})
-            SET
-               new_instance.title = $class_data.title,
-               new_instance.label = $class_data.label,
-               new_instance.description = $class_data.description
-            CREATE (root)-[:{CLASS_VERSION_REL_TYPE}]->(new_instance)
-
-            WITH new_instance
-            MATCH (dmv:DataModelVersion {{href: $version_href}})-[{version_to_model_rel_type}]->(model_value:{model_value_label})
-            MERGE (dmv)-[contains_class:{version_to_class_rel_type}]->(new_instance)
-            SET contains_class.href=$class_data.href
-            MERGE (model_value)-[has_class:{model_to_class_rel_type}]->(new_instance)
-            ON CREATE SET has_class.ordinal = $class_data.ordinal
-
-            WITH new_instance
-            MATCH ()-[rel]->(prior_instance_node)<-[:{CLASS_VERSION_REL_TYPE}]-(prior_root_node)
-            WHERE rel.href=$class_data.prior_version AND (rel:{VERSION_TO_CLASS_REL_TYPE} OR rel:{VERSION_TO_DATASET_REL_TYPE})
-            CALL apoc.do.when($uid<>prior_root_node.uid,
-                'WITH $new_instance AS new_instance, $prior_instance_node AS prior_instance_node MERGE (new_instance)<-[rep:REPLACED_BY]-(prior_instance_node) SET rep.catalogue=$catalogue, rep.version_number=$prefixed_version_number RETURN rep',
-                '',
-                {{prior_instance_node: prior_instance_node, new_instance: new_instance, catalogue: $class_data.catalogue, prefixed_version_number: $prefixed_version_number}}
+                {{prior_instance_node: prior_instance_node, instance: instance, catalogue: class_data.catalogue, prefixed_version_number: $prefixed_version_number}}
             )
             YIELD value AS result
             RETURN result
         """,
-        uid=_class["uid"],
+        classes,
         effective_date=version_data["effective_date"],
-        class_data=_class,
         version_href=version_data["href"],
         prefixed_version_number=prefixed_version_number,
         author_id=AUTHOR_ID,
     )
 
-    if version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
-        link_dataset_with_class(tx, _class, prefixed_version_number)
-
 
-def use_existing_class_instance(tx, version_data, _class, reusable_instance_id):
+def use_existing_class_instances(tx, version_data, rows):
+    """Links the given existing instances to the version, each row holds the class_data and its reusable_instance_id."""
     model_value_label = ""
     model_to_class_rel_type = ""
     version_to_model_rel_type = ""
@@ -965,39 +1014,38 @@ def use_existing_class_instance(tx, version_data, _class, reusable_instance_id):
         model_to_class_rel_type = CATALOGUE_TO_DATASET_ROOT_REL_TYPE
         version_to_model_rel_type = VERSION_TO_DATA_MODEL_IG_REL_TYPE
         version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
-    tx.run(
+    _run_batched(
+        tx,
         f"""
+            UNWIND $rows AS row
+            WITH row.class_data AS class_data, row.reusable_instance_id AS reusable_instance_id
             MATCH (instance)
-            WHERE id(instance)=$reusable_instance_id
+            WHERE id(instance)=reusable_instance_id
             MATCH (dmv:DataModelVersion {{href: $version_href}})-[{version_to_model_rel_type}]->(model_value:{model_value_label})
             MERGE (dmv)-[contains_class:{version_to_class_rel_type}]->(instance)
-            SET contains_class.href=$class_data.href
+            SET contains_class.href=class_data.href
             MERGE (model_value)-[has_class:{model_to_class_rel_type}]->(instance)
-            ON CREATE SET has_class.ordinal = $class_data.ordinal
+            ON CREATE SET has_class.ordinal = class_data.ordinal
 
-            WITH instance
+            WITH class_data, instance
             MATCH ()-[rel]->(prior_instance_node)<-[:{CLASS_VERSION_REL_TYPE}]-(prior_root_node)
-            WHERE rel.href=$class_data.prior_version AND (rel:{VERSION_TO_CLASS_REL_TYPE} OR rel:{VERSION_TO_DATASET_REL_TYPE})
-            CALL apoc.do.when($uid<>prior_root_node.uid,
+            WHERE rel.href=class_data.prior_version AND (rel:{VERSION_TO_CLASS_REL_TYPE} OR rel:{VERSION_TO_DATASET_REL_TYPE})
+            CALL apoc.do.when(class_data.uid<>prior_root_node.uid,
                 'WITH $instance AS instance, $prior_instance_node AS prior_instance_node MERGE (instance)<-[rep:REPLACED_BY]-(prior_instance_node) SET rep.catalogue=$catalogue, rep.version_number=$prefixed_version_number RETURN rep',
                 '',
-                {{prior_instance_node: prior_instance_node, instance: instance, catalogue: $class_data.catalogue, prefixed_version_number: $prefixed_version_number}}
+                {{prior_instance_node: prior_instance_node, instance: instance, catalogue: class_data.catalogue, prefixed_version_number: $prefixed_version_number}}
             )
             YIELD value AS result
             RETURN result
         """,
-        uid=_class["uid"],
-        reusable_instance_id=reusable_instance_id,
-        class_data=_class,
+        rows,
         version_href=version_data["href"],
         prefixed_version_number=prefixed_version_number,
     )
 
-    if version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
-        link_dataset_with_class(tx, _class, prefixed_version_number)
-
 
-def create_initial_scenario_instance(tx, version_data, scenario, dataset_href):
+def create_scenario_instances(tx, version_data, rows):
+    """Creates a new instance of each scenario, each row holds the scenario_data and its dataset_href."""
     prefixed_version_number = _prettify_version_number(version_data["version_number"])
     class_value_label = ""
     scenario_root_label = SCENARIO_ROOT_LABEL
@@ -1012,35 +1060,36 @@ def create_initial_scenario_instance(tx, version_data, scenario, dataset_href):
         class_value_label = DATASET_VALUE_LABEL
         version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
 
-    tx.run(
+    _run_batched(
+        tx,
         f"""
-            MATCH (root:{scenario_root_label}{{uid: $uid}})
+            UNWIND $rows AS row
+            WITH row.scenario_data AS scenario_data, row.dataset_href AS dataset_href
+            MATCH (root:{scenario_root_label}{{uid: scenario_data.uid}})
             CREATE (instance:{scenario_value_label})
             SET
-               instance.label = $scenario_data.label
+               instance.label = scenario_data.label
             CREATE (root)-[:{SCENARIO_VERSION_REL_TYPE}]->(instance)
 
-            WITH instance
+            WITH scenario_data, dataset_href, instance
             MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{version_to_class_rel_type}]->(class_value:{class_value_label})
-                WHERE rel.href=$dataset_href
-            MERGE (dmv)-[contains_scenario:{version_to_scenario_rel_type} {{href: $scenario_data.href}}]->(instance)
+                WHERE rel.href=dataset_href
+            MERGE (dmv)-[contains_scenario:{version_to_scenario_rel_type} {{href: scenario_data.href}}]->(instance)
             MERGE (class_value)-[has_scenario:{class_to_scenario_rel_type}]->(instance)
-            SET contains_scenario.href=$scenario_data.href, has_scenario.ordinal = $scenario_data.ordinal, has_scenario.version_number = $prefixed_version_number
+            SET contains_scenario.href=scenario_data.href, has_scenario.ordinal = scenario_data.ordinal, has_scenario.version_number = $prefixed_version_number
         """,
-        uid=scenario["uid"],
+        rows,
         effective_date=version_data["effective_date"],
         prefixed_version_number=prefixed_version_number,
-        scenario_data=scenario,
         version_href=version_data["href"],
-        dataset_href=dataset_href,
         author_id=AUTHOR_ID,
     )
 
 
-def create_new_scenario_instance(tx, version_data, scenario, dataset_href):
+def use_existing_scenario_instances(tx, version_data, rows):
+    """Links the given existing instances to the version, each row holds the scenario_data, its dataset_href and its reusable_instance_id."""
     prefixed_version_number = _prettify_version_number(version_data["version_number"])
     class_value_label = ""
-    scenario_value_label = SCENARIO_VALUE_LABEL
     class_to_scenario_rel_type = CLASS_TO_SCENARIO_REL_TYPE
     version_to_class_rel_type = ""
     version_to_scenario_rel_type = VERSION_TO_SCENARIO_REL_TYPE
@@ -1051,63 +1100,23 @@ def create_new_scenario_instance(tx, version_data, scenario, dataset_href):
         class_value_label = DATASET_VALUE_LABEL
         version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
 
-    tx.run(
-        f"""
-        MATCH (root{{uid: $uid}})
-        CREATE (new_instance: {scenario_value_label})
-        SET
-            new_instance.label = $scenario_data.label
-        CREATE (root)-[:{SCENARIO_VERSION_REL_TYPE}]->(new_instance)
-
-        WITH new_instance
-        MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{version_to_class_rel_type}]->(class_value:{class_value_label})
-            WHERE rel.href=$dataset_href
-        MERGE (dmv)-[contains_scenario:{version_to_scenario_rel_type} {{href: $scenario_data.href}}]->(new_instance)
-        CREATE (class_value)-[has_scenario:{class_to_scenario_rel_type}]->(new_instance)
-        SET contains_scenario.href=$scenario_data.href, has_scenario.ordinal = $scenario_data.ordinal, has_scenario.version_number = $prefixed_version_number
-        """,
-        uid=scenario["uid"],
-        effective_date=version_data["effective_date"],
-        prefixed_version_number=prefixed_version_number,
-        scenario_data=scenario,
-        version_href=version_data["href"],
-        dataset_href=dataset_href,
-        author_id=AUTHOR_ID,
-    )
-
-
-def use_existing_scenario_instance(
-    tx, version_data, scenario, dataset_href, reusable_instance_id
-):
-    prefixed_version_number = _prettify_version_number(version_data["version_number"])
-    class_value_label = ""
-    class_to_scenario_rel_type = CLASS_TO_SCENARIO_REL_TYPE
-    version_to_class_rel_type = ""
-    version_to_scenario_rel_type = VERSION_TO_SCENARIO_REL_TYPE
-    if version_data["data_model_type"] == DataModelType.FOUNDATIONAL.value:
-        class_value_label = DATASET_CLASS_VALUE_LABEL
-        version_to_class_rel_type = VERSION_TO_CLASS_REL_TYPE
-    elif version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
-        class_value_label = DATASET_VALUE_LABEL
-        version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
-
-    tx.run(
+    _run_batched(
+        tx,
         f"""
+        UNWIND $rows AS row
+        WITH row.scenario_data AS scenario_data, row.dataset_href AS dataset_href, row.reusable_instance_id AS reusable_instance_id
         MATCH (instance)
-        WHERE id(instance)=$reusable_instance_id
+        WHERE id(instance)=reusable_instance_id
         MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{version_to_class_rel_type}]->(class_value:{class_value_label})
-            WHERE rel.href=$dataset_href
-        MERGE (dmv)-[:{version_to_scenario_rel_type} {{href: $scenario_data.href}}]->(instance)
+            WHERE rel.href=dataset_href
+        MERGE (dmv)-[:{version_to_scenario_rel_type} {{href: scenario_data.href}}]->(instance)
         CREATE (class_value)-[has_scenario:{class_to_scenario_rel_type}]->(instance)
-        SET has_scenario.ordinal = $scenario_data.ordinal, has_scenario.version_number = $prefixed_version_number
+        SET has_scenario.ordinal = scenario_data.ordinal, has_scenario.version_number = $prefixed_version_number
         """,
-        uid=scenario["uid"],
-        reusable_instance_id=reusable_instance_id,
+        rows,
         effective_date=version_data["effective_date"],
         prefixed_version_number=prefixed_version_number,
-        scenario_data=scenario,
         version_href=version_data["href"],
-        dataset_href=dataset_href,
     )
 
 
@@ -1147,12 +1156,12 @@ def build_variable_instance_query(
     create = f"""
             CREATE ({instance_node_variable_name}:{variable_value_label})
             SET
-               {instance_node_variable_name}.title = $variable_data.title,
-               {instance_node_variable_name}.label = $variable_data.label,
-               {instance_node_variable_name}.simple_datatype = $variable_data.simple_datatype,
-               {instance_node_variable_name}.length = $variable_data.length
+               {instance_node_variable_name}.title = row.variable_data.title,
+               {instance_node_variable_name}.label = row.variable_data.label,
+               {instance_node_variable_name}.simple_datatype = row.variable_data.simple_datatype,
+               {instance_node_variable_name}.length = row.variable_data.length
     """
-    with_clause = f" WITH {instance_node_variable_name} "
+    with_clause = f" WITH row, {instance_node_variable_name} "
 
     versioning = f"""
         , root
@@ -1162,17 +1171,17 @@ def build_variable_instance_query(
     variable_parents = ""
 
     codelists = """
-        UNWIND $variable_data.codelists AS codelist
+        UNWIND row.variable_data.codelists AS codelist
         MATCH (c:CTCodelistRoot {uid: codelist})
     """
 
     prior_version = f"""
         MATCH ()-[rel]->(prior_instance_node)<-[:{VARIABLE_VERSION_REL_TYPE}]-(prior_root_node)
-        WHERE rel.href=$variable_data.prior_version AND (rel:{VERSION_TO_VARIABLE_CLASS_REL_TYPE} OR rel:{VERSION_TO_DATASET_VARIABLE_REL_TYPE})
-        CALL apoc.do.when($uid<>prior_root_node.uid,
+        WHERE rel.href=row.variable_data.prior_version AND (rel:{VERSION_TO_VARIABLE_CLASS_REL_TYPE} OR rel:{VERSION_TO_DATASET_VARIABLE_REL_TYPE})
+        CALL apoc.do.when(row.variable_data.uid<>prior_root_node.uid,
             'WITH ${instance_node_variable_name} AS {instance_node_variable_name}, $prior_instance_node AS prior_instance_node MERGE ({instance_node_variable_name})<-[rep:REPLACED_BY]-(prior_instance_node) SET rep.catalogue=$catalogue, rep.version_number=$prefixed_version_number RETURN rep',
             '',
-            {{prior_instance_node: prior_instance_node, {instance_node_variable_name}: {instance_node_variable_name}, catalogue: $variable_data.catalogue, prefixed_version_number: $prefixed_version_number}}
+            {{prior_instance_node: prior_instance_node, {instance_node_variable_name}: {instance_node_variable_name}, catalogue: row.variable_data.catalogue, prefixed_version_number: $prefixed_version_number}}
         )
         YIELD value AS result
         RETURN result
@@ -1180,29 +1189,29 @@ def build_variable_instance_query(
 
     if parent_type == "class":
         create += f""",
-                {instance_node_variable_name}.description = $variable_data.description,
-                {instance_node_variable_name}.role = $variable_data.role,
-                {instance_node_variable_name}.notes = $variable_data.notes,
-                {instance_node_variable_name}.variable_c_code = $variable_data.variable_c_code,
-                {instance_node_variable_name}.usage_restrictions = $variable_data.usage_restrictions,
-                {instance_node_variable_name}.examples = $variable_data.examples,
-                {instance_node_variable_name}.value_list = $variable_data.value_list,
-                {instance_node_variable_name}.described_value_domain = $variable_data.described_value_domain,
-                {instance_node_variable_name}.role_description = $variable_data.role_description,
-                {instance_node_variable_name}.implementation_notes = $variable_data.implementation_notes,
-                {instance_node_variable_name}.mapping_instructions = $variable_data.mapping_instructions,
-                {instance_node_variable_name}.prompt = $variable_data.prompt,
-                {instance_node_variable_name}.question_text = $variable_data.question_text,
-                {instance_node_variable_name}.completion_instructions = $variable_data.completion_instructions,
-                {instance_node_variable_name}.core = $variable_data.core
+                {instance_node_variable_name}.description = row.variable_data.description,
+                {instance_node_variable_name}.role = row.variable_data.role,
+                {instance_node_variable_name}.notes = row.variable_data.notes,
+                {instance_node_variable_name}.variable_c_code = row.variable_data.variable_c_code,
+                {instance_node_variable_name}.usage_restrictions = row.variable_data.usage_restrictions,
+                {instance_node_variable_name}.examples = row.variable_data.examples,
+                {instance_node_variable_name}.value_list = row.variable_data.value_list,
+                {instance_node_variable_name}.described_value_domain = row.variable_data.described_value_domain,
+                {instance_node_variable_name}.role_description = row.variable_data.role_description,
+                {instance_node_variable_name}.implementation_notes = row.variable_data.implementation_notes,
+                {instance_node_variable_name}.mapping_instructions = row.variable_data.mapping_instructions,
+                {instance_node_variable_name}.prompt = row.variable_data.prompt,
+                {instance_node_variable_name}.question_text = row.variable_data.question_text,
+                {instance_node_variable_name}.completion_instructions = row.variable_data.completion_instructions,
+                {instance_node_variable_name}.core = row.variable_data.core
         """
 
         variable_parents = f"""
             MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{version_to_class_rel_type}]->(class_value:{class_value_label})
-                WHERE rel.href=$parent_href
-            MERGE (dmv)-[:{version_to_variable_rel_type} {{href: $variable_data.href}}]->({instance_node_variable_name})
+                WHERE rel.href=row.parent_href
+            MERGE (dmv)-[:{version_to_variable_rel_type} {{href: row.variable_data.href}}]->({instance_node_variable_name})
             MERGE (class_value)-[has_variable:{class_to_variable_rel_type} {{
-                ordinal: $variable_data.ordinal,
+                ordinal: row.variable_data.ordinal,
                 version_number: $prefixed_version_number
             }}]->({instance_node_variable_name})
         """
@@ -1216,31 +1225,31 @@ def build_variable_instance_query(
         create += f"""
             CREATE ({scenario_value_variable_name}:{scenario_variable_value_label})
             SET
-                {scenario_value_variable_name}.description = $variable_data.description,
-                {scenario_value_variable_name}.role = $variable_data.role,
-                {scenario_value_variable_name}.notes = $variable_data.notes,
-                {scenario_value_variable_name}.variable_c_code = $variable_data.variable_c_code,
-                {scenario_value_variable_name}.usage_restrictions = $variable_data.usage_restrictions,
-                {scenario_value_variable_name}.examples = $variable_data.examples,
-                {scenario_value_variable_name}.value_list = $variable_data.value_list,
-                {scenario_value_variable_name}.described_value_domain = $variable_data.described_value_domain,
-                {scenario_value_variable_name}.role_description = $variable_data.role_description,
-                {scenario_value_variable_name}.implementation_notes = $variable_data.implementation_notes,
-                {scenario_value_variable_name}.mapping_instructions = $variable_data.mapping_instructions,
-                {scenario_value_variable_name}.prompt = $variable_data.prompt,
-                {scenario_value_variable_name}.question_text = $variable_data.question_text,
-                {scenario_value_variable_name}.completion_instructions = $variable_data.completion_instructions,
-                {scenario_value_variable_name}.core = $variable_data.core
+                {scenario_value_variable_name}.description = row.variable_data.description,
+                {scenario_value_variable_name}.role = row.variable_data.role,
+                {scenario_value_variable_name}.notes = row.variable_data.notes,
+                {scenario_value_variable_name}.variable_c_code = row.variable_data.variable_c_code,
+                {scenario_value_variable_name}.usage_restrictions = row.variable_data.usage_restrictions,
+                {scenario_value_variable_name}.examples = row.variable_data.examples,
+                {scenario_value_variable_name}.value_list = row.variable_data.value_list,
+                {scenario_value_variable_name}.described_value_domain = row.variable_data.described_value_domain,
+                {scenario_value_variable_name}.role_description = row.variable_data.role_description,
+                {scenario_value_variable_name}.implementation_notes = row.variable_data.implementation_notes,
+                {scenario_value_variable_name}.mapping_instructions = row.variable_data.mapping_instructions,
+                {scenario_value_variable_name}.prompt = row.variable_data.prompt,
+                {scenario_value_variable_name}.question_text = row.variable_data.question_text,
+                {scenario_value_variable_name}.completion_instructions = row.variable_data.completion_instructions,
+                {scenario_value_variable_name}.core = row.variable_data.core
             CREATE ({instance_node_variable_name})-[var_sc_rel:{variable_value_to_scenario_variable_value_rel_type}]->({scenario_value_variable_name})
             SET var_sc_rel.version_number = $prefixed_version_number
         """
 
         variable_parents = f"""
             MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{version_to_scenario_rel_type}]->(scenario_value:{scenario_value_label})
-                WHERE rel.href=$parent_href
-            MERGE (dmv)-[:{version_to_variable_rel_type} {{href: $variable_data.href}}]->({instance_node_variable_name})
+                WHERE rel.href=row.parent_href
+            MERGE (dmv)-[:{version_to_variable_rel_type} {{href: row.variable_data.href}}]->({instance_node_variable_name})
             MERGE (scenario_value)-[has_variable:{scenario_to_variable_rel_type} {{
-                ordinal: $variable_data.ordinal,
+                ordinal: row.variable_data.ordinal,
                 version_number: $prefixed_version_number
             }}]->({instance_node_variable_name})
             MERGE (dmv)-[contains_scenario_variable:{version_to_scenario_variable_rel_type}]->({scenario_value_variable_name})
@@ -1263,51 +1272,15 @@ def build_variable_instance_query(
     return full_query
 
 
-def create_initial_variable_instance(
-    tx, version_data, variable, parent_href, parent_type, value_list_mappings
-):
-    prefixed_version_number = _prettify_version_number(version_data["version_number"])
-    variable_root_label = ""
-    if version_data["data_model_type"] == DataModelType.FOUNDATIONAL.value:
-        variable_root_label = VARIABLE_CLASS_ROOT_LABEL
-    elif version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
-        variable_root_label = DATASET_VARIABLE_ROOT_LABEL
-
-    initial_part = f"""
-        MATCH (root:{variable_root_label}{{uid: $uid}})
-        WITH root
-    """
-
-    full_query = initial_part + build_variable_instance_query(
-        instance_node_variable_name="value",
-        parent_type=parent_type,
-        version_data=version_data,
-    )
+def _variable_rows_by_parent_type(rows):
+    rows_by_parent_type = defaultdict(list)
+    for row in rows:
+        rows_by_parent_type[row["parent_type"]].append(row)
+    return rows_by_parent_type
 
-    tx.run(
-        full_query,
-        uid=variable["uid"],
-        effective_date=version_data["effective_date"],
-        prefixed_version_number=prefixed_version_number,
-        variable_data=variable,
-        version_href=version_data["href"],
-        parent_href=parent_href,
-        author_id=AUTHOR_ID,
-    )
-
-    if "value_list" in variable:
-        link_variable_with_value_terms(
-            tx,
-            version_data=version_data,
-            variable=variable,
-            parent_href=parent_href,
-            value_list_mappings=value_list_mappings,
-        )
 
-
-def create_new_variable_instance(
-    tx, version_data, variable, parent_href, parent_type, value_list_mappings
-):
+def create_variable_instances(tx, version_data, rows):
+    """Creates a new instance of each variable, each row holds the variable_data, its parent_href and parent_type."""
     prefixed_version_number = _prettify_version_number(version_data["version_number"])
     variable_root_label = ""
     if version_data["data_model_type"] == DataModelType.FOUNDATIONAL.value:
@@ -1316,63 +1289,55 @@ def create_new_variable_instance(
         variable_root_label = DATASET_VARIABLE_ROOT_LABEL
 
     initial_part = f"""
-        MATCH (root:{variable_root_label}{{uid: $uid}})
-        WITH root
+        UNWIND $rows AS row
+        MATCH (root:{variable_root_label}{{uid: row.variable_data.uid}})
+        WITH row, root
     """
 
-    full_query = initial_part + build_variable_instance_query(
-        instance_node_variable_name="new_value",
-        parent_type=parent_type,
-        version_data=version_data,
-    )
-    tx.run(
-        full_query,
-        uid=variable["uid"],
-        effective_date=version_data["effective_date"],
-        prefixed_version_number=prefixed_version_number,
-        variable_data=variable,
-        version_href=version_data["href"],
-        parent_href=parent_href,
-        author_id=AUTHOR_ID,
-    )
+    for parent_type, parent_rows in _variable_rows_by_parent_type(rows).items():
+        full_query = initial_part + build_variable_instance_query(
+            instance_node_variable_name="value",
+            parent_type=parent_type,
+            version_data=version_data,
+        )
 
-    if "value_list" in variable:
-        link_variable_with_value_terms(
+        _run_batched(
             tx,
-            version_data=version_data,
-            variable=variable,
-            parent_href=parent_href,
-            value_list_mappings=value_list_mappings,
+            full_query,
+            parent_rows,
+            effective_date=version_data["effective_date"],
+            prefixed_version_number=prefixed_version_number,
+            version_href=version_data["href"],
+            author_id=AUTHOR_ID,
         )
 
 
-def use_existing_variable_instance(
-    tx, version_data, variable, parent_href, instance_node_id, parent_type
-):
+def use_existing_variable_instances(tx, version_data, rows):
+    """Links the given existing instances to the version, each row holds the variable_data, its parent_href, parent_type and instance_node_id."""
     prefixed_version_number = _prettify_version_number(version_data["version_number"])
 
     initial_part = """
+        UNWIND $rows AS row
         MATCH (instance)
-        WHERE id(instance)=$instance_node_id
+        WHERE id(instance)=row.instance_node_id
     """
 
-    full_query = initial_part + build_variable_instance_query(
-        instance_node_variable_name="instance",
-        parent_type=parent_type,
-        create_version=False,
-        version_data=version_data,
-    )
+    for parent_type, parent_rows in _variable_rows_by_parent_type(rows).items():
+        full_query = initial_part + build_variable_instance_query(
+            instance_node_variable_name="instance",
+            parent_type=parent_type,
+            create_version=False,
+            version_data=version_data,
+        )
 
-    tx.run(
-        full_query,
-        uid=variable["uid"],
-        instance_node_id=instance_node_id,
-        effective_date=version_data["effective_date"],
-        prefixed_version_number=prefixed_version_number,
-        variable_data=variable,
-        version_href=version_data["href"],
-        parent_href=parent_href,
-    )
+        _run_batched(
+            tx,
+            full_query,
+            parent_rows,
+            effective_date=version_data["effective_date"],
+            prefixed_version_number=prefixed_version_number,
+            version_href=version_data["href"],
+        )
 
 
 def link_ig_with_data_model(tx, version_data):
@@ -40,21 +40,32 @@ def wrapper_import_cdisc_ct_into_cdisc_db(
     package_dates = get_ordered_package_dates(json_data_directory)
     print(f"Found the following dates: {str(package_dates)}")
     for effective_date in package_dates:
-        print(f"============================================")
-        print(
-            f"== Importing JSON data into the cdisc-DB='{CDISC_IMPORT_DATABASE}' for the effective_date='{effective_date}'."
-        )
-        print(f"==")
-        import_json_data_into_cdisc_db(
-            effective_date,
-            json_data_directory,
-            cdisc_neo4j_driver,
-            CDISC_IMPORT_DATABASE,
-            author_id,
+        wrapper_import_cdisc_ct_package_into_cdisc_db(
+            author_id, json_data_directory, effective_date, cdisc_neo4j_driver
         )
 
     cdisc_neo4j_driver.close()
 
 
+def wrapper_import_cdisc_ct_package_into_cdisc_db(
+    author_id: str, json_data_directory: str, effective_date: str, cdisc_neo4j_driver
+):
+    """
+    Calls the import step for the JSON files of one effective date.
+    """
+    print(f"============================================")
+    print(
+        f"== Importing JSON data into the cdisc-DB='{CDISC_IMPORT_DATABASE}' for the effective_date='{effective_date}'."
+    )
+    print(f"==")
+    import_json_data_into_cdisc_db(
+        effective_date,
+        json_data_directory,
+        cdisc_neo4j_driver,
+        CDISC_IMPORT_DATABASE,
+        author_id,
+    )
+
+
 if __name__ == "__main__":
     wrapper_import_cdisc_ct_into_cdisc_db(get_author_id(1), get_directory_name(2, "cdisc_ct"))
@@ -0,0 +1,197 @@
+from unittest.mock import patch
+
+import pytest
+
+from mdr_standards_import.scripts.import_scripts.cdisc_ct import \
+    import_into_mdr_db
+from mdr_standards_import.scripts.import_scripts.cdisc_ct.import_into_mdr_db import (
+    batched_codelists, create_initial_codelist_attributes_values,
+    create_initial_codelist_names, create_initial_term_attributes_values,
+    create_initial_term_names, create_new_version_codelist_attributes_values,
+    create_new_version_term_attributes_values, plan_attribute_updates,
+    use_existing_codelist_attributes_values,
+    use_existing_term_attributes_values)
+
+EFFECTIVE_DATE = "2024-03-29"
+
+
+def codelist_data(concept_id, terms, name="Codelist"):
+    return {
+        "codelist": {
+            "concept_id": concept_id,
+            "name": name,
+            "submission_value": concept_id,
+            "preferred_term": name,
+            "definition": name,
+            "extensible": "false",
+            "synonyms": [],
+        },
+        "packages": [{"name": "SDTM CT 2024-03-29", "catalogue_name": "SDTM CT"}],
+        "terms_data": [
+            {
+                "term": term,
+                "packages": [{"name": "SDTM CT 2024-03-29"}],
+            }
+            for term in terms
+        ],
+    }
+
+
+def term(concept_id, submission_value, preferred_term="Term"):
+    return {
+        "uid": f"{concept_id}_{submission_value}",
+        "concept_id": concept_id,
+        "code_submission_value": submission_value,
+        "name_submission_value": submission_value,
+        "preferred_term": preferred_term,
+        "definition": preferred_term,
+        "synonyms": [],
+    }
+
+
+def plan(codelists_data, existing_codelists=None, existing_terms=None):
+    def fetch_codelists(_tx, concept_ids, _effective_date):
+        return {
+            uid: record
+            for uid, record in (existing_codelists or {}).items()
+            if uid in concept_ids
+        }
+
+    def fetch_terms(_tx, term_uids, _effective_date):
+        return {
+            uid: record
+            for uid, record in (existing_terms or {}).items()
+            if uid in term_uids
+        }
+
+    with patch.object(
+        import_into_mdr_db, "_fetch_all_codelists", fetch_codelists
+    ), patch.object(import_into_mdr_db, "_fetch_all_terms", fetch_terms):
+        return plan_attribute_updates(None, codelists_data, EFFECTIVE_DATE, 2)
+
+
+def concept_ids(writes, write):
+    return [row["codelist"]["concept_id"] for row in writes[write.__name__]]
+
+
+def term_uids(writes, write):
+    return [row["term"]["uid"] for row in writes[write.__name__]]
+
+
+class Test:
+    def test__batched_codelists(self):
+        # given
+        codelists_data = [
+            codelist_data("C1", [term("T1", "A"), term("T2", "B")]),
+            codelist_data("C2", []),
+            codelist_data("C3", [term("T3", "C") for _ in range(10)]),
+            codelist_data("C4", [term("T4", "D")]),
+        ]
+
+        # when
+        batches = list(batched_codelists(codelists_data, batch_size=4))
+
+        # then
+        assert [[cl["codelist"]["concept_id"] for cl in b] for b in batches] == [
+            ["C1", "C2"],
+            ["C3"],
+            ["C4"],
+        ]
+
+    def test__plan_attribute_updates_classifies_codelists_and_terms(self):
+        # given
+        unchanged = codelist_data("C2", [term("T2", "B")])
+        existing_codelists = {
+            "C2": {
+                "cl_attributes_value": unchanged["codelist"],
+                "cl_attributes_value_for_date": None,
+            },
+            "C3": {
+                "cl_attributes_value": codelist_data("C3", [], name="Old")["codelist"],
+                "cl_attributes_value_for_date": None,
+            },
+        }
+        existing_terms = {
+            "T2_B": {
+                "t_attributes_value": term("T2", "B", preferred_term="Old"),
+                "t_attributes_value_for_date": None,
+            },
+        }
+
+        # when
+        summary, rounds = plan(
+            [
+                codelist_data("C1", [term("T1", "A")]),
+                unchanged,
+                codelist_data("C3", []),
+            ],
+            existing_codelists,
+            existing_terms,
+        )
+
+        # then
+        assert summary == {
+            "new_codelists": 1,
+            "updated_codelists": 1,
+            "unchanged_codelists": 1,
+            "new_terms": 1,
+            "updated_terms": 1,
+            "unchanged_terms": 0,
+        }
+        assert len(rounds) == 1
+        writes = rounds[0]
+        assert concept_ids(writes, create_initial_codelist_attributes_values) == ["C1"]
+        assert writes[create_initial_codelist_names.__name__] == [
+            {"uid": "C1", "name": "Codelist"}
+        ]
+        assert concept_ids(writes, create_new_version_codelist_attributes_values) == [
+            "C3"
+        ]
+        assert concept_ids(writes, use_existing_codelist_attributes_values) == ["C2"]
+        assert writes[create_initial_term_names.__name__] == [
+            {"uid": "T1_A", "name": "Term", "name_sentence_case": "term"}
+        ]
+        assert term_uids(writes, create_new_version_term_attributes_values) == ["T2_B"]
+
+    def test__plan_attribute_updates_orders_shared_terms_in_rounds(self):
+        # given a new term shared by two codelists, changed by the second one
+        codelists_data = [
+            codelist_data("C1", [term("T1", "A")]),
+            codelist_data("C2", [term("T1", "A", preferred_term="Other")]),
+            codelist_data("C3", [term("T1", "A", preferred_term="Other")]),
+        ]
+
+        # when
+        summary, rounds = plan(codelists_data)
+
+        # then the term is created, then updated, then reused, as one codelist after the other
+        assert summary["new_terms"] == 1
+        assert summary["updated_terms"] == 1
+        assert summary["unchanged_terms"] == 1
+        assert len(rounds) == 3
+        assert concept_ids(rounds[0], create_initial_codelist_attributes_values) == [
+            "C1",
+            "C2",
+            "C3",
+        ]
+        assert term_uids(rounds[0], create_initial_term_attributes_values) == ["T1_A"]
+        assert term_uids(rounds[1], create_new_version_term_attributes_values) == [
+            "T1_A"
+        ]
+        assert term_uids(rounds[2], use_existing_term_attributes_values) == ["T1_A"]
+        assert not concept_ids(rounds[1], create_initial_codelist_attributes_values)
+
+    def test__plan_attribute_updates_fails_before_writing_on_changed_definition(self):
+        # given
+        existing_terms = {
+            "T1_A": {
+                "t_attributes_value": term("T1", "A"),
+                "t_attributes_value_for_date": term("T1", "A", preferred_term="Old"),
+            },
+        }
+
+        # when, then
+        with pytest.raises(RuntimeError):
+            plan(
+                [codelist_data("C1", [term("T1", "A")])], existing_terms=existing_terms
+            )
@@ -0,0 +1,147 @@
+from unittest.mock import patch
+
+from mdr_standards_import.scripts.entities.cdisc_data_models.data_model_type import (
+    DataModelType,
+)
+from mdr_standards_import.scripts.import_scripts.cdisc_data_models import (
+    import_into_mdr_db,
+)
+from mdr_standards_import.scripts.import_scripts.cdisc_data_models.import_into_mdr_db import (
+    CLASS_CONTENT_PROPERTIES,
+    _content_hash,
+    _index_by_content,
+    _rounds_by_uid,
+    merge_classes,
+)
+
+VERSION_DATA = {
+    "catalogue": "SDTM",
+    "data_model_type": DataModelType.FOUNDATIONAL.value,
+    "version_number": "2-0",
+    "href": "/mdr/sdtm/2-0",
+}
+
+
+def class_data(uid, title="Title", node_id=None):
+    _class = {
+        "uid": uid,
+        "title": title,
+        "label": uid,
+        "description": title,
+        "subclasses": [],
+    }
+    if node_id is not None:
+        _class["id"] = node_id
+    return {"class": _class}
+
+
+class FakeClassStore:
+    """Existing class instances by uid, the created instances are added to it."""
+
+    def __init__(self, instances_by_uid):
+        self.instances_by_uid = instances_by_uid
+        self.next_id = 100
+        self.created = []
+        self.reused = []
+        self.fetched_uids = []
+
+    def get_class_instances(self, _tx, catalogue, data_model_type, uids):
+        self.fetched_uids.append(uids)
+        return {
+            uid: list(self.instances_by_uid[uid])
+            for uid in uids
+            if uid in self.instances_by_uid
+        }
+
+    def create_class_instances(self, _tx, version_data, classes):
+        self.created.append([_class["uid"] for _class in classes])
+        for _class in classes:
+            self.instances_by_uid.setdefault(_class["uid"], []).append(
+                {**_class, "id": self.next_id}
+            )
+            self.next_id += 1
+
+    def use_existing_class_instances(self, _tx, version_data, rows):
+        self.reused.append(
+            [(row["class_data"]["uid"], row["reusable_instance_id"]) for row in rows]
+        )
+
+    def merge(self, classes_data):
+        with patch.object(
+            import_into_mdr_db, "_get_class_instances", self.get_class_instances
+        ), patch.object(
+            import_into_mdr_db, "create_class_instances", self.create_class_instances
+        ), patch.object(
+            import_into_mdr_db,
+            "use_existing_class_instances",
+            self.use_existing_class_instances,
+        ):
+            return merge_classes(None, VERSION_DATA, classes_data)
+
+
+class Test:
+    def test__rounds_by_uid(self):
+        assert _rounds_by_uid(["A", "B", "A", "C", "A", "B"], lambda uid: uid) == [
+            ["A", "B", "C"],
+            ["A", "B"],
+            ["A"],
+        ]
+
+    def test__index_by_content_keeps_the_first_instance_of_a_content(self):
+        # given
+        instances_by_uid = {
+            "AE": [
+                class_data("AE", node_id=1)["class"],
+                class_data("AE", title="Other", node_id=2)["class"],
+                class_data("AE", node_id=3)["class"],
+            ]
+        }
+
+        # when
+        index = _index_by_content(instances_by_uid, CLASS_CONTENT_PROPERTIES)
+
+        # then
+        assert index == {
+            "AE": {
+                _content_hash(class_data("AE")["class"], CLASS_CONTENT_PROPERTIES): 1,
+                _content_hash(
+                    class_data("AE", title="Other")["class"], CLASS_CONTENT_PROPERTIES
+                ): 2,
+            }
+        }
+
+    def test__merge_classes_classifies_the_classes(self):
+        # given
+        store = FakeClassStore(
+            {
+                "AE": [class_data("AE", node_id=1)["class"]],
+                "CM": [class_data("CM", title="Old", node_id=2)["class"]],
+            }
+        )
+
+        # when
+        counts = store.merge([class_data("AE"), class_data("CM"), class_data("DM")])
+
+        # then
+        assert counts == (1, 1, 1)
+        assert store.fetched_uids == [["AE", "CM", "DM"]]
+        assert store.created == [["CM", "DM"]]
+        assert store.reused == [[("AE", 1)]]
+
+    def test__merge_classes_reuses_instances_created_for_the_same_uid(self):
+        # given
+        store = FakeClassStore({})
+
+        # when
+        counts = store.merge(
+            [
+                class_data("AE"),
+                class_data("AE"),
+                class_data("AE", title="Other"),
+            ]
+        )
+
+        # then the first class is new, the second reuses its instance and the third is updated
+        assert counts == (1, 1, 1)
+        assert store.created == [["AE"], [], ["AE"]]
+        assert store.reused == [[], [("AE", 100)], []]
@@ -0,0 +1,131 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mdr_standards_import.scripts.import_scripts import (
+    bulk_import as bulk_import_module,
+)
+from mdr_standards_import.scripts.import_scripts.bulk_import import bulk_import
+
+PACKAGE_DATES = ["2014-09-26", "2015-03-27", "2016-06-24"]
+
+
+class FakeStages:
+    """Records the calls of the import steps, in the order they were made."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.first_package_imported_into_mdr = threading.Event()
+
+    def record(self, *call):
+        with self.lock:
+            self.calls.append(call)
+
+    def stage_ct_package(self, _author_id, _directory, effective_date, _driver):
+        self.record("CT into CDISC DB", effective_date)
+
+    def import_ct_package_into_mdr(self, author_id, effective_date):
+        self.record("CT into MDR DB", effective_date)
+        self.first_package_imported_into_mdr.set()
+
+    def stage_data_models(self, _author_id, _directory):
+        self.record("Data models into CDISC DB")
+
+    def import_data_models_into_mdr(self, author_id, json_data_directory):
+        self.record("Data models into MDR DB")
+
+    def patches(self):
+        return [
+            patch.object(
+                bulk_import_module,
+                "get_ordered_package_dates",
+                lambda _directory: PACKAGE_DATES,
+            ),
+            patch.object(bulk_import_module, "get_cdisc_neo4j_driver", MagicMock),
+            patch.object(
+                bulk_import_module,
+                "wrapper_import_cdisc_ct_package_into_cdisc_db",
+                self.stage_ct_package,
+            ),
+            patch.object(
+                bulk_import_module,
+                "wrapper_import_cdisc_ct_from_cdisc_db_into_mdr",
+                self.import_ct_package_into_mdr,
+            ),
+            patch.object(
+                bulk_import_module,
+                "wrapper_import_cdisc_data_models_into_cdisc_db",
+                self.stage_data_models,
+            ),
+            patch.object(
+                bulk_import_module,
+                "wrapper_import_cdisc_data_models_from_cdisc_db_into_mdr",
+                self.import_data_models_into_mdr,
+            ),
+        ]
+
+
+def run_bulk_import(stages, **kwargs):
+    patches = stages.patches()
+    for _patch in patches:
+        _patch.start()
+    try:
+        bulk_import("TEST", "json_data", **kwargs)
+    finally:
+        for _patch in patches:
+            _patch.stop()
+
+
+class Test:
+    def test__packages_are_imported_into_mdr_in_effective_date_order(self):
+        # given
+        stages = FakeStages()
+
+        # when
+        run_bulk_import(stages)
+
+        # then
+        mdr_imports = [call for call in stages.calls if call[0] == "CT into MDR DB"]
+        assert mdr_imports == [("CT into MDR DB", date) for date in PACKAGE_DATES]
+        for date in PACKAGE_DATES:
+            assert stages.calls.index(("CT into CDISC DB", date)) < stages.calls.index(
+                ("CT into MDR DB", date)
+            )
+        # the data models refer to CT terms, so they are imported into MDR last
+        assert stages.calls[-1] == ("Data models into MDR DB",)
+
+    def test__packages_are_imported_into_mdr_while_the_next_are_staged(self):
+        # given the staging of a package waits until a previous one was imported into MDR
+        stages = FakeStages()
+        stage_ct_package = stages.stage_ct_package
+
+        def stage_ct_package_after_first_import(*args):
+            if args[2] == PACKAGE_DATES[1]:
+                assert stages.first_package_imported_into_mdr.wait(timeout=5)
+            stage_ct_package(*args)
+
+        stages.stage_ct_package = stage_ct_package_after_first_import
+
+        # when
+        run_bulk_import(stages, import_data_models=False)
+
+        # then
+        assert ("Data models into CDISC DB",) not in stages.calls
+        assert stages.calls.index(("CT into MDR DB", PACKAGE_DATES[0])) < (
+            stages.calls.index(("CT into CDISC DB", PACKAGE_DATES[1]))
+        )
+
+    def test__failed_import_into_mdr_is_raised(self):
+        # given
+        stages = FakeStages()
+
+        def failing_import(author_id, effective_date):
+            raise RuntimeError("MDR DB unavailable")
+
+        stages.import_ct_package_into_mdr = failing_import
+
+        # when, then
+        with pytest.raises(RuntimeError):
+            run_bulk_import(stages, import_data_models=False)
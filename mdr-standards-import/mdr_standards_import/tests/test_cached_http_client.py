@@ -0,0 +1,175 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import listdir
+from unittest.mock import patch
+
+import pytest
+from requests.exceptions import HTTPError
+
+from mdr_standards_import.scripts import download_json_data_from_cdisc_api
+from mdr_standards_import.scripts.cached_http_client import CachedHttpClient
+from mdr_standards_import.scripts.entities.cdisc_ct.ct_import import CTImport
+from mdr_standards_import.scripts.entities.cdisc_ct.package import Package
+
+
+class FakeCDISCServer(ThreadingHTTPServer):
+    """Serves the JSON documents of `resources` by path, with an ETag of their version."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeCDISCRequestHandler)
+        self.resources = {}
+        self.versions = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def set_resource(self, href, data):
+        self.resources[href] = data
+        self.versions[href] = self.versions.get(href, 0) + 1
+
+
+class FakeCDISCRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("api-key") != "secret":
+            self.send_response(401)
+            self.end_headers()
+            return
+        if self.path not in self.server.resources:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = f'"{self.server.versions[self.path]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(self.server.resources[self.path]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture(name="server")
+def fixture_server():
+    server = FakeCDISCServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="client")
+def fixture_client(tmp_path):
+    return CachedHttpClient(
+        headers={"api-key": "secret"},
+        cache_directory=tmp_path / "cache",
+        max_workers=4,
+        retries=0,
+    )
+
+
+class Test:
+    def test__unchanged_resources_are_not_downloaded_again(self, server, client):
+        # given
+        server.set_resource("/mdr/ct/packages", {"packages": [1]})
+
+        # when
+        first = client.get_json(server.base_url + "/mdr/ct/packages")
+        second = client.get_json(server.base_url + "/mdr/ct/packages")
+
+        # then
+        assert first == second == {"packages": [1]}
+        assert client.stats == {"downloaded": 1, "not_modified": 1}
+        assert server.requests == [
+            ("/mdr/ct/packages", None),
+            ("/mdr/ct/packages", '"1"'),
+        ]
+
+    def test__modified_resources_are_downloaded_again(self, server, client):
+        # given
+        server.set_resource("/mdr/ct/packages", {"packages": [1]})
+        client.get_json(server.base_url + "/mdr/ct/packages")
+
+        # when
+        server.set_resource("/mdr/ct/packages", {"packages": [1, 2]})
+
+        # then
+        assert client.get_json(server.base_url + "/mdr/ct/packages") == {
+            "packages": [1, 2]
+        }
+        assert client.stats == {"downloaded": 2, "not_modified": 0}
+
+    def test__corrupted_cache_entries_are_downloaded_again(self, server, client):
+        # given
+        server.set_resource("/mdr/ct/packages", {"packages": [1]})
+        client.get_json(server.base_url + "/mdr/ct/packages")
+        for object_file in (client.cache_directory / "objects").rglob("*"):
+            if object_file.is_file():
+                object_file.write_bytes(b'{"packages": [')
+
+        # when
+        data = client.get_json(server.base_url + "/mdr/ct/packages")
+
+        # then
+        assert data == {"packages": [1]}
+        assert server.requests[-1] == ("/mdr/ct/packages", None)
+
+    def test__errors_are_raised(self, server, client):
+        with pytest.raises(HTTPError):
+            client.get(server.base_url + "/mdr/ct/packages/missing")
+
+    def test__map_keeps_the_order_of_the_items(self, client):
+        assert client.map(lambda item: item * 2, range(10)) == list(range(0, 20, 2))
+
+    def test__download_packages_data_resumes(self, server, client, tmp_path):
+        # given
+        packages = []
+        for effective_date in ["2023-12-15", "2024-03-29"]:
+            href = f"/mdr/ct/packages/sdtmct-{effective_date}"
+            package = Package(CTImport(effective_date, "TMP"))
+            package.set_catalogue_name(href)
+            package.set_href(href)
+            packages.append(package)
+        server.set_resource(
+            "/mdr/ct/packages/sdtmct-2023-12-15", {"effective_date": "2023-12-15"}
+        )
+        to_directory = str(tmp_path / "packages")
+
+        with patch.object(
+            download_json_data_from_cdisc_api, "BASE_URL", server.base_url
+        ), patch.object(download_json_data_from_cdisc_api, "CDISC_API_CLIENT", client):
+            # when the second package fails
+            download_json_data_from_cdisc_api.download_packages_data(
+                packages, to_directory
+            )
+            assert listdir(to_directory) == ["sdtmct-2023-12-15.json"]
+
+            # then only the missing package is downloaded when running again
+            server.set_resource(
+                "/mdr/ct/packages/sdtmct-2024-03-29", {"effective_date": "2024-03-29"}
+            )
+            server.requests.clear()
+            download_json_data_from_cdisc_api.download_packages_data(
+                packages, to_directory
+            )
+
+        assert sorted(listdir(to_directory)) == [
+            "sdtmct-2023-12-15.json",
+            "sdtmct-2024-03-29.json",
+        ]
+        assert server.requests == [("/mdr/ct/packages/sdtmct-2024-03-29", None)]
+        with open(f"{to_directory}/sdtmct-2024-03-29.json") as package_file:
+            assert json.load(package_file) == {"effective_date": "2024-03-29"}
@@ -115,6 +115,40 @@ TEXT_INDEXES = [
     ("Brand", "name"),
 ]
 
+# array of full-text indexes to create [name, labels, properties]
+# Used by the wildcard search of the library listings in the API,
+# the names must match the WildcardFulltextIndex definitions of the repositories.
+FULLTEXT_INDEXES = [
+    (
+        "fulltext_ct_term_value",
+        ["CTTermNameValue", "CTTermAttributesValue"],
+        [
+            "name",
+            "name_sentence_case",
+            "concept_id",
+            "code_submission_value",
+            "name_submission_value",
+            "preferred_term",
+            "definition",
+        ],
+    ),
+    # Other properties searched by the wildcard: root uids, library, catalogue and author names
+    (
+        "fulltext_library_item_metadata",
+        ["CTTermRoot", "Library", "CTCatalogue", "User"],
+        ["uid", "name", "username"],
+    ),
+]
+
+# array of relationship full-text indexes to create [name, type, properties]
+FULLTEXT_REL_INDEXES = [
+    (
+        "fulltext_version_metadata",
+        "HAS_VERSION",
+        ["status", "version", "author_id", "change_description"],
+    ),
+]
+
 # array of relation indexes to create [type, property]
 REL_INDEXES = [
     ("CONTAINS_DATASET", "href"),
@@ -229,6 +263,28 @@ def build_create_node_text_index_query(data):
     return query
 
 
+def build_create_fulltext_index_query(data):
+    name, labels, props = data
+    label_list = "|".join(labels)
+    prop_list = ", ".join(f"n.{prop}" for prop in props)
+    # The default analyzer drops english stop words, which breaks searching for words like "no" or "on"
+    query = (
+        f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR (n:{label_list}) ON EACH [{prop_list}] "
+        "OPTIONS {indexConfig: {`fulltext.analyzer`: 'standard-no-stop-words'}}"
+    )
+    return query
+
+
+def build_create_fulltext_rel_index_query(data):
+    name, rel_type, props = data
+    prop_list = ", ".join(f"r.{prop}" for prop in props)
+    query = (
+        f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR ()-[r:{rel_type}]-() ON EACH [{prop_list}] "
+        "OPTIONS {indexConfig: {`fulltext.analyzer`: 'standard-no-stop-words'}}"
+    )
+    return query
+
+
 def build_create_rel_index_query(data):
     label, prop = data
     name = label + "_" + prop
@@ -269,6 +325,14 @@ def build_schema_queries():
         query = build_create_node_text_index_query(idx)
         queries.append(query)
 
+    for idx in FULLTEXT_INDEXES:
+        query = build_create_fulltext_index_query(idx)
+        queries.append(query)
+
+    for idx in FULLTEXT_REL_INDEXES:
+        query = build_create_fulltext_rel_index_query(idx)
+        queries.append(query)
+
     for idx in REL_INDEXES:
         query = build_create_rel_index_query(idx)
         queries.append(query)
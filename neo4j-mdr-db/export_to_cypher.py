@@ -1,5 +1,8 @@
 from neo4j import GraphDatabase
 from os import environ
+import argparse
+import gzip
+import time
 
 DATABASE = environ.get("NEO4J_MDR_DATABASE")
 HOST = environ.get("NEO4J_MDR_HOST")
@@ -7,25 +10,85 @@ PORT = environ.get("NEO4J_MDR_BOLT_PORT")
 USER = environ.get("NEO4J_MDR_AUTH_USER")
 PASS =  environ.get("NEO4J_MDR_AUTH_PASSWORD")
 
-uri = "neo4j://{}:{}".format(HOST, PORT)
-driver = GraphDatabase.driver(uri, auth=(USER, PASS))
-
-print("Dumping database contents as cypher statements")
-def get_data(tx):
-    result = tx.run("CALL apoc.export.cypher.all(null, {streamStatements: true, batchSize: 1000, format: 'cypher-shell', saveIndexNames: true, saveConstraintNames: true, multipleRelationshipsWithType: true})")
-    return result.data()
-
-with driver.session(database=DATABASE) as session:
-    print(f"Connecting to database '{DATABASE}' on host: {HOST}")
-    nbr_nodes = session.read_transaction(lambda tx: tx.run("MATCH (n) RETURN count(n) as nbr_nodes").single().get("nbr_nodes"))
-    nbr_rels = session.read_transaction(lambda tx: tx.run("MATCH ()-[r]-() RETURN count(r) as nbr_rels").single().get("nbr_rels"))
-    print(f"Database contains {nbr_nodes} nodes and {nbr_rels} relationships")
-    print("Requesting data")
-    data = session.read_transaction(get_data)
-    print(f"Saving data to 'dump-{DATABASE}.cypher'")
-    with open(f"dump-{DATABASE}.cypher", "w") as f:
-        for chunk in data:
-            f.write(chunk['cypherStatements'])
-
-driver.close()
-print("Done!")
+EXPORT_QUERY = """
+CALL apoc.export.cypher.all(null, {
+    streamStatements: true,
+    batchSize: $batch_size,
+    format: 'cypher-shell',
+    saveIndexNames: true,
+    saveConstraintNames: true,
+    multipleRelationshipsWithType: true
+})
+YIELD cypherStatements
+RETURN cypherStatements
+"""
+
+
+def open_output(filename):
+    # Compress when the filename asks for it
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "wt", encoding="utf-8")
+    return open(filename, "w", encoding="utf-8")
+
+
+def dump_statements(session, file, batch_size):
+    # The statements are written batch by batch as they are streamed from the database,
+    # so the dump is never held in memory as a whole.
+    start = time.perf_counter()
+    nbr_batches = 0
+    nbr_chars = 0
+    result = session.run(EXPORT_QUERY, batch_size=batch_size)
+    for record in result:
+        statements = record["cypherStatements"]
+        file.write(statements)
+        nbr_batches += 1
+        nbr_chars += len(statements)
+        elapsed = time.perf_counter() - start
+        print(
+            f"Batches written: {nbr_batches}, {nbr_chars/1024/1024:.1f} MB, "
+            f"{nbr_chars/1024/1024/elapsed:.1f} MB/s",
+            end="\r",
+        )
+    print()
+    return nbr_batches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Dump database contents as cypher statements"
+    )
+    parser.add_argument(
+        "filename",
+        nargs="?",
+        default=f"dump-{DATABASE}.cypher",
+        help="output file, compressed with gzip if the name ends with .gz",
+    )
+    parser.add_argument(
+        "--gzip", action="store_true", help="compress the output with gzip"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="number of nodes or relationships in each exported batch",
+    )
+    args = parser.parse_args()
+    filename = args.filename
+    if args.gzip and not filename.endswith(".gz"):
+        filename = filename + ".gz"
+
+    uri = "neo4j://{}:{}".format(HOST, PORT)
+    driver = GraphDatabase.driver(uri, auth=(USER, PASS))
+
+    print("Dumping database contents as cypher statements")
+    with driver.session(database=DATABASE) as session:
+        print(f"Connecting to database '{DATABASE}' on host: {HOST}")
+        nbr_nodes = session.read_transaction(lambda tx: tx.run("MATCH (n) RETURN count(n) as nbr_nodes").single().get("nbr_nodes"))
+        nbr_rels = session.read_transaction(lambda tx: tx.run("MATCH ()-[r]-() RETURN count(r) as nbr_rels").single().get("nbr_rels"))
+        print(f"Database contains {nbr_nodes} nodes and {nbr_rels} relationships")
+        print(f"Requesting data, saving to '{filename}'")
+        with open_output(filename) as f:
+            dump_statements(session, f, args.batch_size)
+
+    driver.close()
+    print("Done!")
@@ -1,7 +1,12 @@
 from neo4j import GraphDatabase
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from os import environ
+import argparse
+import gzip
+import io
 import os
 import sys
+import time
 
 DATABASE = environ.get("NEO4J_MDR_DATABASE")
 HOST = environ.get("NEO4J_MDR_HOST")
@@ -9,8 +14,20 @@ PORT = environ.get("NEO4J_MDR_BOLT_PORT")
 USER = environ.get("NEO4J_MDR_AUTH_USER")
 PASS =  environ.get("NEO4J_MDR_AUTH_PASSWORD")
 
-uri = "neo4j://{}:{}".format(HOST, PORT)
-driver = GraphDatabase.driver(uri, auth=(USER, PASS))
+# Kinds of statements in a dump made by apoc.export.cypher
+SCHEMA = "schema"
+NODES = "nodes"
+OTHER = "other"
+
+SCHEMA_PREFIXES = (
+    "CREATE CONSTRAINT",
+    "CREATE INDEX",
+    "CREATE RANGE INDEX",
+    "CREATE FULLTEXT INDEX",
+    "DROP CONSTRAINT",
+    "DROP INDEX",
+    "CALL DB.AWAITINDEX",
+)
 
 def run_queries(tx, queries):
     for q in queries:
@@ -54,13 +71,147 @@ def next_transaction(file):
         queries = [query]
     return queries
 
+def statement_kind(query):
+    """
+    Schema statements must run in their own transaction.
+    Statements that only create nodes do not depend on each other,
+    everything else (relationships, clean-up) depends on the nodes being created first.
+    """
+    start = query.lstrip()
+    if start[:30].upper().startswith(SCHEMA_PREFIXES):
+        return SCHEMA
+    if start.startswith("UNWIND "):
+        # UNWIND [{...}, ...] AS row CREATE (n:...) for nodes,
+        # UNWIND [{...}, ...] AS row MATCH (start:...) ... for relationships
+        start = start.rsplit("] AS row", 1)[-1].lstrip()
+    if start.startswith("CREATE (") and ")-[" not in start:
+        return NODES
+    return OTHER
+
+def transaction_kind(queries):
+    kinds = {statement_kind(query) for query in queries}
+    if SCHEMA in kinds:
+        return SCHEMA
+    if kinds == {NODES}:
+        return NODES
+    return OTHER
+
+def read_batches(file, batch_size):
+    """
+    Yields (kind, queries) for each batch of statements to run in one transaction.
+    Consecutive transactions in the file of the same kind are combined
+    into batches of up to batch_size statements, schema transactions are never combined.
+    """
+    batch = []
+    batch_kind = None
+    while True:
+        queries = next_transaction(file)
+        if len(queries) == 0:
+            break
+        kind = transaction_kind(queries)
+        if batch and (
+            kind != batch_kind
+            or kind == SCHEMA
+            or len(batch) + len(queries) > batch_size
+        ):
+            yield batch_kind, batch
+            batch = []
+        batch_kind = kind
+        batch.extend(queries)
+    if batch:
+        yield batch_kind, batch
+
+def open_input(filename):
+    # Returns the raw file, to track progress, and a text stream of the statements
+    raw = open(filename, "rb")
+    if filename.endswith(".gz"):
+        return raw, io.TextIOWrapper(gzip.GzipFile(fileobj=raw), encoding="utf-8")
+    return raw, io.TextIOWrapper(raw, encoding="utf-8")
+
+class Progress:
+    def __init__(self, raw_file, file_size):
+        self.raw_file = raw_file
+        self.file_size = file_size
+        self.start = time.perf_counter()
+        self.nbr_tx = 0
+        self.nbr_statements = 0
+
+    def executed(self, queries):
+        self.nbr_tx += 1
+        self.nbr_statements += len(queries)
+
+    def report(self, end="\r"):
+        elapsed = time.perf_counter() - self.start
+        position = self.raw_file.tell() if not self.raw_file.closed else self.file_size
+        print(
+            f"Progress: {position/self.file_size:.1%}, transactions executed: {self.nbr_tx}, "
+            f"statements: {self.nbr_statements} ({self.nbr_statements/elapsed:.0f}/s, "
+            f"{position/1024/1024/elapsed:.1f} MB/s read)",
+            end=end,
+        )
+
+def write_batch(driver, queries):
+    with driver.session(database=DATABASE) as session:
+        session.write_transaction(run_queries, queries)
+    return queries
+
+def import_statements(driver, file, progress, batch_size, workers):
+    with driver.session(database=DATABASE) as session, ThreadPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        pending = set()
+
+        def wait_for(max_pending):
+            nonlocal pending
+            while len(pending) > max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    progress.executed(future.result())
+                progress.report()
+
+        for kind, queries in read_batches(file, batch_size):
+            if kind == NODES and workers > 1:
+                # Node batches are independent, run them in parallel.
+                # Limit the number of pending batches to keep memory use bounded.
+                pending.add(executor.submit(write_batch, driver, queries))
+                wait_for(2 * workers)
+                continue
+            # Everything else must wait for all previous statements
+            wait_for(0)
+            session.write_transaction(run_queries, queries)
+            progress.executed(queries)
+            progress.report()
+        wait_for(0)
+
 
 if __name__ == "__main__":
-    try:
-        filename = sys.argv[1]
-    except IndexError:
+    parser = argparse.ArgumentParser(
+        description="Import a database from a file of cypher statements"
+    )
+    parser.add_argument(
+        "filename", nargs="?", help="file to import, may be compressed with gzip (.gz)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=20,
+        help="maximum number of statements executed in one transaction",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of node batches executed in parallel",
+    )
+    args = parser.parse_args()
+    filename = args.filename
+    if filename is None:
         print("Error: no filename given!")
         sys.exit(1)
+
+    uri = "neo4j://{}:{}".format(HOST, PORT)
+    driver = GraphDatabase.driver(uri, auth=(USER, PASS))
+
     file_stats = os.stat(filename)
     file_size = file_stats.st_size
     print(f"Importing from file '{filename}', size: {file_size/1024/1024:.1f} MB")
@@ -68,16 +219,11 @@ if __name__ == "__main__":
         print(f"Creating database '{DATABASE}'")
         querystring = "CREATE DATABASE `{}` IF NOT EXISTS".format(DATABASE)
         session.write_transaction(run_queries, [querystring])
-    with driver.session(database=DATABASE) as session:
 
-        with open(filename, 'r') as file:
-            nbr_tx = 0
-            while True:
-                queries = next_transaction(file)
-                if len(queries) == 0:
-                    break
-                session.write_transaction(run_queries, queries)
-                nbr_tx += 1
-                print(f"Progress: {file.tell()/file_size:.1%}, transactions executed: {nbr_tx}", end="\r")
+    raw, file = open_input(filename)
+    with file:
+        progress = Progress(raw, file_size)
+        import_statements(driver, file, progress, args.batch_size, args.workers)
+    progress.report(end="\n")
     driver.close()
-    print("\nDone!")
+    print("Done!")
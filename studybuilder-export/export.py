@@ -1,4 +1,6 @@
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from os import environ
 import os
 import logging
@@ -8,6 +10,15 @@ import json
 OUTPUT_DIR = environ.get("OUTPUT_DIR", "./output")
 LOG_LEVEL = environ.get("LOG_LEVEL", "INFO")
 
+# Number of requests sent to the api at the same time
+EXPORT_CONCURRENCY = int(environ.get("EXPORT_CONCURRENCY", "4"))
+# Export all studies, also those that have not changed since the last export
+EXPORT_FULL = environ.get("EXPORT_FULL", "False") == "True"
+# Page size used for large collections
+EXPORT_PAGE_SIZE = int(environ.get("EXPORT_PAGE_SIZE", "1000"))
+
+MANIFEST_FILENAME = "export-manifest.json"
+
 INCLUDE_STUDY_NUMBERS = environ.get("INCLUDE_STUDY_NUMBERS", "")
 EXCLUDE_STUDY_NUMBERS = environ.get("EXCLUDE_STUDY_NUMBERS", "")
 
@@ -33,8 +44,20 @@ class StudyExporter:
         self.api_base_url = self._read_env("API_BASE_URL")
         api_headers = {"Accept": "application/json", "User-Agent": "studybuilder-export"}
         self.api_headers = self._authenticate(api_headers)
+        self.session = self._create_session()
         self.verify_connection()
 
+    def _create_session(self):
+        """A session that keeps the connections to the api open between requests"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=EXPORT_CONCURRENCY, pool_maxsize=EXPORT_CONCURRENCY
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.api_headers)
+        return session
+
     def _read_env(self, varname):
         value = environ.get(varname)
         if not value:
@@ -88,9 +111,7 @@ class StudyExporter:
     # TODO Replace with api health check resource ...
     def verify_connection(self):
         try:
-            response = requests.get(
-                self.api_base_url + "/openapi.json", headers=self.api_headers
-            )
+            response = self.session.get(self.api_base_url + "/openapi.json")
             response.raise_for_status()
             self.log.info(f"Connected to api at {self.api_base_url}")
         except Exception as e:
@@ -102,16 +123,9 @@ class StudyExporter:
     def get_from_api(self, path, params=None, items_only=True):
         # Make sure that we always provide the page_size parameter,
         # otherwise the api uses its default of 10.
-        if params is None:
-            params = DEFAULT_QUERY_PARAMS
-        else:
-            for key, value in DEFAULT_QUERY_PARAMS.items():
-                if key not in params:
-                    params[key] = value
+        params = {**DEFAULT_QUERY_PARAMS, **(params or {})}
 
-        response = requests.get(
-            self.api_base_url + path, params=params, headers=self.api_headers
-        )
+        response = self.session.get(self.api_base_url + path, params=params)
         if response.ok:
             self.log.info(f"Successfully fetched data from: {path}")
             data = response.json()
@@ -125,17 +139,20 @@ class StudyExporter:
                 self.log.error("get %s %s", path, response.text)
             return None
 
-    def get_from_api_paged(self, path, params=None, page_size=100):
+    def iter_from_api_paged(self, path, params=None, page_size=100):
+        """Yields the items of a collection one page at a time"""
         page_number = 1
         page_params = {
             "page_number": page_number,
             "page_size": page_size,
             "total_count": True,
         }
-        page_params.update(params)
+        page_params.update(params or {})
         data = self.get_from_api(path, params=page_params, items_only=False)
-        all_data = data["items"]
+        if data is None:
+            raise RuntimeError(f"Failed to fetch {path}")
         count = data["total"]
+        yield data["items"]
 
         # Get remaining pages
         page_params["total_count"] = False
@@ -143,7 +160,14 @@ class StudyExporter:
             page_number += 1
             page_params["page_number"] = page_number
             data = self.get_from_api(path, params=page_params, items_only=True)
-            all_data.extend(data)
+            if data is None:
+                raise RuntimeError(f"Failed to fetch page {page_number} of {path}")
+            yield data
+
+    def get_from_api_paged(self, path, params=None, page_size=100):
+        all_data = []
+        for page in self.iter_from_api_paged(path, params=params, page_size=page_size):
+            all_data.extend(page)
         return all_data
 
     def get_dictionary_uid(self, library):
@@ -155,12 +179,73 @@ class StudyExporter:
             return None
         return data[0].get("codelist_uid")
 
-    def save_formatted_json(self, data, dir, filename):
+    def _write_atomic(self, dir, filename, write):
+        """
+        Writes to a temporary file that replaces the output file when complete,
+        so that an interrupted export never leaves a truncated file behind.
+        """
         filename = filename.replace("/", ".")
         path = os.path.join(dir, filename)
-        with open(path, "w") as f:
-            self.log.info(f"Saving to file: {path}")
-            f.write(json.dumps(data, indent=2, sort_keys=True))
+        self.log.info(f"Saving to file: {path}")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return filename
+
+    def save_formatted_json(self, data, dir, filename):
+        return self._write_atomic(
+            dir, filename, lambda f: json.dump(data, f, indent=2, sort_keys=True)
+        )
+
+    def save_formatted_json_pages(self, pages, dir, filename):
+        """
+        Streams a list given as an iterable of pages to disk,
+        with the same formatting as save_formatted_json().
+        """
+
+        def write(f):
+            separator = "[\n  "
+            for page in pages:
+                for item in page:
+                    f.write(separator)
+                    f.write(
+                        json.dumps(item, indent=2, sort_keys=True).replace("\n", "\n  ")
+                    )
+                    separator = ",\n  "
+            f.write("[]" if separator == "[\n  " else "\n]")
+
+        return self._write_atomic(dir, filename, write)
+
+    def export_endpoint(self, path, filename, params=None, page_size=None):
+        """Fetches one endpoint and saves it, returns the name of the saved file"""
+        if page_size is None:
+            data = self.get_from_api(path, params=params)
+            if data is None:
+                raise RuntimeError(f"Failed to fetch {path}")
+            return self.save_formatted_json(data, OUTPUT_DIR, filename)
+        return self.save_formatted_json_pages(
+            self.iter_from_api_paged(path, params=params, page_size=page_size),
+            OUTPUT_DIR,
+            filename,
+        )
+
+    def read_manifest(self):
+        if EXPORT_FULL:
+            return {}
+        try:
+            with open(os.path.join(OUTPUT_DIR, MANIFEST_FILENAME)) as f:
+                return json.load(f).get("studies", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, studies):
+        self.save_formatted_json({"studies": studies}, OUTPUT_DIR, MANIFEST_FILENAME)
 
     def filter_studies(self, studies):
         include_numbers = [
@@ -191,6 +276,42 @@ class StudyExporter:
                 )
         return studies_copy
 
+    @staticmethod
+    def study_version(study):
+        version_metadata = study["current_metadata"].get("version_metadata") or {}
+        return {
+            "study_status": version_metadata.get("study_status"),
+            "version_number": version_metadata.get("version_number"),
+            "version_timestamp": version_metadata.get("version_timestamp"),
+        }
+
+    def get_last_change(self, study_uid):
+        """
+        Returns the date of the latest audit trail entry of a study,
+        which also changes when the design of a draft study is edited.
+        """
+        data = self.get_from_api(f"/studies/{study_uid}/last-change", items_only=False)
+        if data is None:
+            raise RuntimeError(f"Failed to fetch the last change of study {study_uid}")
+        return data["date"]
+
+    def is_unchanged(self, study, last_change, manifest_entry):
+        """
+        A study, locked or draft, is unchanged if it is still the same version
+        with the same last change as in the manifest,
+        and all files written by that export still exist.
+        """
+        if manifest_entry is None:
+            return False
+        if manifest_entry.get("version") != self.study_version(study):
+            return False
+        if last_change is None or manifest_entry.get("last_change") != last_change:
+            return False
+        return all(
+            os.path.exists(os.path.join(OUTPUT_DIR, filename))
+            for filename in manifest_entry.get("files", [])
+        )
+
 
 study_optional_fields = [
     "current_metadata.study_description",
@@ -371,10 +492,7 @@ dictionaries = [
 
 
 def run_export():
-    try:
-        os.mkdir("output")
-    except FileExistsError:
-        pass
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     api = StudyExporter()
 
     # Clinical programmes
@@ -400,109 +518,128 @@ def run_export():
     study_uids = [s["uid"] for s in studies]
     api.log.info(f"Found studies {study_uids}")
 
+    # Studies that are unchanged since the last export are skipped.
+    # The last changes are read before the export,
+    # so that edits made during the export are exported by the next run.
+    previous_manifest = api.read_manifest()
+    with ThreadPoolExecutor(max_workers=EXPORT_CONCURRENCY) as executor:
+        last_changes = dict(
+            zip(study_uids, executor.map(api.get_last_change, study_uids))
+        )
+    manifest = {}
+    studies_to_export = []
+    for study in studies:
+        uid = study["uid"]
+        if api.is_unchanged(study, last_changes[uid], previous_manifest.get(uid)):
+            api.log.info(f"Study uid {uid} is unchanged since last export, skipping")
+            manifest[uid] = previous_manifest[uid]
+        else:
+            studies_to_export.append(study)
+
+    # All remaining exports are independent of each other and run in parallel.
+    # Each task fetches one endpoint and saves it to one file.
+    tasks = {}
+
     # Study metadata
-    api.log.info("=== Export study metadata ===")
     # Include all optional fields
     # , --> %2C
     # + --> %2B
     fields = "%2C".join(["%2B" + f for f in study_optional_fields])
-    for uid in study_uids:
-        api.log.info(f"Export metadata for study uid: {uid}")
-        study = api.get_from_api(f"/studies/{uid}?fields={fields}")
-        api.save_formatted_json(study, OUTPUT_DIR, f"studies/{uid}.json")
-
-    # Study design
-    api.log.info("=== Export study design ===")
-    for uid in study_uids:
-        api.log.info(f"Export study design for study uid: {uid}")
+    for study in studies_to_export:
+        uid = study["uid"]
+        tasks[(uid, "metadata")] = (
+            f"/studies/{uid}?fields={fields}",
+            f"studies/{uid}.json",
+            None,
+            None,
+        )
+
+        # Study design
         for ep in study_design_endpoints:
             study_ep = ep.format(study_uid=uid)
-            data = api.get_from_api(f"/{study_ep}")
-            api.save_formatted_json(data, OUTPUT_DIR, f"{study_ep}.json")
+            tasks[(uid, ep)] = (f"/{study_ep}", f"{study_ep}.json", None, None)
 
     # Templates
-    api.log.info("=== Export syntax templates ===")
     for ep in template_endpoints:
-        data = api.get_from_api(f"/{ep}")
-        api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
+        tasks[(None, ep)] = (f"/{ep}", f"{ep}.json", None, EXPORT_PAGE_SIZE)
 
     # Templates pre-instances
-    api.log.info("=== Export syntax pre-instances ===")
     for ep in syntax_pre_instance_endpoints:
-        data = api.get_from_api(f"/{ep}")
-        api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
+        tasks[(None, ep)] = (f"/{ep}", f"{ep}.json", None, EXPORT_PAGE_SIZE)
 
     # Sponsor extensions to CT packages
-    api.log.info("=== Export sponsor extensions ===")
     for ext in sponsor_ct_extensions:
         ep = ext["endpoint"]
-        params = ext["parameters"]
-        page_size = ext["page_size"]
-        codelist_name = params["codelist_name"]
-        api.log.info(f"Export sponsor extensions to {codelist_name} codelist")
-
-        # Small dataset, no need to split into pages.
-        if page_size is None:
-            data = api.get_from_api(f"/{ep}", params=params)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.{codelist_name}.json")
-
-        # Large dataset, split request into pages.
-        else:
-            data = api.get_from_api_paged(f"/{ep}", params=params, page_size=page_size)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.{codelist_name}.json")
-
-    # Concepts
-    api.log.info("=== Export concepts ===")
-    for cpt in concept_endpoints:
-        ep = cpt["endpoint"]
-        params = cpt["parameters"]
-        page_size = cpt["page_size"]
-        concept_name = ep.rsplit("/", 1)[1]
-        api.log.info(f"Export concept: {concept_name}")
-
-        # Small dataset, no need to split into pages.
-        if page_size is None:
-            data = api.get_from_api(f"/{ep}", params=params)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
-
-        # Large dataset, split request into pages.
-        else:
-            data = api.get_from_api_paged(f"/{ep}", params=params, page_size=page_size)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
+        codelist_name = ext["parameters"]["codelist_name"]
+        tasks[(None, f"{ep}.{codelist_name}")] = (
+            f"/{ep}",
+            f"{ep}.{codelist_name}.json",
+            ext["parameters"],
+            ext["page_size"],
+        )
 
-    # Activity items etc
-    api.log.info("=== Export activity items, classes etc ===")
-    for cpt in activity_endpoints:
+    # Concepts, activity items, classes etc
+    # Small datasets (without page size) are fetched in one request,
+    # large datasets are split into pages.
+    for cpt in concept_endpoints + activity_endpoints:
         ep = cpt["endpoint"]
-        params = cpt["parameters"]
-        page_size = cpt["page_size"]
-        api.log.info(f"Export activity data: {ep}")
-
-        # Small dataset, no need to split into pages.
-        if page_size is None:
-            data = api.get_from_api(f"/{ep}", params=params)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
-
-        # Large dataset, split request into pages.
-        else:
-            data = api.get_from_api_paged(f"/{ep}", params=params, page_size=page_size)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
+        tasks[(None, ep)] = (f"/{ep}", f"{ep}.json", cpt["parameters"], cpt["page_size"])
 
     # Dictionaries
-    api.log.info("=== Export dictionaries ===")
     for d in dictionaries:
-        api.log.info(f"Export dictionary: {d}")
         uid = api.get_dictionary_uid(d)
         if uid is None:
             api.log.error(f"Could not find dictionary: {d}")
             continue
-        params = {"codelist_uid": uid}
-        data = api.get_from_api("/dictionaries/terms", params=params)
-        api.save_formatted_json(data, OUTPUT_DIR, f"dictionaries.{d}.json")
+        tasks[(None, f"dictionaries.{d}")] = (
+            "/dictionaries/terms",
+            f"dictionaries.{d}.json",
+            {"codelist_uid": uid},
+            EXPORT_PAGE_SIZE,
+        )
 
+    api.log.info(
+        f"=== Export {len(tasks)} endpoints for {len(studies_to_export)} studies "
+        f"and the library, {EXPORT_CONCURRENCY} at a time ==="
+    )
+    study_files = {study["uid"]: [] for study in studies_to_export}
+    failed_studies = set()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=EXPORT_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(api.export_endpoint, *task): key
+            for key, task in tasks.items()
+        }
+        for future in as_completed(futures):
+            study_uid, ep = futures[future]
+            try:
+                filename = future.result()
+            except Exception as e:
+                api.log.error(f"Failed to export {ep} for study uid {study_uid}: {e}")
+                failed += 1
+                if study_uid is not None:
+                    failed_studies.add(study_uid)
+                continue
+            if study_uid is not None:
+                study_files[study_uid].append(filename)
+
+    # Studies are only added to the manifest when all of their files were saved,
+    # so that an interrupted or partly failed export is completed by the next run.
+    for study in studies_to_export:
+        uid = study["uid"]
+        if uid not in failed_studies:
+            manifest[uid] = {
+                "version": api.study_version(study),
+                "last_change": last_changes[uid],
+                "files": sorted(study_files[uid]),
+            }
+    api.save_manifest(manifest)
 
     # All done
-    api.log.info(f"=== Export completed successfully ===")
+    if failed:
+        api.log.error(f"=== Export completed with {failed} failed endpoints ===")
+    else:
+        api.log.info(f"=== Export completed successfully ===")
 
 
 if __name__ == "__main__":
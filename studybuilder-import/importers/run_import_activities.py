@@ -2,8 +2,6 @@ import asyncio
 import csv
 import json
 
-import aiohttp
-
 from .functions.caselessdict import CaselessDict
 from .functions.parsers import map_boolean
 from .functions.utils import load_env
@@ -1471,9 +1469,7 @@ class Activities(BaseImporter):
             "MDR_MIGRATION_ACTIVITY_ITEM_CLASSES"
         )
 
-        timeout = aiohttp.ClientTimeout(None)
-        conn = aiohttp.TCPConnector(limit=4, force_close=True)
-        async with aiohttp.ClientSession(timeout=timeout, connector=conn) as session:
+        async with self.api.client_session() as session:
             if (
                 self._limit_import_to is None
                 or ACTIVITY_GROUPS in self._limit_import_to
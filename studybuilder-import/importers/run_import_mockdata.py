@@ -306,14 +306,16 @@ class Mockdata(BaseImporter):
         readCSV = csv.reader(csvfile, delimiter=",")
         headers = next(readCSV)
         snomed_uid = self.api.find_dictionary_uid("SNOMED")
-        all_categories = self.api.get_terms_for_codelist_name("Objective Category")
+        all_categories = self.get_cache().get_terms_for_codelist_name(
+            "Objective Category"
+        )
 
         for row in readCSV:
             data = mapper(row, headers)
             indications = row[headers.index("indication")]
             if indications != "":
                 for ind in indications.split("|"):
-                    uid = self.api.find_dictionary_item_uid_from_name(snomed_uid, ind)
+                    uid = self.cache.find_dictionary_item_uid_from_name(snomed_uid, ind)
                     if uid is not None:
                         data["body"]["indication_uids"].append(uid)
                     else:
@@ -4,8 +4,6 @@ import json
 import os
 from collections import defaultdict
 
-import aiohttp
-
 from .functions.utils import load_env
 from .utils.importer import BaseImporter, open_file_async
 from .utils.metrics import Metrics
@@ -83,7 +81,9 @@ class SponsorModels(BaseImporter):
         csv_reader = csv.reader(instance_class_csvfile, delimiter=",")
         headers = next(csv_reader)
         existing_instance_classes = self.api.get_all_identifiers(
-            self.api.get_all_from_api(ACTIVITY_INSTANCE_CLASSES_PATH),
+            await self.api.get_all_from_api_async(
+                ACTIVITY_INSTANCE_CLASSES_PATH, session
+            ),
             identifier="name",
             value="uid",
         )
@@ -141,7 +141,7 @@ class SponsorModels(BaseImporter):
         csv_reader = csv.reader(item_class_csvfile, delimiter=",")
         headers = next(csv_reader)
         existing_item_classes = self.api.get_all_identifiers(
-            self.api.get_all_from_api(ACTIVITY_ITEM_CLASSES_PATH),
+            await self.api.get_all_from_api_async(ACTIVITY_ITEM_CLASSES_PATH, session),
             identifier="name",
             value="uid",
         )
@@ -192,7 +192,7 @@ class SponsorModels(BaseImporter):
 
     async def handle_sponsor_model(self, session) -> bool:
         existing_sponsor_models = self.api.get_all_identifiers(
-            self.api.get_all_from_api(SPONSOR_MODELS_PATH),
+            await self.api.get_all_from_api_async(SPONSOR_MODELS_PATH, session),
             identifier="name",
             value="uid",
         )
@@ -454,9 +454,7 @@ class SponsorModels(BaseImporter):
         await asyncio.gather(*api_tasks)
 
     async def async_run(self):
-        timeout = aiohttp.ClientTimeout(None)
-        conn = aiohttp.TCPConnector(limit=4, force_close=True)
-        async with aiohttp.ClientSession(timeout=timeout, connector=conn) as session:
+        async with self.api.client_session() as session:
             await self.handle_activity_instance_class_relations(
                 MDR_MIGRATION_ACTIVITY_INSTANCE_CLASS_MODEL_RELS,
                 session,
@@ -2,8 +2,6 @@ import asyncio
 import csv
 import sys
 
-import aiohttp
-
 from .functions.utils import create_logger, load_env
 from .utils.api_bindings import CODELIST_ELEMENT_TYPE, CODELIST_EPOCH_TYPE
 from .utils.importer import BaseImporter, open_file_async
@@ -200,15 +198,11 @@ class StandardCodelistTerms2(BaseImporter):
             (MDR_MIGRATION_REPEATING_VISIT_FREQUENCY, "Repeating Visit Frequency"),
         ]
 
-        timeout = aiohttp.ClientTimeout(None)
         for file_path, codelist_name in codelists_to_import:
             if self.limit_to_codelists and codelist_name not in self.limit_to_codelists:
                 self.log.info(f"Skipping codelist '{codelist_name}'")
                 continue
-            conn = aiohttp.TCPConnector(limit=4, force_close=True)
-            async with aiohttp.ClientSession(
-                timeout=timeout, connector=conn
-            ) as session:
+            async with self.api.client_session() as session:
                 await self.migrate_term(
                     file_path,
                     codelist_name=codelist_name,
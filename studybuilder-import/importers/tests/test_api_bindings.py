@@ -0,0 +1,177 @@
+import asyncio
+from unittest.mock import patch
+
+from aiohttp import web
+
+from ..utils import api_bindings
+from ..utils.api_bindings import ApiBinding
+from ..utils.metrics import Metrics
+
+
+def create_api(base_url, concurrency=3, retries=2):
+    with patch.object(ApiBinding, "verify_connection"), patch.object(
+        ApiBinding, "check_for_ct_packages"
+    ):
+        return ApiBinding(
+            base_url,
+            {"Accept": "application/json"},
+            Metrics(),
+            concurrency=concurrency,
+            retries=retries,
+        )
+
+
+async def run_with_server(routes, test):
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await test(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+@patch.object(api_bindings, "API_RETRY_BACKOFF", 0)
+def test_get_is_retried_on_unavailable_api():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        assert request.query["page_size"] == "0"
+        if len(calls) < 3:
+            return web.json_response({"message": "unavailable"}, status=503)
+        return web.json_response({"items": [{"uid": "Term_000001"}]})
+
+    async def test(base_url):
+        api = create_api(base_url)
+        async with api.client_session() as session:
+            items = await api.get_all_from_api_async("/ct/terms", session)
+        return api, items
+
+    api, items = asyncio.run(run_with_server([web.get("/ct/terms", handler)], test))
+    assert items == [{"uid": "Term_000001"}]
+    assert calls == ["GET", "GET", "GET"]
+    assert api.metrics.timings["GET /ct/terms"][0] == 3
+
+
+@patch.object(api_bindings, "API_RETRY_BACKOFF", 0)
+def test_put_is_retried_on_unavailable_api():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        if len(calls) < 2:
+            return web.json_response({"message": "unavailable"}, status=503)
+        return web.json_response({"uid": "Item_000001"})
+
+    async def test(base_url):
+        api = create_api(base_url)
+        async with api.client_session() as session:
+            return await api._send_async("PUT", "/items/Item_000001", {}, session)
+
+    status, result = asyncio.run(
+        run_with_server([web.put("/items/Item_000001", handler)], test)
+    )
+    assert status == 200
+    assert result == {"uid": "Item_000001"}
+    assert calls == ["PUT", "PUT"]
+
+
+@patch.object(api_bindings, "API_RETRY_BACKOFF", 0)
+def test_post_is_not_retried_after_a_response():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        return web.json_response({"message": "unavailable"}, status=503)
+
+    async def test(base_url):
+        api = create_api(base_url)
+        async with api.client_session() as session:
+            return await api.post_to_api_async("/ct/terms", {}, session)
+
+    status, result = asyncio.run(
+        run_with_server([web.post("/ct/terms", handler)], test)
+    )
+    assert status == 503
+    assert result == {"message": "unavailable"}
+    assert calls == ["POST"]
+
+
+def test_concurrency_is_limited():
+    in_flight = []
+    max_in_flight = []
+
+    async def handler(request):
+        in_flight.append(request)
+        max_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request)
+        return web.json_response({"uid": request.match_info["uid"]})
+
+    async def test(base_url):
+        api = create_api(base_url, concurrency=3)
+        async with api.client_session() as session:
+            return await asyncio.gather(
+                *(
+                    api.patch_to_api_async(f"/items/Item_{i:06}", {}, session)
+                    for i in range(20)
+                )
+            )
+
+    results = asyncio.run(run_with_server([web.patch("/items/{uid}", handler)], test))
+    assert len(results) == 20
+    assert all(status == 200 for status, _ in results)
+    assert max(max_in_flight) == 3
+
+
+@patch.object(api_bindings, "SLEEP_BEFORE_APPROVE", 0)
+def test_post_then_approve_is_pipelined():
+    created = []
+    approved = []
+
+    async def create(request):
+        body = await request.json()
+        if body["name"] == "duplicate":
+            return web.json_response({"message": "already exists"}, status=409)
+        uid = f"Item_{len(created):06}"
+        created.append(uid)
+        return web.json_response({"uid": uid, "name": body["name"]}, status=201)
+
+    async def approve(request):
+        approved.append(request.match_info["uid"])
+        return web.json_response({"uid": request.match_info["uid"], "status": "Final"})
+
+    async def test(base_url):
+        api = create_api(base_url)
+        items = [
+            {
+                "path": "/items",
+                "approve_path": "/items",
+                "body": {"name": name},
+            }
+            for name in ["a", "b", "duplicate", "c"]
+        ]
+        async with api.client_session() as session:
+            return api, await asyncio.gather(
+                *(
+                    api.post_then_approve(data=data, session=session, approve=True)
+                    for data in items
+                )
+            )
+
+    api, results = asyncio.run(
+        run_with_server(
+            [web.post("/items", create), web.post("/items/{uid}/approvals", approve)],
+            test,
+        )
+    )
+    assert sorted(approved) == sorted(created)
+    assert len(created) == 3
+    assert [result["status"] for result in results if result] == ["Final"] * 3
+    assert results[2] is None
+    assert api.metrics.metrics["/items/Item_NNNNNN/approvals - Approve"] == 3
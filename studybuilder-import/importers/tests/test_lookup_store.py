@@ -0,0 +1,185 @@
+import importlib
+
+from ..utils.lookup_store import MISSING, LookupStore
+
+
+class FakeApi:
+    api_base_url = "http://localhost:8000"
+
+    def __init__(self):
+        self.calls = []
+        self.terms_total = 2
+        self.memberships_total = 3
+        self.dictionary_terms_total = 1
+        self.dictionary_items = {}
+        self.codelist_terms = [{"term_uid": "CTTerm_000001"}]
+
+    def get_all_from_api(self, path, params=None, items_only=True):
+        self.calls.append(path)
+        if path == "/ct/packages":
+            return [{"uid": "SDTM CT 2024-03-29"}]
+        totals = {
+            "/ct/terms": self.memberships_total,
+            "/dictionaries/terms": self.dictionary_terms_total,
+        }
+        return {
+            "items": [{"start_date": "2024-05-01T10:00:00"}],
+            "total": totals.get(path, self.terms_total),
+        }
+
+    def get_all_from_api_paged(self, path):
+        self.calls.append(f"{path} paged")
+        return [
+            {
+                "term_uid": "CTTerm_000001",
+                "catalogue_name": "SDTM CT",
+                "name_submission_value": "Screening",
+                "code_submission_value": "SCREENING",
+                "sponsor_preferred_name": "Screening",
+            }
+        ]
+
+    def get_all_identifiers(self, responses, identifier, value):
+        return {item[identifier]: item[value] for item in responses}
+
+    def get_all_identifiers_multiple(self, responses, identifier, values):
+        return {item[identifier]: [{v: item[v] for v in values}] for item in responses}
+
+    def get_terms_for_codelist_uid(self, codelist_uid):
+        self.calls.append(f"codelist {codelist_uid}")
+        return self.codelist_terms
+
+    def find_dictionary_item_uid_from_name(self, dict_uid, name):
+        self.calls.append(f"dictionary {dict_uid} {name}")
+        return self.dictionary_items.get(name)
+
+
+def test_store(tmp_path):
+    path = str(tmp_path / "lookups.sqlite")
+    store = LookupStore(path)
+    assert store.marker is None
+    assert not store.is_valid(None)
+    store.reset("marker-1")
+    store.put("codelist_terms", "CTCodelist_000001", [{"term_uid": "CTTerm_000001"}])
+    store.put_many("concept_terms", {"C1|SDTM CT|": [], "C1||": [1], "C2||": [2]})
+    store.close()
+
+    store = LookupStore(path)
+    assert store.is_valid("marker-1")
+    assert not store.is_valid("marker-2")
+    assert store.get("codelist_terms", "ctcodelist_000001") == [
+        {"term_uid": "CTTerm_000001"}
+    ]
+    assert store.get("concept_terms", "C1|SDTM CT|") == []
+    store.forget("concept_terms", prefix="C1|")
+    assert store.get("concept_terms", "C1||") is MISSING
+    assert store.get("concept_terms", "C2||") == [2]
+    store.forget("codelist_terms", "CTCodelist_000001")
+    assert store.get("codelist_terms", "CTCodelist_000001") is MISSING
+
+    store.reset("marker-2")
+    assert store.get("concept_terms", "C2||") is MISSING
+    assert store.marker == "marker-2"
+
+
+def test_term_cache_is_reused_until_terms_change(monkeypatch, tmp_path):
+    monkeypatch.setenv("API_BASE_URL", "http://localhost:8000")
+    importer = importlib.import_module("importers.utils.importer")
+    store = LookupStore(str(tmp_path / "lookups.sqlite"))
+    api = FakeApi()
+
+    cache = importer.TermCache(api, store=store)
+    assert cache.all_terms_code_submission_values["screening"] == "CTTerm_000001"
+    assert cache.get_terms_for_codelist_uid("CTCodelist_000001") == [
+        {"term_uid": "CTTerm_000001"}
+    ]
+    assert api.calls.count("/ct/terms/attributes paged") == 1
+
+    # A new cache, for example in the next import step, reuses the lookups
+    api.calls.clear()
+    cache = importer.TermCache(api, store=store)
+    cache.get_terms_for_codelist_uid("CTCodelist_000001")
+    assert cache.all_term_name_values["Screening"][0]["term_uid"] == "CTTerm_000001"
+    assert api.calls == [
+        "/ct/packages",
+        "/ct/terms/attributes",
+        "/ct/terms/names",
+        "/ct/terms",
+    ]
+
+    # Adding a term to a codelist only drops the lookups of that codelist
+    cache.forget_codelist("CTCodelist_000001")
+    cache.get_terms_for_codelist_uid("CTCodelist_000001")
+    assert api.calls[-1] == "codelist CTCodelist_000001"
+
+    # Changed terms in the API rebuild everything
+    api.calls.clear()
+    api.terms_total = 3
+    importer.TermCache(api, store=store)
+    assert "/ct/terms/attributes paged" in api.calls
+
+
+def test_term_cache_marker_includes_codelist_memberships(monkeypatch, tmp_path):
+    monkeypatch.setenv("API_BASE_URL", "http://localhost:8000")
+    importer = importlib.import_module("importers.utils.importer")
+    store = LookupStore(str(tmp_path / "lookups.sqlite"))
+    api = FakeApi()
+
+    importer.TermCache(api, store=store)
+    api.calls.clear()
+    api.memberships_total = 4
+    importer.TermCache(api, store=store)
+    assert "/ct/terms/attributes paged" in api.calls
+
+
+def test_term_cache_does_not_keep_empty_lookups(monkeypatch, tmp_path):
+    monkeypatch.setenv("API_BASE_URL", "http://localhost:8000")
+    importer = importlib.import_module("importers.utils.importer")
+    store = LookupStore(str(tmp_path / "lookups.sqlite"))
+    api = FakeApi()
+    api.codelist_terms = []
+
+    cache = importer.TermCache(api, store=store)
+    assert cache.get_terms_for_codelist_uid("CTCodelist_000001") == []
+    assert cache.find_dictionary_item_uid_from_name("SNOMED", "Fever") is None
+    assert store.get("codelist_terms", "CTCodelist_000001") is MISSING
+    assert store.get("dictionary_terms", "SNOMED|Fever") is MISSING
+
+    api.codelist_terms = [{"term_uid": "CTTerm_000001"}]
+    api.dictionary_items["Fever"] = "DictionaryTerm_000001"
+    assert cache.get_terms_for_codelist_uid("CTCodelist_000001") == [
+        {"term_uid": "CTTerm_000001"}
+    ]
+    assert (
+        cache.find_dictionary_item_uid_from_name("SNOMED", "Fever")
+        == "DictionaryTerm_000001"
+    )
+
+
+def test_dictionary_lookups_are_dropped_when_dictionary_changes(monkeypatch, tmp_path):
+    monkeypatch.setenv("API_BASE_URL", "http://localhost:8000")
+    importer = importlib.import_module("importers.utils.importer")
+    store = LookupStore(str(tmp_path / "lookups.sqlite"))
+    api = FakeApi()
+    api.dictionary_items["Fever"] = "DictionaryTerm_000001"
+
+    cache = importer.TermCache(api, store=store)
+    cache.find_dictionary_item_uid_from_name("SNOMED", "Fever")
+    cache.find_dictionary_item_uid_from_name("SNOMED", "Fever")
+    assert api.calls.count("/dictionaries/terms") == 1
+    assert api.calls.count("dictionary SNOMED Fever") == 1
+
+    # The next run reuses the lookups of unchanged dictionaries
+    api.calls.clear()
+    cache = importer.TermCache(api, store=store)
+    cache.find_dictionary_item_uid_from_name("SNOMED", "Fever")
+    assert "dictionary SNOMED Fever" not in api.calls
+
+    api.calls.clear()
+    api.dictionary_terms_total = 2
+    api.dictionary_items["Fever"] = "DictionaryTerm_000002"
+    cache = importer.TermCache(api, store=store)
+    assert (
+        cache.find_dictionary_item_uid_from_name("SNOMED", "Fever")
+        == "DictionaryTerm_000002"
+    )
@@ -5,10 +5,15 @@ import logging
 import math
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from os import environ
 from typing import Sequence
+from urllib.parse import urlencode, urlsplit
 
 import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from .metrics import Metrics
 from .path_join import path_join
@@ -85,6 +90,16 @@ UNIT_SUBSET_ENDPOINT_UNIT = "Endpoint Unit"
 
 SLEEP_BEFORE_APPROVE = 0.05
 
+# Maximum number of concurrent requests to the API, and size of the connection pools
+API_CONCURRENCY = int(environ.get("API_CONCURRENCY", "4"))
+# Number of retries of failed requests, with exponential backoff
+API_RETRIES = int(environ.get("API_RETRIES", "3"))
+API_RETRY_BACKOFF = float(environ.get("API_RETRY_BACKOFF", "0.5"))
+# Responses worth retrying: the request was not processed by the API
+RETRY_STATUSES = (502, 503, 504)
+# Only requests with these methods are retried after a response or a read error
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
 
 def status_ok(status):
     return 200 <= status < 300
@@ -103,14 +118,25 @@ def get_error_message(response):
 # ---------------------------------------------------------------
 #
 class ApiBinding:
-    def __init__(self, api_base_url, api_headers, metrics, logger=None):
+    def __init__(
+        self,
+        api_base_url,
+        api_headers,
+        metrics,
+        logger=None,
+        concurrency=None,
+        retries=None,
+    ):
         self.api_headers = api_headers
         self.api_base_url = api_base_url
         if metrics is None:
             self.metrics = Metrics()
         else:
             self.metrics = metrics
-        self.sem = asyncio.Semaphore(8)
+        self.concurrency = concurrency or API_CONCURRENCY
+        self.retries = API_RETRIES if retries is None else retries
+        self._semaphores = {}
+        self.session = self._create_session()
         if logger is not None:
             self.log = logger
         else:
@@ -124,6 +150,52 @@ class ApiBinding:
     def update_headers(self, api_headers):
         self.api_headers = api_headers
 
+    # ---------------------------------------------------------------
+    # Connection pools
+    # ---------------------------------------------------------------
+    #
+    # Keep-alive session shared by all blocking requests, retrying failed requests with backoff
+    def _create_session(self):
+        session = requests.Session()
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=API_RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.concurrency, max_retries=retry
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.hooks["response"].append(self._record_response)
+        return session
+
+    def _record_response(self, response, *args, **kwargs):
+        self.metrics.record_request(
+            response.request.method,
+            urlsplit(response.request.url).path,
+            response.elapsed.total_seconds(),
+        )
+
+    # Limits the number of concurrent requests, one semaphore per event loop
+    # as importers may run several event loops one after the other.
+    @property
+    def sem(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.concurrency)}
+        return self._semaphores[loop]
+
+    # Keep-alive session for the async building blocks, to be used as an async context manager.
+    # The number of concurrent requests is limited by the connector and by self.sem.
+    def client_session(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(None), connector=connector
+        )
+
     # ---------------------------------------------------------------
     # Verify connection to api (and database)
     # ---------------------------------------------------------------
@@ -132,7 +204,7 @@ class ApiBinding:
     # TODO Replace with api health check resource ...
     def verify_connection(self):
         try:
-            response = requests.get(
+            response = self.session.get(
                 path_join(self.api_base_url, "openapi.json"), headers=self.api_headers
             )
             response.raise_for_status()
@@ -170,7 +242,7 @@ class ApiBinding:
     def simple_delete(self, path, simple_path=None):
         if simple_path is None:
             simple_path = path
-        response = requests.delete(
+        response = self.session.delete(
             path_join(self.api_base_url, path), headers=self.api_headers
         )
         if response.ok:
@@ -186,7 +258,7 @@ class ApiBinding:
     def simple_post_to_api(self, path, body, simple_path=None, params=None):
         if simple_path is None:
             simple_path = path
-        response = requests.post(
+        response = self.session.post(
             path_join(self.api_base_url, path),
             headers=self.api_headers,
             json=body,
@@ -219,14 +291,14 @@ class ApiBinding:
 
     def post_to_api(self, object, body=None, path=None):
         if path is None:
-            response = requests.post(
+            response = self.session.post(
                 path_join(self.api_base_url, object["path"]),
                 headers=self.api_headers,
                 json=object["body"],
             )
             path = object["path"]
         else:
-            response = requests.post(
+            response = self.session.post(
                 path_join(self.api_base_url, path), headers=self.api_headers, json=body
             )
         short_path = "".join([i for i in path if not i.isdigit()])
@@ -263,7 +335,7 @@ class ApiBinding:
 
     def patch_to_api(self, body, path):
         url = path_join(self.api_base_url, path, body["uid"])
-        response = requests.patch(url, headers=self.api_headers, json=body)
+        response = self.session.patch(url, headers=self.api_headers, json=body)
         if response.ok:
             self.metrics.icrement(path + "--Patch")
             self.log.info("Patch %s %s", path, "success")
@@ -283,7 +355,7 @@ class ApiBinding:
 
     def approve_item(self, uid: str, url: str):
         full_url = path_join(self.api_base_url, url, uid, "approvals")
-        response = requests.post(full_url, headers=self.api_headers)
+        response = self.session.post(full_url, headers=self.api_headers)
         if not response.ok:
             self.log.warning("Failed to approve %s %s", uid, response.content)
             return None
@@ -292,12 +364,12 @@ class ApiBinding:
 
     def approve_item_names_and_attributes(self, uid: str, url: str):
         full_url = path_join(self.api_base_url, url, uid, "names/approvals")
-        response = requests.post(full_url, headers=self.api_headers)
+        response = self.session.post(full_url, headers=self.api_headers)
         if not response.ok:
             self.log.warning("Failed to approve names %s %s", uid, response.content)
             return False
         full_url = path_join(self.api_base_url, url, uid, "attributes/approvals")
-        response = requests.post(full_url, headers=self.api_headers)
+        response = self.session.post(full_url, headers=self.api_headers)
         if not response.ok:
             self.log.warning(
                 "Failed to approve attributes %s %s", uid, response.content
@@ -319,7 +391,7 @@ class ApiBinding:
             if "page_number" not in params:
                 params["page_number"] = 1
 
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, path), params=params, headers=self.api_headers
         )
 
@@ -376,16 +448,20 @@ class ApiBinding:
         count = data["total"]
 
         nbr_pages = math.ceil(count / page_size)
-        # Get remaining pages
+        # Get remaining pages, fetched concurrently over the pooled session
         page_params["total_count"] = False
-        while page_size * page_number < count:
-            page_number += 1
-            page_params["page_number"] = page_number
+
+        def get_page(page_number):
             self.log.info(f"Fetching {path}, page {page_number} of {nbr_pages}")
-            additional_data = self.get_all_from_api(
-                path, params=page_params, items_only=True
+            return self.get_all_from_api(
+                path,
+                params={**page_params, "page_number": page_number},
+                items_only=True,
             )
-            all_items.extend(additional_data)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for additional_data in executor.map(get_page, range(2, nbr_pages + 1)):
+                all_items.extend(additional_data)
         if items_only:
             return all_items
         return data
@@ -431,7 +507,7 @@ class ApiBinding:
         return identifiers
 
     def get_libraries(self):
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, "libraries"), headers=self.api_headers
         )
         response.raise_for_status()
@@ -442,7 +518,7 @@ class ApiBinding:
 
     def create_library(self, object):
         self.metrics.icrement("/libraries")
-        response = requests.post(
+        response = self.session.post(
             path_join(self.api_base_url, "libraries"),
             headers=self.api_headers,
             json=object,
@@ -459,7 +535,7 @@ class ApiBinding:
             }
         else:
             params = {"codelist_name": codelist_name, "page_number": 1, "page_size": 0}
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, "ct/terms"),
             params=params,
             headers=self.api_headers,
@@ -470,7 +546,7 @@ class ApiBinding:
 
     # Get all terms from a codelist identified by codelist uid
     def get_terms_for_codelist_uid(self, codelist_uid: str):
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, "ct/terms"),
             params={"codelist_uid": codelist_uid, "page_number": 1, "page_size": 0},
             headers=self.api_headers,
@@ -492,7 +568,7 @@ class ApiBinding:
                 "op": "eq",
             }
         filters = json.dumps(filters_dict)
-        response = requests.get(
+        response = self.session.get(
             self.api_base_url + "/ct/terms/attributes",
             params={
                 "library_name": "CDISC",
@@ -508,7 +584,7 @@ class ApiBinding:
 
     # Get all dictionary mapping all codelist names to a uid
     def get_code_lists_uids(self):
-        response = requests.get(
+        response = self.session.get(
             path_join(
                 self.api_base_url, "ct/codelists/names?page_number=1&page_size=0"
             ),
@@ -570,7 +646,7 @@ class ApiBinding:
             "page_number": 1,
             "page_size": 0,
         }
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, "studies", study_uid, "study-objectives"),
             headers=self.api_headers,
             params=params,
@@ -587,7 +663,7 @@ class ApiBinding:
             "page_number": 1,
             "page_size": 0,
         }
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, path), headers=self.api_headers, params=params
         )
         response.raise_for_status()
@@ -600,7 +676,7 @@ class ApiBinding:
 
     def find_object_by_name(self, name, path):
         params = {"filters": '{"name":{"v":["' + name + '"],"op":"eq"}}'}
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, path),
             params=params,
             headers=self.api_headers,
@@ -612,7 +688,7 @@ class ApiBinding:
 
     # Find the uid for a dictionary from its name
     def find_dictionary_uid(self, name):
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, "dictionaries/codelists"),
             params={"library_name": name},
             headers=self.api_headers,
@@ -625,7 +701,7 @@ class ApiBinding:
 
     # Find a term via its name from a dictionary
     def find_dictionary_item_uid_from_name(self, dict_uid, name):
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, "dictionaries/terms"),
             params={
                 "codelist_uid": dict_uid,
@@ -645,7 +721,7 @@ class ApiBinding:
             "page_number": 1,
             "page_size": 0,
         }
-        response = requests.get(
+        response = self.session.get(
             path_join(self.api_base_url, path), headers=self.api_headers, params=params
         )
         response.raise_for_status()
@@ -659,7 +735,7 @@ class ApiBinding:
 
     def simple_approve(self, path: str):
         path = path_join(self.api_base_url, path)
-        res = requests.post(path, headers=self.api_headers)
+        res = self.session.post(path, headers=self.api_headers)
         if not res.ok:
             self.log.warning("Failed to approve %s", path)
             return False
@@ -668,7 +744,9 @@ class ApiBinding:
 
     def simple_approve2(self, url: str, path: str, label=""):
         url = path_join(url, path)
-        res = requests.post(path_join(self.api_base_url, url), headers=self.api_headers)
+        res = self.session.post(
+            path_join(self.api_base_url, url), headers=self.api_headers
+        )
         if not res.ok:
             self.log.warning("Failed to approve %s", url)
             self.metrics.icrement(f"{url}--{label}ApproveError")
@@ -679,7 +757,7 @@ class ApiBinding:
 
     def simple_patch(self, body, url, path):
         full_url = path_join(self.api_base_url, url)
-        response = requests.patch(full_url, headers=self.api_headers, json=body)
+        response = self.session.patch(full_url, headers=self.api_headers, json=body)
         if response.ok:
             self.metrics.icrement(path + "--Patch")
             self.log.info("Patch %s %s", path, "success")
@@ -706,103 +784,124 @@ class ApiBinding:
     # Async building blocks
     # ---------------------------------------------------------------
     #
-    async def new_version_to_api_async(self, path: str, session: aiohttp.ClientSession):
-        async with session.post(
-            path_join(self.api_base_url, path), json={}, headers=self.api_headers
-        ) as response:
-            status = response.status
+    async def _request_async(
+        self,
+        method: str,
+        url: str,
+        session: aiohttp.ClientSession,
+        body: dict | None = None,
+    ):
+        """
+        Sends a request with at most self.concurrency requests in flight, retrying with exponential backoff.
+
+        Requests are retried when the connection could not be established,
+        and idempotent requests are also retried after a read error or a RETRY_STATUSES response.
+        Returns the status and the decoded json response, or the response text if it is not json.
+        """
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            start = time.perf_counter()
             try:
-                result = await response.json()
-            except aiohttp.ContentTypeError:
-                textresult = await response.text()
-                result = {}
-                self.log.error(
-                    f"Failed to post to '{path}', status: {status}, message: {textresult}"
+                async with self.sem:
+                    async with session.request(
+                        method, url, json=body, headers=self.api_headers
+                    ) as response:
+                        status = response.status
+                        try:
+                            result = await response.json()
+                        except (aiohttp.ContentTypeError, json.JSONDecodeError):
+                            result = await response.text()
+            except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as e:
+                if attempt >= self.retries or (
+                    not idempotent and not isinstance(e, aiohttp.ClientConnectorError)
+                ):
+                    raise
+                self.log.warning(f"{method} {url} failed: {e}, retrying")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries or not idempotent:
+                    raise
+                self.log.warning(f"{method} {url} failed: {e}, retrying")
+            else:
+                self.metrics.record_request(
+                    method, urlsplit(url).path, time.perf_counter() - start
                 )
-            return status, result
+                if not (
+                    idempotent and status in RETRY_STATUSES and attempt < self.retries
+                ):
+                    return status, result
+                self.log.warning(f"{method} {url} returned {status}, retrying")
+            await asyncio.sleep(API_RETRY_BACKOFF * 2**attempt)
+            attempt += 1
+
+    async def _send_async(
+        self, method: str, path: str, body: dict, session: aiohttp.ClientSession
+    ):
+        status, result = await self._request_async(
+            method, path_join(self.api_base_url, path), session, body=body
+        )
+        if isinstance(result, str):
+            self.log.error(
+                f"Failed to {method.lower()} to '{path}', status: {status}, message: {result}"
+            )
+            result = {}
+        return status, result
+
+    async def new_version_to_api_async(self, path: str, session: aiohttp.ClientSession):
+        return await self._send_async("POST", path, {}, session)
 
     async def patch_to_api_async(
         self, path: str, body: dict, session: aiohttp.ClientSession
     ):
-        async with session.patch(
-            path_join(self.api_base_url, path), json=body, headers=self.api_headers
-        ) as response:
-            status = response.status
-            try:
-                result = await response.json()
-            except aiohttp.ContentTypeError:
-                textresult = await response.text()
-                result = {}
-                self.log.error(
-                    f"Failed to patch to '{path}', status: {status}, message: {textresult}"
-                )
-            return status, result
+        return await self._send_async("PATCH", path, body, session)
 
-    # This gives reasonable waiting for lock on atomic incrementing of identifiers
     async def post_to_api_async(
         self, url: str, body: dict, session: aiohttp.ClientSession
     ):
-        async with self.sem:
-            async with session.post(
-                path_join(self.api_base_url, url), json=body, headers=self.api_headers
-            ) as response:
-                status = response.status
-                try:
-                    result = await response.json()
-                except aiohttp.ContentTypeError:
-                    textresult = await response.text()
-                    result = {}
-                    self.log.error(
-                        f"Failed to post to '{url}', status: {status}, message: {textresult}"
-                    )
-                return status, result
+        return await self._send_async("POST", url, body, session)
+
+    async def get_all_from_api_async(
+        self, path: str, session: aiohttp.ClientSession, params=None
+    ):
+        # All items in one page, like get_all_from_api
+        params = {"page_number": 1, "page_size": 0} | (params or {})
+        url = f"{path_join(self.api_base_url, path)}?{urlencode(params)}"
+        status, result = await self._request_async("GET", url, session)
+        if not status_ok(status):
+            self.log.error(f"get {path}, status: {status}, message: {result}")
+            return None
+        if isinstance(result, dict) and "items" in result:
+            self.metrics.icrement(path + "--GET", len(result["items"]))
+            return result["items"]
+        return result
+
+    async def _approve_async(self, url: str, session: aiohttp.ClientSession):
+        status, result = await self._request_async(
+            "POST", path_join(self.api_base_url, url), session, body={}
+        )
+        if not status_ok(status):
+            error_message = (
+                get_error_message(result) if isinstance(result, dict) else result
+            )
+            self.log.warning(
+                f"Failed to approve {url}, status: {status}, message: {error_message}"
+            )
+            result = {}
+        return status, result
 
     async def approve_async(self, url: str, session: aiohttp.ClientSession):
-        async with session.post(
-            path_join(self.api_base_url, url), json={}, headers=self.api_headers
-        ) as response:
-            status = response.status
-            if response.ok:
-                result = await response.json()
-            else:
-                try:
-                    error_result = await response.json()
-                    error_message = get_error_message(error_result)
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                self.log.warning(
-                    f"Failed to approve {url}, status: {status}, message: {error_message}"
-                )
-                result = {}
-            return status, result
+        return await self._approve_async(url, session)
 
     async def approve_item_async(
         self, uid: str, url: str, session: aiohttp.ClientSession
     ):
-        url = path_join(self.api_base_url, url, uid, "approvals")
-        async with session.post(
-            url,
-            json={},
-            headers=self.api_headers,
-        ) as response:
-            status = response.status
-            if response.ok:
-                result = await response.json()
-            else:
-                try:
-                    error_result = await response.json()
-                    error_message = get_error_message(error_result)
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                self.log.warning(
-                    f"Failed to approve {url}, status: {status}, message: {error_message}"
-                )
-                result = {}
-            if not response.ok:
-                self.metrics.icrement(url + "--ApproveError")
-            else:
-                self.metrics.icrement(url + "--Approve")
-            return status, result
+        url = path_join(url, uid, "approvals")
+        status, result = await self._approve_async(url, session)
+        if not status_ok(status):
+            self.metrics.icrement(url + "--ApproveError")
+        else:
+            self.metrics.icrement(url + "--Approve")
+        return status, result
 
     async def post_then_approve(
         self, data: dict, session: aiohttp.ClientSession, approve: bool
@@ -831,7 +930,7 @@ class ApiBinding:
         uid = response.get("uid")
         if approve is True and uid is not None:
             # Sleeping to avoid errors when running locally (with limited resources for the db).
-            time.sleep(SLEEP_BEFORE_APPROVE)
+            await asyncio.sleep(SLEEP_BEFORE_APPROVE)
             self.log.info(f"Approve object with uid '{uid}'")
             status, result = await self.approve_item_async(
                 uid=uid, url=data["approve_path"], session=session
@@ -865,7 +964,7 @@ class ApiBinding:
         uid = response.get("uid")
         if approve and uid is not None:
             # Sleeping to avoid errors when running locally (with limited resources for the db).
-            time.sleep(SLEEP_BEFORE_APPROVE)
+            await asyncio.sleep(SLEEP_BEFORE_APPROVE)
             status, reponse = await self.approve_item_async(
                 uid=response.get("uid"), url=data["approve_path"], session=session
             )
@@ -18,6 +18,7 @@ from .api_bindings import (
     UNIT_SUBSET_AGE,
     ApiBinding,
 )
+from .lookup_store import MISSING, LookupStore
 from .metrics import Metrics
 
 logger = logging.getLogger("legacy_mdr_migrations - utils")
@@ -33,10 +34,53 @@ API_HEADERS = {"Accept": "application/json", "User-Agent": "test"}
 API_BASE_URL = load_env("API_BASE_URL")
 
 
+LOOKUP_CACHE_PATH = load_env("MDR_MIGRATION_LOOKUP_CACHE", default=":memory:")
+
+_lookup_store = None
+
+
+def get_lookup_store() -> LookupStore:
+    global _lookup_store
+    if _lookup_store is None:
+        _lookup_store = LookupStore(LOOKUP_CACHE_PATH)
+    return _lookup_store
+
+
 class TermCache:
-    def __init__(self, api):
+    """
+    Term lookups shared by the import steps.
+
+    The terms are kept in a LookupStore together with a change marker of the
+    API. A new TermCache only fetches all terms again when the marker has changed,
+    and single lookups (terms of a codelist, terms by concept id, dictionary terms)
+    are only fetched once per marker. Dictionary term lookups are also dropped
+    when the terms of their dictionary have changed. Empty lookup results are not
+    kept, as the missing items may be added later in the import.
+    With MDR_MIGRATION_LOOKUP_CACHE set to a file path,
+    the lookups are also reused by the following runs of the import.
+    """
+
+    def __init__(self, api, store: LookupStore | None = None):
         self.api = api
-        self.all_terms_attributes = self.api.get_all_from_api_paged("/ct/terms/attributes")
+        self.store = store if store is not None else get_lookup_store()
+        marker = self.get_change_marker()
+        all_terms_attributes = MISSING
+        all_term_names = MISSING
+        if self.store.is_valid(marker):
+            logger.info("Reusing terms from lookup cache %s", self.store.path)
+            all_terms_attributes = self.store.get("ct_terms", "attributes")
+            all_term_names = self.store.get("ct_terms", "names")
+        if all_terms_attributes is MISSING or all_term_names is MISSING:
+            self.store.reset(marker)
+            all_terms_attributes = self.api.get_all_from_api_paged(
+                "/ct/terms/attributes"
+            )
+            all_term_names = self.api.get_all_from_api_paged("/ct/terms/names")
+            self.store.put_many(
+                "ct_terms",
+                {"attributes": all_terms_attributes, "names": all_term_names},
+            )
+        self.all_terms_attributes = all_terms_attributes
         self.all_terms_name_submission_values = CaselessDict(
             self.api.get_all_identifiers(
                 self.all_terms_attributes,
@@ -51,7 +95,7 @@ class TermCache:
                 value="term_uid",
             )
         )
-        self.all_term_names = self.api.get_all_from_api_paged("/ct/terms/names")
+        self.all_term_names = all_term_names
         self.all_term_name_values = CaselessDict(
             self.api.get_all_identifiers_multiple(
                 self.all_term_names,
@@ -60,6 +104,131 @@ class TermCache:
             )
         )
         self.added_terms = CaselessDict()
+        self.checked_dictionaries = set()
+
+    def get_change_marker(self) -> str | None:
+        """
+        Cheap description of the current state of the terms in the API:
+        the loaded CT packages, the number of term names and attributes
+        together with the start date of the most recently changed ones,
+        and the number of codelist memberships of the terms.
+        Returns None if the state could not be fetched.
+        """
+        packages = self.api.get_all_from_api("/ct/packages")
+        if packages is None:
+            return None
+        marker = {
+            "api": self.api.api_base_url,
+            "packages": sorted(package.get("uid", "") for package in packages),
+        }
+        for path in ("/ct/terms/attributes", "/ct/terms/names"):
+            latest = self.api.get_all_from_api(
+                path,
+                params={
+                    "page_size": 1,
+                    "total_count": True,
+                    "sort_by": json.dumps({"start_date": False}),
+                },
+                items_only=False,
+            )
+            if latest is None:
+                return None
+            marker[path] = [
+                latest.get("total"),
+                [item.get("start_date") for item in latest.get("items", [])],
+            ]
+        # One row per term and codelist, so that terms added to or removed from codelists change the marker
+        memberships = self.api.get_all_from_api(
+            "/ct/terms",
+            params={"page_size": 1, "total_count": True},
+            items_only=False,
+        )
+        if memberships is None:
+            return None
+        marker["/ct/terms"] = memberships.get("total")
+        return json.dumps(marker, sort_keys=True)
+
+    def check_dictionary(self, dict_uid: str):
+        """
+        Drop the lookups of a dictionary once per TermCache if its terms have changed,
+        as described by their number and the start date of the most recently changed one.
+        """
+        if dict_uid in self.checked_dictionaries:
+            return
+        self.checked_dictionaries.add(dict_uid)
+        latest = self.api.get_all_from_api(
+            "/dictionaries/terms",
+            params={
+                "codelist_uid": dict_uid,
+                "page_size": 1,
+                "total_count": True,
+                "sort_by": json.dumps({"start_date": False}),
+            },
+            items_only=False,
+        )
+        marker = MISSING
+        if latest is not None:
+            marker = [
+                latest.get("total"),
+                [item.get("start_date") for item in latest.get("items", [])],
+            ]
+        if (
+            marker is MISSING
+            or self.store.get("dictionary_markers", dict_uid) != marker
+        ):
+            self.store.forget("dictionary_terms", prefix=f"{dict_uid}|")
+            if marker is not MISSING:
+                self.store.put("dictionary_markers", dict_uid, marker)
+
+    def _lookup(self, kind: str, key: str, fetch: Callable):
+        value = self.store.get(kind, key)
+        if value is MISSING:
+            value = fetch()
+            if value:
+                self.store.put(kind, key, value)
+        return value
+
+    def get_terms_for_codelist_uid(self, codelist_uid: str):
+        return self._lookup(
+            "codelist_terms",
+            codelist_uid,
+            lambda: self.api.get_terms_for_codelist_uid(codelist_uid),
+        )
+
+    def get_terms_for_codelist_name(self, codelist_name: str):
+        return self._lookup(
+            "codelist_terms_by_name",
+            codelist_name,
+            lambda: self.api.get_terms_for_codelist_name(codelist_name),
+        )
+
+    def lookup_terms_from_concept_id(
+        self, concept_id: str, catalogue_name=None, code_submission_value=None
+    ):
+        return self._lookup(
+            "concept_terms",
+            f"{concept_id}|{catalogue_name or ''}|{code_submission_value or ''}",
+            lambda: self.api.lookup_terms_from_concept_id(
+                concept_id,
+                catalogue_name=catalogue_name,
+                code_submission_value=code_submission_value,
+            ),
+        )
+
+    def find_dictionary_item_uid_from_name(self, dict_uid: str, name: str):
+        self.check_dictionary(dict_uid)
+        return self._lookup(
+            "dictionary_terms",
+            f"{dict_uid}|{name}",
+            lambda: self.api.find_dictionary_item_uid_from_name(dict_uid, name),
+        )
+
+    def forget_codelist(self, codelist_uid: str, concept_id: str | None = None):
+        """Drop the lookups that are outdated after adding a term to a codelist"""
+        self.store.forget("codelist_terms", codelist_uid)
+        self.store.forget("codelist_terms_by_name")
+        if concept_id:
+            self.store.forget("concept_terms", prefix=f"{concept_id}|")
 
 
 # Decorator to avoid starting every function with the open() context manager
@@ -277,28 +446,28 @@ class BaseImporter:
                 self.log.info(
                     f"Looking up term with concept id '{concept_id}' with submission value '{submval}' in catalogue '{catalogue}'"
                 )
-                matching_terms = self.api.lookup_terms_from_concept_id(
+                matching_terms = self.cache.lookup_terms_from_concept_id(
                     concept_id, catalogue_name=catalogue, code_submission_value=submval
                 )
                 if len(matching_terms) == 0:
                     self.log.warning(
                         f"Could not find term with concept id '{concept_id}' with submission value '{submval}' in catalogue '{catalogue}'"
                     )
-                    matching_terms = self.api.lookup_terms_from_concept_id(
+                    matching_terms = self.cache.lookup_terms_from_concept_id(
                         concept_id, code_submission_value=submval
                     )
                     if len(matching_terms) == 0:
                         self.log.warning(
                             f"Could not find term with concept id '{concept_id}' with submission value '{submval}' in any catalogue'"
                         )
-                        matching_terms = self.api.lookup_terms_from_concept_id(
+                        matching_terms = self.cache.lookup_terms_from_concept_id(
                             concept_id, catalogue_name=catalogue
                         )
                         if len(matching_terms) == 0:
                             self.log.warning(
                                 f"Could not find term with concept id '{concept_id}' with any submission value in catalogue '{catalogue}'"
                             )
-                            matching_terms = self.api.lookup_terms_from_concept_id(
+                            matching_terms = self.cache.lookup_terms_from_concept_id(
                                 concept_id
                             )
                             if len(matching_terms) == 0:
@@ -344,7 +513,7 @@ class BaseImporter:
                     term_uid = term_in_catalogue["term_uid"]
                 codelist_uid = data["body"]["codelist_uid"]
                 codelist = self.retry_function(
-                    self.api.get_terms_for_codelist_uid,
+                    self.cache.get_terms_for_codelist_uid,
                     [codelist_uid],
                     nbr_retries=3,
                     retry_delay=0.5,
@@ -389,6 +558,8 @@ class BaseImporter:
                     self.log.error(
                         f"Failed to add term name '{term_name}' with uid '{term_uid}' to codelist '{codelist_uid}'"
                     )
+                else:
+                    self.cache.forget_codelist(codelist_uid, concept_id=concept_id)
         if data.get("element_type_uid"):
             self.api.post_to_api(
                 {
@@ -419,7 +590,9 @@ class BaseImporter:
                 retry_delay = 2 * retry_delay
 
     @lru_cache(maxsize=10000)
-    def lookup_concept_uid(self, name, endpoint, subset=None, library=None, only_final=False):
+    def lookup_concept_uid(
+        self, name, endpoint, subset=None, library=None, only_final=False
+    ):
         self.log.info(f"Looking up concept {endpoint} with name '{name}'")
         filt = {"name": {"v": [name], "op": "eq"}}
         if library is not None:
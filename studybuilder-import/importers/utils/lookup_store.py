@@ -0,0 +1,92 @@
+import json
+import sqlite3
+import threading
+
+# Returned by LookupStore.get() when a key has not been stored
+MISSING = object()
+
+
+class LookupStore:
+    """
+    Small key/value store for the lookups done by the importers,
+    for example term uids by submission value or the terms of a codelist.
+    Values are stored as json, keys are case insensitive.
+
+    The content is tagged with a change marker describing the state of the
+    API it was fetched from. When the marker of the API no longer matches,
+    the content is stale and must be rebuilt with reset().
+    Use ":memory:" as path to only keep the lookups for the current process.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS marker (id INTEGER PRIMARY KEY CHECK (id = 1), value TEXT)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS lookup (kind TEXT, key TEXT, value TEXT, PRIMARY KEY (kind, key))"
+            )
+
+    @property
+    def marker(self):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM marker WHERE id = 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_valid(self, marker: str | None) -> bool:
+        return marker is not None and self.marker == marker
+
+    def reset(self, marker: str | None):
+        """Remove all content and tag the empty store with a new change marker"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM lookup")
+            self._connection.execute("DELETE FROM marker")
+            if marker is not None:
+                self._connection.execute(
+                    "INSERT INTO marker (id, value) VALUES (1, ?)", (marker,)
+                )
+
+    def get(self, kind: str, key: str = ""):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM lookup WHERE kind = ? AND key = ?",
+                (kind, key.lower()),
+            ).fetchone()
+        return json.loads(row[0]) if row else MISSING
+
+    def put(self, kind: str, key: str, value):
+        self.put_many(kind, {key: value})
+
+    def put_many(self, kind: str, values: dict):
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO lookup (kind, key, value) VALUES (?, ?, ?)",
+                [
+                    (kind, key.lower(), json.dumps(value))
+                    for key, value in values.items()
+                ],
+            )
+
+    def forget(self, kind: str, key: str | None = None, prefix: str | None = None):
+        """Remove one key, all keys starting with a prefix, or all keys of a kind"""
+        with self._lock, self._connection:
+            if key is not None:
+                self._connection.execute(
+                    "DELETE FROM lookup WHERE kind = ? AND key = ?", (kind, key.lower())
+                )
+            elif prefix is not None:
+                self._connection.execute(
+                    "DELETE FROM lookup WHERE kind = ? AND substr(key, 1, ?) = ?",
+                    (kind, len(prefix), prefix.lower()),
+                )
+            else:
+                self._connection.execute("DELETE FROM lookup WHERE kind = ?", (kind,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -1,11 +1,18 @@
 import re
+import threading
+import time
 
 
 class Metrics:
     metrics: dict
+    timings: dict
 
     def __init__(self):
         self.metrics = dict()
+        # Request count and total duration in seconds, per simplified endpoint
+        self.timings = dict()
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
 
     def simplify_path(self, path: str):
         parts = path.rsplit("--", 1)
@@ -23,6 +30,33 @@ class Metrics:
         key = self.simplify_path(key)
         self.metrics[key] = self.metrics.get(key, 0) + increment
 
+    def record_request(self, method: str, path: str, elapsed: float):
+        key = f"{method} {self.simplify_path(path)}"
+        with self._lock:
+            count, total = self.timings.get(key, (0, 0.0))
+            self.timings[key] = (count + 1, total + elapsed)
+
+    def print_throughput(self):
+        elapsed = time.perf_counter() - self.started
+        nbr_requests = sum(count for count, _ in self.timings.values())
+        data = sorted(self.timings.items(), key=lambda x: x[1][1], reverse=True)
+        print("----------------------------------------")
+        print("Throughput, sorted by total time")
+        print("----------------------------------------")
+        for key, (count, total) in data:
+            print(
+                "{}: {} requests, {:.1f}s, {:.0f}ms avg".format(
+                    key, count, total, 1000 * total / count
+                )
+            )
+        print("----------------------------------------")
+        print(
+            "{} requests in {:.1f}s, {:.1f} requests/s".format(
+                nbr_requests, elapsed, nbr_requests / elapsed if elapsed else 0
+            )
+        )
+        print("----------------------------------------")
+
     def print(self, sort_by_number=False):
         print("----------------------------------------")
         print("Metrics")
@@ -72,6 +72,7 @@ def main():
     # Display metrics
     metr.print_sorted_by_key()
     metr.print_sorted_by_value()
+    metr.print_throughput()
 
 
 if __name__ == "__main__":